@@ -17,6 +17,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from lib.base_collector import BaseCollector, main_runner
 from lib.parsers.jupyterhub_nodes import JupyterHubNodeParser
 from lib.exceptions import SSHError
+from lib.ssh_utils import ssh_command
 
 # Import requests for API calls
 import requests
@@ -168,7 +169,9 @@ class JupyterHubCollector(BaseCollector):
         Raises:
             SSHError: If command fails or times out
         """
-        ssh_cmd = f'ssh -o ConnectTimeout=10 {self.config.pbs_host} "{command}"'
+        ssh_cmd = ssh_command(self.config.pbs_host, command, 10,
+                              control_dir=self.config.ssh_control_dir,
+                              control_persist=self.config.ssh_control_persist)
         self.logger.debug(f"Running SSH command: {ssh_cmd}")
 
         try:
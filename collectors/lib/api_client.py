@@ -1,28 +1,151 @@
 """
 SAM Status Dashboard API client.
+
+Optionally compresses POST bodies (gzip, or zstd when ``zstandard`` is
+installed) and sends deltas: once the server has acknowledged a snapshot
+(``snapshot_token`` in its response), the next tick's list fields carry only
+the rows that changed since. The wire format and the server side live in
+``src/system_status/delta.py``; ``DELTA_KEYS`` and ``make_delta`` below
+mirror it, since the collectors don't import the webapp tree.
 """
 
+import gzip
 import json
 import logging
+import os
 import time
 import requests
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 try:
     from .exceptions import APIError, APIAuthError, APIValidationError
 except ImportError:
     from exceptions import APIError, APIAuthError, APIValidationError
 
 
+# List fields sent as deltas → the row fields identifying a row (keep in
+# step with system_status.delta.DELTA_KEYS).
+DELTA_KEYS = {
+    'login_nodes': ('node_name',),
+    'node_types': ('node_type',),
+    'queues': ('queue_name',),
+    'user_project_queues': ('username', 'project_code', 'queue_name'),
+    'filesystems': ('filesystem_name',),
+    'reservations': ('reservation_name',),
+    'queue_definitions': ('queue_name',),
+}
+
+
+def make_delta(base, current, base_token):
+    """
+    Describe ``current`` relative to the acknowledged ``base`` snapshot.
+
+    Scalars and lists the base lacks are sent in full; every other
+    ``DELTA_KEYS`` list becomes ``{"upsert": [new/changed rows],
+    "remove": [[key values], ...]}``.
+    """
+    delta = {'delta_base': base_token}
+    for name, value in current.items():
+        fields = DELTA_KEYS.get(name)
+        if fields is None or not isinstance(value, list) or name not in base:
+            delta[name] = value
+            continue
+        old = {tuple(r.get(f) for f in fields): r for r in base[name]}
+        new_keys = set()
+        upsert = []
+        for row in value:
+            key = tuple(row.get(f) for f in fields)
+            new_keys.add(key)
+            if old.get(key) != row:
+                upsert.append(row)
+        delta[name] = {
+            'upsert': upsert,
+            'remove': [list(k) for k in old if k not in new_keys],
+        }
+    return delta
+
+
 class SAMAPIClient:
     """Client for SAM Status Dashboard API."""
 
-    def __init__(self, base_url, username, password, timeout=30):
+    def __init__(self, base_url, username, password, timeout=30,
+                 compression=None, delta_state_dir=None):
+        """
+        Args:
+            compression: 'gzip', 'zstd' (gzip when zstandard is missing)
+                or None to send plain JSON
+            delta_state_dir: Directory holding each system's last
+                acknowledged snapshot; None disables deltas
+        """
         self.base_url = base_url.rstrip('/')
         self.auth = (username, password)
         self.timeout = timeout
         self.session = requests.Session()
         self.logger = logging.getLogger(__name__)
 
+        if compression == 'zstd' and zstandard is None:
+            self.logger.warning("zstandard not installed; compressing with gzip")
+            compression = 'gzip'
+        if compression not in (None, 'gzip', 'zstd'):
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.compression = compression
+        self.delta_state_dir = delta_state_dir
+
+    def _encode(self, payload):
+        """Serialize ``payload``; returns (body bytes, headers)."""
+        body = json.dumps(payload, separators=(',', ':'), allow_nan=False).encode()
+        headers = {'Content-Type': 'application/json'}
+        if self.compression == 'gzip':
+            body = gzip.compress(body, compresslevel=6)
+            headers['Content-Encoding'] = 'gzip'
+        elif self.compression == 'zstd':
+            body = zstandard.ZstdCompressor(level=3).compress(body)
+            headers['Content-Encoding'] = 'zstd'
+        return body, headers
+
+    def _delta_state_path(self, system):
+        return os.path.join(self.delta_state_dir, f'{system}-snapshot.json.gz')
+
+    def _load_delta_base(self, system):
+        """The last acknowledged (token, payload) for ``system``, or None."""
+        if not self.delta_state_dir:
+            return None
+        try:
+            with gzip.open(self._delta_state_path(system), 'rt') as f:
+                state = json.load(f)
+            return state['token'], state['payload']
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"Ignoring unreadable delta state for {system}: {e}")
+            return None
+
+    def _save_delta_base(self, system, token, payload):
+        """Record ``payload`` as acknowledged under ``token`` (atomic replace)."""
+        if not self.delta_state_dir:
+            return
+        path = self._delta_state_path(system)
+        try:
+            os.makedirs(self.delta_state_dir, mode=0o700, exist_ok=True)
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with gzip.open(tmp, 'wt') as f:
+                json.dump({'token': token, 'payload': payload}, f, separators=(',', ':'))
+            os.replace(tmp, path)
+        except OSError as e:
+            self.logger.warning(f"Could not save delta state for {system}: {e}")
+
+    def _clear_delta_base(self, system):
+        if not self.delta_state_dir:
+            return
+        try:
+            os.remove(self._delta_state_path(system))
+        except FileNotFoundError:
+            pass
+
     def post_status(self, system, data, max_retries=3, dry_run=False):
         """
         Post status data to API with retry logic.
@@ -46,21 +169,42 @@ class SAMAPIClient:
             self.logger.info(f"[DRY RUN] Data:\n{json.dumps(data, indent=2)}")
             return {'success': True, 'message': 'Dry run - no data posted'}
 
+        payload = data
+        base = self._load_delta_base(system)
+        if base is not None:
+            payload = make_delta(base[1], data, base[0])
+        body, headers = self._encode(payload)
+        self.logger.debug(
+            f"POST body: {len(body)} bytes ({'delta' if base else 'full'}, "
+            f"{self.compression or 'uncompressed'})"
+        )
+
         for attempt in range(max_retries):
             try:
                 response = self.session.post(
                     url,
-                    json=data,
+                    data=body,
                     auth=self.auth,
                     timeout=self.timeout,
-                    headers={'Content-Type': 'application/json'}
+                    headers=headers
                 )
 
+                if response.status_code == 409 and base is not None:
+                    # The server no longer holds our base (restart, other
+                    # worker, expiry): resend this tick in full.
+                    self.logger.info(f"Delta base rejected for {system}; sending full snapshot")
+                    self._clear_delta_base(system)
+                    return self.post_status(system, data, max_retries=max_retries)
+
                 response.raise_for_status()
                 result = response.json()
 
+                if result.get('snapshot_token'):
+                    self._save_delta_base(system, result['snapshot_token'], data)
+
                 self.logger.info(
-                    f"✓ Posted {system} status: status_id={result.get('status_id')}"
+                    f"✓ Posted {system} status: status_id={result.get('status_id')}, "
+                    f"server ingest {result.get('ingest_ms')} ms"
                 )
                 return result
 
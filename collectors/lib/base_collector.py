@@ -3,8 +3,10 @@ Base class for HPC system status collectors.
 """
 import sys
 import json
+import time
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # This try/except block allows the file to be imported when 'collectors' is a package,
@@ -15,7 +17,6 @@ try:
     from .config import CollectorConfig
     from .logging_utils import setup_logging
     from .parsers.nodes import NodeParser
-    from .parsers.jobs import JobParser
     from .parsers.queues import QueueParser
     from .parsers.filesystems import FilesystemParser
     from .parsers.reservations import ReservationParser
@@ -26,7 +27,6 @@ except ImportError:
     from config import CollectorConfig
     from logging_utils import setup_logging
     from parsers.nodes import NodeParser
-    from parsers.jobs import JobParser
     from parsers.queues import QueueParser
     from parsers.filesystems import FilesystemParser
     from parsers.reservations import ReservationParser
@@ -36,6 +36,18 @@ except ImportError:
 class BaseCollector:
     """Base class for system-specific data collectors."""
 
+    # (timing key, method) for each independent command group. Every stage
+    # fills its own keys of the payload, so the groups run concurrently into
+    # private dicts that are merged back in this order.
+    STAGES = (
+        ('nodes', '_collect_node_data'),
+        ('jobs', '_collect_job_data'),
+        ('queue_definitions', '_collect_queue_definitions'),
+        ('login_nodes', '_collect_login_node_data'),
+        ('filesystems', '_collect_filesystem_data'),
+        ('reservations', '_collect_reservation_data'),
+    )
+
     def __init__(self, system_name, dry_run=False, json_only=False):
         self.system_name = system_name
         self.config = CollectorConfig(system_name)
@@ -44,14 +56,23 @@ class BaseCollector:
         self.logger = logging.getLogger(__name__)
 
         # Initialize clients
-        self.pbs = PBSClient(self.config.pbs_host, timeout=self.config.pbs_timeout)
+        ssh_control = {
+            'control_dir': self.config.ssh_control_dir,
+            'control_persist': self.config.ssh_control_persist,
+        }
+        self.pbs = PBSClient(self.config.pbs_host, timeout=self.config.pbs_timeout,
+                             **ssh_control)
         self.api = SAMAPIClient(
             self.config.api_url,
             self.config.api_user,
             self.config.api_password,
-            timeout=self.config.api_timeout
+            timeout=self.config.api_timeout,
+            compression=self.config.api_compression,
+            delta_state_dir=self.config.api_delta_dir if self.config.api_delta else None,
         )
-        self.login_collector = LoginNodeCollector(self.config.pbs_host, timeout=self.config.ssh_timeout)
+        self.login_collector = LoginNodeCollector(self.config.pbs_host,
+                                                  timeout=self.config.ssh_timeout,
+                                                  **ssh_control)
 
     def _collect_node_data(self, data: dict):
         """
@@ -64,12 +85,17 @@ class BaseCollector:
         """Collect common job data."""
         try:
             self.logger.info("Collecting job data...")
-            jobs_json = self.pbs.get_jobs_json()
-            job_stats = JobParser.parse_jobs(jobs_json)
+            # One pass over the jobs fills the job totals and both rollups.
+            if self.config.qstat_stream:
+                jobs = self.pbs.iter_jobs()
+            else:
+                jobs = self.pbs.get_jobs_json().get('Jobs', {}).items()
+            rollups = QueueParser.aggregate_jobs(jobs)
+            job_stats = rollups['job_stats']
             data.update(job_stats)
 
-            data['queues'] = QueueParser.parse_queues(jobs_json)
-            data['user_project_queues'] = QueueParser.parse_user_project_queues(jobs_json)
+            data['queues'] = rollups['queues']
+            data['user_project_queues'] = rollups['user_project_queues']
 
             self.logger.info(
                 f"  Jobs: {job_stats.get('running_jobs', 0)} running, {job_stats.get('pending_jobs', 0)} pending, {job_stats.get('held_jobs', 0)} held"
@@ -77,19 +103,6 @@ class BaseCollector:
             self.logger.info(
                 f"  User/project rollups: {len(data['user_project_queues'])} rows"
             )
-
-            # Full qstat -Q roster (incl. routing/idle queues that never hold
-            # jobs) — its own try/except so a qstat -Q hiccup doesn't cost us
-            # the job-derived metrics above.
-            try:
-                queues_json = self.pbs.get_queues_json()
-                data['queue_definitions'] = QueueParser.parse_queue_definitions(queues_json)
-                self.logger.info(
-                    f"  Queue roster: {len(data['queue_definitions'])} defined queues"
-                )
-            except Exception as e:
-                self.logger.error(f"Failed to collect queue roster: {e}")
-                data['queue_definitions'] = []
         except Exception as e:
             self.logger.error(f"Failed to collect job data: {e}")
             data.update({
@@ -99,9 +112,24 @@ class BaseCollector:
                 'active_users': 0,
                 'queues': [],
                 'user_project_queues': [],
-                'queue_definitions': [],
             })
 
+    def _collect_queue_definitions(self, data: dict):
+        """
+        Collect the full qstat -Q roster (incl. routing/idle queues that
+        never hold jobs) — its own stage so a qstat -Q hiccup doesn't cost
+        us the job-derived metrics.
+        """
+        try:
+            queues_json = self.pbs.get_queues_json()
+            data['queue_definitions'] = QueueParser.parse_queue_definitions(queues_json)
+            self.logger.info(
+                f"  Queue roster: {len(data['queue_definitions'])} defined queues"
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to collect queue roster: {e}")
+            data['queue_definitions'] = []
+
     def _collect_login_node_data(self, data: dict):
         """Collect common login node data."""
         try:
@@ -143,17 +171,48 @@ class BaseCollector:
             self.logger.error(f"Failed to collect reservation data: {e}")
             data['reservations'] = []
 
+    def _run_stage(self, method_name: str):
+        """Run one stage into a fresh dict; returns (data, seconds)."""
+        part = {}
+        start = time.perf_counter()
+        getattr(self, method_name)(part)
+        return part, time.perf_counter() - start
+
     def collect(self):
         """
         Collect all system metrics.
         Returns a complete data dict ready for API posting.
+
+        The stages in ``STAGES`` run on ``COLLECT_WORKERS`` threads after the
+        shared ssh control connection is up; the payload's ``stage_timings``
+        holds each stage's wall time in seconds (plus ``ssh_master`` and
+        ``total``), so the slowest stage is the tick's critical path.
         """
         data = {'timestamp': datetime.now().isoformat()}
-        self._collect_node_data(data)
-        self._collect_job_data(data)
-        self._collect_login_node_data(data)
-        self._collect_filesystem_data(data)
-        self._collect_reservation_data(data)
+        timings = {}
+        start = time.perf_counter()
+
+        try:
+            if self.pbs.open_master():
+                timings['ssh_master'] = round(time.perf_counter() - start, 3)
+        except Exception as e:
+            # Not fatal: each stage reports its own ssh failures.
+            self.logger.warning(f"Could not open ssh control connection: {e}")
+
+        with ThreadPoolExecutor(max_workers=self.config.collect_workers,
+                                thread_name_prefix='collect') as pool:
+            futures = [(name, pool.submit(self._run_stage, method))
+                       for name, method in self.STAGES]
+            for name, future in futures:
+                part, seconds = future.result()
+                data.update(part)
+                timings[name] = round(seconds, 3)
+
+        timings['total'] = round(time.perf_counter() - start, 3)
+        data['stage_timings'] = timings
+        self.logger.info(
+            "  Stage timings: " + ", ".join(f"{k} {v:.2f}s" for k, v in timings.items())
+        )
         return data
 
     def run(self):
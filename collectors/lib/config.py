@@ -3,6 +3,7 @@ Configuration management for collectors.
 """
 
 import os
+import tempfile
 import yaml
 import logging
 from pathlib import Path
@@ -46,6 +47,35 @@ class CollectorConfig:
         self.ssh_timeout = int(os.getenv('SSH_TIMEOUT', '10'))
         self.api_timeout = int(os.getenv('API_TIMEOUT', '30'))
 
+        # Parse qstat -f -F json incrementally off the ssh pipe instead of
+        # buffering the whole document (see parsers/qstat_stream.py).
+        self.qstat_stream = os.getenv('QSTAT_STREAM', '0').lower() in ('1', 'true', 'yes')
+
+        # Multiplex all ssh commands to a host over one control connection
+        # that outlives the run (seconds), so the 5-minute loop reuses it.
+        # 'no' opens a fresh connection per command.
+        persist = os.getenv('SSH_CONTROL_PERSIST', '600')
+        self.ssh_control_persist = None if persist.lower() in ('', 'no', 'off') else persist
+        self.ssh_control_dir = os.getenv('SSH_CONTROL_DIR') or os.path.join(
+            tempfile.gettempdir(), f'sam-collector-ssh-{os.getuid()}'
+        )
+
+        # POST body compression: 'gzip', 'zstd' or 'none' (the default, for
+        # webapps that predate compressed ingest).
+        compression = os.getenv('STATUS_API_COMPRESSION', 'none').lower()
+        self.api_compression = None if compression in ('', 'none', 'off') else compression
+
+        # Send only rows changed since the last snapshot the API acknowledged;
+        # that snapshot is kept in api_delta_dir between runs.
+        self.api_delta = os.getenv('STATUS_API_DELTA', '0').lower() in ('1', 'true', 'yes')
+        self.api_delta_dir = os.getenv('STATUS_API_DELTA_DIR') or os.path.join(
+            tempfile.gettempdir(), f'sam-collector-delta-{os.getuid()}'
+        )
+
+        # Independent collection stages run on this many threads (1 = one
+        # after another, in the historical order).
+        self.collect_workers = max(1, int(os.getenv('COLLECT_WORKERS', '6')))
+
     def _load_yaml(self):
         """Load system-specific YAML configuration."""
         config_file = os.path.join(self.config_dir, 'config.yaml')
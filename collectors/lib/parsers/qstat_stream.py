@@ -0,0 +1,128 @@
+"""
+Incremental parser for ``qstat -f -F json`` output.
+
+``qstat -f -F json`` on Derecho is one document of tens of thousands of
+jobs; ``json.loads`` on it needs the whole text buffered and the whole
+object tree built before the first job can be looked at. ``iter_qstat_jobs``
+reads the stream in chunks and yields each ``(job_id, job)`` pair of the
+top-level ``Jobs`` object as soon as it is complete, so memory is bounded by
+one chunk plus one job and parsing overlaps the transfer over ssh.
+
+Only the document's outer structure is walked by hand; every key and value
+is still decoded by ``json.JSONDecoder.raw_decode``, so the yielded objects
+are exactly what ``json.loads(...)['Jobs'].items()`` would produce. Errors
+are raised as ``json.JSONDecodeError`` like ``json.loads`` does.
+"""
+
+import json
+import re
+from typing import Iterator, Tuple
+
+CHUNK_SIZE = 1 << 20
+"""Characters read from the stream per refill."""
+
+_WS = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+
+
+class _Cursor:
+    """A window over the stream: ``buf[pos:]`` is the unparsed text."""
+
+    def __init__(self, stream, chunk_size):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of stream)."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self.fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f'Expecting {char!r}', self.buf, self.pos)
+        self.pos += 1
+
+    def value(self):
+        """Decode one complete JSON value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof or not self.fill():
+                    raise
+                continue
+            # A value ending exactly at the buffer edge may be a number
+            # that continues in the next chunk.
+            if end == len(self.buf) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_json_object_items(stream, key: str,
+                           chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, object]]:
+    """
+    Yield the members of the object at top-level ``key`` of a JSON document.
+
+    Other top-level members are decoded and discarded. A missing ``key``
+    yields nothing, like ``doc.get(key, {}).items()``.
+
+    Args:
+        stream: Text stream (``read(n)``) holding one JSON object
+        key: Top-level member whose object members to yield
+        chunk_size: Characters per read
+
+    Raises:
+        json.JSONDecodeError: Malformed or truncated input
+    """
+    cur = _Cursor(stream, chunk_size)
+    cur.expect('{')
+    if cur.peek() == '}':
+        cur.pos += 1
+        return
+    while True:
+        name = cur.value()
+        cur.expect(':')
+        if name == key and cur.peek() == '{':
+            cur.pos += 1
+            if cur.peek() == '}':
+                cur.pos += 1
+            else:
+                while True:
+                    member = cur.value()
+                    cur.expect(':')
+                    yield member, cur.value()
+                    if cur.peek() == ',':
+                        cur.pos += 1
+                        continue
+                    cur.expect('}')
+                    break
+        else:
+            cur.value()
+        if cur.peek() == ',':
+            cur.pos += 1
+            continue
+        cur.expect('}')
+        break
+    if cur.peek():
+        raise json.JSONDecodeError('Extra data', cur.buf, cur.pos)
+
+
+def iter_qstat_jobs(stream, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, dict]]:
+    """Yield ``(job_id, job_data)`` from streamed ``qstat -f -F json`` output."""
+    return iter_json_object_items(stream, 'Jobs', chunk_size)
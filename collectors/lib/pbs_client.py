@@ -5,24 +5,61 @@ PBS command execution client.
 import json
 import logging
 import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
 
 try:
     from .exceptions import PBSCommandError, PBSParseError
+    from .parsers.qstat_stream import iter_qstat_jobs
+    from .ssh_utils import ssh_command
 except ImportError:
     from exceptions import PBSCommandError, PBSParseError
+    from parsers.qstat_stream import iter_qstat_jobs
+    from ssh_utils import ssh_command
 
 
 class PBSClient:
     """
     Wrapper for PBS command execution.
     Handles SSH invocation, timeouts, and error capture.
+
+    With ``control_dir``/``control_persist`` set, every command rides one
+    multiplexed ssh connection to ``host`` (see ``ssh_utils.ssh_command``).
     """
 
-    def __init__(self, host, timeout=30):
+    def __init__(self, host, timeout=30, control_dir=None, control_persist=None):
         self.host = host
         self.timeout = timeout
+        self.control_dir = control_dir
+        self.control_persist = control_persist
         self.logger = logging.getLogger(__name__)
 
+    def _ssh(self, cmd):
+        return ssh_command(self.host, cmd, self.timeout,
+                           control_dir=self.control_dir,
+                           control_persist=self.control_persist)
+
+    def open_master(self):
+        """
+        Establish the multiplexed control connection, if enabled.
+
+        Run once before fanning commands out concurrently: with
+        ControlMaster=auto, simultaneous first connections would each
+        handshake on their own and only one would become the master.
+        A live master makes this a cheap no-op round trip.
+
+        Returns:
+            True if a control connection is configured and answered
+
+        Raises:
+            PBSCommandError: If the connection fails or times out
+        """
+        if not (self.control_dir and self.control_persist):
+            return False
+        self.run_command("true")
+        return True
+
     def run_command(self, cmd, json_output=False):
         """
         Execute PBS command via SSH.
@@ -37,7 +74,7 @@ class PBSClient:
         Raises:
             PBSCommandError: If command fails or times out
         """
-        full_cmd = f'ssh -o ConnectTimeout={self.timeout} {self.host} "{cmd}"'
+        full_cmd = self._ssh(cmd)
 
         self.logger.debug(f"Running: {full_cmd}")
 
@@ -68,6 +105,57 @@ class PBSClient:
 
         return output
 
+    @contextmanager
+    def stream_command(self, cmd):
+        """
+        Execute PBS command via SSH, yielding its stdout as a text stream.
+
+        For outputs too large to buffer comfortably (``qstat -f -F json``).
+        The same ``timeout`` bounds the whole command; on expiry the process
+        is killed. Exit status is checked once the stream has been consumed.
+
+        Args:
+            cmd: Command to run (e.g., "qstat -f -F json")
+
+        Raises:
+            PBSCommandError: If command fails or times out
+        """
+        full_cmd = self._ssh(cmd)
+
+        self.logger.debug(f"Streaming: {full_cmd}")
+
+        with tempfile.TemporaryFile(mode='w+') as stderr:
+            proc = subprocess.Popen(full_cmd, shell=True, text=True,
+                                    stdout=subprocess.PIPE, stderr=stderr)
+            timed_out = threading.Event()
+
+            def _expire():
+                timed_out.set()
+                proc.kill()
+
+            timer = threading.Timer(self.timeout, _expire)
+            timer.start()
+            try:
+                yield proc.stdout
+                proc.stdout.read()
+            except BaseException:
+                proc.kill()
+                proc.wait()
+                if timed_out.is_set():
+                    raise PBSCommandError(f"Command timed out after {self.timeout}s: {cmd}")
+                raise
+            finally:
+                timer.cancel()
+                proc.stdout.close()
+            proc.wait()
+
+            if timed_out.is_set():
+                raise PBSCommandError(f"Command timed out after {self.timeout}s: {cmd}")
+            if proc.returncode != 0:
+                stderr.seek(0)
+                error_msg = stderr.read().strip()
+                raise PBSCommandError(f"Command failed (exit {proc.returncode}): {cmd}\n{error_msg}")
+
     def get_nodes_json(self):
         """Execute pbsnodes -aj -F json"""
         return self.run_command("pbsnodes -aj -F json", json_output=True)
@@ -76,6 +164,19 @@ class PBSClient:
         """Execute qstat -f -F json"""
         return self.run_command("qstat -f -F json", json_output=True)
 
+    def iter_jobs(self):
+        """
+        Stream qstat -f -F json, yielding ``(job_id, job_data)`` pairs as
+        each job parses (see ``parsers.qstat_stream``).
+        """
+        cmd = "qstat -f -F json"
+        with self.stream_command(cmd) as stdout:
+            try:
+                yield from iter_qstat_jobs(stdout)
+            except json.JSONDecodeError as e:
+                self.logger.error(f"JSON parse error: {e}")
+                raise PBSParseError(f"Invalid JSON from {cmd}: {e}")
+
     def get_queues_json(self):
         """Execute qstat -Q -f -F json (full queue roster, incl. routing queues)"""
         return self.run_command("qstat -Q -f -F json", json_output=True)
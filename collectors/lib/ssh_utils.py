@@ -7,8 +7,9 @@ Parallel: ~2-3s total for all nodes
 """
 
 import logging
+import os
 import subprocess
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 try:
     from .exceptions import SSHError
@@ -18,12 +19,49 @@ except ImportError:
     from parallel_ssh import ParallelSSHCollector
 
 
+def ssh_command(host: str, remote_cmd: str, connect_timeout: int,
+                control_dir: Optional[str] = None,
+                control_persist: Optional[str] = None) -> str:
+    """
+    Build the shell command line that runs ``remote_cmd`` on ``host``.
+
+    With ``control_dir`` and ``control_persist`` set, the command joins (or
+    starts) one multiplexed control connection per host (ssh ControlMaster):
+    only the first command of a tick pays the TCP + auth handshake, later and
+    concurrent commands open a channel on the existing connection, and the
+    master lingers ``control_persist`` seconds after the last one so the next
+    tick reuses it too.
+
+    Args:
+        host: Remote host
+        remote_cmd: Command to run there (double-quoted on the command line)
+        connect_timeout: ssh ConnectTimeout in seconds
+        control_dir: Directory for the control sockets (created 0700)
+        control_persist: ssh ControlPersist value; None disables multiplexing
+    """
+    opts = [f'-o ConnectTimeout={connect_timeout}']
+    if control_dir and control_persist:
+        os.makedirs(control_dir, mode=0o700, exist_ok=True)
+        # %C is a hash of (local host, remote host, port, user): short enough
+        # for the unix socket path limit, distinct per destination.
+        opts += [
+            '-o ControlMaster=auto',
+            f'-o ControlPath={os.path.join(control_dir, "%C")}',
+            f'-o ControlPersist={control_persist}',
+        ]
+    return f'ssh {" ".join(opts)} {host} "{remote_cmd}"'
+
+
 class LoginNodeCollector:
     """Collect login node metrics via SSH in parallel."""
 
-    def __init__(self, base_host: str, timeout: int = 10):
+    def __init__(self, base_host: str, timeout: int = 10,
+                 control_dir: Optional[str] = None,
+                 control_persist: Optional[str] = None):
         self.base_host = base_host
         self.timeout = timeout
+        self.control_dir = control_dir
+        self.control_persist = control_persist
         self.logger = logging.getLogger(__name__)
 
     def collect_login_node_data(self, login_nodes: List[dict]) -> List[dict]:
@@ -109,10 +147,14 @@ class LoginNodeCollector:
         """
         # SSH through base host to login node, collecting load, users, and CPU count
         # Example: ssh derecho "ssh derecho1 'cat /proc/loadavg; echo ---; who | wc -l; echo ---; nproc --all'"
+        # The outer hop shares the base host's control connection with PBSClient.
 
-        cmd = (
-            f"ssh -o ConnectTimeout={self.timeout} {self.base_host} "
-            f'"ssh {node_name} \'cat /proc/loadavg; echo ---; who | wc -l; echo ---; nproc --all\'" '
+        cmd = ssh_command(
+            self.base_host,
+            f"ssh {node_name} 'cat /proc/loadavg; echo ---; who | wc -l; echo ---; nproc --all'",
+            self.timeout,
+            control_dir=self.control_dir,
+            control_persist=self.control_persist,
         )
 
         self.logger.debug(f"Running: {cmd}")
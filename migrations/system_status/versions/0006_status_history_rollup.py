@@ -0,0 +1,71 @@
+"""status_history_rollup: hourly / daily aggregates of the history series
+
+The partition, queue and Casper node-type history pages used to load every
+5-minute snapshot row in the window — a one-year partition history is
+~100k full ``derecho_status`` objects (plus their eager-loaded children)
+to draw a chart a few hundred pixels wide. This table holds per-hour and
+per-day ``[sum, count]`` pairs for each charted metric, so long windows
+read a few hundred rollup rows instead.
+
+Ingest maintains the table incrementally (one tick folded into the current
+hour and day buckets). No backfill is done here: run
+``scripts/rebuild_status_rollups.py`` once after upgrading to cover the
+raw history already on disk. Until then the read side aggregates the
+uncovered part of a window from raw rows, so charts stay complete.
+
+Cross-dialect notes:
+  * ``metrics`` is ``sa.JSON`` — native JSON on MySQL/Postgres, TEXT on
+    SQLite.
+
+Revision ID: 0006_status_history_rollup
+Revises: 0005_queue_def_roster_columns
+Create Date: 2026-10-16
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0006_status_history_rollup"
+down_revision: Union[str, Sequence[str], None] = "0005_queue_def_roster_columns"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "status_history_rollup",
+        sa.Column("rollup_id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("system_id", sa.Integer(), nullable=False),
+        sa.Column("family", sa.String(length=16), nullable=False),
+        sa.Column("series", sa.String(length=64), nullable=False),
+        sa.Column("grain", sa.String(length=8), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(), nullable=False),
+        sa.Column("samples", sa.Integer(), nullable=False),
+        sa.Column("metrics", sa.JSON(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["system_id"], ["systems.system_id"],
+            name=op.f("fk_status_history_rollup_system_id_systems"),
+        ),
+        sa.PrimaryKeyConstraint("rollup_id", name=op.f("pk_status_history_rollup")),
+        sa.UniqueConstraint(
+            "system_id", "family", "series", "grain", "bucket_start",
+            name="uq_status_history_rollup_series_bucket",
+        ),
+    )
+    with op.batch_alter_table("status_history_rollup", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_status_history_rollup_bucket_start"),
+            ["bucket_start"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("status_history_rollup", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_status_history_rollup_bucket_start"))
+    op.drop_table("status_history_rollup")
@@ -0,0 +1,117 @@
+"""user_proj_daily_usage: nightly-rolled (user, project, queue) usage per day
+
+``get_user_proj_usage`` integrates ``user_proj_queue_status`` spans live;
+a month window takes 10–15 s and a year minutes, and the raw spans only
+live as long as the parent snapshots' retention. These tables hold the
+same left-step integral per closed day so a window is answered from the
+days it covers plus a live integration of only its open edges.
+
+New tables:
+
+    user_proj_daily_usage
+        — (day, system, user, project, queue) core/GPU/node-hour integrals,
+          first/last tick present within the day, tick count.
+    user_proj_daily_usage_days
+        — ledger of rolled (system, day) pairs and the successor tick of
+          each day's last tick.
+
+No backfill is done here: run ``scripts/rollup_user_proj_usage.py`` after
+upgrading (and nightly). Until a day is rolled the read side integrates it
+live, so results are unchanged.
+
+Cross-dialect notes:
+  * Hour columns are ``sa.Double`` — DOUBLE on MySQL, DOUBLE PRECISION on
+    Postgres, REAL on SQLite. Plain ``Float`` is single precision on MySQL.
+
+Revision ID: 0007_user_proj_daily_usage
+Revises: 0006_status_history_rollup
+Create Date: 2026-10-16
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0007_user_proj_daily_usage"
+down_revision: Union[str, Sequence[str], None] = "0006_status_history_rollup"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_proj_daily_usage",
+        sa.Column("user_proj_daily_usage_id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("day", sa.DateTime(), nullable=False),
+        sa.Column("system_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("project_code_id", sa.Integer(), nullable=False),
+        sa.Column("queue_id", sa.Integer(), nullable=False),
+        sa.Column("core_hours", sa.Double(), nullable=False),
+        sa.Column("gpu_hours", sa.Double(), nullable=False),
+        sa.Column("node_hours", sa.Double(), nullable=False),
+        sa.Column("first_seen", sa.DateTime(), nullable=False),
+        sa.Column("last_seen", sa.DateTime(), nullable=False),
+        sa.Column("tick_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["system_id"], ["systems.system_id"],
+            name=op.f("fk_user_proj_daily_usage_system_id_systems"),
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["status_users.user_id"],
+            name=op.f("fk_user_proj_daily_usage_user_id_status_users"),
+        ),
+        sa.ForeignKeyConstraint(
+            ["project_code_id"], ["project_codes.project_code_id"],
+            name=op.f("fk_user_proj_daily_usage_project_code_id_project_codes"),
+        ),
+        sa.ForeignKeyConstraint(
+            ["queue_id"], ["queues.queue_id"],
+            name=op.f("fk_user_proj_daily_usage_queue_id_queues"),
+        ),
+        sa.PrimaryKeyConstraint("user_proj_daily_usage_id",
+                                name=op.f("pk_user_proj_daily_usage")),
+        sa.UniqueConstraint(
+            "day", "system_id", "user_id", "project_code_id", "queue_id",
+            name="uq_user_proj_daily_usage_tuple_day",
+        ),
+    )
+    with op.batch_alter_table("user_proj_daily_usage", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_user_proj_daily_usage_day"), ["day"], unique=False,
+        )
+
+    op.create_table(
+        "user_proj_daily_usage_days",
+        sa.Column("rollup_day_id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("system_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.DateTime(), nullable=False),
+        sa.Column("first_tick", sa.DateTime(), nullable=False),
+        sa.Column("last_tick", sa.DateTime(), nullable=False),
+        sa.Column("next_tick", sa.DateTime(), nullable=False),
+        sa.Column("tick_count", sa.Integer(), nullable=False),
+        sa.Column("tuple_count", sa.Integer(), nullable=False),
+        sa.Column("rolled_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["system_id"], ["systems.system_id"],
+            name=op.f("fk_user_proj_daily_usage_days_system_id_systems"),
+        ),
+        sa.PrimaryKeyConstraint("rollup_day_id", name=op.f("pk_user_proj_daily_usage_days")),
+        sa.UniqueConstraint("system_id", "day", name="uq_user_proj_daily_usage_days_day"),
+    )
+    with op.batch_alter_table("user_proj_daily_usage_days", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_user_proj_daily_usage_days_day"), ["day"], unique=False,
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("user_proj_daily_usage_days", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_user_proj_daily_usage_days_day"))
+    op.drop_table("user_proj_daily_usage_days")
+    with op.batch_alter_table("user_proj_daily_usage", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_user_proj_daily_usage_day"))
+    op.drop_table("user_proj_daily_usage")
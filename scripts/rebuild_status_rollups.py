@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Rebuild the hourly/daily history rollups from raw status snapshots.
+
+Ingest folds every tick into ``status_history_rollup`` as it arrives; run
+this after applying the rollup migration (to backfill the snapshots that
+predate it) or after a gap where the fold failed. Buckets older than the
+raw retention window are left untouched — they are the only copy of that
+history once cleanup_status_data.py has run.
+
+Usage:
+    python scripts/rebuild_status_rollups.py [--days 7] [--system derecho] [--dry-run]
+    python scripts/rebuild_status_rollups.py --start 2026-01-01 --end 2026-01-08
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+import argparse
+
+# Add python directory to path
+python_dir = Path(__file__).parent.parent / 'src'
+sys.path.insert(0, str(python_dir))
+
+from system_status import create_status_engine, get_session
+from system_status.queries.history import rebuild_rollups
+from system_status.timeutil import utcnow_naive
+
+SYSTEMS = ('derecho', 'casper')
+
+
+def rebuild(systems, start, end, dry_run=False):
+    """
+    Rebuild rollup buckets for each system over [start, end).
+
+    Args:
+        systems: System names to rebuild
+        start: Start of the range (widened to midnight)
+        end: End of the range (widened to the next midnight)
+        dry_run: If True, compute but roll back instead of committing
+    """
+    print("=" * 80)
+    print(f"System Status Rollup Rebuild - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 80)
+    print(f"\nRange: {start:%Y-%m-%d %H:%M} → {end:%Y-%m-%d %H:%M}")
+    print(f"Mode: {'DRY RUN (rolled back)' if dry_run else 'REBUILD'}")
+    print()
+
+    try:
+        engine, SessionLocal = create_status_engine()
+    except Exception as e:
+        print(f"❌ ERROR: Database connection failed: {e}")
+        sys.exit(1)
+
+    total = 0
+    with get_session(SessionLocal) as session:
+        for system in systems:
+            written = rebuild_rollups(session, system, start, end)
+            print(f"{system:40s} {written:8,} buckets")
+            total += written
+
+        if dry_run:
+            session.rollback()
+        else:
+            session.commit()
+
+    print()
+    print("=" * 80)
+    print(f"{'DRY RUN complete' if dry_run else 'Rebuild complete'} - {total:,} buckets")
+    print("=" * 80)
+    return total
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rebuild status history rollups')
+    parser.add_argument('--system', choices=SYSTEMS,
+                        help='Only rebuild this system (default: all)')
+    parser.add_argument('--days', type=int, default=7,
+                        help='Rebuild the last N days (default: 7, the raw retention)')
+    parser.add_argument('--start', type=datetime.fromisoformat,
+                        help='Start of the range (overrides --days)')
+    parser.add_argument('--end', type=datetime.fromisoformat,
+                        help='End of the range (default: now)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Rebuild inside a transaction and roll it back')
+
+    args = parser.parse_args()
+
+    end = args.end or utcnow_naive()
+    start = args.start or end - timedelta(days=args.days)
+
+    try:
+        rebuild([args.system] if args.system else list(SYSTEMS), start, end,
+                dry_run=args.dry_run)
+        sys.exit(0)
+    except Exception as e:
+        print(f"\n❌ ERROR: Rebuild failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
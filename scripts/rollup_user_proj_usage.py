@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Roll closed days of user/project/queue usage into ``user_proj_daily_usage``.
+
+``get_user_proj_usage`` answers a window from the daily summary for the
+whole days it covers and integrates only the edges live. Run this nightly
+(after midnight, once the collector has ticked on the new day) to roll the
+day that just closed, and once after applying the migration to backfill the
+spans still on disk. Days already rolled are skipped, so overlapping runs
+are harmless; ``--rebuild`` recomputes them. Days whose raw spans have aged
+out of retention — wholly, or partly: any day that starts before the oldest
+retained tick — are never touched; the summary is their only full record.
+
+Usage:
+    python scripts/rollup_user_proj_usage.py [--days 7] [--system derecho] [--dry-run]
+    python scripts/rollup_user_proj_usage.py --start 2026-01-01 --end 2026-01-08 --rebuild
+"""
+
+import sys
+from pathlib import Path
+from datetime import datetime, timedelta
+import argparse
+
+# Add python directory to path
+python_dir = Path(__file__).parent.parent / 'src'
+sys.path.insert(0, str(python_dir))
+
+from system_status import create_status_engine, get_session
+from system_status.queries.user_proj_usage import rollup_user_proj_days
+from system_status.timeutil import utcnow_naive
+
+SYSTEMS = ('derecho', 'casper')
+
+
+def rollup(systems, start, end, rebuild=False, dry_run=False):
+    """
+    Roll the closed days in [start, end) for each system.
+
+    Args:
+        systems: System names to roll
+        start: Start of the range (widened to midnight)
+        end: End of the range
+        rebuild: If True, recompute days that are already rolled
+        dry_run: If True, compute but roll back instead of committing
+    """
+    print("=" * 80)
+    print(f"User/Project Usage Daily Rollup - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 80)
+    print(f"\nRange: {start:%Y-%m-%d %H:%M} → {end:%Y-%m-%d %H:%M}")
+    print(f"Mode: {'DRY RUN (rolled back)' if dry_run else 'REBUILD' if rebuild else 'ROLLUP'}")
+    print()
+
+    try:
+        engine, SessionLocal = create_status_engine()
+    except Exception as e:
+        print(f"❌ ERROR: Database connection failed: {e}")
+        sys.exit(1)
+
+    total_days = total_rows = 0
+    with get_session(SessionLocal) as session:
+        for system in systems:
+            days, rows = rollup_user_proj_days(session, system, start, end,
+                                               rebuild=rebuild)
+            print(f"{system:40s} {days:5,} days {rows:10,} rows")
+            total_days += days
+            total_rows += rows
+
+        if dry_run:
+            session.rollback()
+        else:
+            session.commit()
+
+    print()
+    print("=" * 80)
+    print(f"{'DRY RUN complete' if dry_run else 'Rollup complete'} - "
+          f"{total_days:,} days, {total_rows:,} rows")
+    print("=" * 80)
+    return total_days, total_rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Roll up daily user/project usage')
+    parser.add_argument('--system', choices=SYSTEMS,
+                        help='Only roll this system (default: all)')
+    parser.add_argument('--days', type=int, default=7,
+                        help='Roll closed days among the last N (default: 7, the raw retention)')
+    parser.add_argument('--start', type=datetime.fromisoformat,
+                        help='Start of the range (overrides --days)')
+    parser.add_argument('--end', type=datetime.fromisoformat,
+                        help='End of the range (default: now)')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Recompute days that are already rolled, except '
+                             'those starting before the oldest retained tick')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Roll up inside a transaction and roll it back')
+
+    args = parser.parse_args()
+
+    end = args.end or utcnow_naive()
+    start = args.start or end - timedelta(days=args.days)
+
+    try:
+        rollup([args.system] if args.system else list(SYSTEMS), start, end,
+               rebuild=args.rebuild, dry_run=args.dry_run)
+        sys.exit(0)
+    except Exception as e:
+        print(f"\n❌ ERROR: Rollup failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -3,7 +3,7 @@
 Validate + benchmark ``get_user_proj_usage`` against the local
 system_status DB.
 
-This script does triple duty:
+This script does four jobs:
 
 1. **Correctness** — reconciles the integrated user_proj output against
    the integral of the parent ``QueueStatus`` rows over the SAME parent
@@ -28,17 +28,13 @@ This script does triple duty:
    rate, and spans-per-tuple distribution. Quantifies the refactor's
    payoff at the table level, separate from the per-query benchmarks.
 
-## What "the daily-summary decision" hinges on
-
-The design plan flagged a future
-`user_proj_queue_daily_usage` rollup as the right answer if year-scale
-queries become a UI need. The right time to build it is when:
-- A typical UI request window (e.g. last 7 days) takes >1 s consistently.
-- A reporting window (1 month) takes >30 s, blocking offline jobs.
-- DB row growth makes the chunked Python aggregation memory-bound on
-  the smallest deployable host.
-
-This script is the instrument we'll measure those thresholds with.
+4. **Daily-summary parity** — ``get_user_proj_usage`` answers the days it
+   can from the nightly ``user_proj_daily_usage`` rollup
+   (``scripts/rollup_user_proj_usage.py``) and integrates only the open
+   edges live. Over the upu window, the composed result must equal the
+   all-live integral (``use_daily_summary=False``) tuple for tuple: hours
+   to float64 epsilon, first/last seen and tick counts exactly. Both paths
+   are timed, so the summary's payoff is visible in the same report.
 
 Run from the repo host (not inside the docker network):
 
@@ -97,6 +93,7 @@ from system_status import (   # noqa: E402
     QueueDef,
     UserDef,
     ProjectCodeDef,
+    UserProjDailyUsageDay,
 )
 from sqlalchemy import func   # noqa: E402
 from system_status.queries import get_user_proj_usage   # noqa: E402
@@ -403,6 +400,62 @@ def reconcile(session, parent_model, system, start, end):
     print(f'    Overall: {"PASS" if overall_pass else "FAIL"}')
 
 
+# --------------------------------------------------------------------------
+# Daily-summary parity: composed (summary + live edges) vs all-live.
+# --------------------------------------------------------------------------
+
+def check_daily_summary_parity(session, system, system_id, start, end):
+    """Compare get_user_proj_usage with and without the daily summary over
+    [start, end]. Print rolled-day coverage, both timings, and PASS/FAIL."""
+    rolled = session.execute(
+        select(func.count(), func.min(UserProjDailyUsageDay.day),
+               func.max(UserProjDailyUsageDay.day))
+        .where(UserProjDailyUsageDay.system_id == system_id,
+               UserProjDailyUsageDay.day >= start,
+               UserProjDailyUsageDay.day < end)
+    ).one()
+    if not rolled[0]:
+        print('    no rolled days in window — run scripts/rollup_user_proj_usage.py')
+        return
+    print(f'    rolled days in window: {rolled[0]} ({rolled[1]:%Y-%m-%d} → '
+          f'{rolled[2]:%Y-%m-%d})')
+
+    with timed(f'get_user_proj_usage all-live ({system})'):
+        live = get_user_proj_usage(
+            session, system=system, start_date=start, end_date=end,
+            use_daily_summary=False,
+        )
+    with timed(f'get_user_proj_usage daily summary ({system})'):
+        composed = get_user_proj_usage(
+            session, system=system, start_date=start, end_date=end,
+        )
+
+    def key(r):
+        return (r['username'], r['project_code'], r['queue_name'])
+
+    live_by_key = {key(r): r for r in live}
+    composed_by_key = {key(r): r for r in composed}
+    mismatches = []
+    for k in sorted(set(live_by_key) | set(composed_by_key), key=str):
+        a, b = live_by_key.get(k), composed_by_key.get(k)
+        if a is None or b is None:
+            mismatches.append((k, 'missing from ' + ('live' if a is None else 'summary')))
+            continue
+        for col in ('core_hours', 'gpu_hours', 'node_hours'):
+            if abs(a[col] - b[col]) / max(abs(a[col]), 1.0) >= 1e-9:
+                mismatches.append((k, f'{col} {a[col]:.6f} vs {b[col]:.6f}'))
+        for col in ('first_seen', 'last_seen', 'tick_count'):
+            if a[col] != b[col]:
+                mismatches.append((k, f'{col} {a[col]} vs {b[col]}'))
+
+    for k, what in mismatches[:20]:
+        print(f'    {"/".join(str(x) for x in k):<40} {what}')
+    if len(mismatches) > 20:
+        print(f'    … {len(mismatches) - 20} more')
+    print(f'    {len(live)} tuples, {len(mismatches)} mismatches — '
+          f'Overall: {"PASS" if not mismatches else "FAIL"}')
+
+
 # --------------------------------------------------------------------------
 # Reporting
 # --------------------------------------------------------------------------
@@ -509,6 +562,9 @@ def main():
             print(f'\n  Reconciliation against QueueStatus integrals:')
             reconcile(session, parent, system, start, end)
 
+            print(f'\n  Daily-summary parity (summary + live edges vs all-live):')
+            check_daily_summary_parity(session, system, sys_id, start, end)
+
 
 if __name__ == '__main__':
     main()
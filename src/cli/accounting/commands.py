@@ -29,6 +29,7 @@ from cli.accounting.path_verifier import (
 )
 from sam.manage.summaries import (
     _resolve_user,
+    bulk_upsert_comp_charge_summaries,
     upsert_comp_charge_summary, upsert_disk_charge_summary,
     upsert_disk_activity, upsert_disk_charge,
 )
@@ -39,6 +40,11 @@ from sam.summaries.disk_summaries import (
     DISK_CHARGING_TIB_EPOCH, mark_disk_snapshot_current, tib_years,
 )
 from sam.summaries.comp_summaries import COMP_CHARGING_EPOCH
+from sam.summaries.charge_rollup import (
+    ROLLUP_CHARGE_TYPES, ensure_rollup_tables, mark_rollup_stale, months_between,
+    refresh_charge_rollup, stale_months,
+)
+from sam.enums import ChargeType
 
 
 # Reconcile tolerance: allocations within this fraction of quota truth are
@@ -248,6 +254,7 @@ class AccountingAdminCommand(BaseCommand):
         disk: bool = False,
         archive: bool = False,
         reconcile_quotas: Optional[str] = None,
+        refresh_rollup: bool = False,
         resource: Optional[str] = None,
         machine: Optional[str] = None,
         start_date: Optional[date] = None,
@@ -262,6 +269,8 @@ class AccountingAdminCommand(BaseCommand):
         create_queues: bool = False,
         chunk_size: int = 500,
         include_deleted_accounts: bool = False,
+        # --comp specific
+        bulk: bool = False,
         # --disk specific
         user_usage_path: Optional[str] = None,
         quotas_path: Optional[str] = None,
@@ -283,6 +292,8 @@ class AccountingAdminCommand(BaseCommand):
                 verify_paths=verify_paths,
                 verify_host=verify_host,
             )
+        if refresh_rollup:
+            return self._run_refresh_rollup(start_date, end_date)
         if comp:
             return self._run_comp(
                 machine, start_date, end_date,
@@ -292,6 +303,7 @@ class AccountingAdminCommand(BaseCommand):
                 chunk_size=chunk_size,
                 include_deleted_accounts=include_deleted_accounts,
                 epoch=epoch,
+                bulk=bulk,
             )
         if disk:
             return self._run_disk(
@@ -421,6 +433,7 @@ class AccountingAdminCommand(BaseCommand):
             for chunk_idx, chunk in enumerate(chunks, start=1):
                 try:
                     with management_transaction(self.session):
+                        pending = []
                         for row in chunk:
                             result = adapt_jobstats_row(row, machine)
                             progress.advance(task)
@@ -445,42 +458,71 @@ class AccountingAdminCommand(BaseCommand):
                                         f"— posting to {resource_name}[/yellow]"
                                     )
 
+                            pending.append(dict(
+                                activity_date=date.fromisoformat(str(row["date"])),
+                                act_username=row["user"],
+                                act_projcode=row["account"],
+                                act_unix_uid=None,
+                                resource_name=resource_name,
+                                machine_name=machine_name,
+                                queue_name=normalize_queue_name(row["queue"]),
+                                num_jobs=row["job_count"],
+                                core_hours=core_hours,
+                                charges=charges,
+                            ))
+
+                        if kwargs.get("bulk"):
+                            # Set-based path: one resolution pass + one keyed
+                            # diff + batched writes for the whole chunk.
                             try:
-                                _, action = upsert_comp_charge_summary(
+                                outcome = bulk_upsert_comp_charge_summaries(
                                     self.session,
-                                    activity_date=date.fromisoformat(str(row["date"])),
-                                    act_username=row["user"],
-                                    act_projcode=row["account"],
-                                    act_unix_uid=None,
-                                    resource_name=resource_name,
-                                    machine_name=machine_name,
-                                    queue_name=normalize_queue_name(row["queue"]),
-                                    num_jobs=row["job_count"],
-                                    core_hours=core_hours,
-                                    charges=charges,
+                                    pending,
                                     create_queue_if_missing=kwargs["create_queues"],
                                     include_deleted_accounts=kwargs["include_deleted_accounts"],
+                                    skip_errors=kwargs["skip_errors"],
                                 )
-                                if action == "created":
-                                    n_created += 1
-                                else:
-                                    n_updated += 1
-                            except ValueError as exc:
+                            except ValueError:
                                 n_errors += 1
-                                if not kwargs["skip_errors"]:
-                                    raise
-                                if self.ctx.verbose:
-                                    self.console.print(f"[yellow]Skip: {exc}[/yellow]")
+                                raise
+                            n_created += outcome.n_created
+                            n_updated += outcome.n_updated
+                            n_errors += outcome.n_errors
+                            if self.ctx.verbose:
+                                for _, message in outcome.errors:
+                                    self.console.print(f"[yellow]Skip: {message}[/yellow]")
+                        else:
+                            for upsert_kwargs in pending:
+                                try:
+                                    _, action = upsert_comp_charge_summary(
+                                        self.session,
+                                        **upsert_kwargs,
+                                        create_queue_if_missing=kwargs["create_queues"],
+                                        include_deleted_accounts=kwargs["include_deleted_accounts"],
+                                    )
+                                    if action == "created":
+                                        n_created += 1
+                                    else:
+                                        n_updated += 1
+                                except ValueError as exc:
+                                    n_errors += 1
+                                    if not kwargs["skip_errors"]:
+                                        raise
+                                    if self.ctx.verbose:
+                                        self.console.print(f"[yellow]Skip: {exc}[/yellow]")
 
                 except ValueError as exc:
                     # Chunk-level failure (skip_errors=False): re-raised from inner loop
                     self.console.print(f"[bold red]Chunk {chunk_idx} aborted: {exc}[/bold red]")
                     return 2
 
-        # --- 8. Summary ---
+        # --- 8. Refresh the charge rollup for the posted window ---
+        self._refresh_charge_rollup(ChargeType.COMP, start_date, end_date)
+
+        # --- 9. Summary ---
         display_import_summary(self.ctx, n_created, n_updated, n_errors, n_skipped)
 
-        # --- 9. Exit code ---
+        # --- 10. Exit code ---
         return 0 if n_errors == 0 else 2
 
 
@@ -764,6 +806,7 @@ class AccountingAdminCommand(BaseCommand):
                     .delete(synchronize_session=False)
                 )
                 n_deleted_legacy = int(deleted)
+                mark_rollup_stale(self.session, ChargeType.DISK, [snap_date])
         except Exception as exc:  # noqa: BLE001
             self.console.print(
                 f"[bold red]Failed to clear existing rows for {snap_date}: {exc}[/bold red]"
@@ -905,9 +948,63 @@ class AccountingAdminCommand(BaseCommand):
                     )
                     return 2
 
+        self._refresh_charge_rollup(ChargeType.DISK, snap_date, snap_date)
         display_import_summary(self.ctx, n_created, n_updated, n_errors, n_skipped)
         return 0 if n_errors == 0 else 2
 
+    def _refresh_charge_rollup(self, charge_type: str, start_date: date, end_date: date) -> None:
+        """Rebuild the charge rollup months covering ``[start_date, end_date]``.
+
+        A no-op until the rollup tables exist. Failure only warns: the
+        posted months stay marked stale and readers scan the raw table.
+        """
+        months = months_between(start_date, end_date)
+        try:
+            with management_transaction(self.session):
+                n_rows = refresh_charge_rollup(self.session, charge_type, months)
+        except Exception as exc:  # noqa: BLE001
+            self.console.print(
+                f"[yellow]Charge rollup refresh failed ({exc}); "
+                f"affected months fall back to raw scans.[/yellow]"
+            )
+            return
+        if self.ctx.verbose and n_rows:
+            self.console.print(
+                f"[dim]Refreshed {charge_type} charge rollup: "
+                f"{len(months)} month(s), {n_rows} row(s).[/dim]"
+            )
+
+    def _run_refresh_rollup(self, start_date: Optional[date], end_date: Optional[date]) -> int:
+        """Create the charge rollup tables if needed and refresh months.
+
+        With a date range every rolled-up charge type is rebuilt for every
+        month in it (the backfill); without one, only months marked stale.
+        DAV is never rolled up (see ``ROLLUP_CHARGE_TYPES``).
+        """
+        with management_transaction(self.session):
+            ensure_rollup_tables(self.session)
+
+        if start_date is None:
+            targets = stale_months(self.session)
+        else:
+            months = months_between(start_date, end_date)
+            targets = {str(ct): months for ct in sorted(ROLLUP_CHARGE_TYPES)}
+
+        if not any(targets.values()):
+            self.console.print("[dim]Charge rollup is up to date.[/dim]")
+            return 0
+
+        for charge_type, months in targets.items():
+            n_rows = 0
+            for month in months:
+                with management_transaction(self.session):
+                    n_rows += refresh_charge_rollup(self.session, charge_type, [month])
+            self.console.print(
+                f"Refreshed {charge_type} charge rollup: "
+                f"{len(months)} month(s), {n_rows} row(s)."
+            )
+        return 0
+
     def _write_disk_activity_and_charge(
         self,
         entries: list,
@@ -266,6 +266,9 @@ def contracts(ctx: Context, validate, audit_all, check_sources, limit,
 @click.option('--reconcile-quotas', 'reconcile_quotas', type=click.Path(exists=True, dir_okay=False),
               default=None, metavar='PATH',
               help='Mode: reconcile SAM allocations against a storage quota file (requires --resource)')
+@click.option('--refresh-rollup', 'refresh_rollup', is_flag=True,
+              help='Mode: create/refresh the monthly charge rollup '
+                   '(stale months, or every month in --start/--end)')
 # --- Common ----------------------------------------------------------------
 @click.option('--resource', type=str, default=None,
               help='[disk/reconcile] Resource name (e.g. Campaign_Store)')
@@ -284,6 +287,9 @@ def contracts(ctx: Context, validate, audit_all, check_sources, limit,
               help='[comp] HPC machine (required)')
 @click.option('--create-queues', is_flag=True,
               help='[comp] Auto-create unknown queues in SAM')
+@click.option('--bulk', is_flag=True,
+              help='[comp] Set-based ingest: resolve + diff each chunk in a few '
+                   'queries and write with batched INSERT/UPDATE (for backfills)')
 @click.option('--start', type=str, default=None,
               help='[comp] Start date (YYYY-MM-DD, inclusive; default: 2024-01-01)')
 @click.option('--end', type=str, default=None,
@@ -337,7 +343,7 @@ def contracts(ctx: Context, validate, audit_all, check_sources, limit,
 @click.option('--verify-host', 'verify_host', type=str, default=None, metavar='HOST',
               help='[reconcile] SSH host to use for --verify-paths (default: auto-detect)')
 @pass_context
-def accounting(ctx: Context, comp, disk, archive, reconcile_quotas, resource,
+def accounting(ctx: Context, comp, disk, archive, reconcile_quotas, refresh_rollup, resource,
                machine,
                user_usage_path, quotas_path, reporting_interval,
                unidentified_label, reconcile_quota_gap,
@@ -346,7 +352,7 @@ def accounting(ctx: Context, comp, disk, archive, reconcile_quotas, resource,
                start, end, date_str, today_flag, last,
                dry_run, update_accounting_system, deactivate_orphaned,
                force, verify_paths, verify_host,
-               skip_errors, create_queues, chunk_size,
+               skip_errors, create_queues, bulk, chunk_size,
                include_deleted_accounts, verbose):
     """Post charge summaries into SAM, or reconcile allocations against quota truth.
 
@@ -359,6 +365,7 @@ def accounting(ctx: Context, comp, disk, archive, reconcile_quotas, resource,
            --today             Today's date
            --last N[d]         Last N days including today
            --start / --end     Date range (defaults: 2024-01-01 to yesterday)
+         Optional: --bulk    Set-based chunk ingest (large backfills)
 
       2. Post disk charge summaries  (--disk)
          Required: --resource <name> and --user-usage <path>
@@ -377,6 +384,11 @@ def accounting(ctx: Context, comp, disk, archive, reconcile_quotas, resource,
            --deactivate-orphaned        Deactivate orphaned allocations
            --force                      Override the live-path safety gate
                                         (requires --deactivate-orphaned)
+
+      4. Refresh the monthly charge rollup  (--refresh-rollup)
+         Creates the rollup tables on first use. Refreshes the months
+         marked stale, or every month in --start/--end when both are given.
+         --comp/--disk already refresh the months they post.
     """
     if verbose:
         ctx.verbose = True
@@ -391,6 +403,12 @@ def accounting(ctx: Context, comp, disk, archive, reconcile_quotas, resource,
             style="bold red",
         )
         sys.exit(1)
+    if refresh_rollup and (charge_mode or reconcile_mode):
+        ctx.console.print(
+            "Error: --refresh-rollup is mutually exclusive with the other modes",
+            style="bold red",
+        )
+        sys.exit(1)
 
     if (verify_paths or verify_host) and not reconcile_mode:
         ctx.console.print(
@@ -465,6 +483,28 @@ def accounting(ctx: Context, comp, disk, archive, reconcile_quotas, resource,
         )
         sys.exit(exit_code)
 
+    if refresh_rollup:
+        start_date = end_date = None
+        if start or end:
+            if not (start and end):
+                ctx.console.print(
+                    "Error: --refresh-rollup takes both --start and --end, or neither",
+                    style="bold red",
+                )
+                sys.exit(1)
+            try:
+                start_date = datetime.strptime(start, '%Y-%m-%d').date()
+                end_date = datetime.strptime(end, '%Y-%m-%d').date()
+            except ValueError:
+                ctx.console.print(
+                    "Error: --start/--end must be in YYYY-MM-DD format",
+                    style="bold red",
+                )
+                sys.exit(1)
+        command = AccountingAdminCommand(ctx)
+        sys.exit(command.execute(refresh_rollup=True,
+                                 start_date=start_date, end_date=end_date))
+
     # --- Disk charge import (separate validation path) ---------------------
     if disk:
         if not resource:
@@ -517,6 +557,12 @@ def accounting(ctx: Context, comp, disk, archive, reconcile_quotas, resource,
                 style="bold red",
             )
             sys.exit(1)
+        if bulk:
+            ctx.console.print(
+                "Error: --bulk is HPC-only; do not pass it with --disk",
+                style="bold red",
+            )
+            sys.exit(1)
 
         # --date is optional: when supplied, the snapshot in the file
         # must match this date exactly (otherwise abort). When omitted,
@@ -573,6 +619,7 @@ def accounting(ctx: Context, comp, disk, archive, reconcile_quotas, resource,
         dry_run=dry_run,
         skip_errors=skip_errors,
         create_queues=create_queues,
+        bulk=bulk,
         chunk_size=chunk_size,
         include_deleted_accounts=include_deleted_accounts,
         epoch=epoch_date,
@@ -583,35 +630,68 @@ def accounting(ctx: Context, comp, disk, archive, reconcile_quotas, resource,
 @cli.command()
 @click.option('--refresh', is_flag=True,
               help='Invalidate the running webapp\'s caches')
+@click.option('--warm-scans', 'warm_scans', is_flag=True,
+              help='Precompute the Filesystem Scans cards for newly scanned collections')
 @click.option('--category',
               type=click.Choice(['flask', 'chart', 'usage', 'scans', 'jobs',
-                                 'awards']),
+                                 'awards', 'snapshots']),
               default=None,
-              help='Scope the refresh to one cache category (default: all)')
+              help='[refresh] Scope the refresh to one cache category (default: all)')
 @click.option('--base', 'base_url', type=str, default=None,
-              help=f'Webapp base URL (default: $SAM_API_BASE or {_DEFAULT_API_BASE})')
+              help=f'[refresh] Webapp base URL (default: $SAM_API_BASE or {_DEFAULT_API_BASE})')
+@click.option('--resource', 'resources', multiple=True,
+              help='[warm-scans] Scan resource to warm (repeatable; default: FS_SCAN_RESOURCES)')
+@click.option('--force', is_flag=True,
+              help='[warm-scans] Re-warm collections already warmed for their latest scan')
+@click.option('--workers', type=int, default=None,
+              help='[warm-scans] Scopes computed at once (default: FS_SCANS_WARM_WORKERS)')
 @pass_context
-def cache(ctx: Context, refresh: bool, category, base_url):
+def cache(ctx: Context, refresh: bool, warm_scans: bool, category, base_url,
+          resources, force, workers):
     """Manage the running webapp's caches.
 
     \b
-    Thin HTTP client for POST /api/v1/admin/cache/refresh — the caches live
-    inside the webapp worker process (and shared Redis), not the DB, so this
-    hits the live endpoint rather than clearing anything locally.
+    --refresh is a thin HTTP client for POST /api/v1/admin/cache/refresh —
+    the caches live inside the webapp worker process (and shared Redis), not
+    the DB, so this hits the live endpoint rather than clearing anything
+    locally.
 
     Credentials (HTTP Basic Auth, same as the systems-integration client):
       SAM_API_USER   API-key username (required)
       SAM_API_PASS   API-key password (required)
       SAM_API_BASE   Base URL (optional; --base overrides)
 
+    \b
+    --warm-scans runs the fs-scans post-scan warmer here, writing into the
+    webapp's shared cache, so it needs CACHE_REDIS_URL (and the fs-scans
+    plugin configuration the webapp uses).  Collections already warmed for
+    their latest scan are skipped unless --force.
+
     \b
     Examples:
       sam-admin cache --refresh
       sam-admin cache --refresh --category chart
+      sam-admin cache --warm-scans --resource Campaign_Store
     """
-    if not refresh:
+    if refresh == warm_scans:
+        ctx.console.print(
+            "Error: specify exactly one action (--refresh or --warm-scans)",
+            style="bold red",
+        )
+        sys.exit(EXIT_ERROR)
+
+    if warm_scans:
+        if category or base_url:
+            ctx.console.print(
+                "Error: --category/--base only apply to --refresh",
+                style="bold red",
+            )
+            sys.exit(EXIT_ERROR)
+        sys.exit(_warm_scans(ctx, list(resources), force, workers))
+
+    if resources or force or workers is not None:
         ctx.console.print(
-            "Error: specify an action (currently only --refresh)",
+            "Error: --resource/--force/--workers only apply to --warm-scans",
             style="bold red",
         )
         sys.exit(EXIT_ERROR)
@@ -662,5 +742,76 @@ def cache(ctx: Context, refresh: bool, category, base_url):
     sys.exit(EXIT_SUCCESS)
 
 
+def _warm_scans(ctx: Context, resources, force: bool, workers) -> int:
+    """Run :func:`webapp.disk_scans.warm.warm_scan_caches` once; report it."""
+    if not os.getenv('CACHE_REDIS_URL'):
+        ctx.console.print(
+            "Error: CACHE_REDIS_URL is not set — a warmed per-process cache "
+            "would be discarded on exit.",
+            style="bold red",
+        )
+        return EXIT_ERROR
+
+    # Just enough of the webapp for the warmer: its config and the fs-scans
+    # plugin state. SAM queries go through this command's own session.
+    from flask import Flask
+    from webapp.config import get_webapp_config
+    from webapp.disk_scans import init_fs_scans, is_enabled
+    from webapp.disk_scans.warm import warm_scan_caches
+
+    app = Flask('sam-admin')
+    app.config.from_object(get_webapp_config())
+    init_fs_scans(app)
+    if not is_enabled(app):
+        ctx.console.print("Error: fs-scans plugin unavailable or no collections reachable",
+                          style="bold red")
+        return EXIT_ERROR
+
+    json_mode = ctx.output_format == 'json'
+
+    def _progress(done, total, timing):
+        if json_mode:
+            return
+        status = f"[red]{timing.error}[/red]" if timing.error else "ok"
+        ctx.console.print(
+            f"[{done:>{len(str(total))}}/{total}] {timing.resource} {timing.projcode} "
+            f"{timing.seconds:7.1f}s  {', '.join(timing.path_prefixes)}  {status}")
+
+    with app.app_context():
+        report = warm_scan_caches(ctx.session, resources=resources or None,
+                                  force=force, workers=workers, progress=_progress)
+
+    if report.busy:
+        ctx.console.print("Another warm run holds the lease; nothing done.",
+                          style="yellow")
+        return EXIT_SUCCESS
+
+    if json_mode:
+        import json
+        click.echo(json.dumps({
+            'collections': [{'resource': r, 'collection': c, 'status': status}
+                            for (r, c), status in report.collections.items()],
+            'prefixes': [t._asdict() for t in report.prefixes],
+        }, indent=2, default=list))
+        return EXIT_ERROR if report.errors else EXIT_SUCCESS
+
+    from rich.table import Table
+    table = Table(title="fs-scans cache warm", title_style="bold")
+    table.add_column("Resource", style="cyan")
+    table.add_column("Collection")
+    table.add_column("Status")
+    for (resource, collection), status in report.collections.items():
+        style = {'warmed': 'green', 'failed': 'bold red'}.get(status, 'dim')
+        table.add_row(resource, collection, f"[{style}]{status}[/{style}]")
+    ctx.console.print(table)
+    if report.prefixes:
+        total = sum(t.seconds for t in report.prefixes)
+        slowest = max(report.prefixes, key=lambda t: t.seconds)
+        ctx.console.print(
+            f"{len(report.prefixes)} scope(s) warmed in {total:.1f}s of query time; "
+            f"slowest {slowest.projcode} ({slowest.seconds:.1f}s)")
+    return EXIT_ERROR if report.errors else EXIT_SUCCESS
+
+
 if __name__ == '__main__':
     cli()
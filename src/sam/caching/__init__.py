@@ -22,6 +22,7 @@ from sam.caching.buckets import (
     norm,
     registered_caches,
 )
+from sam.caching.codec import Codec, CodecError
 from sam.caching.redis_client import make_redis_client
 from sam.caching.redis_ttl import RedisTTLAdapter
 from sam.caching.ttl import TTLCacheAdapter
@@ -30,6 +31,8 @@ __all__ = [
     'BucketSpec',
     'BucketedTTLCache',
     'CacheBase',
+    'Codec',
+    'CodecError',
     'RedisTTLAdapter',
     'TTLCacheAdapter',
     'approx_bytes',
@@ -21,6 +21,31 @@ staleness tolerance under a single Redis instance — e.g. fs-scans' long-lived
 passive queries vs the explorer's volatile filter permutations. A bucket is
 disabled by config when either its TTL or its size is 0.
 
+Single-flight
+-------------
+A miss on a hot key used to fan out: every request that arrived during the
+multi-second compute ran the same plugin query. ``get_or_compute`` now
+collapses them. Within a worker, concurrent callers for one ``(bucket, key)``
+share a single ``Future`` — one thread computes, the rest block on its
+result. Across gunicorn workers, a Redis-backed bucket takes a short
+``SET NX`` lease; a worker that loses the race polls for the winner's value
+instead of recomputing, and falls back to computing itself only if the lease
+expires without a value appearing. ``force_refresh`` no longer drops the old
+entry up front, so everyone else keeps being served the stale copy until
+the refreshed one lands.
+
+Stale-while-revalidate
+----------------------
+A bucket may declare a *soft* TTL below its hard one (``soft_ttl_key``; 0,
+the default, leaves it off). Entries are then stored stamped with their
+compute time, and a hit older than the soft TTL is returned immediately while
+a refresh is queued on a small shared background executor — under the same
+single-flight key and Redis lease, so one worker recomputes and the rest keep
+serving the stale copy. Only callers that hand ``get_or_compute`` a
+``refresh`` callable get this: the refresh runs after the request is gone, so
+it must not close over request-bound state (a concrete DB session, say).
+Without one a soft-stale hit is served as-is until the hard TTL.
+
 Registry
 --------
 Instances self-register at construction so the webapp's ``Caching`` facade can
@@ -31,11 +56,16 @@ foreign-keyspace skip list) without hand-maintaining parallel lists.
 
 from __future__ import annotations
 
+import contextlib
 import logging
 import os
 import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Tuple
+from typing import (
+    Any, Callable, Dict, Hashable, List, Mapping, NamedTuple, Optional, Tuple,
+)
 
 from sam.caching.base import CacheBase
 from sam.caching.redis_client import make_redis_client
@@ -44,6 +74,22 @@ from sam.caching.ttl import TTLCacheAdapter, disabled_info
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+# Cross-worker lease defaults. The lease only has to outlive the slowest
+# compute it guards; a worker that dies mid-compute costs waiters at most
+# this long before they compute themselves.
+_LEASE_TTL = 60.0
+_LEASE_POLL_MIN = 0.05
+_LEASE_POLL_MAX = 1.0
+
+# Background refresh pool, shared by every cache. Small on purpose: a refresh
+# is the same multi-second query a miss runs, and it competes with live
+# requests for the DB. Past _REFRESH_PENDING_MAX queued refreshes a stale hit
+# just skips scheduling — the next stale hit tries again.
+_REFRESH_WORKERS = 2
+_REFRESH_PENDING_MAX = 32
+
 
 @dataclass(frozen=True)
 class BucketSpec:
@@ -60,6 +106,21 @@ class BucketSpec:
     ttl_default: int
     size_key: str
     size_default: int
+    #: Optional stale-while-revalidate threshold (see module docstring).
+    #: Ignored unless 0 < soft TTL < hard TTL.
+    soft_ttl_key: Optional[str] = None
+    soft_ttl_default: int = 0
+
+
+class _Stamped(NamedTuple):
+    """A stored value plus its wall-clock compute time (soft-TTL buckets only).
+
+    Wall clock, not monotonic: under Redis the stamp is read by other
+    processes. Module-level so it pickles.
+    """
+
+    value: Any
+    stored_at: float
 
 
 def _config_int(key: str, default: int) -> int:
@@ -80,7 +141,8 @@ class BucketedTTLCache:
     """
 
     def __init__(self, label: str, category: str,
-                 buckets: Mapping[str, BucketSpec]) -> None:
+                 buckets: Mapping[str, BucketSpec], *,
+                 lease_ttl: float = _LEASE_TTL) -> None:
         """
         Args:
             label: short name used in log lines (e.g. ``'jobs'``).
@@ -90,11 +152,25 @@ class BucketedTTLCache:
             buckets: ``{bucket_key: BucketSpec}``. Iteration order is the
                 display order in the Admin card, so declare the primary
                 bucket first.
+            lease_ttl: seconds a Redis recompute lease lives — also how long
+                a worker waits on a peer's compute before doing it itself.
         """
         self.label = label
         self.category = category
         self.buckets: Dict[str, BucketSpec] = dict(buckets)
+        self.lease_ttl = float(lease_ttl)
         self._adapters: Dict[str, Optional[CacheBase]] = {}
+        # Effective soft TTL per initialised bucket (0 = off); filled with
+        # the adapter memo and reset with it.
+        self._soft_ttls: Dict[str, int] = {}
+        # Per-worker counters: {bucket: {'hits', 'misses', 'stale_hits',
+        # 'refreshes'}}. Surfaced by info() where the adapter has none.
+        self._stats: Dict[str, Dict[str, int]] = {
+            b: dict.fromkeys(('hits', 'misses', 'stale_hits', 'refreshes'), 0)
+            for b in self.buckets
+        }
+        # In-process single-flight: (bucket, key) → the leader's Future.
+        self._inflight: Dict[Tuple[str, Hashable], Future] = {}
         self._lock = threading.RLock()
         _register(self)
 
@@ -120,6 +196,7 @@ class BucketedTTLCache:
             if ttl <= 0 or size <= 0:
                 self._adapters[bucket] = None
                 return None
+            self._soft_ttls[bucket] = self._soft_ttl(spec, ttl)
 
             redis_url = os.environ.get('CACHE_REDIS_URL')
             if redis_url:
@@ -142,6 +219,13 @@ class BucketedTTLCache:
             self._adapters[bucket] = adapter
             return adapter
 
+    @staticmethod
+    def _soft_ttl(spec: BucketSpec, ttl: int) -> int:
+        if spec.soft_ttl_key is None:
+            return 0
+        soft = _config_int(spec.soft_ttl_key, spec.soft_ttl_default)
+        return soft if 0 < soft < ttl else 0
+
     def live_adapters(self) -> List[CacheBase]:
         """Every enabled adapter, in declaration order (for the facade)."""
         out: List[CacheBase] = []
@@ -155,7 +239,8 @@ class BucketedTTLCache:
 
     def get_or_compute(self, bucket: str, key: Hashable,
                        compute: Callable[[], Any], *,
-                       force_refresh: bool = False) -> Any:
+                       force_refresh: bool = False,
+                       refresh: Optional[Callable[[], Any]] = None) -> Any:
         """Return the cached value for *key* in *bucket*, or compute and store it.
 
         *compute* must produce the FINAL caller-facing result, so a cache hit
@@ -166,28 +251,217 @@ class BucketedTTLCache:
 
         The compute runs OUTSIDE the adapter lock: these are multi-second
         plugin queries, and holding the lock across one would serialise every
-        other reader of the bucket.
+        other reader of the bucket. It does run at most once per key at a
+        time — concurrent misses wait on the in-flight compute rather than
+        repeating it (see "Single-flight" in the module docstring). A waiter
+        sees the leader's exception if the compute raises.
+
+        *refresh*, when given, is the off-request equivalent of *compute*
+        used for stale-while-revalidate on soft-TTL buckets. Often *compute*
+        itself, if it opens its own session.
         """
         adapter = self.adapter(bucket)
         if adapter is None:
             return compute()
 
-        with adapter.lock:
-            if not force_refresh and key in adapter:
-                return adapter[key]
-            # Drop any stale entry so the post-compute store can re-insert.
-            adapter.pop(key, None)
+        if not force_refresh:
+            value, stored_at = self._lookup(adapter, key)
+            if value is not _MISSING:
+                soft = self._soft_ttls.get(bucket, 0)
+                if (soft and stored_at is not None
+                        and time.time() - stored_at >= soft):
+                    self._count(bucket, 'stale_hits')
+                    if refresh is not None:
+                        self._schedule_refresh(adapter, bucket, key, refresh)
+                else:
+                    self._count(bucket, 'hits')
+                return value
+            self._count(bucket, 'misses')
+
+        flight_key = (bucket, key)
+        with self._lock:
+            future = self._inflight.get(flight_key)
+            leader = future is None
+            if leader:
+                future = self._inflight[flight_key] = Future()
+        if not leader:
+            result = future.result()
+            # A background refresh that lost the Redis lease yields nothing.
+            return result if result is not _MISSING else compute()
+
+        try:
+            # A previous leader may have stored and left between our miss
+            # and taking the lead; its value is the one we would compute.
+            result = (_MISSING if force_refresh
+                      else self._lookup(adapter, key)[0])
+            if result is _MISSING:
+                result = self._compute_and_store(adapter, bucket, key, compute,
+                                                 force_refresh)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(flight_key, None)
+
+    def peek(self, bucket: str, key: Hashable, default: Any = None) -> Any:
+        """The stored value for *key*, or *default* — no compute, no stats."""
+        adapter = self.adapter(bucket)
+        if adapter is None:
+            return default
+        value, _ = self._lookup(adapter, key)
+        return default if value is _MISSING else value
+
+    def put(self, bucket: str, key: Hashable, value: Any) -> None:
+        """Store *value* under *key* with no compute — a no-op while disabled.
+
+        For a caller that produced several keys' results in one go and
+        stores the ones nobody asked for yet. The caller owns the same
+        contract *compute* has in `get_or_compute`: *value* must be exactly
+        what a compute for *key* would return.
+        """
+        adapter = self.adapter(bucket)
+        if adapter is not None:
+            self._store(adapter, bucket, key, value)
+
+    def schedule_refresh(self, bucket: str, key: Hashable,
+                         refresh: Callable[[], Any]) -> None:
+        """Recompute *key* in the background, serving the stored value meanwhile.
+
+        For callers with their own staleness signal (an invalidation stamp,
+        say) rather than the bucket's soft TTL. Same single-flight and Redis
+        lease as a soft-stale refresh; a no-op while the bucket is disabled.
+        """
+        adapter = self.adapter(bucket)
+        if adapter is not None:
+            self._schedule_refresh(adapter, bucket, key, refresh)
 
-        result = compute()
+    def _count(self, bucket: str, stat: str) -> None:
+        # ``+=`` on a shared dict is not atomic across request threads.
+        with self._lock:
+            self._stats[bucket][stat] += 1
+
+    @staticmethod
+    def _lookup(adapter: CacheBase, key: Hashable) -> Tuple[Any, Optional[float]]:
+        """``(value, stored_at)``, or ``(_MISSING, None)`` on a miss.
 
+        ``stored_at`` is ``None`` for unstamped entries — written while the
+        bucket had no soft TTL, or by a worker configured without one.
+        """
+        with adapter.lock:
+            raw = adapter.get(key, _MISSING)
+        if raw is _MISSING:
+            return _MISSING, None
+        if isinstance(raw, _Stamped):
+            return raw.value, raw.stored_at
+        return raw, None
+
+    def _store(self, adapter: CacheBase, bucket: str, key: Hashable,
+               result: Any) -> None:
+        entry = (_Stamped(result, time.time())
+                 if self._soft_ttls.get(bucket) else result)
         with adapter.lock:
             try:
-                adapter[key] = result
-            except ValueError:
-                # Cache full and no expired entries to evict — skip the store
-                # rather than fail the request.
+                adapter[key] = entry
+            except (ValueError, TypeError, OverflowError):
+                # Cache full and no expired entries to evict, or a value the
+                # codec cannot encode (pickle: TypeError; msgpack: ints past
+                # 64 bits, OverflowError) — skip the store rather than fail
+                # the request.
                 pass
-        return result
+
+    def _compute_and_store(self, adapter: CacheBase, bucket: str,
+                           key: Hashable, compute: Callable[[], Any],
+                           force_refresh: bool, *,
+                           background: bool = False) -> Any:
+        """Run *compute* as this worker's leader for *key*, then store.
+
+        Adapters without a lease surface (the per-worker TTLCacheAdapter)
+        have nothing to coordinate with and compute straight away. A
+        *background* refresh that loses the lease returns ``_MISSING``
+        instead of waiting: the peer holding it is already refreshing.
+        """
+        acquire = getattr(adapter, 'acquire_lease', None)
+        token = acquire(key, self.lease_ttl) if acquire is not None else None
+        if acquire is not None and token is None:
+            if background:
+                return _MISSING
+            value = self._await_peer(adapter, key, force_refresh)
+            if value is not _MISSING:
+                return value
+            # Peer's lease lapsed with nothing stored — compute ourselves.
+            token = acquire(key, self.lease_ttl)
+
+        try:
+            result = compute()
+            self._store(adapter, bucket, key, result)
+            return result
+        finally:
+            if token is not None:
+                adapter.release_lease(key, token)
+
+    def _await_peer(self, adapter: CacheBase, key: Hashable,
+                    force_refresh: bool) -> Any:
+        """Poll while another worker holds the lease for *key*.
+
+        Returns the peer's stored value, or ``_MISSING`` if the lease is gone
+        (released or expired) and nothing was stored. A plain miss returns as
+        soon as a value appears; ``force_refresh`` waits for the lease to drop,
+        since the value already present is the stale one being replaced.
+        """
+        deadline = time.monotonic() + self.lease_ttl
+        delay = _LEASE_POLL_MIN
+        while time.monotonic() < deadline:
+            held = adapter.lease_held(key)
+            if not held or not force_refresh:
+                value, _ = self._lookup(adapter, key)
+                if value is not _MISSING:
+                    return value
+            if not held:
+                return _MISSING
+            time.sleep(delay)
+            delay = min(delay * 2, _LEASE_POLL_MAX)
+        return _MISSING
+
+    def _schedule_refresh(self, adapter: CacheBase, bucket: str,
+                          key: Hashable, refresh: Callable[[], Any]) -> None:
+        """Queue a background recompute of a soft-stale entry.
+
+        Registers under the same single-flight key as a foreground compute,
+        so a miss arriving mid-refresh waits on it instead of starting its
+        own, and a second stale hit does not queue a duplicate.
+        """
+        flight_key = (bucket, key)
+        with self._lock:
+            if flight_key in self._inflight:
+                return
+            future = _submit_refresh(self._run_refresh, adapter, bucket, key,
+                                     refresh, _app_context_factory())
+            if future is not None:
+                self._inflight[flight_key] = future
+
+    def _run_refresh(self, adapter: CacheBase, bucket: str, key: Hashable,
+                     refresh: Callable[[], Any], app_context) -> Any:
+        try:
+            with app_context():
+                result = self._compute_and_store(adapter, bucket, key, refresh,
+                                                 True, background=True)
+            if result is not _MISSING:
+                self._count(bucket, 'refreshes')
+            return result
+        except Exception:
+            # The stale entry stays until its hard TTL and the next stale hit
+            # retries. A miss that queued behind this refresh gets that entry
+            # — or ``_MISSING``, and computes for itself — never the error.
+            logger.warning("%s cache: background refresh failed (bucket=%s)",
+                           self.label, bucket, exc_info=True)
+            return self._lookup(adapter, key)[0]
+        finally:
+            with self._lock:
+                self._inflight.pop((bucket, key), None)
 
     # ── Admin / facade hooks ────────────────────────────────────────────
 
@@ -215,8 +489,23 @@ class BucketedTTLCache:
                     maxsize=_config_int(spec.size_key, spec.size_default),
                     ttl=_config_int(spec.ttl_key, spec.ttl_default),
                 ))
-            else:
-                infos.append(adapter.info())
+                continue
+            info = adapter.info()
+            stats = self._stats[bucket]
+            # Adapter-native counters win (shared across workers where the
+            # backend keeps them); otherwise report this worker's.
+            if info.get('hits') is None and info.get('misses') is None:
+                info['hits'] = stats['hits']
+                info['misses'] = stats['misses']
+            soft = self._soft_ttls.get(bucket, 0)
+            if soft:
+                info['extras'] = {
+                    **(info.get('extras') or {}),
+                    'soft_ttl':   soft,
+                    'stale_hits': stats['stale_hits'],
+                    'refreshes':  stats['refreshes'],
+                }
+            infos.append(info)
         return infos
 
     @property
@@ -246,10 +535,62 @@ class BucketedTTLCache:
         """
         with self._lock:
             self._adapters.clear()
+            self._soft_ttls.clear()
+            for stats in self._stats.values():
+                stats.update(dict.fromkeys(stats, 0))
             if disabled:
                 self._adapters.update({b: None for b in self.buckets})
 
 
+# ---------------------------------------------------------------------------
+# Background refresh executor
+# ---------------------------------------------------------------------------
+
+_REFRESH_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_REFRESH_PENDING = 0
+_REFRESH_LOCK = threading.Lock()
+
+
+def _submit_refresh(fn: Callable, *args: Any) -> Optional[Future]:
+    """Submit *fn* to the shared refresh pool; ``None`` if the queue is full.
+
+    The pool is built on first use so importing a cache module never starts
+    threads (CLI runs, and gunicorn's pre-fork master, stay thread-free).
+    """
+    global _REFRESH_EXECUTOR, _REFRESH_PENDING
+    with _REFRESH_LOCK:
+        if _REFRESH_PENDING >= _REFRESH_PENDING_MAX:
+            return None
+        if _REFRESH_EXECUTOR is None:
+            _REFRESH_EXECUTOR = ThreadPoolExecutor(
+                max_workers=_REFRESH_WORKERS,
+                thread_name_prefix='cache-refresh',
+            )
+        _REFRESH_PENDING += 1
+    future = _REFRESH_EXECUTOR.submit(fn, *args)
+    future.add_done_callback(_refresh_done)
+    return future
+
+
+def _refresh_done(_future: Future) -> None:
+    global _REFRESH_PENDING
+    with _REFRESH_LOCK:
+        _REFRESH_PENDING -= 1
+
+
+def _app_context_factory() -> Callable[[], Any]:
+    """Context factory re-entering the caller's Flask app on the refresh thread.
+
+    Refresh computes read ``current_app`` config and extensions (the jobs
+    plugin's engines, for one); outside Flask this is a no-op context.
+    """
+    try:
+        from flask import current_app
+        return current_app._get_current_object().app_context
+    except (ImportError, RuntimeError):
+        return contextlib.nullcontext
+
+
 # ---------------------------------------------------------------------------
 # Registry
 # ---------------------------------------------------------------------------
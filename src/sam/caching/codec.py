@@ -0,0 +1,188 @@
+"""
+Value codecs for the Redis-backed cache adapters.
+
+Redis memory is what bounds the hit rate under ``allkeys-lru``, and the
+values we store — jobs aggregation envelopes, allocation-usage row lists,
+matplotlib SVGs — are highly redundant. A :class:`Codec` turns a value into
+bytes (pickle, msgpack for plain dict/list payloads, or UTF-8 for text) and
+compresses the result with zstd or zlib once it is above a size threshold.
+
+Wire format
+-----------
+Every encoded value opens with a 4-byte header::
+
+    MAGIC (0xA7) | VERSION | SERIALIZER | COMPRESSION
+
+so any reader can tell how a value was written regardless of its own
+config. A reader that meets a newer ``VERSION``, or a codec it cannot
+decode (zstd written by a worker that has ``zstandard``, read by one that
+does not), raises :class:`CodecError` and the adapter treats the entry as a
+miss. Mixed-version rolling deploys therefore degrade to recomputes, never
+to errors. Pre-codec workers never see these values at all: the adapters
+store them under a distinct key tag (see ``RedisTTLAdapter`` /
+``RedisChartCache``).
+
+Configuration (environment, read once per adapter construction — the
+adapters are built outside any request, like ``CACHE_REDIS_URL``):
+
+  CACHE_CODEC            — ``zstd`` (default; falls back to ``zlib`` when the
+                           ``zstandard`` package is absent), ``zlib`` or
+                           ``none``
+  CACHE_CODEC_MIN_BYTES  — compress only payloads at least this long
+                           (default 1024; small values lose to the framing)
+  CACHE_CODEC_MSGPACK    — ``1`` to serialise plain dict/list payloads with
+                           msgpack when installed (default ``0``)
+"""
+
+import logging
+import os
+import pickle
+import zlib
+from typing import Any, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional — zlib is always available
+    zstandard = None
+
+try:
+    import msgpack
+except ImportError:  # optional — pickle covers everything msgpack would
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = 0xA7
+VERSION = 1
+
+SER_PICKLE = 0
+SER_MSGPACK = 1
+SER_TEXT = 2
+
+COMP_NONE = 0
+COMP_ZLIB = 1
+COMP_ZSTD = 2
+
+_COMPRESSION_NAMES = {'none': COMP_NONE, 'zlib': COMP_ZLIB, 'zstd': COMP_ZSTD}
+_DEFAULT_MIN_BYTES = 1024
+
+
+class CodecError(ValueError):
+    """An encoded value this process cannot decode (unknown header/codec)."""
+
+
+def _is_plain(obj: Any) -> bool:
+    """True when msgpack round-trips *obj* exactly.
+
+    Tuples are excluded (msgpack returns lists) and so are non-str dict keys
+    and anything date-like; those payloads stay on pickle.
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return True
+    if isinstance(obj, list):
+        return all(_is_plain(v) for v in obj)
+    if isinstance(obj, dict):
+        return all(isinstance(k, str) and _is_plain(v) for k, v in obj.items())
+    return False
+
+
+class Codec:
+    """Serialise + optionally compress cache values behind a versioned header."""
+
+    def __init__(self, *, compression: str = 'zstd',
+                 min_bytes: int = _DEFAULT_MIN_BYTES,
+                 use_msgpack: bool = False, level: int = 3):
+        if compression not in _COMPRESSION_NAMES:
+            raise ValueError(f'unknown cache compression {compression!r}')
+        if compression == 'zstd' and zstandard is None:
+            compression = 'zlib'
+        self.compression = compression
+        self.min_bytes = int(min_bytes)
+        self.use_msgpack = bool(use_msgpack and msgpack is not None)
+        self.level = level
+        self._comp_id = _COMPRESSION_NAMES[compression]
+        self._zstd_c = (zstandard.ZstdCompressor(level=level)
+                        if self._comp_id == COMP_ZSTD else None)
+
+    def describe(self) -> str:
+        """Short label for the Admin card, e.g. ``'zstd≥1024+msgpack'``."""
+        label = self.compression
+        if self._comp_id != COMP_NONE:
+            label += f'≥{self.min_bytes}'
+        if self.use_msgpack:
+            label += '+msgpack'
+        return label
+
+    # ── encode ──────────────────────────────────────────────────────────
+
+    def encode(self, value: Any) -> Tuple[bytes, int]:
+        """Return ``(wire_bytes, raw_size)``.
+
+        ``raw_size`` is the serialised length before compression, so callers
+        can report what compression saved.
+        """
+        if isinstance(value, str):
+            ser, body = SER_TEXT, value.encode()
+        elif self.use_msgpack and _is_plain(value):
+            ser, body = SER_MSGPACK, msgpack.packb(value, use_bin_type=True)
+        else:
+            ser, body = SER_PICKLE, pickle.dumps(value, protocol=4)
+
+        raw_size = len(body)
+        comp = COMP_NONE
+        if self._comp_id != COMP_NONE and raw_size >= self.min_bytes:
+            packed = (self._zstd_c.compress(body) if self._comp_id == COMP_ZSTD
+                      else zlib.compress(body, self.level))
+            # Incompressible payloads (already-compressed blobs) stay raw.
+            if len(packed) < raw_size:
+                comp, body = self._comp_id, packed
+        return bytes((MAGIC, VERSION, ser, comp)) + body, raw_size
+
+    # ── decode ──────────────────────────────────────────────────────────
+
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        """Inverse of :meth:`encode`, driven entirely by the header.
+
+        Static on purpose: a value is decoded by what it says it is, not by
+        how this process is configured to write.
+        """
+        if len(data) < 4 or data[0] != MAGIC:
+            raise CodecError('missing codec header')
+        version, ser, comp = data[1], data[2], data[3]
+        if version > VERSION:
+            raise CodecError(f'codec version {version} is newer than {VERSION}')
+        body = data[4:]
+
+        if comp == COMP_ZLIB:
+            body = zlib.decompress(body)
+        elif comp == COMP_ZSTD:
+            if zstandard is None:
+                raise CodecError('zstd-compressed value but zstandard is not installed')
+            body = zstandard.ZstdDecompressor().decompress(body)
+        elif comp != COMP_NONE:
+            raise CodecError(f'unknown compression id {comp}')
+
+        if ser == SER_PICKLE:
+            return pickle.loads(body)
+        if ser == SER_TEXT:
+            return body.decode()
+        if ser == SER_MSGPACK:
+            if msgpack is None:
+                raise CodecError('msgpack value but msgpack is not installed')
+            return msgpack.unpackb(body, raw=False, strict_map_key=False)
+        raise CodecError(f'unknown serializer id {ser}')
+
+
+def codec_from_env() -> Codec:
+    """Build the process's codec from the ``CACHE_CODEC*`` environment."""
+    compression = os.environ.get('CACHE_CODEC', 'zstd').strip().lower()
+    if compression not in _COMPRESSION_NAMES:
+        logger.warning("CACHE_CODEC=%r not recognised; using zlib.", compression)
+        compression = 'zlib'
+    return Codec(
+        compression=compression,
+        min_bytes=int(os.environ.get('CACHE_CODEC_MIN_BYTES', _DEFAULT_MIN_BYTES)),
+        use_msgpack=os.environ.get('CACHE_CODEC_MSGPACK', '0').lower()
+        in ('1', 'true', 'yes'),
+    )
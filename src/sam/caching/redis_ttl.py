@@ -6,17 +6,38 @@ sites are unchanged. Eviction is handled Redis-wide via `allkeys-lru`,
 not per-cache `maxsize`. Keys are namespaced under a per-adapter prefix
 (derived from the adapter name by default) so a single Redis DB can host
 every adapter and `RedisChartCache` without collisions.
+
+Round trips: a lookup is one pipelined GET + counter bump (`get`), a store
+one pipelined SET + index/counter update. Hit/miss/byte counters live in a
+per-prefix hash (`<prefix>stats`) and live entries are indexed in a
+per-prefix sorted set scored by expiry time (`<prefix>index`), so `info()`
+reports cross-worker hit rates and sizes without SCANning the keyspace.
+
+Values go through a `sam.caching.codec.Codec` (compression above a size
+threshold, optional msgpack) and are stored under a key tagged with the
+codec marker, so workers from before the codec layer — which would
+`pickle.loads` a header-prefixed value and fail — never read them.
 """
 
 import contextlib
+import logging
 import os
 import pickle
 import threading
+import time
+import uuid
 from typing import Any, Hashable, Optional
 
 import redis
 
 from sam.caching.base import CacheBase
+from sam.caching.codec import MAGIC, Codec, codec_from_env
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+#: Entry-key tag for codec-encoded values (see module docstring).
+_KEY_TAG = bytes((MAGIC,))
 
 
 @contextlib.contextmanager
@@ -38,15 +59,20 @@ class RedisTTLAdapter(CacheBase):
     `__setitem__` so entries expire in Redis the same way
     `cachetools.TTLCache` would.
 
-    The prefix drives `_encode_key` AND the `clear()`/`info()` SCANs, so
-    each adapter must own a distinct keyspace: two adapters sharing a
-    prefix would satisfy each other's lookups under the wrong TTL policy
-    and cross-wipe on `clear()`. The name-derived default guarantees that
+    The prefix drives `_encode_key`, the stats/index keys AND the `clear()`
+    SCAN, so each adapter must own a distinct keyspace: two adapters sharing
+    a prefix would satisfy each other's lookups under the wrong TTL policy,
+    pool their counters, and cross-wipe on `clear()`. The name-derived default guarantees that
     as long as adapter names are unique (they are — the Admin card keys
     off them).
 
     `maxsize` is recorded for `info()` reporting only — bounding is
     handled by Redis-wide `allkeys-lru`.
+
+    Bookkeeping keys (`stats`, `index`, `lease:…`) share the prefix so
+    `clear()` sweeps them and the flask adapter's foreign-keyspace skip
+    covers them; entry keys are prefix + codec tag + pickled key, and the
+    non-ASCII tag byte can never collide with them.
     """
 
     def __init__(self,
@@ -55,12 +81,16 @@ class RedisTTLAdapter(CacheBase):
                  client: redis.Redis,
                  ttl: float,
                  maxsize: Optional[int] = None,
-                 prefix: Optional[str] = None):
+                 prefix: Optional[str] = None,
+                 codec: Optional[Codec] = None):
         self.name = name
         self._client = client
         self._ttl = float(ttl)
         self._maxsize = maxsize
         self._prefix = prefix if prefix is not None else f'{name}:'
+        self._stats_key = f'{self._prefix}stats'.encode()
+        self._index_key = f'{self._prefix}index'.encode()
+        self._codec = codec if codec is not None else codec_from_env()
         # Internal lock guards only Python-side bookkeeping; cross-worker
         # consistency is provided by Redis itself.
         self._py_lock = threading.RLock()
@@ -70,7 +100,24 @@ class RedisTTLAdapter(CacheBase):
     def _encode_key(self, key: Hashable) -> bytes:
         # protocol=4 is universally available on Python ≥ 3.4 and yields
         # a stable byte representation across processes.
-        return self._prefix.encode() + pickle.dumps(key, protocol=4)
+        return self._prefix.encode() + _KEY_TAG + pickle.dumps(key, protocol=4)
+
+    def _is_entry(self, raw_key: bytes) -> bool:
+        # Bookkeeping keys are ASCII after the prefix. Untagged pickled keys
+        # (opening with the PROTO opcode, 0x80) are entries a pre-codec
+        # worker wrote; they still count.
+        n = len(self._prefix.encode())
+        return raw_key[n:n + 1] in (_KEY_TAG, b'\x80')
+
+    def _decode(self, raw: bytes) -> Any:
+        try:
+            return self._codec.decode(raw)
+        except Exception as exc:
+            # Unknown codec version, a compressor this worker lacks, or a
+            # corrupt value: all are just misses — recompute and overwrite.
+            logger.debug("%s: undecodable cache value (%s); treating as miss",
+                         self.name, exc)
+            return _MISSING
 
     # ── lock surface (no-op; see module docstring) ───────────────────────
 
@@ -81,28 +128,124 @@ class RedisTTLAdapter(CacheBase):
     # ── dict-like API used by usage_cache.py:138-163 ─────────────────────
 
     def __contains__(self, key: Hashable) -> bool:
+        # Existence probe only — deliberately not counted as a lookup.
         return bool(self._client.exists(self._encode_key(key)))
 
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Single-round-trip lookup: GET pipelined with the lookup counter.
+
+        Replaces the EXISTS-then-GET pair (``key in adapter`` followed by
+        ``adapter[key]``), which also raced an expiry between the two.
+        Only a miss pays a second trip, to count it — and a miss is about
+        to pay for a compute anyway.
+        """
+        pipe = self._client.pipeline(transaction=False)
+        pipe.get(self._encode_key(key))
+        pipe.hincrby(self._stats_key, 'lookups', 1)
+        raw, _ = pipe.execute()
+        value = _MISSING if raw is None else self._decode(raw)
+        if value is _MISSING:
+            self._client.hincrby(self._stats_key, 'misses', 1)
+            return default
+        return value
+
     def __getitem__(self, key: Hashable) -> Any:
-        raw = self._client.get(self._encode_key(key))
-        if raw is None:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
             raise KeyError(key)
-        return pickle.loads(raw)
+        return value
 
     def __setitem__(self, key: Hashable, value: Any) -> None:
-        self._client.set(
-            self._encode_key(key),
-            pickle.dumps(value, protocol=4),
-            ex=int(self._ttl) if self._ttl > 0 else None,
-        )
+        encoded = self._encode_key(key)
+        payload, raw_size = self._codec.encode(value)
+        now = time.time()
+        pipe = self._client.pipeline(transaction=False)
+        pipe.set(encoded, payload,
+                 ex=int(self._ttl) if self._ttl > 0 else None)
+        pipe.zadd(self._index_key,
+                  {encoded: now + self._ttl if self._ttl > 0 else float('inf')})
+        # Prune on write so the index tracks the live set without a sweeper.
+        pipe.zremrangebyscore(self._index_key, '-inf', now)
+        pipe.hincrby(self._stats_key, 'writes', 1)
+        pipe.hincrby(self._stats_key, 'bytes_written', len(payload))
+        pipe.hincrby(self._stats_key, 'bytes_raw', raw_size)
+        pipe.execute()
 
     def pop(self, key: Hashable, default: Any = None) -> Any:
         encoded = self._encode_key(key)
-        raw = self._client.get(encoded)
-        if raw is None:
-            return default
-        self._client.delete(encoded)
-        return pickle.loads(raw)
+        pipe = self._client.pipeline(transaction=False)
+        pipe.get(encoded)
+        pipe.delete(encoded)
+        pipe.zrem(self._index_key, encoded)
+        raw = pipe.execute()[0]
+        value = _MISSING if raw is None else self._decode(raw)
+        return default if value is _MISSING else value
+
+    # ── cross-worker single-flight lease ─────────────────────────────────
+
+    def _lease_key(self, key: Hashable) -> bytes:
+        # Lives under the adapter's own prefix so clear() sweeps stray
+        # leases too; the ``lease:`` infix keeps it from ever colliding
+        # with an entry key (those open with the codec tag byte).
+        return f'{self._prefix}lease:'.encode() + pickle.dumps(key, protocol=4)
+
+    def acquire_lease(self, key: Hashable, ttl: float) -> Optional[str]:
+        """Try to become the one worker recomputing *key*.
+
+        Returns an opaque token on success (SET NX PX — atomic across
+        workers), ``None`` when another worker already holds the lease.
+        The lease self-expires after *ttl* seconds so a worker that dies
+        mid-compute cannot wedge the key.
+        """
+        token = uuid.uuid4().hex
+        try:
+            ok = self._client.set(self._lease_key(key), token,
+                                  nx=True, px=max(int(ttl * 1000), 1))
+        except redis.RedisError:
+            # Can't coordinate — behave as the leader (today's behaviour).
+            return token
+        return token if ok else None
+
+    def lease_held(self, key: Hashable) -> bool:
+        """True while some worker holds the recompute lease for *key*."""
+        try:
+            return bool(self._client.exists(self._lease_key(key)))
+        except redis.RedisError:
+            return False
+
+    def renew_lease(self, key: Hashable, token: str, ttl: float) -> bool:
+        """Push our lease on *key* out to *ttl* seconds from now.
+
+        Returns ``False`` when the lease is no longer ours — it expired, and
+        perhaps another worker took it — so a long-running holder can stop
+        before it writes. GET-then-PEXPIRE, with the same race window as
+        `release_lease`. ``True`` when Redis is unreachable, as
+        `acquire_lease` behaves as the leader then.
+        """
+        lease_key = self._lease_key(key)
+        try:
+            raw = self._client.get(lease_key)
+            if raw is None or raw.decode() != token:
+                return False
+            self._client.pexpire(lease_key, max(int(ttl * 1000), 1))
+        except redis.RedisError:
+            pass
+        return True
+
+    def release_lease(self, key: Hashable, token: str) -> None:
+        """Drop the lease if we still own it.
+
+        GET-then-DELETE rather than a Lua compare-and-delete: the window
+        only matters when our lease already expired and another worker
+        re-took it, and the cost of losing that race is one extra compute.
+        """
+        lease_key = self._lease_key(key)
+        try:
+            raw = self._client.get(lease_key)
+            if raw is not None and raw.decode() == token:
+                self._client.delete(lease_key)
+        except redis.RedisError:
+            pass
 
     @property
     def ttl(self) -> float:
@@ -119,27 +262,59 @@ class RedisTTLAdapter(CacheBase):
         return self._client.scan_iter(match=f'{self._prefix}*', count=200)
 
     def info(self) -> dict:
+        """Counters and size from the stats hash and expiry index — no SCAN.
+
+        ``currsize`` counts index members not yet past their TTL, so it can
+        overstate by whatever ``allkeys-lru`` evicted early. ``bytes_approx``
+        is the mean stored (post-codec) size of every write times
+        ``currsize``; ``extras.bytes_saved`` is what the codec's compression
+        has saved across all writes since the last clear.
+        """
         try:
-            currsize = sum(1 for _ in self._scan_keys())
+            pipe = self._client.pipeline(transaction=False)
+            pipe.zremrangebyscore(self._index_key, '-inf', time.time())
+            pipe.zcard(self._index_key)
+            pipe.hgetall(self._stats_key)
+            _, currsize, raw_stats = pipe.execute()
         except redis.RedisError:
-            currsize = None
+            currsize, raw_stats = None, None
+        stats = {k.decode() if isinstance(k, bytes) else k: int(v)
+                 for k, v in (raw_stats or {}).items()}
+        misses = stats.get('misses', 0)
+        writes = stats.get('writes', 0)
+        bytes_approx = None
+        if currsize is not None:
+            bytes_approx = (stats.get('bytes_written', 0) // writes * currsize
+                            if writes else 0)
         return {
             'name':         self.name,
             'enabled':      True,
             'currsize':     currsize,
             'maxsize':      self._maxsize,
             'ttl':          self._ttl,
-            'hits':         None,    # not tracked at this layer
-            'misses':       None,
-            'bytes_approx': None,    # MEMORY USAGE on every key is too costly
-            'extras':       {'backend': 'redis', 'prefix': self._prefix},
+            'hits':         None if raw_stats is None
+                            else stats.get('lookups', 0) - misses,
+            'misses':       None if raw_stats is None else misses,
+            'bytes_approx': bytes_approx,
+            'extras':       {
+                'backend':     'redis',
+                'prefix':      self._prefix,
+                'codec':       self._codec.describe(),
+                'bytes_saved': stats.get('bytes_raw', 0)
+                               - stats.get('bytes_written', 0),
+            },
         }
 
     def clear(self) -> int:
+        """Delete every key under the prefix; counters reset with them.
+
+        Returns the number of cache entries removed — bookkeeping keys go
+        too but are not counted.
+        """
         n = 0
         try:
             for key in list(self._scan_keys()):
-                if self._client.delete(key):
+                if self._client.delete(key) and self._is_entry(key):
                     n += 1
         except redis.RedisError:
             pass
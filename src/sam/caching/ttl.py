@@ -40,6 +40,9 @@ class TTLCacheAdapter(CacheBase):
     def __getitem__(self, key: Hashable) -> Any:
         return self._cache[key]
 
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return self._cache.get(key, default)
+
     def __setitem__(self, key: Hashable, value: Any) -> None:
         self._cache[key] = value
 
@@ -590,6 +590,16 @@ def _label_ticks(dates):
     return out
 
 
+def date_tick_labels(dates: list) -> list:
+    """Labels for a row of tick datetimes, for a renderer that places its own.
+
+    The vocabulary `mpl_date_ticks` formats with, minus matplotlib: the
+    direct-SVG chart backend picks tick dates itself and labels them here, so
+    its axes read the same as the matplotlib ones.
+    """
+    return _label_ticks(list(dates))
+
+
 _DATE_FORMATTER_CLS = None
 
 
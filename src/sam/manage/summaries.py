@@ -17,21 +17,34 @@ ON DUPLICATE KEY UPDATE). The summary tables have no UNIQUE constraint on
 their natural key columns, so concurrent writes for the same natural key
 (date, user, project, ...) bucket may produce duplicate rows. Batch
 processes must serialize writes for the same natural key.
+
+``bulk_upsert_comp_charge_summaries`` is the set-based counterpart of
+``upsert_comp_charge_summary`` for large backfills: it resolves every
+natural key in a chunk once into in-memory dimension maps, diffs the
+chunk against existing rows with one keyed SELECT, and writes with
+executemany INSERT / UPDATE batches. Same resolution rules, same PUT
+semantics, same created/updated accounting.
 """
+from dataclasses import dataclass, field
 from datetime import date, datetime
-from typing import Optional, Tuple
+from typing import Iterable, List, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.orm import Session, selectinload
 
 from sam.core.users import User
 from sam.projects.projects import Project
 from sam.resources.resources import Resource
 from sam.resources.machines import Machine, Queue
 from sam.accounting.accounts import Account
+from sam.accounting.allocations import AllocationType
 from sam.activity.disk import DiskActivity, DiskCharge
+from sam.resources.facilities import Panel
 from sam.summaries.comp_summaries import CompChargeSummary
 from sam.summaries.disk_summaries import DiskChargeSummary
 from sam.summaries.archive_summaries import ArchiveChargeSummary
+from sam.summaries.charge_rollup import mark_rollup_stale
+from sam.enums import ChargeType
 
 
 def _resolve_user(session: Session, act_username: str, act_unix_uid: Optional[int]) -> User:
@@ -312,10 +325,449 @@ def upsert_comp_charge_summary(
         record = existing
         action = 'updated'
 
+    mark_rollup_stale(session, ChargeType.COMP, [activity_date])
     session.flush()
     return record, action
 
 
+# ---------------------------------------------------------------------------
+# Bulk (set-based) comp_charge_summary ingest
+# ---------------------------------------------------------------------------
+
+# Natural-key columns shared by the keyed diff SELECT and the in-chunk
+# dedupe. Order matters: it is the tuple layout of ``_comp_natural_key``.
+_COMP_NATURAL_KEY_COLS = (
+    CompChargeSummary.activity_date,
+    CompChargeSummary.act_username,
+    CompChargeSummary.act_projcode,
+    CompChargeSummary.machine,
+    CompChargeSummary.queue,
+    CompChargeSummary.resource,
+)
+
+
+@dataclass
+class BulkUpsertResult:
+    """Outcome of one ``bulk_upsert_comp_charge_summaries`` call.
+
+    ``actions`` is parallel to the input rows: ``'created'``,
+    ``'updated'`` or ``None`` for rows that failed resolution (their
+    message is in ``errors`` keyed by input position).
+    """
+    actions: List[Optional[str]] = field(default_factory=list)
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def n_created(self) -> int:
+        return sum(1 for a in self.actions if a == 'created')
+
+    @property
+    def n_updated(self) -> int:
+        return sum(1 for a in self.actions if a == 'updated')
+
+    @property
+    def n_errors(self) -> int:
+        return len(self.errors)
+
+
+def _folds_case(session: Session) -> bool:
+    """Whether the database compares the key columns case-insensitively.
+
+    True on MySQL (the production collation); False on SQLite, where the
+    per-row resolvers match exactly and the bulk path must as well.
+    """
+    return session.get_bind().dialect.name in ('mysql', 'mariadb')
+
+
+def _ci_lookup(exact: dict, folded: dict, key):
+    """Exact-match lookup with a case-folded fallback.
+
+    The per-row resolvers compare through the database collation. Bulk
+    maps are keyed in Python, so a miss on the exact key falls back to the
+    case-folded map — which ``_ci_index`` leaves empty unless the
+    collation folds case, so on SQLite a lookup is exact, like the
+    resolver's.
+    """
+    hit = exact.get(key)
+    if hit is None and isinstance(key, str):
+        hit = folded.get(key.casefold())
+    return hit
+
+
+def _ci_index(objs: Iterable, attr: str, fold: bool = True) -> Tuple[dict, dict]:
+    """Build the (exact, case-folded) maps consumed by ``_ci_lookup``.
+
+    With *fold* False the case-folded map is empty.
+    """
+    exact, folded = {}, {}
+    for obj in objs:
+        value = getattr(obj, attr)
+        exact.setdefault(value, obj)
+        if fold and isinstance(value, str):
+            folded.setdefault(value.casefold(), obj)
+    return exact, folded
+
+
+def _comp_natural_key(activity_date, act_username, act_projcode, machine, queue, resource) -> tuple:
+    return (activity_date, act_username, act_projcode, machine, queue, resource)
+
+
+#: Columns an update never overwrites: the act_ fields and the natural key,
+#: which may have matched case-insensitively.
+_COMP_IMMUTABLE_COLS = ('activity_date', 'act_username', 'act_projcode',
+                        'act_unix_uid', 'machine', 'queue', 'resource')
+
+
+def _fold_key(key: tuple, fold: bool = True) -> tuple:
+    if not fold:
+        return key
+    return tuple(k.casefold() if isinstance(k, str) else k for k in key)
+
+
+def bulk_upsert_comp_charge_summaries(
+    session: Session,
+    rows: List[dict],
+    *,
+    create_queue_if_missing: bool = False,
+    include_deleted_accounts: bool = False,
+    skip_errors: bool = False,
+) -> BulkUpsertResult:
+    """
+    Insert or update a chunk of CompChargeSummary rows with set-based SQL.
+
+    Each element of ``rows`` carries the same keyword arguments as
+    ``upsert_comp_charge_summary`` (``activity_date``, ``act_username``,
+    ``act_projcode``, ``act_unix_uid``, ``resource_name``,
+    ``machine_name``, ``queue_name``, ``num_jobs``, ``core_hours``,
+    ``charges`` and the optional resolved/override fields).
+
+    Query shape per chunk, independent of chunk size:
+      1. Users by username (plus one unix_uid fallback query for misses)
+      2. Projects by projcode (facility chain eager-loaded)
+      3. Resources by name, with machines eager-loaded
+      4. Accounts for the (project, resource) pairs
+      5. Queues for the (resource, queue_name) pairs (+ creates if allowed)
+      6. One keyed SELECT of existing comp_charge_summary natural keys
+      7. One executemany INSERT and one executemany UPDATE
+         (plus one charge-rollup stale mark per touched month, once the
+         rollup tables exist — see sam.summaries.charge_rollup)
+
+    Resolution rules, error messages and PUT semantics match
+    ``upsert_comp_charge_summary`` row for row, including how keys compare:
+    case-insensitively on MySQL, exactly on SQLite (``_folds_case``). A
+    natural key repeated within the chunk behaves as the sequential path
+    does: the first occurrence counts as created (or updated), later ones
+    as updated, and the last one's values win. The table has no UNIQUE
+    constraint on the natural key, so a key may already have several rows;
+    like the sequential path, only one of them is updated — here the one
+    with the lowest ``charge_summary_id``.
+
+    Raises:
+        ValueError: On the first unresolvable row when ``skip_errors``
+            is False. Every row is resolved, and errors surfaced, before
+            anything is written — missing queues are created only after
+            that — so nothing is flushed for the chunk.
+
+    Notes:
+        Does NOT commit. Caller must use management_transaction().
+    """
+    result = BulkUpsertResult(actions=[None] * len(rows))
+    if not rows:
+        return result
+    fold = _folds_case(session)
+
+    # --- 1. Users ----------------------------------------------------------
+    usernames = {r['act_username'] for r in rows}
+    users_exact, users_folded = _ci_index(
+        session.query(User).filter(User.username.in_(usernames)).all(),
+        'username', fold,
+    )
+    uid_fallback = {
+        r['act_unix_uid'] for r in rows
+        if r.get('act_unix_uid') is not None
+        and _ci_lookup(users_exact, users_folded, r['act_username']) is None
+    }
+    users_by_uid = {}
+    if uid_fallback:
+        for u in session.query(User).filter(User.unix_uid.in_(uid_fallback)).all():
+            users_by_uid.setdefault(u.unix_uid, u)
+
+    # --- 2. Projects (facility chain for _resolve_facility_name) ------------
+    projcodes = {r['act_projcode'].upper() for r in rows}
+    projects_exact, projects_folded = _ci_index(
+        session.query(Project)
+        .filter(Project.projcode.in_(projcodes))
+        .options(
+            selectinload(Project.allocation_type)
+            .selectinload(AllocationType.panel)
+            .selectinload(Panel.facility)
+        )
+        .all(),
+        'projcode', fold,
+    )
+
+    # --- 3. Resources + machines -------------------------------------------
+    resource_names = {r['resource_name'] for r in rows}
+    resources_exact, resources_folded = _ci_index(
+        session.query(Resource)
+        .filter(Resource.resource_name.in_(resource_names))
+        .options(selectinload(Resource.machines))
+        .all(),
+        'resource_name', fold,
+    )
+
+    # Resolve the three independent dimensions per row; accounts and
+    # queues need the (project, resource) / (resource, queue) pairs first.
+    resolved = [None] * len(rows)
+    pending_error = [None] * len(rows)
+
+    for idx, r in enumerate(rows):
+        user = _ci_lookup(users_exact, users_folded, r['act_username'])
+        act_unix_uid = r.get('act_unix_uid')
+        if user is None and act_unix_uid is not None:
+            user = users_by_uid.get(act_unix_uid)
+        if user is None:
+            uid_str = f"unix_uid={act_unix_uid}" if act_unix_uid is not None else "no uid"
+            pending_error[idx] = f"User '{r['act_username']}' ({uid_str}) not found in SAM"
+            continue
+        project = _ci_lookup(projects_exact, projects_folded, r['act_projcode'].upper())
+        if project is None:
+            pending_error[idx] = f"Project '{r['act_projcode']}' not found in SAM"
+            continue
+        res = _ci_lookup(resources_exact, resources_folded, r['resource_name'])
+        if res is None:
+            pending_error[idx] = f"Resource '{r['resource_name']}' not found in SAM"
+            continue
+        resolved[idx] = (user, project, res)
+
+    # --- 4. Accounts ---------------------------------------------------------
+    pairs = {(p.project_id, res.resource_id) for (_, p, res) in filter(None, resolved)}
+    accounts = {}
+    if pairs:
+        q = session.query(Account).filter(
+            tuple_(Account.project_id, Account.resource_id).in_(sorted(pairs))
+        )
+        if not include_deleted_accounts:
+            q = q.filter(Account.deleted == False)
+        for acct in q.order_by(Account.account_id).all():
+            accounts.setdefault((acct.project_id, acct.resource_id), acct)
+
+    # --- 5. Machines (in memory) + account errors ----------------------------
+    for idx, r in enumerate(rows):
+        if resolved[idx] is None:
+            continue
+        user, project, res = resolved[idx]
+        account = accounts.get((project.project_id, res.resource_id))
+        if account is None:
+            qualifier = " (including deleted)" if include_deleted_accounts else ""
+            pending_error[idx] = (
+                f"No account{qualifier} found for project '{project.projcode}' "
+                f"on resource '{res.resource_name}'"
+            )
+            resolved[idx] = None
+            continue
+        machine_name = r.get('machine_name')
+        machines = res.machines
+        if machine_name is not None:
+            m_exact, m_folded = _ci_index(machines, 'name', fold)
+            machine = _ci_lookup(m_exact, m_folded, machine_name)
+            if machine is None:
+                pending_error[idx] = (
+                    f"Machine '{machine_name}' not found on resource '{res.resource_name}'"
+                )
+                resolved[idx] = None
+                continue
+        elif len(machines) == 1:
+            machine = machines[0]
+        elif not machines:
+            pending_error[idx] = (
+                f"Resource '{res.resource_name}' has no machines; "
+                f"machine_name must be provided explicitly"
+            )
+            resolved[idx] = None
+            continue
+        else:
+            names = sorted(m.name for m in machines)
+            pending_error[idx] = (
+                f"Resource '{res.resource_name}' has {len(machines)} machines "
+                f"({', '.join(names)}); machine_name must be provided explicitly"
+            )
+            resolved[idx] = None
+            continue
+        resolved[idx] = (user, project, res, account, machine)
+
+    # --- 6. Queues -------------------------------------------------------------
+    queue_pairs = {
+        (resolved[idx][2].resource_id, r['queue_name'])
+        for idx, r in enumerate(rows) if resolved[idx] is not None
+    }
+    queues_exact, queues_folded = {}, {}
+    if queue_pairs:
+        for qobj in session.query(Queue).filter(
+            tuple_(Queue.resource_id, Queue.queue_name).in_(sorted(queue_pairs))
+        ).order_by(Queue.queue_id).all():
+            queues_exact.setdefault((qobj.resource_id, qobj.queue_name), qobj)
+            if fold:
+                queues_folded.setdefault((qobj.resource_id, qobj.queue_name.casefold()), qobj)
+
+    def _find_queue(res, queue_name):
+        return (queues_exact.get((res.resource_id, queue_name))
+                or queues_folded.get((res.resource_id, queue_name.casefold())))
+
+    to_create = []       # rows whose queue is created once errors are out
+    for idx, r in enumerate(rows):
+        if resolved[idx] is None:
+            continue
+        res = resolved[idx][2]
+        queue = _find_queue(res, r['queue_name'])
+        if queue is None:
+            if not create_queue_if_missing:
+                pending_error[idx] = (
+                    f"Queue '{r['queue_name']}' not found on resource '{res.resource_name}'. "
+                    f"Pass create_queue_if_missing=True to create it automatically."
+                )
+                resolved[idx] = None
+            else:
+                to_create.append(idx)
+            continue
+        resolved[idx] = resolved[idx] + (queue,)
+
+    # Surface errors in input order, honoring skip_errors before any write.
+    for idx, message in enumerate(pending_error):
+        if message is None:
+            continue
+        if not skip_errors:
+            raise ValueError(message)
+        result.errors.append((idx, message))
+
+    # The first row to reference a missing queue creates it (same
+    # start_date convention as _resolve_or_create_queue); later ones find it.
+    for idx in to_create:
+        r, res = rows[idx], resolved[idx][2]
+        queue = _find_queue(res, r['queue_name'])
+        if queue is None:
+            queue = _resolve_or_create_queue(
+                session, r['queue_name'], res, True,
+                start_date=datetime.combine(r['activity_date'], datetime.min.time()),
+            )
+            queues_exact[(res.resource_id, r['queue_name'])] = queue
+            if fold:
+                queues_folded[(res.resource_id, r['queue_name'].casefold())] = queue
+        resolved[idx] = resolved[idx] + (queue,)
+
+    # --- 7. Build row values ----------------------------------------------------
+    # Keyed on the natural key as the database compares it — case-folded on
+    # MySQL, where the sequential path's lookup for 'bob' finds the row it
+    # just created for 'Bob' and updates it: the first spelling of the key
+    # columns, the last row's figures. On SQLite the two stay two rows.
+    values = {}          # folded natural key -> column dict
+    first_keys = {}      # folded natural key -> first occurrence's exact key
+    positions_by_key = {}  # folded natural key -> input positions sharing it
+    for idx, r in enumerate(rows):
+        if resolved[idx] is None:
+            continue
+        user, project, res, account, machine, queue = resolved[idx]
+        act_username = r['act_username']
+        act_projcode = r['act_projcode']
+        act_unix_uid = r.get('act_unix_uid')
+        eff_act_unix_uid = act_unix_uid if act_unix_uid is not None else user.unix_uid
+
+        username = r.get('username')
+        projcode = r.get('projcode')
+        unix_uid = r.get('unix_uid')
+        resource_override = r.get('resource')
+        facility_name = r.get('facility_name')
+        resource_col = resource_override if resource_override is not None else r['resource_name']
+        if facility_name is None:
+            facility_name = _resolve_facility_name(project)
+
+        key = _comp_natural_key(
+            r['activity_date'], act_username, act_projcode,
+            machine.name, r['queue_name'], resource_col,
+        )
+        folded = _fold_key(key, fold)
+        cols = dict(
+            activity_date=r['activity_date'],
+            act_username=act_username,
+            act_projcode=act_projcode,
+            act_unix_uid=eff_act_unix_uid,
+            username=username if username is not None else act_username,
+            projcode=projcode if projcode is not None else act_projcode,
+            unix_uid=unix_uid if unix_uid is not None else eff_act_unix_uid,
+            user_id=user.user_id,
+            account_id=account.account_id,
+            facility_name=facility_name,
+            machine=machine.name,
+            machine_id=machine.machine_id,
+            queue=r['queue_name'],
+            queue_id=queue.queue_id,
+            resource=resource_col,
+            num_jobs=r['num_jobs'],
+            core_hours=r['core_hours'],
+            charges=r['charges'],
+            cos=r.get('cos'),
+            sweep=r.get('sweep'),
+            error_comment=r.get('error_comment'),
+        )
+        if folded in values:
+            cols.update({k: values[folded][k] for k in _COMP_IMMUTABLE_COLS})
+        values[folded] = cols
+        first_keys.setdefault(folded, key)
+        positions_by_key.setdefault(folded, []).append(idx)
+
+    if not values:
+        return result
+
+    # --- 8. One keyed SELECT against existing rows ------------------------------
+    existing_exact, existing_folded = {}, {}
+    stmt = (
+        select(CompChargeSummary.charge_summary_id, *_COMP_NATURAL_KEY_COLS)
+        .where(tuple_(*_COMP_NATURAL_KEY_COLS).in_(list(first_keys.values())))
+        .order_by(CompChargeSummary.charge_summary_id)
+    )
+    for row in session.execute(stmt):
+        key = tuple(row[1:])
+        existing_exact.setdefault(key, row[0])
+        existing_folded.setdefault(_fold_key(key, fold), row[0])
+
+    # --- 9. Split into INSERT / UPDATE batches ------------------------------------
+    inserts, updates = [], []
+    for folded, cols in values.items():
+        charge_summary_id = existing_exact.get(first_keys[folded])
+        if charge_summary_id is None:
+            charge_summary_id = existing_folded.get(folded)
+        positions = positions_by_key[folded]
+        if charge_summary_id is None:
+            inserts.append(cols)
+            result.actions[positions[0]] = 'created'
+            for idx in positions[1:]:
+                result.actions[idx] = 'updated'
+        else:
+            # UPDATE — overwrite only mutable fields; NEVER touch act_ fields
+            # (or the natural-key columns, which matched case-insensitively).
+            updates.append({
+                'charge_summary_id': charge_summary_id,
+                **{k: v for k, v in cols.items() if k not in _COMP_IMMUTABLE_COLS},
+            })
+            for idx in positions:
+                result.actions[idx] = 'updated'
+
+    mark_rollup_stale(session, ChargeType.COMP, {key[0] for key in values})
+    if inserts:
+        session.execute(insert(CompChargeSummary), inserts)
+    if updates:
+        session.execute(update(CompChargeSummary), updates)
+
+    session.flush()
+    return result
+
+
+_STORAGE_CHARGE_TYPES = {
+    DiskChargeSummary: ChargeType.DISK,
+    ArchiveChargeSummary: ChargeType.ARCHIVE,
+}
+
+
 def _upsert_storage_summary(
     session: Session,
     model_cls,        # DiskChargeSummary or ArchiveChargeSummary
@@ -432,6 +884,7 @@ def _upsert_storage_summary(
         record = existing
         action = 'updated'
 
+    mark_rollup_stale(session, _STORAGE_CHARGE_TYPES[model_cls], [activity_date])
     session.flush()
     return record, action
 
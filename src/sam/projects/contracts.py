@@ -328,6 +328,21 @@ class Contract(Base, TimestampMixin, DateRangeMixin, SessionMixin):
                 selectinload(cls.principal_investigator),
             )
 
+        # Plain text searches can come from the webapp's in-memory index;
+        # the join filters below stay in SQL.
+        if (pattern and pattern.strip()
+                and not (source or program or pi or monitor)):
+            from sam.search import contract_active, fetch_ranked, search_index
+            term = pattern.strip()
+            ids = search_index.search(
+                session, 'contracts',
+                term if ('%' in term or '_' in term) else f'%{term}%',
+                limit=limit,
+                where=lambda _, attrs: contract_active(attrs) or not active_only,
+            )
+            if ids is not None:
+                return fetch_ranked(query, cls.contract_id, ids)
+
         if pattern and pattern.strip():
             term = pattern.strip()
             query = query.filter(or_(_text_filter(cls.contract_number, term),
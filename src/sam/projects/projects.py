@@ -11,6 +11,7 @@ from ..summaries.comp_summaries import *
 from ..summaries.dav_summaries import *
 from ..accounting.calculator import calculate_charges, get_charge_models_for_resource
 from ..enums import ResourceTypeName
+from ..summaries import charge_rollup
 
 import logging
 from typing import Any
@@ -19,6 +20,7 @@ from sqlalchemy.orm import joinedload
 from sqlalchemy import text
 import sqlalchemy.exc as sa_exc
 
+from bisect import bisect_left, bisect_right
 from datetime import timedelta
 
 _logger = logging.getLogger(__name__)
@@ -56,6 +58,84 @@ def _ensure_values_cte_probed(session) -> None:
             "Results are correct but performance is degraded. "
             "Upgrade the database to enable the optimal CTE path."
         )
+
+
+def _attribute_to_anchors(desc_amounts: Dict[tuple, float],
+                          anchor_to_keys: Dict[tuple, List]) -> Dict[Any, float]:
+    """Sum per-descendant amounts into the MPTT anchors that contain them.
+
+    desc_amounts maps (tree_root, tree_left, tree_right, resource_id) to an
+    amount. Descendants are sorted by tree_left per (tree_root, resource_id)
+    so each anchor only visits the slice with a_left <= d_left <= a_right.
+    """
+    by_tree: Dict[tuple, List[tuple]] = {}
+    for (root, left, right, res), amount in desc_amounts.items():
+        by_tree.setdefault((root, res), []).append((left, right, amount))
+    index = {}
+    for tree_key, nodes in by_tree.items():
+        nodes.sort()
+        index[tree_key] = ([n[0] for n in nodes], nodes)
+
+    out: Dict[Any, float] = {}
+    for (a_root, a_left, a_right, a_res), keys in anchor_to_keys.items():
+        entry = index.get((a_root, a_res))
+        if entry is None:
+            continue
+        lefts, nodes = entry
+        lo, hi = bisect_left(lefts, a_left), bisect_right(lefts, a_right)
+        amount = sum(n[2] for n in nodes[lo:hi] if n[1] <= a_right)
+        if amount:
+            for k in keys:
+                out[k] = out.get(k, 0.0) + amount
+    return out
+
+
+def _batch_charges_from_rollup(session, alloc_infos: List[Dict],
+                               result: Dict[Any, Dict], *, subtree: bool) -> None:
+    """Fill result[key]['charges_by_type'] from the monthly charge rollup.
+
+    Shared by both batch charge methods when the rollup tables exist. One
+    coverage query for the whole call, then per (resource_type, window)
+    group and charge model one rollup query plus, only for months the
+    rollup does not cover cleanly, one residual raw-table query.
+    """
+    from collections import defaultdict
+
+    date_groups: Dict[tuple, List[Dict]] = defaultdict(list)
+    for info in alloc_infos:
+        date_groups[(info['resource_type'], info['start_date'], info['end_date'])].append(info)
+
+    windows = [charge_rollup.window_days(s, e) for (_, s, e) in date_groups]
+    charge_keys = {k for (rt, _, _) in date_groups for k in get_charge_models_for_resource(rt)}
+    clean = charge_rollup.clean_months(session, charge_keys,
+                                       min(w[0] for w in windows),
+                                       max(w[1] for w in windows))
+
+    for (rt, start_date, end_date), group_infos in date_groups.items():
+        for charge_key in get_charge_models_for_resource(rt):
+            if subtree:
+                anchor_to_keys: Dict[tuple, List] = defaultdict(list)
+                for info in group_infos:
+                    coord = (info['tree_root'], info['tree_left'], info['tree_right'], info['resource_id'])
+                    anchor_to_keys[coord].append(info['key'])
+                desc = charge_rollup.window_charges(
+                    session, charge_key, start_date, end_date, clean[charge_key],
+                    resource_ids=list({info['resource_id'] for info in group_infos}),
+                    subtrees=[coord[:3] for coord in anchor_to_keys],
+                )
+                amounts = _attribute_to_anchors(desc, anchor_to_keys)
+            else:
+                totals = charge_rollup.window_charges(
+                    session, charge_key, start_date, end_date, clean[charge_key],
+                    account_ids=list({info['account_id'] for info in group_infos}),
+                )
+                amounts = {info['key']: totals[info['account_id']]
+                           for info in group_infos if info['account_id'] in totals}
+            for k, amount in amounts.items():
+                if amount:
+                    result[k]['charges_by_type'][charge_key] = (
+                        result[k]['charges_by_type'].get(charge_key, 0.0) + amount
+                    )
 #-------------------------------------------------------------------------bm-
 #----------------------------------------------------------------------------
 class Project(Base, TimestampMixin, ActiveFlagMixin, SessionMixin, NestedSetMixin):
@@ -211,6 +291,16 @@ class Project(Base, TimestampMixin, ActiveFlagMixin, SessionMixin, NestedSetMixi
             >>> projects = Project.search_by_pattern(session, 'TEST%',
             ...                                      active_only=False)
         """
+        # The webapp's in-memory index, when enabled; same LIKE semantics.
+        from sam.search import fetch_ranked, search_index
+        ids = search_index.search(
+            session, 'projects', pattern, limit=limit,
+            fields=None if search_title else ('projcode',),
+            where=lambda _, attrs: attrs['active'] or not active_only,
+        )
+        if ids is not None:
+            return fetch_ranked(session.query(cls), cls.project_id, ids)
+
         # Build base query
         query = session.query(cls)
 
@@ -1064,6 +1154,11 @@ class Project(Base, TimestampMixin, ActiveFlagMixin, SessionMixin, NestedSetMixi
         coordinates; attribution back to anchors is done in Python via range containment.
         A WARNING is logged once per process so the deployment team can act on it.
 
+        Rollup path: when the charge_summary_rollup tables exist (see
+        sam.summaries.charge_rollup), charges are read from the monthly
+        prefix sums instead, with a raw scan only for months the rollup does
+        not cover cleanly; adjustments still take one of the paths above.
+
         Parallel to batch_get_account_charges() — both use the same charge model lookup
         (get_charge_models_for_resource) and summary tables; this version follows project
         MPTT tree coordinates while batch_get_account_charges() uses direct account_id.
@@ -1092,13 +1187,19 @@ class Project(Base, TimestampMixin, ActiveFlagMixin, SessionMixin, NestedSetMixi
 
         _ensure_values_cte_probed(session)
 
+        # Charges come from the monthly rollup when it exists; the paths
+        # below then only handle adjustments (models left empty).
+        use_rollup = charge_rollup.rollup_available(session)
+        if use_rollup:
+            _batch_charges_from_rollup(session, alloc_infos, result, subtree=True)
+
         # Group by (resource_type, start_date, end_date) — one DB pass per group per charge model
         date_groups: Dict[tuple, List[Dict]] = defaultdict(list)
         for info in alloc_infos:
             date_groups[(info['resource_type'], info['start_date'], info['end_date'])].append(info)
 
         for (rt, start_date, end_date), group_infos in date_groups.items():
-            models = get_charge_models_for_resource(rt)
+            models = {} if use_rollup else get_charge_models_for_resource(rt)
 
             if _values_cte_supported:
                 # ----------------------------------------------------------------
@@ -1251,6 +1352,10 @@ class Project(Base, TimestampMixin, ActiveFlagMixin, SessionMixin, NestedSetMixi
         Fallback path: groups by (resource_type, start_date, end_date) and issues one
         query per charge model per date group (correct but more queries for diverse ranges).
 
+        Rollup path: as in batch_get_subtree_charges(), charges come from the
+        monthly rollup when its tables exist, grouped by (resource_type,
+        start_date, end_date); adjustments are unchanged.
+
         Parallel to batch_get_subtree_charges() — both use the same charge model lookup
         (get_charge_models_for_resource) and summary tables; this version filters by
         direct account_id while batch_get_subtree_charges() uses MPTT tree coordinates.
@@ -1276,6 +1381,12 @@ class Project(Base, TimestampMixin, ActiveFlagMixin, SessionMixin, NestedSetMixi
 
         _ensure_values_cte_probed(session)
 
+        # Charges come from the monthly rollup when it exists; the paths
+        # below then only handle adjustments (models left empty).
+        use_rollup = charge_rollup.rollup_available(session)
+        if use_rollup:
+            _batch_charges_from_rollup(session, alloc_infos, result, subtree=False)
+
         if _values_cte_supported:
             # ----------------------------------------------------------------
             # PRIMARY PATH: VALUES CTE — group by resource_type only.
@@ -1301,7 +1412,7 @@ class Project(Base, TimestampMixin, ActiveFlagMixin, SessionMixin, NestedSetMixi
                     params[f'ed{i}']   = info['end_date']
                     idx_to_key[i]      = info['key']
 
-                models = get_charge_models_for_resource(rt)
+                models = {} if use_rollup else get_charge_models_for_resource(rt)
 
                 for charge_key, ModelClass in models.items():
                     sql = text(f"""
@@ -1351,7 +1462,7 @@ class Project(Base, TimestampMixin, ActiveFlagMixin, SessionMixin, NestedSetMixi
                 for info in group_infos:
                     acct_to_keys[info['account_id']].append(info['key'])
 
-                models = get_charge_models_for_resource(rt)
+                models = {} if use_rollup else get_charge_models_for_resource(rt)
 
                 for charge_key, ModelClass in models.items():
                     rows = session.query(
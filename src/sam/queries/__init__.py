@@ -126,6 +126,7 @@ from .directory_access import (
     group_populator,
     user_populator,
     build_directory_access_response,
+    build_directory_access_delta,
 )
 
 # Project Access (LDAP project group status)
@@ -138,6 +139,7 @@ from .fstree_access import (
     get_fstree_data,
     get_project_fsdata,
     get_user_fsdata,
+    build_fsdata_delta,
 )
 
 # Queue (active job queues by resource)
@@ -248,12 +250,14 @@ __all__ = [
     'group_populator',
     'user_populator',
     'build_directory_access_response',
+    'build_directory_access_delta',
     # Project Access
     'get_project_group_status',
     # FairShare Tree
     'get_fstree_data',
     'get_project_fsdata',
     'get_user_fsdata',
+    'build_fsdata_delta',
     # Queue
     'get_queue_data',
     # Wallclock exemptions
@@ -431,3 +431,47 @@ def build_directory_access_response(
         })
 
     return {'accessBranchDirectories': directories}
+
+
+def _keyed_changes(before: List[Dict], after: List[Dict], key: str) -> dict:
+    """Entries of *after* added or changed since *before*, and keys removed."""
+    old = {item[key]: item for item in before}
+    new = {item[key]: item for item in after}
+    return {
+        'added':   [new[k] for k in sorted(new.keys() - old.keys())],
+        'changed': [new[k] for k in sorted(new.keys() & old.keys()) if new[k] != old[k]],
+        'removed': sorted(old.keys() - new.keys()),
+    }
+
+
+def build_directory_access_delta(old: dict, new: dict) -> dict:
+    """
+    Changes between two build_directory_access_response() documents.
+
+    Groups are matched on groupName and accounts on username, per branch.
+    Added and changed entries are given whole (a consumer replaces them);
+    removed ones by name. Branches with no changes are left out, and a
+    branch that disappeared lists all of its groups and accounts as removed.
+
+    Returns:
+        dict with "accessBranchDirectories" list, each entry containing
+        "accessBranchName", and "unixGroups" / "unixAccounts" dicts of
+        "added", "changed" and "removed".
+    """
+    empty = {'unixGroups': [], 'unixAccounts': []}
+    before = {b['accessBranchName']: b for b in old['accessBranchDirectories']}
+    after = {b['accessBranchName']: b for b in new['accessBranchDirectories']}
+
+    directories = []
+    for branch_name in sorted(before.keys() | after.keys()):
+        was, now = before.get(branch_name, empty), after.get(branch_name, empty)
+        groups = _keyed_changes(was['unixGroups'], now['unixGroups'], 'groupName')
+        accounts = _keyed_changes(was['unixAccounts'], now['unixAccounts'], 'username')
+        if any(groups.values()) or any(accounts.values()):
+            directories.append({
+                'accessBranchName': branch_name,
+                'unixGroups': groups,
+                'unixAccounts': accounts,
+            })
+
+    return {'accessBranchDirectories': directories}
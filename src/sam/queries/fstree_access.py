@@ -976,3 +976,28 @@ def get_user_fsdata(
                 print(projcode, res['name'], res['accountStatus'])
     """
     return _remap_fstree_by_user(get_fstree_data(session, resource_name))
+
+
+def build_fsdata_delta(old: Dict, new: Dict) -> Dict:
+    """
+    Changes between two get_project_fsdata() or get_user_fsdata() documents.
+
+    Entries are compared whole, per projcode (or username): added and
+    changed ones are given in full, keyed as in the source document, so a
+    consumer replaces them; removed ones are listed by key.
+
+    Returns:
+        Dict with the source's ``name`` and, under its ``projects`` /
+        ``users`` key, a dict of ``added``, ``changed`` and ``removed``.
+    """
+    key = 'projects' if 'projects' in new else 'users'
+    before, after = old[key], new[key]
+    return {
+        'name': new['name'],
+        key: {
+            'added':   {k: after[k] for k in sorted(after.keys() - before.keys())},
+            'changed': {k: after[k] for k in sorted(after.keys() & before.keys())
+                        if after[k] != before[k]},
+            'removed': sorted(before.keys() - after.keys()),
+        },
+    }
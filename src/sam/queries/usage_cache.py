@@ -14,8 +14,15 @@ cache key.
 Configuration is read from Flask app.config when available, falling back to
 environment variables so the module works outside a Flask context (CLI, tests).
 
-  ALLOCATION_USAGE_CACHE_TTL  — TTL in seconds (0 = disabled, default 3600)
-  ALLOCATION_USAGE_CACHE_SIZE — max LRU entries  (0 = disabled, default 200)
+  ALLOCATION_USAGE_CACHE_TTL      — TTL in seconds (0 = disabled, default 3600)
+  ALLOCATION_USAGE_CACHE_SIZE     — max LRU entries  (0 = disabled, default 200)
+  ALLOCATION_USAGE_CACHE_SOFT_TTL — serve-stale-and-refresh threshold in
+                                    seconds (0 = off, default)
+
+The background refresh behind the soft TTL only runs when the caller's
+``session`` is a ``scoped_session`` (the webapp's ``db.session``): that
+proxy resolves to a fresh session on the refresh thread, where a concrete
+``Session`` would be shared across threads.
 """
 
 from datetime import datetime
@@ -23,6 +30,8 @@ from typing import Dict, List, Optional
 
 import logging
 
+from sqlalchemy.orm import scoped_session
+
 from sam.caching import BucketedTTLCache, BucketSpec, CacheBase, norm
 from sam.queries.allocations import get_allocation_summary_with_usage
 
@@ -36,6 +45,7 @@ _CACHE = BucketedTTLCache('usage_cache', 'usage', {
         name='allocation_usage',
         ttl_key='ALLOCATION_USAGE_CACHE_TTL', ttl_default=3600,
         size_key='ALLOCATION_USAGE_CACHE_SIZE', size_default=200,
+        soft_ttl_key='ALLOCATION_USAGE_CACHE_SOFT_TTL',
     ),
 })
 
@@ -107,8 +117,10 @@ def cached_allocation_usage(
         include_adjustments,
         root_only,
     )
-    return _CACHE.get_or_compute('default', key, _compute,
-                                 force_refresh=force_refresh)
+    return _CACHE.get_or_compute(
+        'default', key, _compute, force_refresh=force_refresh,
+        refresh=_compute if isinstance(session, scoped_session) else None,
+    )
 
 
 def purge_usage_cache() -> int:
@@ -194,10 +194,22 @@ def search_users_by_pattern(
         active_only: If True, only return active users
 
     Returns:
-        List of User objects matching the pattern
+        List of User objects matching the pattern. Served from
+        ``sam.search.search_index`` when the webapp enables it: ranked
+        best match first rather than by name.
     """
     like_pattern = f"%{pattern}%"
 
+    from sam.search import fetch_ranked, search_index
+    excluded = set(exclude_user_ids or ())
+    ids = search_index.search(
+        session, 'users', like_pattern, limit=limit,
+        where=lambda user_id, attrs: (user_id not in excluded
+                                      and (attrs['active'] or not active_only)),
+    )
+    if ids is not None:
+        return fetch_ranked(session.query(User), User.user_id, ids)
+
     # Search by username, first name, last name, or email
     # Join with email addresses to search by email too
     query = session.query(User).outerjoin(
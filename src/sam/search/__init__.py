@@ -0,0 +1,28 @@
+"""
+In-process n-gram search over users, projects and contracts.
+
+`search_index` answers the autocomplete searches (`search_users_by_pattern`,
+`Project.search_by_pattern`, `Contract.search_by_pattern`) from memory when
+the webapp enables it; see `sam.search.index` for how the indexes are built,
+refreshed from `modified_time` and shared through Redis, and
+`sam.search.ngram` for the matching itself.
+"""
+
+from sam.search.index import (
+    ENTITIES,
+    SearchIndex,
+    contract_active,
+    fetch_ranked,
+    search_index,
+)
+from sam.search.ngram import NgramIndex, compile_like
+
+__all__ = [
+    'ENTITIES',
+    'NgramIndex',
+    'SearchIndex',
+    'compile_like',
+    'contract_active',
+    'fetch_ranked',
+    'search_index',
+]
@@ -0,0 +1,441 @@
+"""SearchIndex — process-wide n-gram indexes for the autocomplete searches.
+
+``search_users_by_pattern``, ``Project.search_by_pattern`` and
+``Contract.search_by_pattern`` back type-ahead boxes that fire on every
+keystroke; in SQL each one is a ``%term%`` ILIKE scan (the user search
+across an outer join to ``email_address`` with DISTINCT). With the index
+enabled they ask ``search_index`` for a ranked page of ids instead and
+fetch just those rows by primary key.
+
+Each kind (``ENTITIES``) is an ``NgramIndex`` over its text columns:
+
+* **Build.** The first search in a worker loads the shared snapshot from
+  Redis, if another worker has published one recently, or else reads the
+  table(s) once and publishes. Every ``rebuild_interval`` seconds it is
+  rebuilt from the database, which also drops hard-deleted rows.
+* **Incremental refresh.** At most every ``refresh_interval`` seconds a
+  search re-reads the rows whose ``modified_time`` is within ``_OVERLAP``
+  of the newest one indexed, or later (for users, also those with a
+  changed email address).
+* **In-process writes.** An ``after_flush`` hook marks the users,
+  projects and contracts a session touched; the next search reloads them
+  through its own session, so a worker sees its own edits at once. Rows
+  touched in a transaction that rolls back are marked again.
+* **Locking.** Builds and refreshes read the database outside the index
+  lock, one thread per kind at a time; the lock is held only to read,
+  patch or swap a kind's state. A search that arrives while another thread
+  maintains its kind is served from the current state, or from SQL while
+  there is none yet.
+
+Searches are the SQL path's ``LIKE`` semantics exactly (see ``ngram``),
+ranked exact > prefix > word prefix > substring, then by the SQL path's
+``ORDER BY``. Off unless ``configure(enabled=True)``; when off, or if
+building fails, ``search`` returns None and callers run their SQL.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Collection, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import event, select, union
+from sqlalchemy.orm import Session
+
+from sam.search.ngram import NgramIndex, normalize
+
+logger = logging.getLogger(__name__)
+
+Doc = Tuple[int, dict, tuple, dict]
+
+# Incremental refreshes re-read from this far before the newest
+# modified_time indexed: a transaction's rows carry the time they were
+# written, not committed, so a slower writer can land behind the watermark.
+_OVERLAP = timedelta(minutes=1)
+
+
+# ---------------------------------------------------------------------------
+# Loaders: (session, since, ids) → (docs, newest modified_time seen)
+# ---------------------------------------------------------------------------
+
+def _newest(*stamps) -> Optional[datetime]:
+    stamps = [s for s in stamps if s is not None]
+    return max(stamps) if stamps else None
+
+
+def _load_users(session: Session, since: Optional[datetime],
+                ids: Optional[Collection[int]]) -> Tuple[List[Doc], Optional[datetime]]:
+    from sam.core.users import EmailAddress, User
+
+    scope = None
+    if ids is not None:
+        scope = User.user_id.in_(list(ids))
+    elif since is not None:
+        scope = User.user_id.in_(union(
+            select(User.user_id).where(User.modified_time >= since),
+            select(EmailAddress.user_id).where(EmailAddress.modified_time >= since),
+        ))
+
+    users = select(User.user_id, User.username, User.first_name, User.last_name,
+                   User.active, User.locked, User.modified_time)
+    emails = select(EmailAddress.user_id, EmailAddress.email_address,
+                    EmailAddress.modified_time)
+    if scope is not None:
+        users = users.where(scope)
+        emails = emails.where(EmailAddress.user_id.in_(
+            select(User.user_id).where(scope)))
+
+    by_user: Dict[int, List[str]] = defaultdict(list)
+    newest = None
+    for user_id, address, modified in session.execute(emails):
+        by_user[user_id].append(address)
+        newest = _newest(newest, modified)
+
+    docs = []
+    for user_id, username, first, last, active, locked, modified in session.execute(users):
+        docs.append((
+            user_id,
+            {'username': username, 'first_name': first, 'last_name': last,
+             'email': by_user.get(user_id, [])},
+            (normalize(last), normalize(first), normalize(username)),
+            {'active': bool(active) and not bool(locked)},
+        ))
+        newest = _newest(newest, modified)
+    return docs, newest
+
+
+def _load_projects(session: Session, since: Optional[datetime],
+                   ids: Optional[Collection[int]]) -> Tuple[List[Doc], Optional[datetime]]:
+    from sam.projects.projects import Project
+
+    stmt = select(Project.project_id, Project.projcode, Project.title,
+                  Project.active, Project.modified_time)
+    if ids is not None:
+        stmt = stmt.where(Project.project_id.in_(list(ids)))
+    elif since is not None:
+        stmt = stmt.where(Project.modified_time >= since)
+
+    docs, newest = [], None
+    for project_id, projcode, title, active, modified in session.execute(stmt):
+        docs.append((project_id, {'projcode': projcode, 'title': title},
+                     (normalize(projcode),), {'active': bool(active)}))
+        newest = _newest(newest, modified)
+    return docs, newest
+
+
+def _load_contracts(session: Session, since: Optional[datetime],
+                    ids: Optional[Collection[int]]) -> Tuple[List[Doc], Optional[datetime]]:
+    from sam.projects.contracts import Contract
+
+    stmt = select(Contract.contract_id, Contract.contract_number, Contract.title,
+                  Contract.start_date, Contract.end_date, Contract.modified_time)
+    if ids is not None:
+        stmt = stmt.where(Contract.contract_id.in_(list(ids)))
+    elif since is not None:
+        stmt = stmt.where(Contract.modified_time >= since)
+
+    docs, newest = [], None
+    for contract_id, number, title, start, end, modified in session.execute(stmt):
+        # ISO strings compare like the datetimes and survive the JSON snapshot.
+        docs.append((contract_id, {'contract_number': number, 'title': title},
+                     (normalize(number),),
+                     {'start': start.isoformat() if start else None,
+                      'end': end.isoformat() if end else None}))
+        newest = _newest(newest, modified)
+    return docs, newest
+
+
+@dataclass(frozen=True)
+class Entity:
+    fields: Tuple[str, ...]
+    load: Callable[[Session, Optional[datetime], Optional[Collection[int]]],
+                   Tuple[List[Doc], Optional[datetime]]]
+
+
+ENTITIES: Dict[str, Entity] = {
+    'users': Entity(('username', 'first_name', 'last_name', 'email'), _load_users),
+    'projects': Entity(('projcode', 'title'), _load_projects),
+    'contracts': Entity(('contract_number', 'title'), _load_contracts),
+}
+
+
+def contract_active(attrs: dict, now: Optional[datetime] = None) -> bool:
+    """``Contract.is_active`` over a contract document's attrs."""
+    now = (now or datetime.now()).isoformat()
+    return (attrs['start'] is not None and attrs['start'] <= now
+            and (attrs['end'] is None or attrs['end'] >= now))
+
+
+# ---------------------------------------------------------------------------
+# SearchIndex
+# ---------------------------------------------------------------------------
+
+@dataclass
+class _State:
+    index: NgramIndex
+    watermark: Optional[datetime]
+    built_at: float                         # time.monotonic()
+    checked_at: float = 0.0                 # last incremental refresh
+    dirty: Set[int] = field(default_factory=set)
+
+
+class SearchIndex:
+    """The ``ENTITIES`` indexes of one process, optionally shared via Redis."""
+
+    KEY_PREFIX = 'search_index:'
+
+    def __init__(self):
+        self.enabled = False
+        self.refresh_interval = 30
+        self.rebuild_interval = 3600
+        self._client = None
+        self._states: Dict[str, _State] = {}
+        self._lock = threading.RLock()
+        # One maintainer per kind: held across the database reads of a build
+        # or refresh, never by a search that only reads the index.
+        self._maintaining = {kind: threading.Lock() for kind in ENTITIES}
+
+    def configure(self, *, enabled: bool, client=None, refresh_interval: int = 30,
+                  rebuild_interval: int = 3600) -> None:
+        self.enabled = enabled
+        self._client = client
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        with self._lock:
+            self._states.clear()
+
+    def clear(self) -> int:
+        """Drop every index (and the shared snapshots); returns the number dropped."""
+        with self._lock:
+            n = len(self._states)
+            self._states.clear()
+        if self._client is not None:
+            try:
+                self._client.delete(*(self.KEY_PREFIX + kind for kind in ENTITIES))
+            except Exception as exc:
+                logger.warning('Search index: Redis clear failed (%s)', exc)
+        return n
+
+    def touch(self, kind: str, ids: Collection[int]) -> None:
+        """Reload these rows of ``kind`` on the next search."""
+        with self._lock:
+            state = self._states.get(kind)
+            if state is not None:
+                state.dirty.update(ids)
+
+    # ── Snapshots ───────────────────────────────────────────────────────
+
+    def _publish(self, kind: str, state: _State) -> None:
+        if self._client is None:
+            return
+        raw = zlib.compress(json.dumps({
+            'built': time.time(),
+            'watermark': state.watermark.isoformat() if state.watermark else None,
+            'docs': list(state.index.documents()),
+        }, separators=(',', ':')).encode())
+        try:
+            self._client.set(self.KEY_PREFIX + kind, raw, ex=self.rebuild_interval)
+        except Exception as exc:
+            logger.warning('Search index: Redis write failed (%s)', exc)
+
+    def _load_shared(self, kind: str) -> Optional[_State]:
+        if self._client is None:
+            return None
+        try:
+            raw = self._client.get(self.KEY_PREFIX + kind)
+        except Exception as exc:
+            logger.warning('Search index: Redis read failed (%s)', exc)
+            return None
+        if raw is None:
+            return None
+        stored = json.loads(zlib.decompress(raw))
+        index = NgramIndex(ENTITIES[kind].fields)
+        index.build(stored['docs'])
+        age = max(0.0, time.time() - stored['built'])
+        watermark = stored['watermark']
+        return _State(index, datetime.fromisoformat(watermark) if watermark else None,
+                      built_at=time.monotonic() - age)
+
+    # ── Maintenance ─────────────────────────────────────────────────────
+
+    def _rebuild(self, session: Session, kind: str) -> _State:
+        started = time.perf_counter()
+        docs, watermark = ENTITIES[kind].load(session, None, None)
+        index = NgramIndex(ENTITIES[kind].fields)
+        index.build(docs)
+        state = _State(index, watermark, built_at=time.monotonic(),
+                       checked_at=time.monotonic())
+        logger.info('Search index: built %s (%d rows) in %.0f ms', kind, len(index),
+                    (time.perf_counter() - started) * 1000)
+        self._publish(kind, state)
+        return state
+
+    def _apply(self, state: _State, docs: List[Doc], ids: Collection[int] = ()) -> None:
+        found = set()
+        for doc_id, raw, sort_key, attrs in docs:
+            state.index.upsert(doc_id, raw, sort_key, attrs)
+            found.add(doc_id)
+        for doc_id in set(ids) - found:
+            state.index.remove(doc_id)
+
+    def _due(self, state: Optional[_State], now: float) -> bool:
+        return (state is None or now - state.built_at > self.rebuild_interval
+                or now - state.checked_at > self.refresh_interval)
+
+    def _maintain(self, session: Session, kind: str) -> Optional[_State]:
+        """Rebuild or refresh *kind* if due; None if another thread is at it.
+
+        The database reads run without ``_lock``; only the swap of a new
+        state, or the patch of the current one, takes it.
+        """
+        maintaining = self._maintaining[kind]
+        if not maintaining.acquire(blocking=False):
+            return None
+        try:
+            now = time.monotonic()
+            with self._lock:
+                state = self._states.get(kind)
+            if not self._due(state, now):
+                return state        # another thread just finished
+            if state is None:
+                state = self._load_shared(kind)
+            if state is None or now - state.built_at > self.rebuild_interval:
+                state = self._rebuild(session, kind)
+            elif now - state.checked_at > self.refresh_interval:
+                since = state.watermark - _OVERLAP if state.watermark else None
+                docs, newest = ENTITIES[kind].load(session, since, None)
+                with self._lock:
+                    self._apply(state, docs)
+                    state.watermark = _newest(state.watermark, newest)
+                    state.checked_at = now
+            with self._lock:
+                previous = self._states.get(kind)
+                if previous is not None and previous is not state:
+                    state.dirty |= previous.dirty
+                self._states[kind] = state
+            return state
+        finally:
+            maintaining.release()
+
+    def _current(self, session: Session, kind: str) -> Optional[_State]:
+        with self._lock:
+            state = self._states.get(kind)
+        if self._due(state, time.monotonic()):
+            state = self._maintain(session, kind) or state
+        if state is None:
+            return None
+        with self._lock:
+            ids, state.dirty = state.dirty, set()
+        if ids:
+            try:
+                docs, _ = ENTITIES[kind].load(session, None, ids)
+            except Exception:
+                with self._lock:
+                    state.dirty |= ids
+                raise
+            with self._lock:
+                self._apply(state, docs, ids)
+                current = self._states.get(kind)
+                if current is not None and current is not state:
+                    # Swapped by a rebuild that read the rows before us.
+                    self._apply(current, docs, ids)
+        return state
+
+    # ── Queries ─────────────────────────────────────────────────────────
+
+    def search(
+        self,
+        session: Session,
+        kind: str,
+        pattern: str,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        where: Optional[Callable[[int, dict], bool]] = None,
+        limit: int = 50,
+    ) -> Optional[List[int]]:
+        """Ranked ids of ``kind`` rows with a field matching the ``LIKE``
+        ``pattern``; None when the index is off, could not be built, or is
+        still being built by another thread."""
+        if not self.enabled:
+            return None
+        try:
+            state = self._current(session, kind)
+        except Exception as exc:
+            logger.warning('Search index: %s unavailable (%s); using SQL', kind, exc)
+            return None
+        if state is None:
+            return None             # first build still running elsewhere
+        with self._lock:
+            return state.index.search(pattern, fields=fields, where=where, limit=limit)
+
+    def info(self) -> dict:
+        with self._lock:
+            return {kind: len(state.index) for kind, state in self._states.items()}
+
+
+#: Process-wide instance; ``webapp.run`` enables it from config.
+search_index = SearchIndex()
+
+
+def fetch_ranked(query, pk, ids: Sequence[int]) -> list:
+    """Rows of ``query`` whose ``pk`` is in ``ids``, in ``ids`` order.
+
+    One primary-key fetch for the page; ids that no longer exist are
+    skipped.
+    """
+    if not ids:
+        return []
+    rows = {getattr(obj, pk.key): obj for obj in query.filter(pk.in_(ids))}
+    return [rows[i] for i in ids if i in rows]
+
+
+# ---------------------------------------------------------------------------
+# Session hooks: reload what this process writes
+# ---------------------------------------------------------------------------
+
+_TOUCHED = 'search_index_touched'
+
+
+def _touched_ids(session) -> Dict[str, Set[int]]:
+    from sam.core.users import EmailAddress, User
+    from sam.projects.contracts import Contract
+    from sam.projects.projects import Project
+
+    watched = ((User, 'users', 'user_id'), (EmailAddress, 'users', 'user_id'),
+               (Project, 'projects', 'project_id'), (Contract, 'contracts', 'contract_id'))
+    touched: Dict[str, Set[int]] = defaultdict(set)
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        for model, kind, attr in watched:
+            if isinstance(obj, model):
+                value = getattr(obj, attr, None)
+                if value is not None:
+                    touched[kind].add(value)
+    return touched
+
+
+@event.listens_for(Session, 'after_flush')
+def _touch_flushed(session, flush_context):
+    if not search_index.enabled:
+        return
+    remembered = session.info.setdefault(_TOUCHED, defaultdict(set))
+    for kind, ids in _touched_ids(session).items():
+        search_index.touch(kind, ids)
+        remembered[kind] |= ids
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _touch_rolled_back(session, previous_transaction):
+    # A search in between may have indexed the rolled-back values.
+    for kind, ids in session.info.pop(_TOUCHED, {}).items():
+        search_index.touch(kind, ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _forget_touched(session):
+    session.info.pop(_TOUCHED, None)
@@ -0,0 +1,202 @@
+"""NgramIndex — substring / LIKE matching over a few text fields per row.
+
+Every value is casefolded and broken into its 2- and 3-grams; a posting
+list per gram names the documents containing it. A query is a SQL ``LIKE``
+pattern (``%`` / ``_`` wildcards, ``\\`` escape) matched case-insensitively
+against each value, exactly as ``ILIKE`` would — the postings only pick
+the candidates, and every candidate is checked against the compiled
+pattern, so the index can never return a row the SQL would not.
+
+Postings come in two layers. ``build`` packs them into sorted
+``array('i')`` (4 bytes an entry: tens of thousands of users fit in a few
+MB per worker); ``upsert`` adds to small per-gram sets on top. A changed
+or removed document may linger in the packed lists until the next
+``build`` — harmless, as the check against its current values drops it.
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import (
+    Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple,
+)
+
+# Gram lengths indexed. Queries need a literal run of at least the
+# shorter one to use the postings; shorter ones scan every document.
+_GRAMS = (2, 3)
+
+
+def normalize(value: Optional[str]) -> str:
+    return value.casefold() if value else ''
+
+
+def _grams(text: str) -> Set[str]:
+    return {text[i:i + n] for n in _GRAMS for i in range(len(text) - n + 1)}
+
+
+@dataclass(frozen=True)
+class LikePattern:
+    """A compiled ``LIKE`` pattern plus what the index needs from it."""
+
+    regex: 're.Pattern'
+    #: Literal runs between wildcards, casefolded.
+    literals: Tuple[str, ...]
+    #: For ``%text%`` (one literal, wildcards only at the ends): the text,
+    #: which ranks exact > prefix > word-prefix > substring matches.
+    substring: Optional[str]
+
+
+def compile_like(pattern: str) -> LikePattern:
+    """Translate a ``LIKE`` pattern into a case-insensitive full match."""
+    parts: List[str] = []
+    literals: List[str] = []
+    current: List[str] = []
+    i = 0
+    text = normalize(pattern)
+    while i < len(text):
+        ch = text[i]
+        if ch == '\\' and i + 1 < len(text):
+            current.append(text[i + 1])
+            parts.append(re.escape(text[i + 1]))
+            i += 2
+            continue
+        if ch in '%_':
+            if current:
+                literals.append(''.join(current))
+                current = []
+            parts.append('.*' if ch == '%' else '.')
+        else:
+            current.append(ch)
+            parts.append(re.escape(ch))
+        i += 1
+    if current:
+        literals.append(''.join(current))
+
+    stripped = text.strip('%')
+    substring = None
+    if (len(literals) == 1 and text.startswith('%') and text.endswith('%')
+            and literals[0] == stripped):
+        substring = literals[0]
+    return LikePattern(re.compile(''.join(parts), re.S), tuple(literals), substring)
+
+
+def _rank(values: Iterable[str], like: LikePattern) -> int:
+    """0 exact, 1 prefix, 2 word prefix, 3 anywhere (``%text%`` only)."""
+    if like.substring is None:
+        return 0
+    needle = like.substring
+    best = 3
+    for value in values:
+        if value == needle:
+            return 0
+        if value.startswith(needle):
+            best = min(best, 1)
+        elif best > 2 and re.search(r'(?:^|[^0-9a-z])' + re.escape(needle), value):
+            best = 2
+    return best
+
+
+class NgramIndex:
+    """Documents ``id → (values per field, sort key, attrs)`` with gram postings.
+
+    ``values`` holds one tuple of strings per field (a user has several
+    email addresses); ``sort_key`` is the tie-break order within a rank,
+    normally the SQL path's ``ORDER BY``; ``attrs`` carries whatever the
+    caller filters on (``active`` and the like).
+    """
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = tuple(fields)
+        self._docs: Dict[int, Tuple[Tuple[Tuple[str, ...], ...], tuple, dict]] = {}
+        self._packed: Dict[str, array] = {}
+        self._delta: Dict[str, Set[int]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._docs
+
+    @staticmethod
+    def _values(raw: Mapping[str, Any], fields: Sequence[str]):
+        out = []
+        for field in fields:
+            value = raw.get(field)
+            items = value if isinstance(value, (list, tuple)) else (value,)
+            out.append(tuple(normalize(v) for v in items if v))
+        return tuple(out)
+
+    def build(self, docs: Iterable[Tuple[int, Mapping[str, Any], tuple, dict]]) -> None:
+        """Replace the contents with ``(id, {field: value(s)}, sort_key, attrs)``."""
+        self._docs = {}
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for doc_id, raw, sort_key, attrs in docs:
+            values = self._values(raw, self.fields)
+            self._docs[doc_id] = (values, tuple(sort_key), dict(attrs))
+            for gram in {g for field in values for v in field for g in _grams(v)}:
+                postings[gram].append(doc_id)
+        self._packed = {g: array('i', sorted(ids)) for g, ids in postings.items()}
+        self._delta = defaultdict(set)
+
+    def upsert(self, doc_id: int, raw: Mapping[str, Any], sort_key: tuple,
+               attrs: dict) -> None:
+        values = self._values(raw, self.fields)
+        self._docs[doc_id] = (values, tuple(sort_key), dict(attrs))
+        for gram in {g for field in values for v in field for g in _grams(v)}:
+            self._delta[gram].add(doc_id)
+
+    def remove(self, doc_id: int) -> None:
+        self._docs.pop(doc_id, None)
+
+    def documents(self):
+        """``(id, {field: values}, sort_key, attrs)`` — ``build``'s input shape."""
+        for doc_id, (values, sort_key, attrs) in self._docs.items():
+            yield doc_id, dict(zip(self.fields, values)), sort_key, attrs
+
+    def _candidates(self, like: LikePattern) -> Iterable[int]:
+        best = None
+        for literal in like.literals:
+            if len(literal) < _GRAMS[0]:
+                continue
+            n = _GRAMS[-1] if len(literal) >= _GRAMS[-1] else _GRAMS[0]
+            for i in range(len(literal) - n + 1):
+                gram = literal[i:i + n]
+                size = len(self._packed.get(gram, ())) + len(self._delta.get(gram, ()))
+                if best is None or size < best[0]:
+                    best = (size, gram)
+        if best is None:
+            return list(self._docs)
+        gram = best[1]
+        return set(self._packed.get(gram, ())) | self._delta.get(gram, set())
+
+    def search(
+        self,
+        pattern: str,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        where: Optional[Callable[[int, dict], bool]] = None,
+        limit: int = 50,
+    ) -> List[int]:
+        """Ids of documents with a value in ``fields`` matching ``pattern``
+        (a ``LIKE`` pattern), best first, at most ``limit``.
+
+        ``where(id, attrs)`` filters further. Ranking is by ``_rank``, then
+        the document's sort key.
+        """
+        like = compile_like(pattern)
+        slots = [self.fields.index(f) for f in (fields or self.fields)]
+        matched = []
+        for doc_id in self._candidates(like):
+            doc = self._docs.get(doc_id)
+            if doc is None:
+                continue
+            values, sort_key, attrs = doc
+            hits = [v for s in slots for v in values[s] if like.regex.fullmatch(v)]
+            if not hits or (where is not None and not where(doc_id, attrs)):
+                continue
+            matched.append((_rank(hits, like), sort_key, doc_id))
+        return [doc_id for _, _, doc_id in heapq.nsmallest(limit, matched)]
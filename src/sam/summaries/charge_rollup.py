@@ -0,0 +1,446 @@
+"""
+Monthly prefix-sum rollup of the daily charge summary tables.
+
+``Project.batch_get_subtree_charges`` / ``batch_get_account_charges`` sum
+``*_charge_summary.charges`` over an allocation window — for a year-long
+allocation on a busy resource that is a range scan over every daily row of
+every descendant account. The rollup stores one row per
+``(charge_type, activity_month, resource_id, account_id)`` holding the
+running total through each day of the month (``cum_d01`` … ``cum_d31``;
+days past the end of a short month repeat the last value, so ``cum_d31`` is
+always the month total). Any ``[start, end]`` window then costs:
+
+  * interior months — ``cum_d31``;
+  * the two edge months — ``cum_d<hi> - cum_d<lo-1>``, still from the rollup;
+  * months not (or no longer) covered — a raw scan of the summary table,
+    restricted to those months only (the residual).
+
+Coverage lives in ``charge_summary_rollup_month``: a month is answered from
+the rollup only when it has a row there with ``is_stale = FALSE``.
+``refresh_charge_rollup`` rebuilds months from the raw table and marks them
+clean; the ``sam.manage.summaries`` upserts flip the month they touch back
+to stale (``mark_rollup_stale``) in the same transaction as the write, so a
+reader never trusts a month that has changed since its last refresh. The
+``sam-admin accounting`` ingest commands refresh the months they posted.
+Only charge types whose every writer goes through those upserts are rolled
+up (``ROLLUP_CHARGE_TYPES``): DAV charges are also loaded by the legacy DAV
+feed, which never marks a month stale, so DAV windows always take the raw
+path.
+
+``rollup_available`` is probed per engine and re-probed after
+``_AVAILABLE_TTL`` seconds, so a running webapp picks up tables created
+(or dropped) by ``--refresh-rollup`` after it started.
+
+These are derived, rebuildable tables owned by this package, not part of
+the legacy SAM schema, so they are declared on their own ``MetaData``
+(invisible to ``Base``-driven schema validation) and created on demand by
+``ensure_rollup_tables``. Until they exist every reader takes the raw path
+exactly as before.
+"""
+
+import calendar
+import logging
+import time as _time
+import weakref
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import (
+    Boolean, Column, Date, DateTime, Float, Index, Integer, MetaData, String,
+    Table, and_, case, delete, func, inspect, insert, or_, select, update,
+)
+from sqlalchemy.orm import Session
+
+from sam.accounting.accounts import Account
+from sam.enums import ChargeType
+
+logger = logging.getLogger(__name__)
+
+rollup_metadata = MetaData()
+
+#: Prefix-sum column names, ``cum_d01`` … ``cum_d31``.
+DAY_COLUMNS = tuple(f'cum_d{d:02d}' for d in range(1, 32))
+
+charge_rollup = Table(
+    'charge_summary_rollup', rollup_metadata,
+    Column('charge_type', String(16), primary_key=True),
+    Column('activity_month', Date, primary_key=True),
+    Column('resource_id', Integer, primary_key=True),
+    Column('account_id', Integer, primary_key=True),
+    *(Column(name, Float, nullable=False, default=0.0) for name in DAY_COLUMNS),
+    Index('idx_charge_rollup_account', 'account_id', 'charge_type', 'activity_month'),
+)
+
+charge_rollup_month = Table(
+    'charge_summary_rollup_month', rollup_metadata,
+    Column('charge_type', String(16), primary_key=True),
+    Column('activity_month', Date, primary_key=True),
+    Column('is_stale', Boolean, nullable=False, default=False),
+    Column('refreshed_at', DateTime, nullable=False),
+)
+
+#: Charge types the rollup holds: those whose every writer calls
+#: ``mark_rollup_stale``. DAV is left out — the legacy DAV feed writes
+#: ``dav_charge_summary`` without marking anything stale.
+ROLLUP_CHARGE_TYPES = frozenset({ChargeType.COMP, ChargeType.DISK, ChargeType.ARCHIVE})
+
+# Engine -> (bool, monotonic probe time): do the rollup tables exist?
+# Probed per engine (like the VALUES-CTE probe in sam.projects.projects)
+# and again once the answer is _AVAILABLE_TTL seconds old; weak so disposed
+# test engines drop out.
+_available: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+_AVAILABLE_TTL = 300.0
+
+_STALE_INFO_KEY = 'charge_rollup_stale'
+
+
+def _charge_models() -> dict:
+    # Deferred: calculator sits above the summary modules in the import graph.
+    from sam.accounting.calculator import CHARGE_MODELS_BY_KEY
+    return CHARGE_MODELS_BY_KEY
+
+
+def _engine(session: Session):
+    bind = session.get_bind()
+    return getattr(bind, 'engine', bind)
+
+
+# ---------------------------------------------------------------------------
+# Date helpers
+# ---------------------------------------------------------------------------
+
+def month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def _next_month(m: date) -> date:
+    return date(m.year + 1, 1, 1) if m.month == 12 else date(m.year, m.month + 1, 1)
+
+
+def months_between(first_day: date, last_day: date) -> List[date]:
+    """First-of-month dates for every month touching ``[first_day, last_day]``."""
+    months, m = [], month_start(first_day)
+    while m <= last_day:
+        months.append(m)
+        m = _next_month(m)
+    return months
+
+
+def window_days(start_date, end_date) -> Tuple[date, date]:
+    """The inclusive ``activity_date`` range ``BETWEEN start AND end`` selects.
+
+    ``activity_date`` is a DATE compared against DATETIME bounds: a start
+    with a time-of-day after midnight excludes its own day; an end of any
+    time includes its day.
+    """
+    first_day, last_day = start_date, end_date
+    if isinstance(start_date, datetime):
+        first_day = start_date.date()
+        if start_date.time() != time.min:
+            first_day += timedelta(days=1)
+    if isinstance(end_date, datetime):
+        last_day = end_date.date()
+    return first_day, last_day
+
+
+# ---------------------------------------------------------------------------
+# Availability / DDL
+# ---------------------------------------------------------------------------
+
+def rollup_available(session: Session) -> bool:
+    """True when the rollup tables exist on this session's database.
+
+    Cached per engine for ``_AVAILABLE_TTL`` seconds.
+    """
+    engine = _engine(session)
+    now = _time.monotonic()
+    try:
+        present, probed_at = _available[engine]
+        if now - probed_at < _AVAILABLE_TTL:
+            return present
+    except (KeyError, TypeError):
+        pass
+    try:
+        present = inspect(session.connection()).has_table(charge_rollup_month.name)
+    except Exception:
+        present = False
+    try:
+        _available[engine] = (present, now)
+    except TypeError:
+        pass
+    return present
+
+
+def ensure_rollup_tables(session: Session) -> None:
+    """Create the rollup tables if absent (idempotent)."""
+    rollup_metadata.create_all(session.connection(), checkfirst=True)
+    _available[_engine(session)] = (True, _time.monotonic())
+
+
+# ---------------------------------------------------------------------------
+# Maintenance
+# ---------------------------------------------------------------------------
+
+def refresh_charge_rollup(session: Session, charge_type: str,
+                          months: Iterable[date]) -> int:
+    """Rebuild the rollup for *charge_type* over *months* and mark them clean.
+
+    Each month is recomputed from scratch from the raw summary table (one
+    grouped SELECT, a DELETE and a bulk INSERT), so refreshing is idempotent
+    and also repairs months a foreign writer touched. Does NOT commit. A
+    charge type outside ``ROLLUP_CHARGE_TYPES`` is not rolled up: nothing
+    is written, so its months are never marked clean.
+
+    Returns the number of rollup rows written.
+    """
+    if charge_type not in ROLLUP_CHARGE_TYPES or not rollup_available(session):
+        return 0
+    model = _charge_models()[charge_type]
+    charge_type = str(charge_type)
+    now = datetime.now()
+    written = 0
+    refreshed = set()
+
+    for month in sorted({month_start(m) for m in months}):
+        next_month = _next_month(month)
+        days_in_month = calendar.monthrange(month.year, month.month)[1]
+        rows = session.execute(
+            select(model.account_id, Account.resource_id, model.activity_date,
+                   func.sum(model.charges))
+            .join(Account, model.account_id == Account.account_id)
+            .where(model.activity_date >= month, model.activity_date < next_month)
+            .group_by(model.account_id, Account.resource_id, model.activity_date)
+        ).all()
+
+        daily: Dict[tuple, List[float]] = defaultdict(lambda: [0.0] * 31)
+        for account_id, resource_id, activity_date, amount in rows:
+            if amount:
+                daily[(account_id, resource_id)][activity_date.day - 1] += float(amount)
+
+        values = []
+        for (account_id, resource_id), per_day in daily.items():
+            running, cums = 0.0, {}
+            for day, name in enumerate(DAY_COLUMNS, start=1):
+                if day <= days_in_month:
+                    running += per_day[day - 1]
+                cums[name] = running
+            values.append(dict(charge_type=charge_type, activity_month=month,
+                               resource_id=resource_id, account_id=account_id,
+                               **cums))
+
+        session.execute(delete(charge_rollup).where(
+            charge_rollup.c.charge_type == charge_type,
+            charge_rollup.c.activity_month == month))
+        if values:
+            session.execute(insert(charge_rollup), values)
+        session.execute(delete(charge_rollup_month).where(
+            charge_rollup_month.c.charge_type == charge_type,
+            charge_rollup_month.c.activity_month == month))
+        session.execute(insert(charge_rollup_month).values(
+            charge_type=charge_type, activity_month=month,
+            is_stale=False, refreshed_at=now))
+        written += len(values)
+        refreshed.add((charge_type, month))
+
+    # A later write in this transaction must be able to re-mark these.
+    state = session.info.get(_STALE_INFO_KEY)
+    if state is not None:
+        state[1].difference_update(refreshed)
+    logger.debug("charge rollup: refreshed %s %d month(s), %d rows",
+                 charge_type, len(refreshed), written)
+    return written
+
+
+def mark_rollup_stale(session: Session, charge_type: str,
+                      activity_dates: Iterable[date]) -> None:
+    """Flag the months holding *activity_dates* as needing a refresh.
+
+    Called by every charge-summary writer. Issues at most one UPDATE per
+    (charge type, month) per transaction; a no-op until the rollup tables
+    exist, and for months the rollup does not cover yet.
+    """
+    if not rollup_available(session):
+        return
+    charge_type = str(charge_type)
+    txn = session.get_transaction()
+    state = session.info.get(_STALE_INFO_KEY)
+    if state is None or state[0] is not txn:
+        state = session.info[_STALE_INFO_KEY] = (txn, set())
+    pending = {(charge_type, month_start(d)) for d in activity_dates} - state[1]
+    for ct, month in sorted(pending):
+        session.execute(update(charge_rollup_month)
+                        .where(charge_rollup_month.c.charge_type == ct,
+                               charge_rollup_month.c.activity_month == month)
+                        .values(is_stale=True))
+    state[1].update(pending)
+
+
+def stale_months(session: Session) -> Dict[str, List[date]]:
+    """``{charge_type: [month, ...]}`` for every covered month marked stale."""
+    out: Dict[str, List[date]] = defaultdict(list)
+    if not rollup_available(session):
+        return out
+    for ct, month in session.execute(
+            select(charge_rollup_month.c.charge_type, charge_rollup_month.c.activity_month)
+            .where(charge_rollup_month.c.is_stale.is_(True),
+                   charge_rollup_month.c.charge_type.in_(
+                       sorted(str(ct) for ct in ROLLUP_CHARGE_TYPES)))
+            .order_by(charge_rollup_month.c.activity_month)):
+        out[ct].append(month)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Read path
+# ---------------------------------------------------------------------------
+
+def clean_months(session: Session, charge_types: Iterable[str],
+                 first_day: date, last_day: date) -> Dict[str, Set[date]]:
+    """Covered, non-stale months per charge type within ``[first_day, last_day]``.
+
+    Always empty for a type outside ``ROLLUP_CHARGE_TYPES``, whatever
+    coverage rows an older build left behind.
+    """
+    out: Dict[str, Set[date]] = defaultdict(set)
+    types = [str(ct) for ct in charge_types if ct in ROLLUP_CHARGE_TYPES]
+    if not types or first_day > last_day:
+        return out
+    rows = session.execute(
+        select(charge_rollup_month.c.charge_type, charge_rollup_month.c.activity_month)
+        .where(charge_rollup_month.c.charge_type.in_(types),
+               charge_rollup_month.c.activity_month >= month_start(first_day),
+               charge_rollup_month.c.activity_month <= last_day,
+               charge_rollup_month.c.is_stale.is_(False)))
+    for ct, month in rows:
+        out[ct].add(month)
+    return out
+
+
+def _month_slice(month: date, first_day: date, last_day: date):
+    """Rollup expression for the part of *month* inside the window."""
+    lo = first_day.day if month_start(first_day) == month else 1
+    hi = last_day.day if month_start(last_day) == month else 31
+    expr = charge_rollup.c[DAY_COLUMNS[hi - 1]]
+    if lo > 1:
+        expr = expr - charge_rollup.c[DAY_COLUMNS[lo - 2]]
+    return expr
+
+
+def _residual_ranges(months: List[date], first_day: date,
+                     last_day: date) -> List[Tuple[date, date]]:
+    """Merge consecutive uncovered months into clipped ``(lo, hi)`` date ranges."""
+    ranges: List[Tuple[date, date]] = []
+    for m in sorted(months):
+        lo = max(m, first_day)
+        hi = min(_next_month(m) - timedelta(days=1), last_day)
+        if ranges and ranges[-1][1] + timedelta(days=1) == lo:
+            ranges[-1] = (ranges[-1][0], hi)
+        else:
+            ranges.append((lo, hi))
+    return ranges
+
+
+def _subtree_filter(subtrees: Iterable[Tuple[int, int, int]]):
+    """WHERE clause selecting the projects inside any of *subtrees*.
+
+    ``(tree_root, tree_left, tree_right)`` anchors; one nested inside
+    another adds nothing, so only the outermost of each tree are kept.
+    """
+    from sam.projects.projects import Project
+
+    outer: List[Tuple[int, int, int]] = []
+    for root, left, right in sorted(set(subtrees), key=lambda t: (t[0], t[1], -t[2])):
+        if outer and outer[-1][0] == root and right <= outer[-1][2]:
+            continue
+        outer.append((root, left, right))
+    return or_(*(and_(Project.tree_root == root, Project.tree_left >= left,
+                      Project.tree_right <= right)
+                 for root, left, right in outer))
+
+
+def window_charges(
+    session: Session,
+    charge_type: str,
+    start_date,
+    end_date,
+    clean: Set[date],
+    *,
+    account_ids: Optional[List[int]] = None,
+    resource_ids: Optional[List[int]] = None,
+    subtrees: Optional[Iterable[Tuple[int, int, int]]] = None,
+) -> Dict[Hashable, float]:
+    """Sum *charge_type* charges over ``[start_date, end_date]``.
+
+    Exactly one of the filters applies:
+      * ``account_ids`` — returns ``{account_id: amount}``;
+      * ``resource_ids`` — returns ``{(tree_root, tree_left, tree_right,
+        resource_id): amount}`` over every project holding an account on
+        those resources (the shape the subtree attribution needs), limited
+        to the projects inside *subtrees* ``(tree_root, tree_left,
+        tree_right)`` when given.
+
+    Months in *clean* (from ``clean_months``) come from the rollup — at most
+    one query; the rest are a raw scan of the summary table limited to
+    those months — at most one more.
+    """
+    from sam.projects.projects import Project
+
+    model = _charge_models()[charge_type]
+    first_day, last_day = window_days(start_date, end_date)
+    totals: Dict[Hashable, float] = defaultdict(float)
+    if first_day > last_day:
+        return totals
+
+    months = months_between(first_day, last_day)
+    rolled = [m for m in months if m in clean]
+    residual = [m for m in months if m not in clean]
+    by_tree = account_ids is None
+    in_subtrees = [_subtree_filter(subtrees)] if by_tree and subtrees else []
+
+    if rolled:
+        edges = [m for m in rolled
+                 if m in (month_start(first_day), month_start(last_day))]
+        amount = (case(*((charge_rollup.c.activity_month == m,
+                          _month_slice(m, first_day, last_day)) for m in edges),
+                       else_=charge_rollup.c.cum_d31)
+                  if edges else charge_rollup.c.cum_d31)
+        where = [charge_rollup.c.charge_type == str(charge_type),
+                 charge_rollup.c.activity_month.in_(rolled)]
+        if by_tree:
+            group = (Project.tree_root, Project.tree_left, Project.tree_right,
+                     charge_rollup.c.resource_id)
+            stmt = (select(*group, func.sum(amount))
+                    .select_from(charge_rollup)
+                    .join(Account, charge_rollup.c.account_id == Account.account_id)
+                    .join(Project, Account.project_id == Project.project_id)
+                    .where(*where, charge_rollup.c.resource_id.in_(resource_ids),
+                           *in_subtrees))
+        else:
+            group = (charge_rollup.c.account_id,)
+            stmt = (select(*group, func.sum(amount))
+                    .where(*where, charge_rollup.c.account_id.in_(account_ids)))
+        for *key, value in session.execute(stmt.group_by(*group)):
+            if value:
+                totals[tuple(key) if by_tree else key[0]] += float(value)
+
+    if residual:
+        in_window = or_(*(model.activity_date.between(lo, hi)
+                          for lo, hi in _residual_ranges(residual, first_day, last_day)))
+        if by_tree:
+            group = (Project.tree_root, Project.tree_left, Project.tree_right,
+                     Account.resource_id)
+            stmt = (select(*group, func.sum(model.charges))
+                    .join(Account, model.account_id == Account.account_id)
+                    .join(Project, Account.project_id == Project.project_id)
+                    .where(Account.resource_id.in_(resource_ids), in_window,
+                           *in_subtrees))
+        else:
+            group = (model.account_id,)
+            stmt = (select(*group, func.sum(model.charges))
+                    .where(model.account_id.in_(account_ids), in_window))
+        for *key, value in session.execute(stmt.group_by(*group)):
+            if value:
+                totals[tuple(key) if by_tree else key[0]] += float(value)
+
+    return totals
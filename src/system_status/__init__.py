@@ -13,6 +13,8 @@ from .models import (
     LoginNodeStatus,
     QueueStatus,
     UserProjQueueStatus,
+    StatusHistoryRollup,
+    UserProjDailyUsage, UserProjDailyUsageDay,
     SystemOutage, ResourceReservation
 )
 from .cli import main
@@ -45,6 +47,9 @@ __all__ = [
     'LoginNodeStatus',
     'QueueStatus',
     'UserProjQueueStatus',
+    'StatusHistoryRollup',
+    'UserProjDailyUsage',
+    'UserProjDailyUsageDay',
     'SystemOutage',
     'ResourceReservation',
 
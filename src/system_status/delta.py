@@ -0,0 +1,205 @@
+"""Delta protocol for collector status POSTs.
+
+Most rows in a 5-minute tick — node types, queues, filesystems and the
+several hundred ``user_project_queues`` rollups — are identical to the
+previous tick's. A collector that has had a snapshot acknowledged (the
+ingest response's ``snapshot_token``) may send only what changed since
+then::
+
+    {
+        "delta_base": "<snapshot_token of the acknowledged tick>",
+        "timestamp": ..., <every scalar field, in full>,
+        "queues": {"upsert": [<new or changed rows>],
+                   "remove": [[<key values of dropped rows>], ...]},
+        ...
+    }
+
+Each list named in ``DELTA_KEYS`` may be either a plain list (sent in
+full, as without the protocol) or an ``{"upsert", "remove"}`` object that
+is expanded against the same list in the base snapshot. Rows are matched
+by the key fields listed for that list; rows the delta doesn't mention
+are carried over unchanged. Any other field is taken from the delta as-is.
+
+The server keeps only the *last accepted* expanded payload per system
+(``SnapshotStore``). A delta against any other base is refused and the
+collector falls back to a full POST, so a restarted worker, an evicted
+entry or a worker without the shared Redis store costs one full tick,
+never a wrong snapshot.
+
+Kept dependency-free (stdlib + an optional redis client) to match the
+collector-side mirror in ``collectors/lib/api_client.py``.
+"""
+
+import copy
+import json
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+
+#: List fields that may be sent as deltas → the row fields identifying a row.
+DELTA_KEYS: Dict[str, Tuple[str, ...]] = {
+    'login_nodes': ('node_name',),
+    'node_types': ('node_type',),
+    'queues': ('queue_name',),
+    'user_project_queues': ('username', 'project_code', 'queue_name'),
+    'filesystems': ('filesystem_name',),
+    'reservations': ('reservation_name',),
+    'queue_definitions': ('queue_name',),
+}
+
+#: Top-level field naming the acknowledged base snapshot.
+BASE_FIELD = 'delta_base'
+
+
+class DeltaBaseMismatch(Exception):
+    """The delta names a base snapshot the server no longer holds."""
+
+
+def _row_key(row: dict, fields: Tuple[str, ...]) -> tuple:
+    return tuple(row.get(f) for f in fields)
+
+
+def _expand_list(base_rows: List[dict], delta: dict,
+                 fields: Tuple[str, ...]) -> List[dict]:
+    """Apply one ``{"upsert", "remove"}`` delta to ``base_rows``.
+
+    Base order is kept: changed rows replace their base row in place,
+    new rows are appended in delta order.
+    """
+    upserts = {_row_key(r, fields): r for r in delta.get('upsert', [])}
+    removed = {tuple(k) for k in delta.get('remove', [])}
+
+    rows = []
+    for row in base_rows:
+        key = _row_key(row, fields)
+        if key in removed:
+            continue
+        rows.append(upserts.pop(key, row))
+    rows.extend(upserts.values())
+    return rows
+
+
+def is_delta(data: dict) -> bool:
+    """True if ``data`` is a delta payload rather than a full snapshot."""
+    return BASE_FIELD in data
+
+
+def expand_delta(base: dict, delta: dict) -> dict:
+    """Rebuild the full payload a collector meant, from ``base`` + ``delta``.
+
+    ``base`` is not modified; carried-over rows are shared with it, so
+    callers that will mutate the result should copy what they store.
+    """
+    full = {}
+    for name, value in delta.items():
+        if name == BASE_FIELD:
+            continue
+        fields = DELTA_KEYS.get(name)
+        if fields is not None and isinstance(value, dict):
+            value = _expand_list(base.get(name) or [], value, fields)
+        full[name] = value
+    return full
+
+
+def make_delta(base: dict, current: dict, base_token: str) -> dict:
+    """Inverse of ``expand_delta``: the smallest payload describing
+    ``current`` relative to ``base``.
+
+    The server-side code never calls this; it is here so the round-trip
+    property (``expand_delta(base, make_delta(base, cur, t)) == cur`` up to
+    row order) is testable next to the expander, and so the wire format is
+    defined in one module — ``collectors/lib/api_client.py`` carries a copy.
+    """
+    delta: Dict[str, Any] = {BASE_FIELD: base_token}
+    for name, value in current.items():
+        fields = DELTA_KEYS.get(name)
+        if fields is None or not isinstance(value, list) or name not in base:
+            delta[name] = value
+            continue
+        old = {_row_key(r, fields): r for r in base[name]}
+        new_keys = set()
+        upsert = []
+        for row in value:
+            key = _row_key(row, fields)
+            new_keys.add(key)
+            if old.get(key) != row:
+                upsert.append(row)
+        remove = [list(k) for k in old if k not in new_keys]
+        delta[name] = {'upsert': upsert, 'remove': remove}
+    return delta
+
+
+class SnapshotStore:
+    """Last accepted (expanded) status payload per system.
+
+    Backed by Redis when a client is given, so every gunicorn worker can
+    expand a delta whose base another worker accepted; otherwise a
+    per-process dict (a delta landing on a different worker then gets a
+    ``DeltaBaseMismatch`` and the collector resends in full).
+    """
+
+    KEY_PREFIX = 'status_delta:'
+
+    def __init__(self, client=None, ttl: int = 3600):
+        self._client = client
+        self.ttl = ttl
+        self._local: Dict[str, Tuple[float, str, dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, system: str, token: str) -> dict:
+        """Return the stored payload for ``system`` if its token is ``token``.
+
+        Always a fresh copy the caller may keep or mutate: ``expand_delta``
+        carries base rows into the next snapshot, which must not share them
+        with this one.
+
+        Raises:
+            DeltaBaseMismatch: No snapshot held, or a different one.
+        """
+        if self._client is not None:
+            raw = self._client.get(self.KEY_PREFIX + system)
+            if raw is not None:
+                stored = json.loads(zlib.decompress(raw))
+                if stored.get('token') == token:
+                    return stored['payload']
+        else:
+            with self._lock:
+                entry = self._local.get(system)
+            if entry is not None:
+                expires, stored_token, payload = entry
+                if stored_token == token and expires > time.monotonic():
+                    return copy.deepcopy(payload)
+        raise DeltaBaseMismatch(
+            f'{system}: delta base {token!r} is not the last accepted snapshot')
+
+    def put(self, system: str, token: str, payload: dict) -> None:
+        """Record ``payload`` as the last accepted snapshot for ``system``.
+
+        The in-process store keeps ``payload`` itself: pass a copy the
+        caller will not mutate afterwards.
+        """
+        if self._client is not None:
+            raw = zlib.compress(json.dumps(
+                {'token': token, 'payload': payload},
+                separators=(',', ':'), default=str).encode())
+            self._client.set(self.KEY_PREFIX + system, raw, ex=self.ttl)
+            return
+        with self._lock:
+            self._local[system] = (time.monotonic() + self.ttl, token, payload)
+
+    def clear(self, system: Optional[str] = None) -> None:
+        """Forget the stored snapshot(s); the next delta will be refused."""
+        if self._client is not None:
+            systems = [system] if system else [
+                k.decode()[len(self.KEY_PREFIX):]
+                for k in self._client.scan_iter(match=self.KEY_PREFIX + '*')]
+            for name in systems:
+                self._client.delete(self.KEY_PREFIX + name)
+            return
+        with self._lock:
+            if system:
+                self._local.pop(system, None)
+            else:
+                self._local.clear()
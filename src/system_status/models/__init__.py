@@ -14,6 +14,8 @@ from .login_nodes import LoginNodeStatus
 from .filesystems import FilesystemStatus
 from .queues import QueueStatus
 from .user_proj_queues import UserProjQueueStatus
+from .history_rollup import StatusHistoryRollup
+from .user_proj_daily_usage import UserProjDailyUsage, UserProjDailyUsageDay
 
 # Side-effect import: registers the before_flush listener that resolves
 # `_pending_*_name` strings staged by the snapshot models' property
@@ -45,6 +47,11 @@ __all__ = [
     'QueueStatus',
     'UserProjQueueStatus',
 
+    # History rollups
+    'StatusHistoryRollup',
+    'UserProjDailyUsage',
+    'UserProjDailyUsageDay',
+
     # Support
     'SystemOutage',
     'ResourceReservation',
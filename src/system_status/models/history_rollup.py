@@ -0,0 +1,55 @@
+#-------------------------------------------------------------------------bh-
+# History Rollup Model
+#-------------------------------------------------------------------------eh-
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from ..base import StatusBase, SessionMixin
+from ..timeutil import utcnow_naive
+from .lookups import System
+
+
+class StatusHistoryRollup(StatusBase, SessionMixin):
+    """
+    Hourly / daily aggregates of the 5-minute history series.
+
+    One row per ``(system, family, series, grain, bucket_start)`` where
+    ``family`` is ``'partition'`` (series = cpu/gpu/viz), ``'queue'``
+    (series = queue name) or ``'node_type'`` (series = Casper node type).
+    ``metrics`` maps each charted metric to ``[sum, count]`` over the
+    ticks folded into the bucket — count excludes NULL readings — so the
+    bucket mean is ``sum / count`` and a bucket can be extended one tick at
+    a time. Maintained incrementally by ingest
+    (``system_status.queries.history.fold_snapshot``); see that module for
+    the read side.
+    """
+    __bind_key__ = "system_status"
+    __tablename__ = 'status_history_rollup'
+
+    __table_args__ = (
+        UniqueConstraint('system_id', 'family', 'series', 'grain', 'bucket_start',
+                         name='uq_status_history_rollup_series_bucket'),
+    )
+
+    rollup_id = Column(Integer, primary_key=True, autoincrement=True)
+
+    system_id = Column(Integer, ForeignKey('systems.system_id'), nullable=False)
+    family = Column(String(16), nullable=False)
+    series = Column(String(64), nullable=False)
+    grain = Column(String(8), nullable=False)
+    bucket_start = Column(DateTime, nullable=False, index=True)
+
+    samples = Column(Integer, nullable=False, default=0)
+    metrics = Column(JSON, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=utcnow_naive,
+                        onupdate=utcnow_naive)
+
+    system = relationship(System, foreign_keys=[system_id])
+
+    def __str__(self):
+        return f"StatusHistoryRollup {self.family}/{self.series} {self.grain} {self.bucket_start}"
+
+    def __repr__(self):
+        return (f"<StatusHistoryRollup(id={self.rollup_id}, family='{self.family}', "
+                f"series='{self.series}', grain='{self.grain}', bucket_start={self.bucket_start})>")
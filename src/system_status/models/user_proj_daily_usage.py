@@ -0,0 +1,105 @@
+#-------------------------------------------------------------------------bh-
+# Daily (user, project, queue) usage summary
+#-------------------------------------------------------------------------eh-
+
+from sqlalchemy import Column, DateTime, Double, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from ..base import StatusBase, SessionMixin
+from ..timeutil import utcnow_naive
+from .lookups import System, QueueDef, UserDef, ProjectCodeDef
+
+
+class UserProjDailyUsage(StatusBase, SessionMixin):
+    """
+    One closed day of ``get_user_proj_usage`` for one ``(user, project, queue)``.
+
+    ``core_hours`` / ``gpu_hours`` / ``node_hours`` are the left-step
+    integrals of the ``UserProjQueueStatus`` spans over the parent ticks in
+    ``[day, day + 1)``, each tick weighted by the interval to its successor
+    — for the day's last tick that successor is the first tick of a later
+    day (recorded on ``UserProjDailyUsageDay.next_tick``). ``first_seen`` /
+    ``last_seen`` are the first and last ticks *within the day* at which
+    the tuple was present and ``tick_count`` how many ticks it was present
+    for, so summing days reproduces a live integration exactly.
+
+    Written by ``system_status.queries.user_proj_usage.rollup_user_proj_days``
+    (nightly / ``scripts/rollup_user_proj_usage.py``). Tuples present with
+    zero allocations are kept so first/last/tick counts compose.
+    """
+    __bind_key__ = "system_status"
+    __tablename__ = 'user_proj_daily_usage'
+
+    __table_args__ = (
+        UniqueConstraint('day', 'system_id', 'user_id', 'project_code_id', 'queue_id',
+                         name='uq_user_proj_daily_usage_tuple_day'),
+    )
+
+    user_proj_daily_usage_id = Column(Integer, primary_key=True, autoincrement=True)
+
+    day = Column(DateTime, nullable=False, index=True)
+    system_id = Column(Integer, ForeignKey('systems.system_id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('status_users.user_id'), nullable=False)
+    project_code_id = Column(Integer, ForeignKey('project_codes.project_code_id'),
+                             nullable=False)
+    queue_id = Column(Integer, ForeignKey('queues.queue_id'), nullable=False)
+
+    core_hours = Column(Double, nullable=False, default=0.0)
+    gpu_hours = Column(Double, nullable=False, default=0.0)
+    node_hours = Column(Double, nullable=False, default=0.0)
+    first_seen = Column(DateTime, nullable=False)
+    last_seen = Column(DateTime, nullable=False)
+    tick_count = Column(Integer, nullable=False, default=0)
+
+    system = relationship(System, foreign_keys=[system_id])
+    user = relationship(UserDef, foreign_keys=[user_id])
+    project = relationship(ProjectCodeDef, foreign_keys=[project_code_id])
+    queue = relationship(QueueDef, foreign_keys=[queue_id])
+
+    def __str__(self):
+        return (f"UserProjDailyUsage {self.day:%Y-%m-%d} user={self.user_id} "
+                f"project={self.project_code_id} queue={self.queue_id}")
+
+    def __repr__(self):
+        return (f"<UserProjDailyUsage(id={self.user_proj_daily_usage_id}, day={self.day}, "
+                f"system_id={self.system_id}, core_hours={self.core_hours})>")
+
+
+class UserProjDailyUsageDay(StatusBase, SessionMixin):
+    """
+    Ledger of the days rolled into ``UserProjDailyUsage``, one row per
+    ``(system, day)``.
+
+    A day only counts as summarized if its ledger row exists — a day with
+    no usage has no ``UserProjDailyUsage`` rows, and the ledger is what
+    tells it apart from a day that was never rolled. ``next_tick`` is the
+    successor of the day's last tick: a query window may use the day's
+    totals only if it extends at least that far, otherwise the final
+    interval would be counted past the window's end.
+    """
+    __bind_key__ = "system_status"
+    __tablename__ = 'user_proj_daily_usage_days'
+
+    __table_args__ = (
+        UniqueConstraint('system_id', 'day', name='uq_user_proj_daily_usage_days_day'),
+    )
+
+    rollup_day_id = Column(Integer, primary_key=True, autoincrement=True)
+
+    system_id = Column(Integer, ForeignKey('systems.system_id'), nullable=False)
+    day = Column(DateTime, nullable=False, index=True)
+    first_tick = Column(DateTime, nullable=False)
+    last_tick = Column(DateTime, nullable=False)
+    next_tick = Column(DateTime, nullable=False)
+    tick_count = Column(Integer, nullable=False, default=0)
+    tuple_count = Column(Integer, nullable=False, default=0)
+    rolled_at = Column(DateTime, nullable=False, default=utcnow_naive)
+
+    system = relationship(System, foreign_keys=[system_id])
+
+    def __str__(self):
+        return f"UserProjDailyUsageDay system={self.system_id} {self.day:%Y-%m-%d}"
+
+    def __repr__(self):
+        return (f"<UserProjDailyUsageDay(system_id={self.system_id}, day={self.day}, "
+                f"tuples={self.tuple_count})>")
@@ -5,7 +5,7 @@ Centralized queries for the system status dashboard.
 """
 
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
@@ -27,6 +27,9 @@ from .user_proj_queues import (  # noqa: F401
     get_user_proj_timeseries,
 )
 from .user_proj_usage import get_user_proj_usage  # noqa: F401
+from . import history
+from .history import pick_resolution  # noqa: F401
+from .columns import SeriesColumns  # noqa: F401
 
 
 def get_latest_derecho_status(session: Session) -> Optional[DerechoStatus]:
@@ -161,30 +164,28 @@ def get_casper_nodetype_history(
     session: Session,
     node_type: str,
     start_date: datetime,
-    end_date: datetime
-) -> List[Dict[str, Any]]:
+    end_date: datetime,
+    *,
+    resolution: str = 'raw',
+    max_points: Optional[int] = None,
+    as_columns: bool = False,
+) -> Union[List[Dict[str, Any]], SeriesColumns]:
     """
     Get historical data for a specific Casper node type.
     Returns a list of dictionaries suitable for charting.
+
+    ``resolution`` is ``'raw'`` (5-minute ticks), ``'hour'`` / ``'day'``
+    (rollup bucket means) or ``'auto'``; ``max_points`` caps the result via
+    LTTB downsampling. See ``system_status.queries.history``. With
+    ``as_columns=True`` the NumPy-backed ``SeriesColumns`` is returned
+    instead of dicts (the dual-panel charts draw from it directly).
     """
-    history_records = session.query(CasperNodeTypeStatus).filter(
-        CasperNodeTypeStatus.node_type == node_type,
-        CasperNodeTypeStatus.timestamp >= start_date,
-        CasperNodeTypeStatus.timestamp <= end_date
-    ).order_by(CasperNodeTypeStatus.timestamp).all()
-
-    return [
-        {
-            'timestamp': record.timestamp,
-            'nodes_total': record.nodes_total,
-            'nodes_available': record.nodes_available,
-            'nodes_down': record.nodes_down,
-            'nodes_allocated': record.nodes_allocated,
-            'utilization_percent': record.utilization_percent,
-            'memory_utilization_percent': record.memory_utilization_percent,
-        }
-        for record in history_records
-    ]
+    columns = history.series_history(
+        session, 'node_type', 'casper', node_type, start_date, end_date,
+        lambda start, end: history.raw_node_type_columns(session, node_type, start, end),
+        resolution=resolution, max_points=max_points, y_key='nodes_allocated',
+    )
+    return columns if as_columns else columns.rows()
 
 
 def get_latest_casper_nodetype_status(session: Session, node_type: str) -> Optional[CasperNodeTypeStatus]:
@@ -199,40 +200,26 @@ def get_queue_history(
     system: str,
     queue_name: str,
     start_date: datetime,
-    end_date: datetime
-) -> List[Dict[str, Any]]:
+    end_date: datetime,
+    *,
+    resolution: str = 'raw',
+    max_points: Optional[int] = None,
+    as_columns: bool = False,
+) -> Union[List[Dict[str, Any]], SeriesColumns]:
     """
     Get historical data for a specific queue.
     Returns a list of dictionaries suitable for charting.
+
+    ``resolution`` / ``max_points`` / ``as_columns`` as for
+    ``get_casper_nodetype_history``.
+    Downsampling keeps the running-jobs shape.
     """
-    history_records = (
-        session.query(QueueStatus)
-        .join(System, QueueStatus.system_id == System.system_id)
-        .join(QueueDef, QueueStatus.queue_id == QueueDef.queue_id)
-        .filter(
-            QueueDef.name == queue_name,
-            System.name == system,
-            QueueStatus.timestamp >= start_date,
-            QueueStatus.timestamp <= end_date,
-        )
-        .order_by(QueueStatus.timestamp)
-        .all()
+    columns = history.series_history(
+        session, 'queue', system, queue_name, start_date, end_date,
+        lambda start, end: history.raw_queue_columns(session, system, queue_name, start, end),
+        resolution=resolution, max_points=max_points, y_key='running_jobs',
     )
-
-    return [
-        {
-            'timestamp': record.timestamp,
-            'running_jobs': record.running_jobs,
-            'pending_jobs': record.pending_jobs,
-            'held_jobs': record.held_jobs,
-            'active_users': record.active_users,
-            'cores_allocated': record.cores_allocated,
-            'cores_pending': record.cores_pending,
-            'gpus_allocated': record.gpus_allocated,
-            'gpus_pending': record.gpus_pending,
-        }
-        for record in history_records
-    ]
+    return columns if as_columns else columns.rows()
 
 
 def get_latest_queue_status(session: Session, system: str, queue_name: str) -> Optional[QueueStatus]:
@@ -296,8 +283,12 @@ def get_system_partition_history(
     system: str,
     partition: str,
     start_date: datetime,
-    end_date: datetime
-) -> List[Dict[str, Any]]:
+    end_date: datetime,
+    *,
+    resolution: str = 'raw',
+    max_points: Optional[int] = None,
+    as_columns: bool = False,
+) -> Union[List[Dict[str, Any]], SeriesColumns]:
     """
     Get historical data for a specific system partition (cpu, gpu, or viz).
     Works for both Derecho and Casper systems.
@@ -309,56 +300,27 @@ def get_system_partition_history(
         partition: One of 'cpu', 'gpu', or 'viz' (viz only for Casper)
         start_date: Start of time range
         end_date: End of time range
+        resolution: 'raw' (5-minute ticks), 'hour' / 'day' (rollup bucket
+            means) or 'auto' (picked from the window and max_points)
+        max_points: LTTB-downsample to at most this many points
+        as_columns: Return the NumPy-backed ``SeriesColumns`` instead of dicts
 
     Returns:
         List of dicts with timestamp, nodes_total, nodes_available,
         nodes_down, nodes_allocated, utilization_percent, memory_utilization_percent
     """
+    system_lower = system.lower()
     partition_lower = partition.lower()
-
-    # Select appropriate model based on system
-    if system.lower() == 'derecho':
-        model = DerechoStatus
-    elif system.lower() == 'casper':
-        model = CasperStatus
-    else:
-        return []
-
-    # Query historical records
-    history_records = session.query(model).filter(
-        model.timestamp >= start_date,
-        model.timestamp <= end_date
-    ).order_by(model.timestamp).all()
-
-    # Extract partition-specific fields
-    result = []
-    for record in history_records:
-        nodes_total = getattr(record, f'{partition_lower}_nodes_total', 0)
-        nodes_available = getattr(record, f'{partition_lower}_nodes_available', 0)
-        nodes_down = getattr(record, f'{partition_lower}_nodes_down', 0)
-
-        # Calculate allocated nodes (total - available - down)
-        nodes_allocated = nodes_total - nodes_available - nodes_down
-
-        # Get utilization percent - use partition-specific for cpu/gpu, general for viz
-        if partition_lower == 'cpu':
-            utilization_percent = record.cpu_utilization_percent
-        elif partition_lower == 'gpu':
-            utilization_percent = record.gpu_utilization_percent
-        else:  # viz or other
-            utilization_percent = None
-
-        result.append({
-            'timestamp': record.timestamp,
-            'nodes_total': nodes_total,
-            'nodes_available': nodes_available,
-            'nodes_down': nodes_down,
-            'nodes_allocated': nodes_allocated,
-            'utilization_percent': utilization_percent,
-            'memory_utilization_percent': record.memory_utilization_percent,
-        })
-
-    return result
+    if system_lower not in ('derecho', 'casper'):
+        return SeriesColumns.empty(history.PARTITION_METRICS) if as_columns else []
+
+    columns = history.series_history(
+        session, 'partition', system_lower, partition_lower, start_date, end_date,
+        lambda start, end: history.raw_partition_columns(
+            session, system_lower, partition_lower, start, end),
+        resolution=resolution, max_points=max_points, y_key='nodes_allocated',
+    )
+    return columns if as_columns else columns.rows()
 
 
 def get_latest_system_partition_status(session: Session, system: str, partition: str) -> Optional[Dict[str, Any]]:
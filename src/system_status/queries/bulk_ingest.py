@@ -0,0 +1,207 @@
+"""Bulk ingest of one Derecho / Casper status tick.
+
+The default ingest path loads the POST through the model schemas, which
+build a transient ORM object for every login node, queue, filesystem,
+node type and user/project/queue row, stage their lookup names as
+``_pending_*`` strings for the ``before_flush`` listener, and flush the
+lot through the unit of work. This path does the same work with plain
+dicts:
+
+* the payload is validated by ``DerechoStatusBulkSchema`` /
+  ``CasperStatusBulkSchema`` (same fields as the model schemas, no ORM);
+* lookup names are resolved through the process-wide ``dimension_cache``;
+* the parent row is one INSERT (its id is the children's FK), and each
+  child table is one executemany INSERT on the session's connection;
+* user/project/queue rows go through ``coalesce_user_proj_queue_rows``,
+  so matching spans are extended with a single UPDATE against the held
+  active-span index.
+
+The rows written are the same as the ORM path's (see
+``tests/api/test_status_bulk_ingest.py``). Selected by the
+``STATUS_BULK_INGEST`` config flag in the status API.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from system_status.models import (
+    CasperNodeTypeStatus,
+    CasperStatus,
+    DerechoStatus,
+    FilesystemStatus,
+    LoginNodeStatus,
+    QueueStatus,
+    UserProjQueueStatus,
+)
+
+from .dimensions import dimension_cache
+from .user_proj_queue_ingest import coalesce_user_proj_queue_rows, fill_staged_span_ids
+
+
+SYSTEM_MODELS = {'derecho': DerechoStatus, 'casper': CasperStatus}
+
+# Payload list → snapshot child model.
+CHILD_MODELS = {
+    'login_nodes': LoginNodeStatus,
+    'node_types': CasperNodeTypeStatus,
+    'queues': QueueStatus,
+    'user_project_queues': UserProjQueueStatus,
+    'filesystems': FilesystemStatus,
+}
+
+
+@lru_cache(maxsize=None)
+def _insert_columns(model) -> Tuple[Tuple[str, Any], ...]:
+    """``(column key, default)`` for every column an insert dict carries.
+
+    Primary keys and columns with a callable default (``created_at``) are
+    left out, so the database and SQLAlchemy fill them per row exactly as
+    they do for the ORM path. Every dict for a table has the same keys,
+    which executemany requires.
+    """
+    out = []
+    for col in model.__table__.columns:
+        if col.primary_key:
+            continue
+        default = col.default
+        if default is not None and not default.is_scalar:
+            continue
+        out.append((col.key, default.arg if default is not None else None))
+    return tuple(out)
+
+
+def _row(model, values: Dict[str, Any], **fixed) -> Dict[str, Any]:
+    row = {key: values.get(key, default) for key, default in _insert_columns(model)}
+    row.update(fixed)
+    return row
+
+
+def _resolve_lookups(session: Session, system_id: int,
+                     children: Dict[str, List[dict]]) -> Dict[str, Dict[tuple, int]]:
+    """Lookup ids for every name the tick's child rows mention."""
+    queue_keys = [(system_id, r['queue_name'])
+                  for name in ('queues', 'user_project_queues')
+                  for r in children[name]]
+    node_types: Dict[tuple, dict] = {}
+    for r in children['login_nodes']:
+        node_types.setdefault((system_id, r['node_name']),
+                              {'node_type': r.get('node_type') or 'cpu'})
+    upq = children['user_project_queues']
+    return {
+        'queue': dimension_cache.resolve_many(session, 'queue', queue_keys),
+        'login_node': dimension_cache.resolve_many(
+            session, 'login_node', node_types, extra=node_types),
+        'filesystem': dimension_cache.resolve_many(
+            session, 'filesystem', [(r['filesystem_name'],) for r in children['filesystems']]),
+        'user': dimension_cache.resolve_many(
+            session, 'user', [(r['username'],) for r in upq]),
+        'project_code': dimension_cache.resolve_many(
+            session, 'project_code', [(r['project_code'],) for r in upq]),
+    }
+
+
+def ingest_status_bulk(session: Session, system_name: str, data: Dict[str, Any],
+                       timestamp: datetime) -> SimpleNamespace:
+    """Insert one tick loaded by the system's bulk schema.
+
+    Args:
+        session:     SQLAlchemy session (system_status bind); the caller commits.
+        system_name: ``'derecho'`` or ``'casper'``.
+        data:        Output of ``DerechoStatusBulkSchema().load()`` /
+                     ``CasperStatusBulkSchema().load()``.
+        timestamp:   The tick (naive-UTC datetime).
+
+    Returns:
+        The snapshot as a namespace — ``status_id``, the parent's columns
+        and one list per child table (user/project/queue rows: only the
+        newly inserted spans) — shaped like the ORM status object, so
+        ``fold_snapshot`` accepts it.
+    """
+    model = SYSTEM_MODELS[system_name]
+    parent_fk = f'{system_name}_status_id'
+    children = {name: data.get(name) or [] for name in CHILD_MODELS}
+
+    system_id = dimension_cache.resolve(session, 'system', (system_name,))
+    ids = _resolve_lookups(session, system_id, children)
+
+    parent = _row(model, data, timestamp=timestamp)
+    status_id = session.execute(
+        insert(model.__table__).values(**parent)
+    ).inserted_primary_key[0]
+
+    fixed = {parent_fk: status_id, 'timestamp': timestamp}
+    rows = {
+        'login_nodes': [
+            _row(LoginNodeStatus, r, **fixed, system_id=system_id,
+                 login_node_def_id=ids['login_node'][(system_id, r['node_name'])])
+            for r in children['login_nodes']
+        ],
+        'node_types': [
+            _row(CasperNodeTypeStatus, r, **fixed) for r in children['node_types']
+        ],
+        'queues': [
+            _row(QueueStatus, r, **fixed, system_id=system_id,
+                 queue_id=ids['queue'][(system_id, r['queue_name'])])
+            for r in children['queues']
+        ],
+        'user_project_queues': [
+            _row(UserProjQueueStatus, r, **fixed, system_id=system_id,
+                 queue_id=ids['queue'][(system_id, r['queue_name'])],
+                 user_id=ids['user'][(r['username'],)],
+                 project_code_id=ids['project_code'][(r['project_code'],)])
+            for r in children['user_project_queues']
+        ],
+        'filesystems': [
+            _row(FilesystemStatus, r, **fixed, system_id=system_id,
+                 filesystem_id=ids['filesystem'][(r['filesystem_name'],)])
+            for r in children['filesystems']
+        ],
+    }
+
+    # Identical adjacent user/project/queue ticks extend their span.
+    upq_rows, _ = coalesce_user_proj_queue_rows(
+        session, system_id, rows['user_project_queues'], timestamp)
+    kept = {id(row) for row in upq_rows}
+    children['user_project_queues'] = [
+        r for r, row in zip(children['user_project_queues'], rows['user_project_queues'])
+        if id(row) in kept
+    ]
+    rows['user_project_queues'] = upq_rows
+
+    for name, child_rows in rows.items():
+        if child_rows:
+            session.execute(insert(CHILD_MODELS[name].__table__), child_rows)
+    if upq_rows:
+        fill_staged_span_ids(session, system_id, timestamp)
+
+    snapshot = SimpleNamespace(status_id=status_id, **parent)
+    for name, child_rows in rows.items():
+        setattr(snapshot, name, [SimpleNamespace(**{**r, **row})
+                                 for r, row in zip(children[name], child_rows)])
+    return snapshot
+
+
+def snapshot_child_ids(session: Session, system_name: str, status_id: int,
+                       id_mappers: Dict[str, Tuple[str, str]]) -> Dict[str, List[int]]:
+    """Child row ids of one snapshot, in insert order.
+
+    ``id_mappers`` is the status API's ``{result_key: (child list, id
+    column)}``. executemany can't hand back generated keys on MySQL, so the
+    ids are read back by parent FK.
+    """
+    parent_fk = f'{system_name}_status_id'
+    out = {}
+    for result_key, (list_name, id_attr) in id_mappers.items():
+        child = CHILD_MODELS[list_name]
+        pk = getattr(child, id_attr)
+        out[result_key] = list(session.execute(
+            select(pk).where(getattr(child, parent_fk) == status_id).order_by(pk)
+        ).scalars())
+    return out
@@ -0,0 +1,298 @@
+"""Name → id cache for the system_status lookup tables.
+
+The snapshot tables key into six small dimension tables (``systems``,
+``queues``, ``filesystems``, ``login_nodes``, ``status_users``,
+``project_codes``) whose rows are created once and then only ever read.
+``dimension_cache`` maps their natural keys to ids for the whole process
+so that neither ingest nor the readers query them per request:
+
+* the bulk ingest path (``bulk_ingest``) resolves every name in a tick
+  with ``resolve_many``, which inserts missing rows;
+* the ORM ingest path's ``before_flush`` resolution (``lookups``) and the
+  user/project/queue coalescer use ``cached`` hits and fall back to their
+  own lookups on a miss;
+* readers (``user_proj_queues._resolve_queue_id`` / ``_resolve_system_id``,
+  the history readers) use ``get``, which never inserts.
+
+With a Redis client (``configure``), ids are also shared between workers
+in one hash per dimension; without one each process keeps its own.
+
+An id only reaches the shared cache once it is known to be committed.
+Ids this session inserted — through ``resolve_many``, or as new lookup
+objects flushed by the ORM path — and any ids it reads from a dimension
+it has written to in the open transaction, are staged in
+``session.info`` and published by ``after_commit``. Any rollback drops
+the staged ids, so a rolled-back lookup row never leaves a dangling id
+behind. Concurrent inserts of the same name (two workers, one new queue)
+are settled by the unique constraints: the loser's INSERT fails inside a
+SAVEPOINT and it reads the winner's row instead.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event, insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from system_status.models.lookups import (
+    Filesystem,
+    LoginNodeDef,
+    ProjectCodeDef,
+    QueueDef,
+    System,
+    UserDef,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# dimension → (model, primary key column, natural-key columns)
+DIMENSIONS = {
+    'system': (System, 'system_id', ('name',)),
+    'queue': (QueueDef, 'queue_id', ('system_id', 'name')),
+    'filesystem': (Filesystem, 'filesystem_id', ('name',)),
+    'login_node': (LoginNodeDef, 'login_node_def_id', ('system_id', 'name')),
+    'user': (UserDef, 'user_id', ('username',)),
+    'project_code': (ProjectCodeDef, 'project_code_id', ('project_code',)),
+}
+_DIMENSION_BY_MODEL = {model: name for name, (model, _, _) in DIMENSIONS.items()}
+
+# session.info keys: ids awaiting commit, and dimensions written this transaction.
+_STAGED = 'dimension_cache_staged'
+_DIRTY = 'dimension_cache_dirty'
+
+
+def natural_key(obj) -> Tuple[str, tuple]:
+    """``(dimension, natural key)`` of a lookup-table instance."""
+    dimension = _DIMENSION_BY_MODEL[type(obj)]
+    return dimension, tuple(getattr(obj, c) for c in DIMENSIONS[dimension][2])
+
+
+class DimensionCache:
+    """Thread-safe ``(dimension, natural key) → id`` map over ``DIMENSIONS``.
+
+    Natural keys are tuples in the column order given in ``DIMENSIONS``,
+    e.g. ``('derecho',)`` for a system or ``(system_id, 'main')`` for a
+    queue. Only existing rows are cached; a miss is never remembered.
+    """
+
+    KEY_PREFIX = 'status_dim:'
+
+    def __init__(self, client=None, ttl: int = 86400):
+        self._client = client
+        self.ttl = ttl
+        self._ids: Dict[Tuple[str, tuple], int] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, client=None, ttl: Optional[int] = None) -> None:
+        """Share ids through ``client`` (a redis client, or None for
+        per-process only); Redis entries expire ``ttl`` seconds after the
+        last new id in their dimension."""
+        self._client = client
+        if ttl is not None:
+            self.ttl = ttl
+        with self._lock:
+            self._ids.clear()
+
+    # ── Lookups ─────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _field(key: tuple) -> str:
+        return '\x1f'.join(str(part) for part in key)
+
+    def _cached_many(self, session: Session, dimension: str,
+                     keys: Iterable[tuple]) -> Dict[tuple, int]:
+        staged = session.info.get(_STAGED, {})
+        found: Dict[tuple, int] = {}
+        with self._lock:
+            for key in keys:
+                hit = staged.get((dimension, key), self._ids.get((dimension, key)))
+                if hit is not None:
+                    found[key] = hit
+        missing = [key for key in keys if key not in found]
+        if not missing or self._client is None:
+            return found
+        try:
+            values = self._client.hmget(self.KEY_PREFIX + dimension,
+                                        [self._field(k) for k in missing])
+        except Exception as exc:
+            logger.warning('Dimension cache: Redis read failed (%s); querying the database', exc)
+            return found
+        shared = {key: int(v) for key, v in zip(missing, values) if v is not None}
+        with self._lock:
+            for key, value in shared.items():
+                self._ids[(dimension, key)] = value
+        found.update(shared)
+        return found
+
+    def cached(self, session: Session, dimension: str, key: tuple) -> Optional[int]:
+        """The id for ``key`` if the cache holds it; never queries the database."""
+        return self._cached_many(session, dimension, [key]).get(key)
+
+    def _select(self, session: Session, dimension: str, keys: list,
+                locking: bool = False) -> Dict[tuple, int]:
+        model, pk, columns = DIMENSIONS[dimension]
+        cols = [getattr(model, c) for c in columns]
+        match = (cols[0].in_([k[0] for k in keys]) if len(cols) == 1
+                 else tuple_(*cols).in_(keys))
+        stmt = select(getattr(model, pk), *cols).where(match)
+        if locking:
+            # A locking read sees rows committed after this transaction's
+            # snapshot (InnoDB REPEATABLE READ), i.e. the race winner's.
+            stmt = stmt.with_for_update(read=True)
+        return {tuple(row[1:]): row[0] for row in session.execute(stmt)}
+
+    def get(self, session: Session, dimension: str, key: tuple) -> Optional[int]:
+        """The id for ``key``, or None if no such row exists. Never inserts."""
+        hit = self.cached(session, dimension, key)
+        if hit is not None:
+            return hit
+        found = self._select(session, dimension, [key])
+        self.learn(session, dimension, found)
+        return found.get(key)
+
+    def resolve_many(
+        self,
+        session: Session,
+        dimension: str,
+        keys: Iterable[tuple],
+        extra: Optional[Dict[tuple, dict]] = None,
+    ) -> Dict[tuple, int]:
+        """Ids for every natural key in ``keys``, creating missing rows.
+
+        Cache misses are looked up with one ``IN`` query; keys still
+        missing are inserted through ``session``, each in a SAVEPOINT, so
+        they commit or roll back with the caller's transaction. ``extra``
+        supplies non-key column values for rows that have to be created,
+        e.g. a login node's ``node_type``.
+        """
+        model, pk, columns = DIMENSIONS[dimension]
+        wanted = list(dict.fromkeys(keys))
+        found = self._cached_many(session, dimension, wanted)
+        missing = [key for key in wanted if key not in found]
+        if not missing:
+            return found
+
+        selected = self._select(session, dimension, missing)
+        self.learn(session, dimension, selected)
+        found.update(selected)
+
+        created: Dict[tuple, int] = {}
+        for key in missing:
+            if key in found:
+                continue
+            values = dict(zip(columns, key), **(extra or {}).get(key, {}))
+            try:
+                with session.begin_nested():
+                    created[key] = session.execute(
+                        insert(model.__table__).values(**values)
+                    ).inserted_primary_key[0]
+            except IntegrityError:
+                # Another worker inserted the same name since our SELECT.
+                created[key] = self._select(session, dimension, [key], locking=True)[key]
+        if created:
+            session.info.setdefault(_DIRTY, set()).add(dimension)
+            self.learn(session, dimension, created)
+            found.update(created)
+        return found
+
+    def resolve(self, session: Session, dimension: str, key: tuple,
+                extra: Optional[dict] = None) -> int:
+        """Id for one natural key; see ``resolve_many``."""
+        return self.resolve_many(session, dimension, [key],
+                                 {key: extra} if extra else None)[key]
+
+    # ── Bookkeeping ─────────────────────────────────────────────────────
+
+    def learn(self, session: Session, dimension: str, ids: Dict[tuple, int]) -> None:
+        """Record ids ``session`` has read or written.
+
+        Published at once if they are necessarily committed, otherwise
+        staged until ``session`` commits (see the module docstring).
+        """
+        if not ids:
+            return
+        if dimension in session.info.get(_DIRTY, ()):
+            staged = session.info.setdefault(_STAGED, {})
+            for key, value in ids.items():
+                staged[(dimension, key)] = value
+        else:
+            self.publish({(dimension, key): value for key, value in ids.items()})
+
+    def publish(self, ids: Dict[Tuple[str, tuple], int]) -> None:
+        """Make committed ids visible to every session (and worker)."""
+        if not ids:
+            return
+        with self._lock:
+            self._ids.update(ids)
+        if self._client is None:
+            return
+        by_dimension: Dict[str, Dict[str, int]] = {}
+        for (dimension, key), value in ids.items():
+            by_dimension.setdefault(dimension, {})[self._field(key)] = value
+        try:
+            pipe = self._client.pipeline()
+            for dimension, mapping in by_dimension.items():
+                pipe.hset(self.KEY_PREFIX + dimension, mapping=mapping)
+                pipe.expire(self.KEY_PREFIX + dimension, self.ttl)
+            pipe.execute()
+        except Exception as exc:
+            logger.warning('Dimension cache: Redis write failed (%s)', exc)
+
+    def clear(self) -> None:
+        """Forget every cached id (after the lookup tables are wiped)."""
+        with self._lock:
+            self._ids.clear()
+        if self._client is not None:
+            try:
+                self._client.delete(*(self.KEY_PREFIX + d for d in DIMENSIONS))
+            except Exception as exc:
+                logger.warning('Dimension cache: Redis clear failed (%s)', exc)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+#: Process-wide instance shared by every request.
+dimension_cache = DimensionCache()
+
+
+# ---------------------------------------------------------------------------
+# Session hooks: stage, publish, discard
+# ---------------------------------------------------------------------------
+
+@event.listens_for(Session, 'after_flush')
+def _stage_flushed_lookups(session, flush_context):
+    """Lookup rows the ORM path just inserted are staged until commit."""
+    for obj in session.new:
+        if type(obj) in _DIMENSION_BY_MODEL:
+            dimension, key = natural_key(obj)
+            session.info.setdefault(_DIRTY, set()).add(dimension)
+            pk = DIMENSIONS[dimension][1]
+            session.info.setdefault(_STAGED, {})[(dimension, key)] = getattr(obj, pk)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_staged(session):
+    staged = session.info.pop(_STAGED, None)
+    session.info.pop(_DIRTY, None)
+    if staged:
+        dimension_cache.publish(staged)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_staged(session, previous_transaction):
+    # Any rollback — including a SAVEPOINT's — may have undone a staged
+    # insert; dropping them all only costs a re-read.
+    session.info.pop(_STAGED, None)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _end_transaction(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_STAGED, None)
+        session.info.pop(_DIRTY, None)
@@ -0,0 +1,496 @@
+"""
+Resolution-aware history series for the status dashboard's drill-down pages.
+
+The partition, queue and Casper node-type history pages plot a handful of
+metrics over windows from hours to a year. Loading every 5-minute snapshot
+for that is wasteful twice over: a year is ~100k rows (and, through the ORM,
+every ``DerechoStatus`` eager-loads its queues, login nodes and filesystems),
+and the chart is a few hundred pixels wide. Three tiers serve the series
+instead:
+
+  * ``raw``  — the snapshot columns themselves, streamed into NumPy arrays
+    by the column loaders in ``system_status.queries.columns`` (no ORM
+    entities).
+  * ``hour`` / ``day`` — bucket means from ``status_history_rollup``, which
+    ingest maintains incrementally (:func:`fold_snapshot`): each tick adds
+    its readings to the current hour and day buckets as ``[sum, count]``
+    pairs, so a bucket's mean is exact however many ticks it has seen.
+
+:func:`pick_resolution` chooses the finest tier whose point count stays
+within ``_OVERSAMPLE`` times the caller's ``max_points``, and the result is
+then thinned to ``max_points`` with largest-triangle-three-buckets
+(:func:`lttb`), which keeps the spikes and dips a plain stride would drop.
+
+Rollups only cover what was ingested (or rebuilt, see
+:func:`rebuild_rollups` / ``scripts/rebuild_status_rollups.py``) after the
+table existed. The part of a window before the first rollup bucket is
+aggregated from raw rows on the fly, so a chart is never silently
+truncated — it is just slower until the backfill runs.
+
+Everything below the getters works on :class:`SeriesColumns`; the getters
+convert to list-of-dicts unless asked for the arrays.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.orm import Session
+
+from system_status.models import (
+    CasperNodeTypeStatus,
+    CasperStatus,
+    DerechoStatus,
+    QueueDef,
+    QueueStatus,
+    StatusHistoryRollup,
+    System,
+)
+
+from ..timeutil import utcnow_naive
+from .columns import SeriesColumns, load_columns
+from .lookups import get_or_create_system
+
+
+RAW_INTERVAL = timedelta(minutes=5)
+GRAINS = {'hour': timedelta(hours=1), 'day': timedelta(days=1)}
+RESOLUTIONS = ('raw', *GRAINS)
+
+# NumPy units the grains floor to.
+_GRAIN_UNITS = {'hour': 'h', 'day': 'D'}
+
+# A tier may return up to this many times max_points before the next
+# coarser one is used; LTTB then thins it. Raw at max_points=1000 thus
+# covers ~2 weeks, hourly ~5.5 months.
+_OVERSAMPLE = 4
+
+PARTITION_METRICS = (
+    'nodes_total', 'nodes_available', 'nodes_down', 'nodes_allocated',
+    'utilization_percent', 'memory_utilization_percent',
+)
+NODE_TYPE_METRICS = PARTITION_METRICS
+QUEUE_METRICS = (
+    'running_jobs', 'pending_jobs', 'held_jobs', 'active_users',
+    'cores_allocated', 'cores_pending', 'gpus_allocated', 'gpus_pending',
+)
+_FAMILY_METRICS = {
+    'partition': PARTITION_METRICS,
+    'node_type': NODE_TYPE_METRICS,
+    'queue': QUEUE_METRICS,
+}
+
+_SYSTEM_MODELS = {'derecho': DerechoStatus, 'casper': CasperStatus}
+_PARTITIONS = {'derecho': ('cpu', 'gpu'), 'casper': ('cpu', 'gpu', 'viz')}
+
+
+# ---------------------------------------------------------------------------
+# Metric extraction — one snapshot at a time, for ingest
+# ---------------------------------------------------------------------------
+
+def partition_metrics(record: Any, partition: str) -> Dict[str, Any]:
+    """Chart metrics for one partition of a system snapshot."""
+    nodes_total = getattr(record, f'{partition}_nodes_total', 0)
+    nodes_available = getattr(record, f'{partition}_nodes_available', 0)
+    nodes_down = getattr(record, f'{partition}_nodes_down', 0)
+    # Partition-specific utilization for cpu/gpu; none recorded for viz.
+    if partition in ('cpu', 'gpu'):
+        utilization_percent = getattr(record, f'{partition}_utilization_percent')
+    else:
+        utilization_percent = None
+    return {
+        'nodes_total': nodes_total,
+        'nodes_available': nodes_available,
+        'nodes_down': nodes_down,
+        'nodes_allocated': nodes_total - nodes_available - nodes_down,
+        'utilization_percent': utilization_percent,
+        'memory_utilization_percent': record.memory_utilization_percent,
+    }
+
+
+def _attr_metrics(record: Any, names: Sequence[str]) -> Dict[str, Any]:
+    return {name: getattr(record, name) for name in names}
+
+
+def snapshot_series(system: str, status: Any) -> Iterable[Tuple[str, str, Dict[str, Any]]]:
+    """Yield ``(family, series, metrics)`` for every history series one
+    ``DerechoStatus`` / ``CasperStatus`` tick contributes to."""
+    for partition in _PARTITIONS.get(system, ()):
+        yield 'partition', partition, partition_metrics(status, partition)
+    for queue in getattr(status, 'queues', None) or ():
+        if queue.queue_name:
+            yield 'queue', queue.queue_name, _attr_metrics(queue, QUEUE_METRICS)
+    for node_type in getattr(status, 'node_types', None) or ():
+        yield 'node_type', node_type.node_type, _attr_metrics(node_type, NODE_TYPE_METRICS)
+
+
+# ---------------------------------------------------------------------------
+# Buckets
+# ---------------------------------------------------------------------------
+
+def bucket_start(ts: datetime, grain: str) -> datetime:
+    """Floor *ts* to the start of its ``'hour'`` or ``'day'`` bucket."""
+    if grain == 'day':
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _fold(acc: Optional[Dict[str, List[float]]],
+          metrics: Dict[str, Any]) -> Dict[str, List[float]]:
+    """Return a new ``{metric: [sum, count]}`` with *metrics* added (NULLs skipped)."""
+    out = {k: list(v) for k, v in (acc or {}).items()}
+    for name, value in metrics.items():
+        if value is None:
+            continue
+        pair = out.setdefault(name, [0, 0])
+        pair[0] += value
+        pair[1] += 1
+    return out
+
+
+def _mean(acc: Dict[str, List[float]], name: str) -> Optional[float]:
+    total, count = acc.get(name) or (0, 0)
+    return total / count if count else None
+
+
+def bucket_sums(series: SeriesColumns, grain: str):
+    """Per-bucket ``(starts, samples, {metric: (sums, counts)})`` of *series*.
+
+    ``counts`` exclude NaN readings, matching :func:`_fold`.
+    """
+    keys = series.timestamps.astype(f'datetime64[{_GRAIN_UNITS[grain]}]')
+    starts, inverse = np.unique(keys, return_inverse=True)
+    n = len(starts)
+    samples = np.bincount(inverse, minlength=n)
+    sums = {}
+    for name, arr in series.columns.items():
+        ok = ~np.isnan(arr)
+        sums[name] = (np.bincount(inverse, weights=np.where(ok, arr, 0.0), minlength=n),
+                      np.bincount(inverse, weights=ok, minlength=n))
+    return starts.astype('datetime64[us]'), samples, sums
+
+
+def bucketize(series: SeriesColumns, grain: str) -> SeriesColumns:
+    """Aggregate raw columns into per-bucket means, in time order."""
+    starts, _, sums = bucket_sums(series, grain)
+    with np.errstate(invalid='ignore'):
+        # 0 / 0 → NaN: a bucket whose readings were all NULL stays NULL.
+        means = {name: total / count for name, (total, count) in sums.items()}
+    return SeriesColumns(starts, means)
+
+
+def pick_resolution(start: datetime, end: datetime, max_points: Optional[int]) -> str:
+    """Finest tier whose point count over [start, end] fits the budget.
+
+    ``max_points=None`` means "no budget" → ``'raw'``.
+    """
+    if not max_points:
+        return 'raw'
+    budget = max_points * _OVERSAMPLE
+    span = end - start
+    if span / RAW_INTERVAL <= budget:
+        return 'raw'
+    if span / GRAINS['hour'] <= budget:
+        return 'hour'
+    return 'day'
+
+
+# ---------------------------------------------------------------------------
+# Downsampling
+# ---------------------------------------------------------------------------
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices largest-triangle-three-buckets keeps of the points (x, y).
+
+    Keeps the first and last points and, from each of ``threshold - 2``
+    equal-width buckets between them, the point forming the largest
+    triangle with the previously kept point and the next bucket's centroid.
+    NaN in *y* counts as 0. Returns every index when *threshold* already
+    fits.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    y = np.nan_to_num(y.astype(np.float64))
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    every = (n - 2) / (threshold - 2)
+    edges = np.minimum((np.arange(threshold) * every).astype(np.intp) + 1, n)
+
+    out = np.empty(threshold, dtype=np.intp)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = edges[i + 1], edges[i + 2]
+        avg_x = (cx[nhi] - cx[nlo]) / (nhi - nlo)
+        avg_y = (cy[nhi] - cy[nlo]) / (nhi - nlo)
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a])
+                      - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def lttb(series: SeriesColumns, threshold: int, y_key: str) -> SeriesColumns:
+    """LTTB-downsample *series* to *threshold* points on its ``y_key`` column."""
+    if threshold >= len(series):
+        return series
+    x = (series.timestamps - series.timestamps[0]).astype('timedelta64[us]')
+    x = x.astype(np.int64) / 1e6
+    return series.take(lttb_indices(x, series[y_key], threshold))
+
+
+# ---------------------------------------------------------------------------
+# Raw readers — column selects into arrays, never ORM entities
+# ---------------------------------------------------------------------------
+
+def raw_partition_columns(session: Session, system: str, partition: str,
+                          start: datetime, end: datetime) -> SeriesColumns:
+    model = _SYSTEM_MODELS.get(system)
+    if model is None:
+        return SeriesColumns.empty(PARTITION_METRICS)
+    wanted = {
+        'nodes_total': f'{partition}_nodes_total',
+        'nodes_available': f'{partition}_nodes_available',
+        'nodes_down': f'{partition}_nodes_down',
+        'memory_utilization_percent': 'memory_utilization_percent',
+    }
+    # Partition-specific utilization for cpu/gpu; none recorded for viz.
+    if partition in ('cpu', 'gpu'):
+        wanted['utilization_percent'] = f'{partition}_utilization_percent'
+    present = {k: attr for k, attr in wanted.items() if hasattr(model, attr)}
+    loaded = load_columns(
+        session,
+        select(model.timestamp, *(getattr(model, attr) for attr in present.values()))
+        .where(model.timestamp >= start, model.timestamp <= end)
+        .order_by(model.timestamp),
+        list(present),
+    )
+    n = len(loaded)
+    # A partition the system does not have reads as 0 nodes, as it always has.
+    nodes = {k: loaded.columns.get(k, np.zeros(n))
+             for k in ('nodes_total', 'nodes_available', 'nodes_down')}
+    return SeriesColumns(loaded.timestamps, {
+        **nodes,
+        'nodes_allocated': nodes['nodes_total'] - nodes['nodes_available'] - nodes['nodes_down'],
+        'utilization_percent': loaded.columns.get('utilization_percent', np.full(n, np.nan)),
+        'memory_utilization_percent': loaded['memory_utilization_percent'],
+    })
+
+
+def raw_queue_columns(session: Session, system: str, queue_name: str,
+                      start: datetime, end: datetime) -> SeriesColumns:
+    return load_columns(
+        session,
+        select(QueueStatus.timestamp,
+               *(getattr(QueueStatus, n) for n in QUEUE_METRICS))
+        .join(System, QueueStatus.system_id == System.system_id)
+        .join(QueueDef, QueueStatus.queue_id == QueueDef.queue_id)
+        .where(
+            QueueDef.name == queue_name,
+            System.name == system,
+            QueueStatus.timestamp >= start,
+            QueueStatus.timestamp <= end,
+        )
+        .order_by(QueueStatus.timestamp),
+        QUEUE_METRICS,
+    )
+
+
+def raw_node_type_columns(session: Session, node_type: str,
+                          start: datetime, end: datetime) -> SeriesColumns:
+    return load_columns(
+        session,
+        select(CasperNodeTypeStatus.timestamp,
+               *(getattr(CasperNodeTypeStatus, n) for n in NODE_TYPE_METRICS))
+        .where(
+            CasperNodeTypeStatus.node_type == node_type,
+            CasperNodeTypeStatus.timestamp >= start,
+            CasperNodeTypeStatus.timestamp <= end,
+        )
+        .order_by(CasperNodeTypeStatus.timestamp),
+        NODE_TYPE_METRICS,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Read side
+# ---------------------------------------------------------------------------
+
+RawReader = Callable[[datetime, datetime], SeriesColumns]
+
+
+def rollup_columns(session: Session, family: str, system: str, series: str,
+                   grain: str, start: datetime, end: datetime,
+                   raw_reader: RawReader) -> SeriesColumns:
+    """Bucket means for one series, with the uncovered head filled from raw.
+
+    Buckets are selected by their start, so the first one may begin before
+    *start* (up to one grain early).
+    """
+    names = _FAMILY_METRICS[family]
+    R = StatusHistoryRollup
+    buckets = session.execute(
+        select(R.bucket_start, R.metrics)
+        .join(System, R.system_id == System.system_id)
+        .where(
+            System.name == system,
+            R.family == family,
+            R.series == series,
+            R.grain == grain,
+            R.bucket_start >= bucket_start(start, grain),
+            R.bucket_start <= end,
+        )
+        .order_by(R.bucket_start)
+    ).all()
+    covered = SeriesColumns(
+        np.array([b.bucket_start for b in buckets], dtype='datetime64[us]'),
+        {n: np.array([_mean(b.metrics, n) for b in buckets], dtype=np.float64)
+         for n in names},
+    )
+
+    covered_from = buckets[0].bucket_start if buckets else None
+    if covered_from is not None and covered_from <= start:
+        return covered
+    raw = raw_reader(start, covered_from or end)
+    if covered_from is not None:
+        raw = raw.take(raw.timestamps < np.datetime64(covered_from, 'us'))
+    return SeriesColumns.concat([bucketize(raw, grain), covered], names)
+
+
+def series_history(session: Session, family: str, system: str, series: str,
+                   start: datetime, end: datetime, raw_reader: RawReader, *,
+                   resolution: str = 'raw', max_points: Optional[int] = None,
+                   y_key: str) -> SeriesColumns:
+    """One history series at *resolution*, LTTB-thinned to *max_points*.
+
+    ``resolution='auto'`` defers to :func:`pick_resolution`.
+    """
+    if resolution == 'auto':
+        resolution = pick_resolution(start, end, max_points)
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f'unknown history resolution {resolution!r}')
+
+    if resolution == 'raw':
+        columns = raw_reader(start, end)
+    else:
+        columns = rollup_columns(session, family, system, series, resolution,
+                                 start, end, raw_reader)
+    if max_points and len(columns) > max_points:
+        columns = lttb(columns, max_points, y_key)
+    return columns
+
+
+# ---------------------------------------------------------------------------
+# Write side
+# ---------------------------------------------------------------------------
+
+def fold_snapshot(session: Session, system: str, status: Any) -> int:
+    """Fold one ingested tick into its hour and day rollup buckets.
+
+    One SELECT for the tick's existing buckets, then in-place updates /
+    inserts through the session (flushed with the ingest's own commit).
+    Returns the number of bucket rows touched.
+    """
+    series = list(snapshot_series(system, status))
+    if not series:
+        return 0
+    system_row = get_or_create_system(session, system)
+    starts = {grain: bucket_start(status.timestamp, grain) for grain in GRAINS}
+
+    R = StatusHistoryRollup
+    existing = {
+        (r.family, r.series, r.grain): r
+        for r in session.query(R).filter(
+            R.system_id == system_row.system_id,
+            or_(*(and_(R.grain == g, R.bucket_start == b) for g, b in starts.items())),
+        )
+    }
+    for family, name, metrics in series:
+        for grain, start in starts.items():
+            row = existing.get((family, name, grain))
+            if row is None:
+                row = R(system_id=system_row.system_id, family=family, series=name,
+                        grain=grain, bucket_start=start, samples=0, metrics={})
+                session.add(row)
+                existing[(family, name, grain)] = row
+            # Reassign (not mutate) so the JSON column is marked dirty.
+            row.metrics = _fold(row.metrics, metrics)
+            row.samples += 1
+    return len(series) * len(starts)
+
+
+def rebuild_rollups(session: Session, system: str, start: datetime,
+                    end: datetime) -> int:
+    """Recompute every rollup bucket of *system* overlapping [start, end).
+
+    The range is widened to whole days so the hour and day tiers are
+    rebuilt from the same ticks, then clipped to the first whole day that
+    still has raw snapshots: buckets older than raw retention are the only
+    copy of that history and are left alone. Reads raw snapshots through
+    the column loaders, deletes the affected buckets and inserts fresh
+    ones; the caller commits. Returns the number of rows written.
+    """
+    model = _SYSTEM_MODELS.get(system)
+    if model is None:
+        return 0
+    earliest = session.execute(select(func.min(model.timestamp))).scalar()
+    if earliest is None:
+        return 0
+    first_day = bucket_start(earliest, 'day')
+    if earliest > first_day:
+        first_day += GRAINS['day']
+    start = max(bucket_start(start, 'day'), first_day)
+    end_day = bucket_start(end, 'day')
+    end = end_day if end == end_day else end_day + GRAINS['day']
+    if start >= end:
+        return 0
+    system_row = get_or_create_system(session, system)
+    # Raw readers are end-inclusive; the rebuilt range is half-open.
+    last = end - timedelta(microseconds=1)
+
+    sources: List[Tuple[str, str, SeriesColumns]] = [
+        ('partition', partition, raw_partition_columns(session, system, partition, start, last))
+        for partition in _PARTITIONS[system]
+    ]
+    queue_names = session.execute(
+        select(QueueDef.name).distinct()
+        .join(QueueStatus, QueueStatus.queue_id == QueueDef.queue_id)
+        .where(QueueStatus.system_id == system_row.system_id,
+               QueueStatus.timestamp >= start, QueueStatus.timestamp < end)
+    ).scalars().all()
+    sources += [('queue', name, raw_queue_columns(session, system, name, start, last))
+                for name in queue_names]
+    if system == 'casper':
+        node_types = session.execute(
+            select(CasperNodeTypeStatus.node_type).distinct()
+            .where(CasperNodeTypeStatus.timestamp >= start,
+                   CasperNodeTypeStatus.timestamp < end)
+        ).scalars().all()
+        sources += [('node_type', name, raw_node_type_columns(session, name, start, last))
+                    for name in node_types]
+
+    now = utcnow_naive()
+    values = []
+    for family, series, columns in sources:
+        for grain in GRAINS:
+            starts, samples, sums = bucket_sums(columns, grain)
+            for i, b in enumerate(starts.tolist()):
+                metrics = {name: [float(total[i]), int(count[i])]
+                           for name, (total, count) in sums.items() if count[i]}
+                values.append({
+                    'system_id': system_row.system_id, 'family': family,
+                    'series': series, 'grain': grain, 'bucket_start': b,
+                    'samples': int(samples[i]), 'metrics': metrics, 'updated_at': now,
+                })
+
+    R = StatusHistoryRollup
+    session.execute(delete(R).where(
+        R.system_id == system_row.system_id,
+        R.bucket_start >= start, R.bucket_start < end,
+    ))
+    if values:
+        session.execute(R.__table__.insert(), values)
+    return len(values)
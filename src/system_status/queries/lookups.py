@@ -13,6 +13,10 @@ This means the public construction surface of the snapshot models is
 **unchanged** by Phase 2 — the migration drops the text columns, but
 test code and ingest paths that pass ``system_name='derecho'`` keep
 working.
+
+Every helper here consults the process-wide ``dimension_cache`` first: a
+name it already knows becomes a persistent lookup instance without a
+query (see ``_from_cache``), and ids found by querying are fed back to it.
 """
 
 from __future__ import annotations
@@ -20,7 +24,7 @@ from __future__ import annotations
 from typing import Optional
 
 from sqlalchemy import event
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from system_status.models.lookups import (
     Filesystem,
@@ -31,6 +35,35 @@ from system_status.models.lookups import (
     UserDef,
 )
 
+from .dimensions import DIMENSIONS, dimension_cache, natural_key
+
+
+def _from_cache(session: Session, dimension: str, key: tuple, **attrs):
+    """The lookup row for a ``dimension_cache`` hit, without a query.
+
+    Returns the instance already in the identity map, or builds one from
+    the cached id plus ``attrs`` (the natural-key columns) and attaches it
+    as persistent; other columns load lazily if touched. None on a miss.
+    """
+    ident = dimension_cache.cached(session, dimension, key)
+    if ident is None:
+        return None
+    model, pk, _ = DIMENSIONS[dimension]
+    obj = session.identity_map.get(session.identity_key(model, ident))
+    if obj is None:
+        obj = model(**{pk: ident}, **attrs)
+        make_transient_to_detached(obj)
+        session.add(obj)
+    return obj
+
+
+def _learn(session: Session, obj) -> None:
+    """Feed a queried lookup row's id back to ``dimension_cache``."""
+    dimension, key = natural_key(obj)
+    ident = getattr(obj, DIMENSIONS[dimension][1])
+    if ident is not None:
+        dimension_cache.learn(session, dimension, {key: ident})
+
 
 # ---------------------------------------------------------------------------
 # get_or_create helpers — used by the ingest path's _handle_reservations
@@ -40,15 +73,24 @@ from system_status.models.lookups import (
 # ---------------------------------------------------------------------------
 
 def get_or_create_system(session: Session, name: str) -> System:
+    obj = _from_cache(session, 'system', (name,), name=name)
+    if obj is not None:
+        return obj
     obj = session.query(System).filter(System.name == name).one_or_none()
     if obj is None:
         obj = System(name=name)
         session.add(obj)
         session.flush()
+    else:
+        _learn(session, obj)
     return obj
 
 
 def get_or_create_queue(session: Session, system: System, name: str) -> QueueDef:
+    obj = _from_cache(session, 'queue', (system.system_id, name),
+                      system_id=system.system_id, name=name)
+    if obj is not None:
+        return obj
     obj = session.query(QueueDef).filter(
         QueueDef.system_id == system.system_id, QueueDef.name == name
     ).one_or_none()
@@ -56,6 +98,8 @@ def get_or_create_queue(session: Session, system: System, name: str) -> QueueDef
         obj = QueueDef(system_id=system.system_id, name=name)
         session.add(obj)
         session.flush()
+    else:
+        _learn(session, obj)
     return obj
 
 
@@ -100,17 +144,26 @@ def update_queue_definitions(session: Session, system_name: str,
 
 
 def get_or_create_filesystem(session: Session, name: str) -> Filesystem:
+    obj = _from_cache(session, 'filesystem', (name,), name=name)
+    if obj is not None:
+        return obj
     obj = session.query(Filesystem).filter(Filesystem.name == name).one_or_none()
     if obj is None:
         obj = Filesystem(name=name)
         session.add(obj)
         session.flush()
+    else:
+        _learn(session, obj)
     return obj
 
 
 def get_or_create_login_node_def(
     session: Session, system: System, name: str, node_type: str
 ) -> LoginNodeDef:
+    obj = _from_cache(session, 'login_node', (system.system_id, name),
+                      system_id=system.system_id, name=name)
+    if obj is not None:
+        return obj
     obj = session.query(LoginNodeDef).filter(
         LoginNodeDef.system_id == system.system_id, LoginNodeDef.name == name
     ).one_or_none()
@@ -118,19 +171,29 @@ def get_or_create_login_node_def(
         obj = LoginNodeDef(system_id=system.system_id, name=name, node_type=node_type)
         session.add(obj)
         session.flush()
+    else:
+        _learn(session, obj)
     return obj
 
 
 def get_or_create_user(session: Session, username: str) -> UserDef:
+    obj = _from_cache(session, 'user', (username,), username=username)
+    if obj is not None:
+        return obj
     obj = session.query(UserDef).filter(UserDef.username == username).one_or_none()
     if obj is None:
         obj = UserDef(username=username)
         session.add(obj)
         session.flush()
+    else:
+        _learn(session, obj)
     return obj
 
 
 def get_or_create_project_code(session: Session, project_code: str) -> ProjectCodeDef:
+    obj = _from_cache(session, 'project_code', (project_code,), project_code=project_code)
+    if obj is not None:
+        return obj
     obj = session.query(ProjectCodeDef).filter(
         ProjectCodeDef.project_code == project_code
     ).one_or_none()
@@ -138,6 +201,8 @@ def get_or_create_project_code(session: Session, project_code: str) -> ProjectCo
         obj = ProjectCodeDef(project_code=project_code)
         session.add(obj)
         session.flush()
+    else:
+        _learn(session, obj)
     return obj
 
 
@@ -186,10 +251,14 @@ def _find_in_session(session: Session, cls, **filters):
 def _ensure_system(session: Session, cache: dict, name: str) -> System:
     if name in cache:
         return cache[name]
-    obj = _find_in_session(session, System, name=name)
+    obj = _from_cache(session, 'system', (name,), name=name)
     if obj is None:
-        obj = System(name=name)
-        session.add(obj)
+        obj = _find_in_session(session, System, name=name)
+        if obj is None:
+            obj = System(name=name)
+            session.add(obj)
+        else:
+            _learn(session, obj)
     cache[name] = obj
     return obj
 
@@ -198,17 +267,23 @@ def _ensure_queue(session: Session, cache: dict, system: System, name: str) -> Q
     key = (id(system), name)
     if key in cache:
         return cache[key]
+    system_id = getattr(system, "system_id", None)
     obj = None
+    if system_id is not None:
+        obj = _from_cache(session, 'queue', (system_id, name), system_id=system_id, name=name)
     # Pending matches first.
-    for o in session.new:
-        if isinstance(o, QueueDef) and o.name == name and o.system is system:
-            obj = o
-            break
+    if obj is None:
+        for o in session.new:
+            if isinstance(o, QueueDef) and o.name == name and o.system is system:
+                obj = o
+                break
     # Fall through to DB if `system` is already-flushed (has id).
-    if obj is None and getattr(system, "system_id", None) is not None:
+    if obj is None and system_id is not None:
         obj = session.query(QueueDef).filter(
-            QueueDef.system_id == system.system_id, QueueDef.name == name
+            QueueDef.system_id == system_id, QueueDef.name == name
         ).first()
+        if obj is not None:
+            _learn(session, obj)
     if obj is None:
         obj = QueueDef(system=system, name=name)
         session.add(obj)
@@ -219,10 +294,14 @@ def _ensure_queue(session: Session, cache: dict, system: System, name: str) -> Q
 def _ensure_filesystem(session: Session, cache: dict, name: str) -> Filesystem:
     if name in cache:
         return cache[name]
-    obj = _find_in_session(session, Filesystem, name=name)
+    obj = _from_cache(session, 'filesystem', (name,), name=name)
     if obj is None:
-        obj = Filesystem(name=name)
-        session.add(obj)
+        obj = _find_in_session(session, Filesystem, name=name)
+        if obj is None:
+            obj = Filesystem(name=name)
+            session.add(obj)
+        else:
+            _learn(session, obj)
     cache[name] = obj
     return obj
 
@@ -233,15 +312,22 @@ def _ensure_login_node_def(
     key = (id(system), name)
     if key in cache:
         return cache[key]
+    system_id = getattr(system, "system_id", None)
     obj = None
-    for o in session.new:
-        if isinstance(o, LoginNodeDef) and o.name == name and o.system is system:
-            obj = o
-            break
-    if obj is None and getattr(system, "system_id", None) is not None:
+    if system_id is not None:
+        obj = _from_cache(session, 'login_node', (system_id, name),
+                          system_id=system_id, name=name)
+    if obj is None:
+        for o in session.new:
+            if isinstance(o, LoginNodeDef) and o.name == name and o.system is system:
+                obj = o
+                break
+    if obj is None and system_id is not None:
         obj = session.query(LoginNodeDef).filter(
-            LoginNodeDef.system_id == system.system_id, LoginNodeDef.name == name
+            LoginNodeDef.system_id == system_id, LoginNodeDef.name == name
         ).first()
+        if obj is not None:
+            _learn(session, obj)
     if obj is None:
         obj = LoginNodeDef(system=system, name=name, node_type=node_type)
         session.add(obj)
@@ -252,10 +338,14 @@ def _ensure_login_node_def(
 def _ensure_user(session: Session, cache: dict, username: str) -> UserDef:
     if username in cache:
         return cache[username]
-    obj = _find_in_session(session, UserDef, username=username)
+    obj = _from_cache(session, 'user', (username,), username=username)
     if obj is None:
-        obj = UserDef(username=username)
-        session.add(obj)
+        obj = _find_in_session(session, UserDef, username=username)
+        if obj is None:
+            obj = UserDef(username=username)
+            session.add(obj)
+        else:
+            _learn(session, obj)
     cache[username] = obj
     return obj
 
@@ -263,10 +353,14 @@ def _ensure_user(session: Session, cache: dict, username: str) -> UserDef:
 def _ensure_project_code(session: Session, cache: dict, project_code: str) -> ProjectCodeDef:
     if project_code in cache:
         return cache[project_code]
-    obj = _find_in_session(session, ProjectCodeDef, project_code=project_code)
+    obj = _from_cache(session, 'project_code', (project_code,), project_code=project_code)
     if obj is None:
-        obj = ProjectCodeDef(project_code=project_code)
-        session.add(obj)
+        obj = _find_in_session(session, ProjectCodeDef, project_code=project_code)
+        if obj is None:
+            obj = ProjectCodeDef(project_code=project_code)
+            session.add(obj)
+        else:
+            _learn(session, obj)
     cache[project_code] = obj
     return obj
 
@@ -16,20 +16,36 @@ The coalescer mutates ``parent_status.user_project_queues`` in place
 *before* the parent is added to the session, so detached duplicates
 never enter SQLAlchemy's unit-of-work — no ``cascade='all,
 delete-orphan'`` surgery required.
+
+``coalesce_user_proj_queue_rows`` makes the same decision for the plain
+insert dicts of the bulk ingest path (``bulk_ingest``).
+
+The previous tick's active set comes from ``span_index`` — each tick's
+spans, kept (in Redis when configured, else per worker) once its
+transaction commits. A held index is trusted after one indexed probe for
+spans newer than it; it is rebuilt from the table only on a cold start,
+after a gap, or when another writer got there first. Extended spans are
+bumped with one ``UPDATE ... WHERE id IN``, so a steady-state tick costs
+SQL in proportion to the rows that changed, not the active set.
 """
 
 from __future__ import annotations
 
+import json
+import logging
+import threading
+import zlib
 from datetime import datetime, timedelta
-from typing import Dict, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from sqlalchemy import func, select
+from sqlalchemy import event, func, inspect, select, update
 from sqlalchemy.orm import Session
 
 from system_status.models import UserProjQueueStatus
 
 from .lookups import resolve_user_proj_queue_pending
 
+logger = logging.getLogger(__name__)
 
 # A `MAX_SPAN_GAP`-or-greater jump between the previous tick's `last_seen`
 # and the incoming `T_new` is treated as a collector outage: spans don't
@@ -54,10 +70,243 @@ _METRIC_FIELDS: Tuple[str, ...] = (
 )
 
 
+SpanKey = Tuple[int, int, int]              # (user_id, project_code_id, queue_id)
+Spans = Dict[SpanKey, Tuple[int, Tuple[int, ...]]]   # → (row_id, metric_tuple)
+
+# session.info key: {system_id: (tick, spans)} awaiting commit. Row ids of
+# spans inserted this tick are their ORM objects (or None) until then.
+_STAGED = 'span_index_staged'
+
+
 def _metric_tuple(obj) -> Tuple[int, ...]:
     return tuple(int(getattr(obj, f) or 0) for f in _METRIC_FIELDS)
 
 
+def _row_metric_tuple(row: dict) -> Tuple[int, ...]:
+    return tuple(int(row[f] or 0) for f in _METRIC_FIELDS)
+
+
+class ActiveSpanIndex:
+    """The last committed tick's span set per system: ``(tick, spans)``.
+
+    Backed by Redis when a client is given, so whichever gunicorn worker
+    takes the next tick starts from it; otherwise a per-process dict
+    (a tick on another worker then costs one rebuild). Entries outlive a
+    ``MAX_SPAN_GAP`` to no purpose, so that is their lifetime.
+    """
+
+    KEY_PREFIX = 'status_spans:'
+
+    def __init__(self, client=None):
+        self._client = client
+        self._local: Dict[int, Tuple[datetime, Spans]] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, client=None) -> None:
+        self._client = client
+        with self._lock:
+            self._local.clear()
+
+    def get(self, system_id: int) -> Optional[Tuple[datetime, Spans]]:
+        if self._client is None:
+            with self._lock:
+                return self._local.get(system_id)
+        try:
+            raw = self._client.get(f'{self.KEY_PREFIX}{system_id}')
+        except Exception as exc:
+            logger.warning('Span index: Redis read failed (%s); rebuilding', exc)
+            return None
+        if raw is None:
+            return None
+        stored = json.loads(zlib.decompress(raw))
+        return (datetime.fromisoformat(stored['tick']),
+                {(u, p, q): (row_id, tuple(m)) for u, p, q, row_id, m in stored['spans']})
+
+    def put(self, system_id: int, tick: datetime, spans: Spans) -> None:
+        if self._client is None:
+            with self._lock:
+                self._local[system_id] = (tick, spans)
+            return
+        raw = zlib.compress(json.dumps(
+            {'tick': tick.isoformat(),
+             'spans': [[*key, row_id, m] for key, (row_id, m) in spans.items()]},
+            separators=(',', ':')).encode())
+        try:
+            self._client.set(f'{self.KEY_PREFIX}{system_id}', raw,
+                             ex=int(MAX_SPAN_GAP.total_seconds()))
+        except Exception as exc:
+            logger.warning('Span index: Redis write failed (%s)', exc)
+            self.clear(system_id)
+
+    def clear(self, system_id: Optional[int] = None) -> None:
+        """Forget the held index(es); the next tick rebuilds from the table."""
+        with self._lock:
+            if system_id is None:
+                self._local.clear()
+            else:
+                self._local.pop(system_id, None)
+        if self._client is None:
+            return
+        try:
+            if system_id is None:
+                keys = list(self._client.scan_iter(match=self.KEY_PREFIX + '*'))
+                if keys:
+                    self._client.delete(*keys)
+            else:
+                self._client.delete(f'{self.KEY_PREFIX}{system_id}')
+        except Exception as exc:
+            logger.warning('Span index: Redis clear failed (%s)', exc)
+
+
+#: Process-wide instance; ``webapp.run`` points it at the shared Redis.
+span_index = ActiveSpanIndex()
+
+
+def _stage(session: Session, system_id: int, T_new: datetime,
+           spans: Dict[SpanKey, Tuple[Any, Tuple[int, ...]]]) -> None:
+    """Hold this tick's span set until the transaction commits."""
+    session.info.setdefault(_STAGED, {})[system_id] = (T_new, spans)
+
+
+def fill_staged_span_ids(session: Session, system_id: int, T_new: datetime) -> None:
+    """Read back the ids of spans the bulk path just inserted at ``T_new``.
+
+    Core executemany INSERTs don't return keys; new spans are the rows
+    with ``timestamp == T_new`` (the unique key's leading column).
+    """
+    staged = session.info.get(_STAGED, {}).get(system_id)
+    if staged is None or staged[0] != T_new:
+        return
+    spans = staged[1]
+    rows = session.execute(
+        select(
+            UserProjQueueStatus.user_proj_queue_status_id,
+            UserProjQueueStatus.user_id,
+            UserProjQueueStatus.project_code_id,
+            UserProjQueueStatus.queue_id,
+        ).where(
+            UserProjQueueStatus.system_id == system_id,
+            UserProjQueueStatus.timestamp == T_new,
+        )
+    )
+    for row_id, *key in rows:
+        key = tuple(key)
+        if key in spans and spans[key][0] is None:
+            spans[key] = (row_id, spans[key][1])
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_span_index(session):
+    for system_id, (tick, spans) in session.info.pop(_STAGED, {}).items():
+        resolved: Spans = {}
+        for key, (ref, metrics) in spans.items():
+            if ref is not None and not isinstance(ref, int):
+                identity = inspect(ref).identity     # ORM object; no SQL
+                ref = identity[0] if identity else None
+            if ref is None:
+                break
+            resolved[key] = (ref, metrics)
+        else:
+            span_index.put(system_id, tick, resolved)
+            continue
+        span_index.clear(system_id)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_span_index(session, previous_transaction):
+    session.info.pop(_STAGED, None)
+
+
+def _active_spans(
+    session: Session,
+    system_id: int,
+    T_new: datetime,
+) -> Optional[Spans]:
+    """The previous tick's spans for ``system_id``, indexed by
+    ``(user_id, project_code_id, queue_id) → (row_id, metric_tuple)``.
+
+    Returns None when there is nothing to coalesce against: first ingest
+    for the system, or a ``MAX_SPAN_GAP`` outage before ``T_new``.
+    """
+    held = span_index.get(system_id)
+    if held is not None and held[0] < T_new:
+        prev_ts, spans = held
+        if (T_new - prev_ts) > MAX_SPAN_GAP:
+            return None
+        # Still current unless another writer has ticked since: one probe
+        # on the last_seen index, empty in the steady state.
+        newer = session.execute(
+            select(UserProjQueueStatus.user_proj_queue_status_id)
+            .where(UserProjQueueStatus.system_id == system_id,
+                   UserProjQueueStatus.last_seen > prev_ts)
+            .limit(1)
+        ).first()
+        if newer is None:
+            return dict(spans)
+
+    # Rebuild. Most recent `last_seen` for this system. None ⇒ first ingest.
+    prev_ts = session.execute(
+        select(func.max(UserProjQueueStatus.last_seen))
+        .where(UserProjQueueStatus.system_id == system_id)
+    ).scalar_one_or_none()
+
+    # Span-gap guard: skip coalescing across collector outages.
+    if prev_ts is None or (T_new - prev_ts) > MAX_SPAN_GAP:
+        return None
+
+    # Active set: spans whose `last_seen == prev_ts` for this system.
+    active_rows = session.execute(
+        select(
+            UserProjQueueStatus.user_proj_queue_status_id,
+            UserProjQueueStatus.user_id,
+            UserProjQueueStatus.project_code_id,
+            UserProjQueueStatus.queue_id,
+            *(getattr(UserProjQueueStatus, f) for f in _METRIC_FIELDS),
+        )
+        .where(
+            UserProjQueueStatus.system_id == system_id,
+            UserProjQueueStatus.last_seen == prev_ts,
+        )
+    ).all()
+
+    return {
+        (r[1], r[2], r[3]): (r[0], tuple(int(v or 0) for v in r[4:]))
+        for r in active_rows
+    }
+
+
+def _extend_spans(
+    session: Session,
+    active: Spans,
+    keyed: List[Tuple[SpanKey, Tuple[int, ...]]],
+    T_new: datetime,
+    synchronize_session,
+) -> Dict[SpanKey, int]:
+    """Bump ``last_seen`` on every active span an incoming
+    ``(key, metric_tuple)`` matches, with one ``UPDATE ... WHERE id IN``.
+
+    Returns ``{key: row_id}`` for the spans extended. A held span that has
+    since been deleted (pruned along with its first parent snapshot) is
+    left out, so its tuple starts a new span as a rebuild would have.
+    """
+    matched = {key: active[key][0] for key, metrics in keyed
+               if key in active and active[key][1] == metrics}
+    if not matched:
+        return {}
+    pk = UserProjQueueStatus.user_proj_queue_status_id
+    ids = list(matched.values())
+    result = session.execute(
+        update(UserProjQueueStatus)
+        .where(pk.in_(ids))
+        .values(last_seen=T_new)
+        .execution_options(synchronize_session=synchronize_session)
+    )
+    if result.rowcount != len(ids):
+        live = set(session.execute(select(pk).where(pk.in_(ids))).scalars())
+        matched = {key: row_id for key, row_id in matched.items() if row_id in live}
+    return matched
+
+
 def coalesce_user_proj_queue_spans(
     session: Session,
     parent_status,
@@ -66,9 +315,10 @@ def coalesce_user_proj_queue_spans(
     """Coalesce ``parent_status.user_project_queues`` against the previous
     tick's active span set.
 
-    Mutates the children list in place: extended spans are loaded by id
-    and have ``last_seen`` bumped; new spans get ``last_seen = T_new``
-    set and stay attached to the parent for INSERT.
+    Mutates the children list in place: extended spans have ``last_seen``
+    bumped (one UPDATE for all of them) and their duplicates are removed;
+    new spans get ``last_seen = T_new`` set and stay attached to the
+    parent for INSERT.
 
     Returns ``{'inserted': N, 'extended': M}`` for logging.
 
@@ -105,6 +355,8 @@ def coalesce_user_proj_queue_spans(
 
     # Read FKs through the resolved relationships (the children are
     # transient, so their column-level FKs aren't auto-synced yet).
+    # Pending lookup rows got their ids from the flush above; rows from
+    # ``dimension_cache`` hits are persistent instances with ids already.
     def _child_fks(c):
         return (
             c.user.user_id if c.user is not None else None,
@@ -121,67 +373,65 @@ def coalesce_user_proj_queue_spans(
             child.last_seen = T_new
         return {'inserted': len(children), 'extended': 0}
 
-    # 3. Most recent `last_seen` for this system. None ⇒ first ingest.
-    prev_ts = session.execute(
-        select(func.max(UserProjQueueStatus.last_seen))
-        .where(UserProjQueueStatus.system_id == system_id)
-    ).scalar_one_or_none()
-
-    # 4. Span-gap guard: skip coalescing across collector outages.
-    if prev_ts is None or (T_new - prev_ts) > MAX_SPAN_GAP:
-        for child in children:
-            child.last_seen = T_new
-        return {'inserted': len(children), 'extended': 0}
-
-    # 5. Active set: spans whose `last_seen == prev_ts` for this system.
-    active_rows = session.execute(
-        select(
-            UserProjQueueStatus.user_proj_queue_status_id,
-            UserProjQueueStatus.user_id,
-            UserProjQueueStatus.project_code_id,
-            UserProjQueueStatus.queue_id,
-            UserProjQueueStatus.running_jobs,
-            UserProjQueueStatus.pending_jobs,
-            UserProjQueueStatus.held_jobs,
-            UserProjQueueStatus.cores_allocated,
-            UserProjQueueStatus.gpus_allocated,
-            UserProjQueueStatus.nodes_allocated,
-            UserProjQueueStatus.cores_pending,
-            UserProjQueueStatus.gpus_pending,
-            UserProjQueueStatus.cores_held,
-            UserProjQueueStatus.gpus_held,
-        )
-        .where(
-            UserProjQueueStatus.system_id == system_id,
-            UserProjQueueStatus.last_seen == prev_ts,
-        )
-    ).all()
+    # 3-5. Active set of the previous tick (None across a gap / cold start).
+    active = _active_spans(session, system_id, T_new) or {}
 
-    # Index by (user_id, project_code_id, queue_id) → (row_id, metric_tuple)
-    active: Dict[Tuple[int, int, int], Tuple[int, Tuple[int, ...]]] = {
-        (r[1], r[2], r[3]): (r[0], tuple(int(v or 0) for v in r[4:]))
-        for r in active_rows
-    }
+    keyed = [(_child_fks(child)[:3], _metric_tuple(child)) for child in children]
+    extended = _extend_spans(session, active, keyed, T_new, 'evaluate')
 
-    inserted = 0
-    extended = 0
-    for child in children:
-        uid, pid, qid, _ = _child_fks(child)
-        key = (uid, pid, qid)
-        match = active.get(key)
-        if match is not None and match[1] == _metric_tuple(child):
-            row_id, _ = match
-            existing = session.get(UserProjQueueStatus, row_id)
-            if existing is not None:
-                existing.last_seen = T_new
-                # Drop the duplicate before the parent enters the session.
-                # This is a plain list mutation while parent_status is still
-                # transient — no cascade machinery fires.
-                parent_status.user_project_queues.remove(child)
-                extended += 1
-                continue
+    # This tick's span set, for the next tick: extended spans keep their
+    # row id, new ones carry their child until it has been inserted.
+    spans: Dict[SpanKey, Tuple[Any, Tuple[int, ...]]] = {}
+    for child, (key, metrics) in zip(children, keyed):
+        if key in extended:
+            spans[key] = (extended[key], metrics)
+            # Drop the duplicate before the parent enters the session.
+            # This is a plain list mutation while parent_status is still
+            # transient — no cascade machinery fires.
+            parent_status.user_project_queues.remove(child)
+            continue
         # New span: stamp last_seen and leave attached for INSERT.
         child.last_seen = T_new
-        inserted += 1
+        spans[key] = (child, metrics)
+
+    _stage(session, system_id, T_new, spans)
+    n_extended = len(children) - len(parent_status.user_project_queues)
+    return {'inserted': len(children) - n_extended, 'extended': n_extended}
+
+
+def coalesce_user_proj_queue_rows(
+    session: Session,
+    system_id: int,
+    rows: List[dict],
+    T_new: datetime,
+) -> Tuple[List[dict], Dict[str, int]]:
+    """Bulk-ingest counterpart of ``coalesce_user_proj_queue_spans``.
+
+    ``rows`` are plain insert dicts with ``user_id`` / ``project_code_id``
+    / ``queue_id`` already resolved. Rows matching an active span extend
+    it — all of them in one ``UPDATE ... WHERE id IN`` — and are dropped;
+    the rest get ``last_seen = T_new`` and are returned for INSERT. Once
+    they are inserted, call ``fill_staged_span_ids``.
+
+    Returns ``(rows_to_insert, {'inserted': N, 'extended': M})``.
+    """
+    if not rows:
+        return [], {'inserted': 0, 'extended': 0}
+
+    active = _active_spans(session, system_id, T_new) or {}
+    keyed = [((row['user_id'], row['project_code_id'], row['queue_id']),
+              _row_metric_tuple(row)) for row in rows]
+    extended = _extend_spans(session, active, keyed, T_new, False)
+
+    spans: Dict[SpanKey, Tuple[Any, Tuple[int, ...]]] = {}
+    to_insert: List[dict] = []
+    for row, (key, metrics) in zip(rows, keyed):
+        if key in extended:
+            spans[key] = (extended[key], metrics)
+            continue
+        row['last_seen'] = T_new
+        to_insert.append(row)
+        spans[key] = (None, metrics)
 
-    return {'inserted': inserted, 'extended': extended}
+    _stage(session, system_id, T_new, spans)
+    return to_insert, {'inserted': len(to_insert), 'extended': len(rows) - len(to_insert)}
@@ -18,12 +18,12 @@ from system_status.models import (
     CasperStatus,
     DerechoStatus,
     ProjectCodeDef,
-    QueueDef,
-    System,
     UserDef,
     UserProjQueueStatus,
 )
 
+from .dimensions import dimension_cache
+
 
 # Parent status table by system, used to fetch the canonical tick
 # timeline for span explosion. Mirrors the dict in
@@ -83,19 +83,17 @@ def _resolve_queue_id(session: Session, system: str, queue_name: str) -> Optiona
 
     ``QueueDef`` is keyed by ``(system_id, name)`` — looking up by name alone
     would be ambiguous (queues with the same name exist on both systems).
+    Served from ``dimension_cache`` once known.
     """
-    return session.execute(
-        select(QueueDef.queue_id)
-        .join(System, QueueDef.system_id == System.system_id)
-        .where(System.name == system, QueueDef.name == queue_name)
-    ).scalar_one_or_none()
+    system_id = _resolve_system_id(session, system)
+    if system_id is None:
+        return None
+    return dimension_cache.get(session, 'queue', (system_id, queue_name))
 
 
 def _resolve_system_id(session: Session, system: str) -> Optional[int]:
     """Return the system_id for ``system``, or ``None`` if absent."""
-    return session.execute(
-        select(System.system_id).where(System.name == system)
-    ).scalar_one_or_none()
+    return dimension_cache.get(session, 'system', (system,))
 
 
 def get_latest_user_proj_queue_snapshot(
@@ -34,13 +34,24 @@ queries that previously scanned ~36M snapshot rows now scan however
 many spans the workload churn produced. The chunking infrastructure is
 preserved for spans that straddle chunk boundaries, with a
 ``seen_ids`` set deduplicating spans seen in multiple chunks.
+
+**Daily summary.** Weighting each tick by the interval to its *global*
+successor makes the integral additive over tick ranges: a window split at
+midnight boundaries sums to the same totals as the whole, as long as each
+piece's last tick reaches the next tick inside the window.
+``rollup_user_proj_days`` integrates every closed day once into
+``user_proj_daily_usage`` (run nightly by
+``scripts/rollup_user_proj_usage.py``); ``get_user_proj_usage`` then reads
+the days a window covers from there and integrates only the open edges
+live. The summary also outlives the raw spans, which go with their parent
+snapshots at the retention cutoff.
 """
 
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
-from sqlalchemy import select
+from sqlalchemy import and_, delete, func, insert, or_, select
 from sqlalchemy.orm import Session
 
 from system_status.models import (
@@ -50,6 +61,8 @@ from system_status.models import (
     QueueDef,
     System,
     UserDef,
+    UserProjDailyUsage,
+    UserProjDailyUsageDay,
     UserProjQueueStatus,
 )
 
@@ -70,6 +83,11 @@ _BITS = 21
 _MASK = (1 << _BITS) - 1
 _MAX_ID = _MASK
 
+# Live segments are inclusive ``[lo, hi]``; a segment ending where a day
+# starts stops one microsecond short of midnight (timestamps are unique).
+_DAY = timedelta(days=1)
+_SEGMENT_END = timedelta(microseconds=1)
+
 
 def _assert_id_fits(uid_arr: np.ndarray, pid_arr: np.ndarray,
                     qid_arr: np.ndarray) -> None:
@@ -103,185 +121,107 @@ def _iter_chunks(start: datetime, end: datetime,
     return out
 
 
-def get_user_proj_usage(
-    session: Session,
-    *,
-    system: str,
-    start_date: datetime,
-    end_date: datetime,
-    queue_name: Optional[str] = None,
-    username: Optional[str] = None,
-    project_code: Optional[str] = None,
-    exclude_unknown_project: bool = False,
-    chunk_days: int = 30,
-) -> List[Dict[str, Any]]:
-    """Integrate ``UserProjQueueStatus`` snapshots into core-hours /
-    GPU-hours / node-hours by ``(user, project, queue)`` over
-    ``[start_date, end_date]``.
-
-    Returns one dict per tuple with non-zero usage, sorted descending by
-    ``core_hours``::
-
-        {
-            'username':     'benkirk',
-            'project_code': 'SCSG0001',
-            'queue_name':   'main',
-            'system':       'derecho',
-            'core_hours':   1234.56,
-            'gpu_hours':    0.0,
-            'node_hours':   38.58,
-            'first_seen':   datetime(...),   # earliest tick the tuple appeared
-            'last_seen':    datetime(...),   # latest tick the tuple appeared
-            'tick_count':   42,              # how many ticks the tuple was present
-        }
-
-    **Integration model.** Left-step rectangle rule over the global tick
-    timeline derived from the parent system status table. A snapshot
-    at tick ``t_i`` with value ``x_i`` contributes ``x_i * (t_{i+1} -
-    t_i)`` to the integral. Absence of a tuple at a tick is treated as
-    0. The last tick in the window has no successor and contributes 0.
-
-    **Filters** (all optional, all combine with AND):
-
-    - ``queue_name`` — restrict to a single queue on ``system``.
-    - ``username`` / ``project_code`` — restrict to a single
-      user / project. Returns ``[]`` if the lookup row doesn't exist.
-    - ``exclude_unknown_project`` — drop the ``'_unknown_'`` bucket
-      (jobs whose ``Account_Name`` was missing/empty).
-
-    **Performance envelope** for windows on prod-shaped data
-    (~98 k rows/day, ~340 distinct tuples/tick):
-
-    ============  =========  ===========================
-    Window        Rows       Wall time (target)
-    ============  =========  ===========================
-    1 hour        ~4 k       <50 ms
-    1 day         ~100 k     <500 ms
-    1 week        ~700 k     ~3 s
-    1 month       ~3 M       ~10–15 s
-    1 year        ~36 M      ~2–4 min  (offline only)
-    ============  =========  ===========================
-
-    Windows >60 days should NOT be hit from a synchronous request
-    handler. If year-scale UI becomes a need, the right answer is a
-    nightly-rolled summary table, not optimizing this query.
-    """
-    parent = _PARENT_STATUS_BY_SYSTEM.get(system)
-    if parent is None:
-        raise ValueError(
-            f'system must be one of {sorted(_PARENT_STATUS_BY_SYSTEM)}, '
-            f'got {system!r}'
+def _accumulate(totals: Dict[int, list], key: int, core_s: float,
+                gpu_s: float, node_s: float, first_us: int, last_us: int,
+                count: int) -> None:
+    """Merge one group's partial sums into the ``totals`` accumulator."""
+    entry = totals.get(key)
+    if entry is None:
+        totals[key] = [core_s, gpu_s, node_s, first_us, last_us, count]
+        return
+    entry[0] += core_s
+    entry[1] += gpu_s
+    entry[2] += node_s
+    if first_us < entry[3]:
+        entry[3] = first_us
+    if last_us > entry[4]:
+        entry[4] = last_us
+    entry[5] += count
+
+
+def _span_select(system_id: int):
+    """Column projection of the spans ``_integrate_segment`` consumes."""
+    return (
+        select(
+            UserProjQueueStatus.user_proj_queue_status_id,
+            UserProjQueueStatus.timestamp,
+            UserProjQueueStatus.last_seen,
+            UserProjQueueStatus.user_id,
+            UserProjQueueStatus.project_code_id,
+            UserProjQueueStatus.queue_id,
+            UserProjQueueStatus.cores_allocated,
+            UserProjQueueStatus.gpus_allocated,
+            UserProjQueueStatus.nodes_allocated,
         )
-    if start_date > end_date:
-        return []
+        .where(UserProjQueueStatus.system_id == system_id)
+    )
 
-    system_id = _resolve_system_id(session, system)
-    if system_id is None:
-        return []
 
-    # Optional scope filter — single queue.
-    queue_id = None
-    if queue_name is not None:
-        queue_id = _resolve_queue_id(session, system, queue_name)
-        if queue_id is None:
-            return []
+def _integrate_segment(session: Session, parent, base, totals: Dict[int, list],
+                       lo: datetime, hi: datetime, horizon: Optional[datetime],
+                       chunk_days: int) -> Optional[tuple]:
+    """Integrate the spans selected by ``base`` over the ticks in ``[lo, hi]``
+    into ``totals``.
 
-    # Optional user / project filters — resolve up front so we avoid a
-    # JOIN in the hot fetch loop.
-    user_id_filter = None
-    if username is not None:
-        user_id_filter = session.execute(
-            select(UserDef.user_id).where(UserDef.username == username)
-        ).scalar_one_or_none()
-        if user_id_filter is None:
-            return []
-
-    project_code_id_filter = None
-    if project_code is not None:
-        project_code_id_filter = session.execute(
-            select(ProjectCodeDef.project_code_id)
-            .where(ProjectCodeDef.project_code == project_code)
-        ).scalar_one_or_none()
-        if project_code_id_filter is None:
-            return []
-
-    unknown_pid = None
-    if exclude_unknown_project:
-        unknown_pid = session.execute(
-            select(ProjectCodeDef.project_code_id)
-            .where(ProjectCodeDef.project_code == '_unknown_')
-        ).scalar_one_or_none()
-        # If no _unknown_ row exists, the filter is a no-op.
+    Each tick is weighted by the interval to its successor. For the last
+    tick of the segment that successor is the first tick after ``hi`` —
+    provided it is no later than ``horizon`` (``None``: unbounded);
+    otherwise the last tick contributes 0. ``horizon == hi`` is therefore
+    the plain single-window integral, and splitting a window at any tick
+    boundaries into segments that share its end as horizon sums to the same
+    result — which is what lets closed days be rolled once and composed.
 
+    Returns ``(first_tick, last_tick, n_ticks, next_tick)`` for the segment
+    (``next_tick`` may be ``None``), or ``None`` when it has no ticks.
+    """
     # ------------------------------------------------------------------
-    # 1. Global tick timeline from the parent status table.
+    # 1. Tick timeline from the parent status table.
     # ------------------------------------------------------------------
     tick_rows = session.execute(
         select(parent.timestamp)
-        .where(parent.timestamp >= start_date,
-               parent.timestamp <= end_date)
+        .where(parent.timestamp >= lo,
+               parent.timestamp <= hi)
         .order_by(parent.timestamp)
     ).all()
     tick_list = [r[0] for r in tick_rows]
     n_ticks = len(tick_list)
-    if n_ticks < 2:
-        # Single tick or no ticks — nothing to integrate over.
-        return []
+    if n_ticks == 0:
+        return None
+
+    after = select(func.min(parent.timestamp)).where(parent.timestamp > hi)
+    if horizon is not None:
+        after = after.where(parent.timestamp <= horizon)
+    next_tick = session.execute(after).scalar_one_or_none()
 
     ticks = np.array(tick_list, dtype='datetime64[us]')
+    tick_us = ticks.astype('int64')
     # Per-tick interval in **seconds** (float64). Computing in seconds —
     # not microseconds — keeps year-scale sums comfortably under the
     # float64 mantissa precision cliff (~9e15 ≈ 2.5e9 core-hours).
-    # dt[N-1] = 0 (last tick has no successor); pad to keep array
-    # length aligned with `ticks`.
+    # dt[N-1] reaches to ``next_tick``, or is 0 when there is none.
     dt_sec = np.zeros(n_ticks, dtype=np.float64)
-    dt_sec[:-1] = np.diff(ticks).astype('int64').astype(np.float64) / 1e6
+    dt_sec[:-1] = np.diff(tick_us).astype(np.float64) / 1e6
+    if next_tick is not None:
+        dt_sec[-1] = (np.datetime64(next_tick, 'us').astype('int64')
+                      - tick_us[-1]) / 1e6
 
     # Cumulative-sum prefix so any span [i..j] integrates as
     #   sum(dt_sec[i:j+1]) == cum_dt[j+1] - cum_dt[i]
     # — O(1) per span instead of O(j - i + 1).
     cum_dt = np.concatenate([[0.0], np.cumsum(dt_sec)])
 
-    start_dt64 = np.datetime64(start_date, 'us')
-    end_dt64 = np.datetime64(end_date, 'us')
+    start_dt64 = np.datetime64(lo, 'us')
+    end_dt64 = np.datetime64(hi, 'us')
 
     # ------------------------------------------------------------------
     # 2. Stream user_proj rows in chunks; per-chunk numpy aggregation
-    #    merged into a master accumulator dict keyed by composite int.
+    #    merged into the accumulator dict keyed by composite int.
     # ------------------------------------------------------------------
-    # totals[composite_key] = [core_sec, gpu_sec, node_sec,
-    #                          first_us, last_us, tick_count]
-    totals: Dict[int, List[float]] = {}
     # Spans whose [first_seen, last_seen] cross a chunk boundary may
     # appear in two consecutive chunks; this set dedups them.
     seen_ids: set = set()
 
-    base = (
-        select(
-            UserProjQueueStatus.user_proj_queue_status_id,
-            UserProjQueueStatus.timestamp,
-            UserProjQueueStatus.last_seen,
-            UserProjQueueStatus.user_id,
-            UserProjQueueStatus.project_code_id,
-            UserProjQueueStatus.queue_id,
-            UserProjQueueStatus.cores_allocated,
-            UserProjQueueStatus.gpus_allocated,
-            UserProjQueueStatus.nodes_allocated,
-        )
-        .where(UserProjQueueStatus.system_id == system_id)
-    )
-    if queue_id is not None:
-        base = base.where(UserProjQueueStatus.queue_id == queue_id)
-    if user_id_filter is not None:
-        base = base.where(UserProjQueueStatus.user_id == user_id_filter)
-    if project_code_id_filter is not None:
-        base = base.where(
-            UserProjQueueStatus.project_code_id == project_code_id_filter
-        )
-    if unknown_pid is not None:
-        base = base.where(UserProjQueueStatus.project_code_id != unknown_pid)
-
-    for t_lo, t_hi in _iter_chunks(start_date, end_date, chunk_days):
+    for t_lo, t_hi in _iter_chunks(lo, hi, chunk_days):
         # Span-overlap predicate: a span [first, last] overlaps chunk
         # [t_lo, t_hi] iff last >= t_lo AND first <= t_hi.
         rows = session.execute(
@@ -317,8 +257,8 @@ def get_user_proj_usage(
         _assert_id_fits(uid_arr, pid_arr, qid_arr)
 
         # Span integration via prefix-sum lookup. Clamp endpoints to the
-        # query window so spans that overhang either edge contribute
-        # only the in-window portion. searchsorted on a sorted tick
+        # segment so spans that overhang either edge contribute only
+        # the in-segment portion. searchsorted on a sorted tick
         # array places each clamped endpoint at the matching tick index
         # (or the next-greater for an off-tick value, which is benign
         # since collector ticks and span endpoints share the same set
@@ -361,9 +301,9 @@ def get_user_proj_usage(
         tick_counts = np.bincount(inverse, weights=tick_per_row.astype(np.float64),
                                   minlength=n_groups)
 
-        # Per-group min(first_seen) and max(last_seen) via reduce-at-indices.
-        first_int = ts_arr.astype('int64')
-        last_int = last_arr.astype('int64')
+        # Per-group first / last tick present, via reduce-at-indices.
+        first_int = tick_us[i_first]
+        last_int = tick_us[i_last]
         first_us = np.full(n_groups, np.iinfo(np.int64).max, dtype=np.int64)
         last_us = np.full(n_groups, np.iinfo(np.int64).min, dtype=np.int64)
         np.minimum.at(first_us, inverse, first_int)
@@ -372,32 +312,170 @@ def get_user_proj_usage(
         # Merge into accumulator dict. Iterating over n_groups (not
         # n_rows) keeps Python overhead bounded.
         for g in range(n_groups):
-            k = int(unique_keys[g])
-            entry = totals.get(k)
-            if entry is None:
-                totals[k] = [
-                    float(core_sums[g]),
-                    float(gpu_sums[g]),
-                    float(node_sums[g]),
-                    int(first_us[g]),
-                    int(last_us[g]),
-                    int(tick_counts[g]),
-                ]
-            else:
-                entry[0] += float(core_sums[g])
-                entry[1] += float(gpu_sums[g])
-                entry[2] += float(node_sums[g])
-                if first_us[g] < entry[3]:
-                    entry[3] = int(first_us[g])
-                if last_us[g] > entry[4]:
-                    entry[4] = int(last_us[g])
-                entry[5] += int(tick_counts[g])
+            _accumulate(totals, int(unique_keys[g]),
+                        float(core_sums[g]), float(gpu_sums[g]),
+                        float(node_sums[g]), int(first_us[g]),
+                        int(last_us[g]), int(tick_counts[g]))
+
+    return ticks[0], ticks[-1], n_ticks, next_tick
+
+
+def get_user_proj_usage(
+    session: Session,
+    *,
+    system: str,
+    start_date: datetime,
+    end_date: datetime,
+    queue_name: Optional[str] = None,
+    username: Optional[str] = None,
+    project_code: Optional[str] = None,
+    exclude_unknown_project: bool = False,
+    chunk_days: int = 30,
+    use_daily_summary: bool = True,
+) -> List[Dict[str, Any]]:
+    """Integrate ``UserProjQueueStatus`` snapshots into core-hours /
+    GPU-hours / node-hours by ``(user, project, queue)`` over
+    ``[start_date, end_date]``.
+
+    Returns one dict per tuple with non-zero usage, sorted descending by
+    ``core_hours``::
+
+        {
+            'username':     'benkirk',
+            'project_code': 'SCSG0001',
+            'queue_name':   'main',
+            'system':       'derecho',
+            'core_hours':   1234.56,
+            'gpu_hours':    0.0,
+            'node_hours':   38.58,
+            'first_seen':   datetime(...),   # earliest tick in the window the tuple appeared
+            'last_seen':    datetime(...),   # latest tick in the window the tuple appeared
+            'tick_count':   42,              # how many ticks the tuple was present
+        }
+
+    **Integration model.** Left-step rectangle rule over the global tick
+    timeline derived from the parent system status table. A snapshot
+    at tick ``t_i`` with value ``x_i`` contributes ``x_i * (t_{i+1} -
+    t_i)`` to the integral. Absence of a tuple at a tick is treated as
+    0. The last tick in the window has no successor and contributes 0.
+
+    **Filters** (all optional, all combine with AND):
+
+    - ``queue_name`` — restrict to a single queue on ``system``.
+    - ``username`` / ``project_code`` — restrict to a single
+      user / project. Returns ``[]`` if the lookup row doesn't exist.
+    - ``exclude_unknown_project`` — drop the ``'_unknown_'`` bucket
+      (jobs whose ``Account_Name`` was missing/empty).
+
+    **Daily summary.** Whole days inside the window that
+    ``rollup_user_proj_days`` has rolled are read from
+    ``user_proj_daily_usage``; the partial days at the edges (and any day
+    not rolled yet) are integrated live from the spans. The result equals
+    the all-live integral up to float summation order.
+    ``use_daily_summary=False`` forces the all-live path (the parity check
+    in ``scripts/validate_user_proj_usage.py`` compares the two).
+
+    **Performance envelope** of the live integration on prod-shaped data
+    (~98 k rows/day, ~340 distinct tuples/tick):
+
+    ============  =========  ===========================
+    Window        Rows       Wall time (target)
+    ============  =========  ===========================
+    1 hour        ~4 k       <50 ms
+    1 day         ~100 k     <500 ms
+    1 week        ~700 k     ~3 s
+    1 month       ~3 M       ~10–15 s
+    1 year        ~36 M      ~2–4 min  (offline only)
+    ============  =========  ===========================
+
+    With the daily summary rolled, only the (at most two) partial edge
+    days are integrated live, so any window costs about as much as two
+    days plus one grouped read of ~340 summary rows per covered day.
+    """
+    parent = _PARENT_STATUS_BY_SYSTEM.get(system)
+    if parent is None:
+        raise ValueError(
+            f'system must be one of {sorted(_PARENT_STATUS_BY_SYSTEM)}, '
+            f'got {system!r}'
+        )
+    if start_date > end_date:
+        return []
+
+    system_id = _resolve_system_id(session, system)
+    if system_id is None:
+        return []
+
+    # Optional scope filter — single queue.
+    queue_id = None
+    if queue_name is not None:
+        queue_id = _resolve_queue_id(session, system, queue_name)
+        if queue_id is None:
+            return []
+
+    # Optional user / project filters — resolve up front so we avoid a
+    # JOIN in the hot fetch loop.
+    user_id_filter = None
+    if username is not None:
+        user_id_filter = session.execute(
+            select(UserDef.user_id).where(UserDef.username == username)
+        ).scalar_one_or_none()
+        if user_id_filter is None:
+            return []
+
+    project_code_id_filter = None
+    if project_code is not None:
+        project_code_id_filter = session.execute(
+            select(ProjectCodeDef.project_code_id)
+            .where(ProjectCodeDef.project_code == project_code)
+        ).scalar_one_or_none()
+        if project_code_id_filter is None:
+            return []
+
+    unknown_pid = None
+    if exclude_unknown_project:
+        unknown_pid = session.execute(
+            select(ProjectCodeDef.project_code_id)
+            .where(ProjectCodeDef.project_code == '_unknown_')
+        ).scalar_one_or_none()
+        # If no _unknown_ row exists, the filter is a no-op.
+
+    base = _span_select(system_id)
+    if queue_id is not None:
+        base = base.where(UserProjQueueStatus.queue_id == queue_id)
+    if user_id_filter is not None:
+        base = base.where(UserProjQueueStatus.user_id == user_id_filter)
+    if project_code_id_filter is not None:
+        base = base.where(
+            UserProjQueueStatus.project_code_id == project_code_id_filter
+        )
+    if unknown_pid is not None:
+        base = base.where(UserProjQueueStatus.project_code_id != unknown_pid)
+
+    # ------------------------------------------------------------------
+    # 1. Closed days from the summary table, the rest integrated live.
+    # ------------------------------------------------------------------
+    if use_daily_summary:
+        live, rolled = _plan_window(session, system_id, start_date, end_date)
+    else:
+        live, rolled = [(start_date, end_date)], []
+
+    # totals[composite_key] = [core_sec, gpu_sec, node_sec,
+    #                          first_us, last_us, tick_count]
+    totals: Dict[int, List[float]] = {}
+    for lo, hi in live:
+        _integrate_segment(session, parent, base, totals,
+                           lo, hi, end_date, chunk_days)
+    if rolled:
+        _accumulate_daily(session, system_id, rolled, totals,
+                          queue_id=queue_id, user_id=user_id_filter,
+                          project_code_id=project_code_id_filter,
+                          exclude_project_code_id=unknown_pid)
 
     if not totals:
         return []
 
     # ------------------------------------------------------------------
-    # 3. Resolve labels in three batched lookups (no N+1).
+    # 2. Resolve labels in three batched lookups (no N+1).
     # ------------------------------------------------------------------
     uid_set: set = set()
     pid_set: set = set()
@@ -421,7 +499,7 @@ def get_user_proj_usage(
     ).all())
 
     # ------------------------------------------------------------------
-    # 4. Convert to hours, drop zero-usage entries, sort.
+    # 3. Convert to hours, drop zero-usage entries, sort.
     # ------------------------------------------------------------------
     SEC_PER_HOUR = 3600.0
     out: List[Dict[str, Any]] = []
@@ -449,3 +527,183 @@ def get_user_proj_usage(
 
     out.sort(key=lambda r: r['core_hours'], reverse=True)
     return out
+
+
+# ----------------------------------------------------------------------
+# Daily summary (``user_proj_daily_usage``)
+# ----------------------------------------------------------------------
+
+def _day_floor(ts: datetime) -> datetime:
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _plan_window(session: Session, system_id: int, start: datetime,
+                 end: datetime) -> Tuple[List[tuple], List[tuple]]:
+    """Split ``[start, end]`` into live segments and rolled day runs.
+
+    A day is taken from the summary when it lies wholly inside the window,
+    is in the ledger, and its ``next_tick`` (the successor its last tick was
+    integrated up to) is within the window. Everything else — the partial
+    days at either edge, days not rolled yet — is integrated live.
+
+    Returns ``(live, rolled)``: inclusive ``(lo, hi)`` segments and
+    half-open ``[day_lo, day_hi)`` runs of summary days.
+    """
+    d_lo = _day_floor(start)
+    if d_lo < start:
+        d_lo += _DAY
+    d_hi = _day_floor(end)
+    if d_lo >= d_hi:
+        return [(start, end)], []
+
+    usable = set(session.execute(
+        select(UserProjDailyUsageDay.day)
+        .where(UserProjDailyUsageDay.system_id == system_id,
+               UserProjDailyUsageDay.day >= d_lo,
+               UserProjDailyUsageDay.day < d_hi,
+               UserProjDailyUsageDay.next_tick <= end)
+    ).scalars())
+    if not usable:
+        return [(start, end)], []
+
+    live: List[tuple] = []
+    rolled: List[tuple] = []
+    cursor = start
+    day = d_lo
+    while day < d_hi:
+        if day in usable:
+            if cursor < day:
+                live.append((cursor, day - _SEGMENT_END))
+            if rolled and rolled[-1][1] == day:
+                rolled[-1] = (rolled[-1][0], day + _DAY)
+            else:
+                rolled.append((day, day + _DAY))
+            cursor = day + _DAY
+        day += _DAY
+    if cursor <= end:
+        live.append((cursor, end))
+    return live, rolled
+
+
+def _accumulate_daily(session: Session, system_id: int, runs: List[tuple],
+                      totals: Dict[int, list], *, queue_id=None,
+                      user_id=None, project_code_id=None,
+                      exclude_project_code_id=None) -> None:
+    """Add the summary rows of the day ``runs`` into ``totals``."""
+    D = UserProjDailyUsage
+    stmt = (
+        select(D.user_id, D.project_code_id, D.queue_id,
+               func.sum(D.core_hours), func.sum(D.gpu_hours),
+               func.sum(D.node_hours), func.min(D.first_seen),
+               func.max(D.last_seen), func.sum(D.tick_count))
+        .where(D.system_id == system_id,
+               or_(*[and_(D.day >= lo, D.day < hi) for lo, hi in runs]))
+        .group_by(D.user_id, D.project_code_id, D.queue_id)
+    )
+    if queue_id is not None:
+        stmt = stmt.where(D.queue_id == queue_id)
+    if user_id is not None:
+        stmt = stmt.where(D.user_id == user_id)
+    if project_code_id is not None:
+        stmt = stmt.where(D.project_code_id == project_code_id)
+    if exclude_project_code_id is not None:
+        stmt = stmt.where(D.project_code_id != exclude_project_code_id)
+
+    for uid, pid, qid, core_h, gpu_h, node_h, first, last, count in session.execute(stmt):
+        _accumulate(totals, (uid << (2 * _BITS)) | (pid << _BITS) | qid,
+                    core_h * 3600.0, gpu_h * 3600.0, node_h * 3600.0,
+                    int(np.datetime64(first, 'us').astype('int64')),
+                    int(np.datetime64(last, 'us').astype('int64')),
+                    int(count))
+
+
+def rollup_user_proj_days(session: Session, system: str, start: datetime,
+                          end: datetime, *, rebuild: bool = False,
+                          chunk_days: int = 30) -> Tuple[int, int]:
+    """Roll the closed days in ``[start, end)`` into ``user_proj_daily_usage``.
+
+    A day is closed once the collector has ticked on a later day: only then
+    is the interval after its last tick known. Days already in the ledger
+    are skipped unless ``rebuild``; a rolled day is replaced wholesale, so
+    rerunning is idempotent. Days with no raw ticks left (past the
+    snapshot retention) are never touched — their summary rows are the
+    only copy of that usage. Nor does ``rebuild`` replace a rolled day that
+    starts before the earliest retained tick: retention purges oldest
+    first, so that day may have lost its start, and its summary is the
+    complete record. Caller commits.
+
+    Returns ``(days_rolled, rows_written)``.
+    """
+    parent = _PARENT_STATUS_BY_SYSTEM.get(system)
+    if parent is None:
+        raise ValueError(
+            f'system must be one of {sorted(_PARENT_STATUS_BY_SYSTEM)}, '
+            f'got {system!r}'
+        )
+    system_id = _resolve_system_id(session, system)
+    if system_id is None:
+        return 0, 0
+
+    done = set(session.execute(
+        select(UserProjDailyUsageDay.day)
+        .where(UserProjDailyUsageDay.system_id == system_id,
+               UserProjDailyUsageDay.day >= _day_floor(start),
+               UserProjDailyUsageDay.day < end)
+    ).scalars())
+    base = _span_select(system_id)
+    retained_from = (session.execute(select(func.min(parent.timestamp)))
+                     .scalar_one_or_none() if rebuild else None)
+
+    days_rolled = rows_written = 0
+    day = _day_floor(start)
+    while day < end:
+        nxt = day + _DAY
+        if day in done and (retained_from is None or day < retained_from):
+            day = nxt
+            continue
+        closed = session.execute(
+            select(func.min(parent.timestamp)).where(parent.timestamp >= nxt)
+        ).scalar_one_or_none()
+        if closed is None:
+            break
+
+        totals: Dict[int, list] = {}
+        seg = _integrate_segment(session, parent, base, totals,
+                                 day, nxt - _SEGMENT_END, None, chunk_days)
+        if seg is None:
+            day = nxt
+            continue
+        first_tick, last_tick, n_ticks, next_tick = seg
+
+        session.execute(delete(UserProjDailyUsage).where(
+            UserProjDailyUsage.system_id == system_id,
+            UserProjDailyUsage.day == day))
+        session.execute(delete(UserProjDailyUsageDay).where(
+            UserProjDailyUsageDay.system_id == system_id,
+            UserProjDailyUsageDay.day == day))
+        rows = [{
+            'day': day,
+            'system_id': system_id,
+            'user_id': (k >> (2 * _BITS)) & _MASK,
+            'project_code_id': (k >> _BITS) & _MASK,
+            'queue_id': k & _MASK,
+            'core_hours': core_s / 3600.0,
+            'gpu_hours': gpu_s / 3600.0,
+            'node_hours': node_s / 3600.0,
+            'first_seen': np.datetime64(first_i, 'us').astype(datetime),
+            'last_seen': np.datetime64(last_i, 'us').astype(datetime),
+            'tick_count': count,
+        } for k, (core_s, gpu_s, node_s, first_i, last_i, count) in totals.items()]
+        if rows:
+            session.execute(insert(UserProjDailyUsage), rows)
+        session.add(UserProjDailyUsageDay(
+            system_id=system_id, day=day,
+            first_tick=first_tick.astype(datetime),
+            last_tick=last_tick.astype(datetime),
+            next_tick=next_tick, tick_count=n_ticks, tuple_count=len(rows),
+        ))
+        session.flush()
+        days_rolled += 1
+        rows_written += len(rows)
+        day = nxt
+    return days_rolled, rows_written
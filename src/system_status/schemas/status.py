@@ -19,7 +19,9 @@ attribute; the ``before_flush`` listener in
 ids using ``get_or_create_*`` helpers.
 """
 
-from marshmallow import Schema, fields, post_load
+import copy
+
+from marshmallow import EXCLUDE, Schema, fields, post_load
 from . import BaseSchema
 from system_status import *
 
@@ -322,3 +324,59 @@ class ResourceReservationSchema(BaseSchema):
 
     system_name = fields.String(dump_only=True)
     system_id = fields.Integer(dump_only=True)
+
+
+# ============================================================================
+# Bulk Ingest Schemas
+# ============================================================================
+#
+# Plain (non-SQLAlchemy) schemas for the bulk ingest path
+# (``system_status.queries.bulk_ingest``): the same fields, types and
+# required-ness as the model schemas above, copied from them so the two
+# paths cannot drift, but loading plain dicts instead of building a
+# transient ORM object per row. Primary keys, parent FKs and ``created_at``
+# are dropped — the insert supplies them.
+
+_BULK_DROP = ('status_id', 'queue_status_id', 'login_node_id', 'fs_status_id',
+              'user_proj_queue_status_id', 'node_type_status_id',
+              'derecho_status_id', 'casper_status_id', 'created_at')
+
+
+def _bulk_schema(model_schema, name, **nested):
+    """A plain Schema class with ``model_schema``'s loadable fields."""
+    declared = {
+        field_name: copy.copy(field)
+        for field_name, field in model_schema().fields.items()
+        if not field.dump_only and field_name not in _BULK_DROP
+        and not isinstance(field, fields.Nested)
+    }
+    for field_name, child in nested.items():
+        declared[field_name] = fields.Nested(child, many=True, load_default=list)
+    return type(name, (Schema,), {**declared, 'Meta': _BulkMeta})
+
+
+class _BulkMeta:
+    unknown = EXCLUDE    # as BaseSchema: collectors send extra keys
+
+
+LoginNodeBulkSchema = _bulk_schema(LoginNodeSchema, 'LoginNodeBulkSchema')
+QueueBulkSchema = _bulk_schema(QueueSchema, 'QueueBulkSchema')
+UserProjQueueBulkSchema = _bulk_schema(UserProjQueueSchema, 'UserProjQueueBulkSchema')
+FilesystemBulkSchema = _bulk_schema(FilesystemSchema, 'FilesystemBulkSchema')
+CasperNodeTypeBulkSchema = _bulk_schema(CasperNodeTypeSchema, 'CasperNodeTypeBulkSchema')
+
+DerechoStatusBulkSchema = _bulk_schema(
+    DerechoStatusSchema, 'DerechoStatusBulkSchema',
+    login_nodes=LoginNodeBulkSchema,
+    queues=QueueBulkSchema,
+    user_project_queues=UserProjQueueBulkSchema,
+    filesystems=FilesystemBulkSchema,
+)
+CasperStatusBulkSchema = _bulk_schema(
+    CasperStatusSchema, 'CasperStatusBulkSchema',
+    login_nodes=LoginNodeBulkSchema,
+    node_types=CasperNodeTypeBulkSchema,
+    queues=QueueBulkSchema,
+    user_project_queues=UserProjQueueBulkSchema,
+    filesystems=FilesystemBulkSchema,
+)
@@ -0,0 +1,332 @@
+"""Versioned snapshots of the provisioning documents.
+
+``/api/v1/directory_access``, ``/project_access`` and ``/fstree_access``
+serve a handful of large documents (``group_populator`` /
+``user_populator``, ``get_project_group_status``, ``get_fstree_data`` and
+its project/user remaps) that LDAP and PBS tooling poll around the clock.
+Cached per URL in Flask-Cache, every ``/refresh`` — and, through the audit
+hook, every commit anywhere in the app — emptied them at once, and all the
+pollers then recomputed the same documents together.
+
+Here each document (per access branch / resource filter) is materialised
+once into a :class:`Snapshot`: the serialized JSON body, a content hash
+used as its ETag, and a version that goes up only when the content
+changes. The version is informational: it is counted by whichever cache
+holds the snapshot, so it restarts after a purge or eviction and differs
+between workers without Redis — only the ETag identifies content.
+Responses carry ``ETag`` and ``X-Snapshot-Version``; a poll whose
+``If-None-Match`` still matches gets a 304 without the document being
+rebuilt or re-sent.
+
+Freshness
+---------
+Nothing ever drops a snapshot to force a rebuild. Instead:
+
+* past ``PROVISIONING_SNAPSHOT_SOFT_TTL`` a snapshot is still served but
+  rebuilt in the background (stale-while-revalidate);
+* ``invalidate_snapshots`` — called by the ``/refresh`` endpoints, and
+  after any commit that wrote a table these documents read — records an
+  invalidation time; a snapshot whose build *started* before it is still
+  served, and rebuilt in the background.
+
+So the previous snapshot stays servable while its successor builds, and
+a rebuild is single-flight across workers (``BucketedTTLCache`` lease).
+
+Deltas
+------
+When a rebuild changes a document, the body it replaces is kept under its
+ETag, for the last ``PROVISIONING_SNAPSHOT_HISTORY`` versions (and no
+longer than the hard TTL). ``delta_response`` answers ``?since=<ETag>``
+with just the changes from that body — computed by the document's own
+delta builder — or with the full document, marked ``X-Snapshot-Delta:
+full``, when that body is not retained (aged out, purged, evicted, built by
+another worker, or not an ETag at all). Bases are content-addressed, so a
+``since`` can only ever be answered from the body it names.
+
+Backend, lazy init and the refresh pool come from
+:class:`sam.caching.BucketedTTLCache`: a Redis adapter shared across
+gunicorn workers when ``CACHE_REDIS_URL`` is set (the invalidation stamps
+live there too, so a ``/refresh`` on one worker reaches them all), a
+per-worker TTL cache otherwise. Registered with the ``webapp.caching``
+facade as category ``snapshots``.
+
+Config (Flask app.config or env; 0 disables the bucket — every request
+then builds its document, though ETags still spare the transfer):
+  PROVISIONING_SNAPSHOT_TTL       — hard TTL seconds (default 86400)
+  PROVISIONING_SNAPSHOT_SIZE      — max entries, history included (default 512)
+  PROVISIONING_SNAPSHOT_SOFT_TTL  — background rebuild age (default 900)
+  PROVISIONING_SNAPSHOT_HISTORY   — prior versions kept for deltas, per
+                                    document (default 24; 0 = no deltas)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Callable, List, NamedTuple, Optional
+
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from sam.caching import BucketedTTLCache, BucketSpec
+
+logger = logging.getLogger(__name__)
+
+_CACHE = BucketedTTLCache('snapshots', 'snapshots', {
+    'default': BucketSpec(
+        name='provisioning_snapshots',
+        ttl_key='PROVISIONING_SNAPSHOT_TTL', ttl_default=86400,           # 1 day
+        size_key='PROVISIONING_SNAPSHOT_SIZE', size_default=512,
+        soft_ttl_key='PROVISIONING_SNAPSHOT_SOFT_TTL', soft_ttl_default=900,
+    ),
+})
+
+#: Test seam, matching the fs-scans / jobs idiom.
+_adapters = _CACHE._adapters
+
+#: Every snapshot document, for ``invalidate_snapshots()``.
+DOCUMENTS = ('directory_access', 'project_access',
+             'fstree', 'fstree_projects', 'fstree_users')
+
+#: Tables the documents are built from. A commit writing any of them
+#: invalidates every document (they overlap too much to be finer).
+_SOURCE_TABLES = frozenset({
+    'access_branch', 'access_branch_resource', 'account', 'account_user',
+    'adhoc_group', 'adhoc_group_tag', 'adhoc_system_account_entry',
+    'allocation', 'allocation_type', 'charge_adjustment', 'facility',
+    'facility_resource', 'institution', 'organization', 'panel', 'phone',
+    'phone_type', 'project', 'resource_shell', 'resource_type', 'resources',
+    'user_institution', 'user_organization', 'user_resource_home',
+    'user_resource_shell', 'users',
+})
+
+
+class Snapshot(NamedTuple):
+    """One materialised document. Module-level so it pickles into Redis."""
+
+    body: bytes             # the JSON response body
+    etag: str               # content hash of ``body``
+    version: int            # bumped each time ``etag`` changes
+    built_at: float         # wall clock when the build *started*
+    found: bool             # False: the filter matched nothing (→ 404)
+
+
+def _stamp_key(document: str) -> tuple:
+    return ('invalidated', document)
+
+
+def _invalidated_at(document: str) -> float:
+    return _CACHE.peek('default', _stamp_key(document), 0.0)
+
+
+def _history_key(document: str, param: Optional[str], etag: str) -> tuple:
+    return ('history', document, param, etag)
+
+
+def _retained_key(document: str, param: Optional[str]) -> tuple:
+    """The ETags of *document*'s retained bodies, oldest first."""
+    return ('history', document, param)
+
+
+def _retain(document: str, param: Optional[str], previous: Snapshot) -> None:
+    """Keep *previous*'s body for deltas; drop the ones that age out."""
+    history = int(current_app.config.get('PROVISIONING_SNAPSHOT_HISTORY', 24))
+    adapter = _CACHE.adapter('default')
+    if adapter is None or history <= 0:
+        return
+    with adapter.lock:
+        retained = [etag for etag in adapter.get(_retained_key(document, param), ())
+                    if etag != previous.etag]
+        retained.append(previous.etag)
+        for etag in retained[:-history]:
+            adapter.pop(_history_key(document, param, etag), None)
+        try:
+            adapter[_history_key(document, param, previous.etag)] = previous.body
+            adapter[_retained_key(document, param)] = tuple(retained[-history:])
+        except ValueError:
+            pass                            # full; deltas fall back to full
+
+
+def _materialize(document: str, param: Optional[str], build: Callable[[], Any],
+                 found: Optional[Callable[[Any], bool]]) -> Snapshot:
+    started = time.time()
+    data = build()
+    body = current_app.json.response(data).get_data()
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    previous = _CACHE.peek('default', (document, param))
+    version = 1
+    if previous is not None:
+        version = previous.version
+        if previous.etag != etag:
+            version += 1
+            _retain(document, param, previous)
+    return Snapshot(body, etag, version, started,
+                    found(data) if found is not None else True)
+
+
+def get_snapshot(document: str, param: Optional[str], build: Callable[[], Any], *,
+                 found: Optional[Callable[[Any], bool]] = None) -> Snapshot:
+    """The current snapshot of *document* (filtered by *param*, e.g. a branch).
+
+    *build* returns the document as a JSON-able value. It runs on a miss and
+    on background rebuilds — the latter inside a fresh app context, so it
+    must reach the database through ``db.session``, not a captured session.
+    *found* decides, at build time, whether the document counts as present.
+    """
+    compute = partial(_materialize, document, param, build, found)
+    snapshot = _CACHE.get_or_compute('default', (document, param), compute,
+                                     refresh=compute)
+    if snapshot.built_at < _invalidated_at(document):
+        _CACHE.schedule_refresh('default', (document, param), compute)
+    return snapshot
+
+
+def invalidate_snapshots(*documents: str) -> None:
+    """Mark *documents* (default: all) for a background rebuild.
+
+    Current snapshots keep being served until their rebuilds land.
+    """
+    adapter = _CACHE.adapter('default')
+    if adapter is None:
+        return
+    now = time.time()
+    with adapter.lock:
+        for document in documents or DOCUMENTS:
+            try:
+                adapter[_stamp_key(document)] = now
+            except ValueError:
+                logger.warning('Snapshots: cache full, could not invalidate %s',
+                               document)
+
+
+# ---------------------------------------------------------------------------
+# Responses
+# ---------------------------------------------------------------------------
+
+_PARSED: 'OrderedDict[str, Any]' = OrderedDict()
+_PARSED_MAX = 8
+_PARSED_LOCK = threading.Lock()
+
+
+def snapshot_data(snapshot: Snapshot) -> Any:
+    """The snapshot's document, parsed; memoised per ETag in this worker."""
+    with _PARSED_LOCK:
+        if snapshot.etag in _PARSED:
+            _PARSED.move_to_end(snapshot.etag)
+            return _PARSED[snapshot.etag]
+    data = json.loads(snapshot.body)
+    with _PARSED_LOCK:
+        _PARSED[snapshot.etag] = data
+        while len(_PARSED) > _PARSED_MAX:
+            _PARSED.popitem(last=False)
+    return data
+
+
+def snapshot_response(snapshot: Snapshot, *, item: Optional[str] = None,
+                      select: Optional[Callable[[Any], Any]] = None):
+    """Serve *snapshot*, or a 304 when the client's ``If-None-Match`` is current.
+
+    For an item endpoint, *select* picks the item out of the parsed document
+    (and may ``abort(404)``); *item* names it, so its ETag is the document's
+    plus the name. A matching ETag means the document — hence the item — is
+    unchanged, so neither is looked at.
+    """
+    etag = snapshot.etag if item is None else f'{snapshot.etag}.{item}'
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    elif select is None:
+        response = current_app.response_class(snapshot.body,
+                                              mimetype='application/json')
+    else:
+        response = current_app.json.response(select(snapshot_data(snapshot)))
+    response.set_etag(etag)
+    response.headers['X-Snapshot-Version'] = str(snapshot.version)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def delta_response(document: str, param: Optional[str], snapshot: Snapshot,
+                   since: Optional[str], delta: Callable[[Any, Any], dict]):
+    """Serve the changes to *document* since the body whose ETag is *since*.
+
+    *delta(old, new)* builds the change document from two parsed versions.
+    The body is that plus ``since``, ``etag`` (the base for the next poll)
+    and ``version``; when the *since* body is not retained (or *since* is
+    not an ETag at all) the full snapshot is served instead.
+    ``X-Snapshot-Delta`` says which (``delta`` / ``full``).
+    """
+    since = (since or '').strip().strip('"') or None
+    base = None
+    if since == snapshot.etag:
+        base = snapshot.body
+    elif since is not None:
+        base = _CACHE.peek('default', _history_key(document, param, since))
+    if base is None:
+        response = snapshot_response(snapshot)
+        response.headers['X-Snapshot-Delta'] = 'full'
+        return response
+
+    etag = f'{snapshot.etag}.since-{since}'
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        changes = delta(json.loads(base), snapshot_data(snapshot))
+        response = current_app.json.response(
+            {'since': since, 'etag': snapshot.etag, 'version': snapshot.version,
+             **changes})
+    response.set_etag(etag)
+    response.headers['X-Snapshot-Version'] = str(snapshot.version)
+    response.headers['X-Snapshot-Delta'] = 'delta'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+# ---------------------------------------------------------------------------
+# Write hooks: invalidate after commits that touch the source tables
+# ---------------------------------------------------------------------------
+
+_TOUCHED = 'provisioning_snapshots_touched'
+
+
+@event.listens_for(Session, 'after_flush')
+def _note_source_writes(session, flush_context):
+    if session.info.get(_TOUCHED):
+        return
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if getattr(type(obj), '__tablename__', None) in _SOURCE_TABLES:
+            session.info[_TOUCHED] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_after_commit(session):
+    if session.info.pop(_TOUCHED, False):
+        try:
+            invalidate_snapshots()
+        except Exception as exc:            # never fail the commit over this
+            logger.warning('Snapshots: invalidation failed (%s)', exc)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_source_writes(session):
+    session.info.pop(_TOUCHED, None)
+
+
+# ---------------------------------------------------------------------------
+# Admin / facade hooks
+# ---------------------------------------------------------------------------
+
+def purge_snapshots() -> int:
+    """Drop every snapshot. Returns the number of entries cleared."""
+    return _CACHE.purge()
+
+
+def snapshots_info() -> List[dict]:
+    """CacheBase ``info()`` dicts for the Admin card."""
+    return _CACHE.info()
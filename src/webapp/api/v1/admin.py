@@ -64,4 +64,8 @@ def refresh_cache():
     if category is not None and category not in valid:
         abort(400, f"Invalid category {category!r}; "
                    f"must be one of {sorted(valid)}")
-    return jsonify({'status': 'ok', 'cleared': caching.clear(category)})
+    cleared = caching.clear(category)
+    if category in (None, 'chart'):
+        from webapp.dashboards.charts.warm import chart_warmer
+        chart_warmer.request_warm('purge')
+    return jsonify({'status': 'ok', 'cleared': cleared})
@@ -257,6 +257,9 @@ def _handle_charge_summary_post(schema, upsert_fn, output_schema_cls):
         db.session.rollback()
         return jsonify({'error': f'Internal error: {str(e)}'}), 500
 
+    from webapp.dashboards.charts.warm import chart_warmer
+    chart_warmer.request_warm('charges')
+
     status_code = 201 if action == 'created' else 200
     return jsonify({
         'success': True,
@@ -9,19 +9,33 @@ Example usage:
     GET /api/v1/directory_access/          — all access branches
     GET /api/v1/directory_access/hpc       — single branch
     GET /api/v1/directory_access/hpc-data  — single branch
-    POST /api/v1/directory_access/refresh  — invalidate cache
+    GET /api/v1/directory_access/?since=<etag>  — changes since that snapshot
+    POST /api/v1/directory_access/refresh  — rebuild the snapshots
+
+Responses are versioned snapshots (see ``webapp.api.snapshots``): send the
+last ``ETag`` back as ``If-None-Match`` and an unchanged document is a 304.
+With ``?since=<ETag>`` only the groups and accounts added, changed or
+removed since that snapshot are returned (``X-Snapshot-Delta: delta``;
+the body's ``etag`` is the next base), or the full document (``full``) if
+that snapshot is no longer retained.
 """
 
-from flask import Blueprint, jsonify, abort
+from flask import Blueprint, jsonify, abort, request
 from webapp.utils.rbac import Permission
 from webapp.utils.api_auth import login_or_token_required
-from webapp.extensions import db, cache, csrf
-from webapp.caching import caching
+from webapp.extensions import db, csrf
 from webapp.api.helpers import register_error_handlers
+from webapp.api.snapshots import (
+    delta_response,
+    get_snapshot,
+    invalidate_snapshots,
+    snapshot_response,
+)
 from sam.queries.directory_access import (
     group_populator,
     user_populator,
     build_directory_access_response,
+    build_directory_access_delta,
     ACCESS_GRACE_PERIOD,
 )
 
@@ -42,27 +56,42 @@ def _build_response(access_branch: str | None = None) -> dict:
     return build_directory_access_response(branch_groups, branch_accounts)
 
 
+def _snapshot(access_branch: str | None = None):
+    return get_snapshot('directory_access', access_branch,
+                        lambda: _build_response(access_branch=access_branch),
+                        found=lambda result: bool(result['accessBranchDirectories']))
+
+
+def _respond(snapshot, access_branch: str | None = None):
+    if 'since' in request.args:
+        return delta_response('directory_access', access_branch, snapshot,
+                              request.args.get('since'),
+                              build_directory_access_delta)
+    return snapshot_response(snapshot)
+
+
 # ---------------------------------------------------------------------------
 # Routes
 # ---------------------------------------------------------------------------
 
 @bp.route('/', methods=['GET'])
 @login_or_token_required(Permission.VIEW_USERS)
-@cache.cached(query_string=True)
 def get_directory_access():
     """
     Return the full directory access data for all access branches.
 
+    Optional query parameter:
+        since: ETag of the snapshot to return changes from (see module docstring).
+
     Returns:
         JSON with "accessBranchDirectories" list, each containing
         "accessBranchName", "unixGroups", and "unixAccounts".
     """
-    return jsonify(_build_response())
+    return _respond(_snapshot())
 
 
 @bp.route('/<access_branch_name>', methods=['GET'])
 @login_or_token_required(Permission.VIEW_USERS)
-@cache.cached(query_string=True)
 def get_directory_access_branch(access_branch_name: str):
     """
     Return directory access data for a single access branch.
@@ -70,14 +99,17 @@ def get_directory_access_branch(access_branch_name: str):
     Args:
         access_branch_name: Name of the access branch (e.g. "hpc", "hpc-data")
 
+    Optional query parameter:
+        since: ETag of the snapshot to return changes from (see module docstring).
+
     Returns:
         JSON with "accessBranchDirectories" list containing a single branch entry.
         404 if the access branch has no groups or accounts.
     """
-    result = _build_response(access_branch=access_branch_name)
-    if not result['accessBranchDirectories']:
+    snapshot = _snapshot(access_branch_name)
+    if not snapshot.found:
         abort(404, f'Access branch {access_branch_name!r} not found or has no data')
-    return jsonify(result)
+    return _respond(snapshot, access_branch_name)
 
 
 @bp.route('/refresh', methods=['POST'])
@@ -87,15 +119,13 @@ def get_directory_access_branch(access_branch_name: str):
 @login_or_token_required(Permission.VIEW_USERS)
 def refresh_cache():
     """
-    Invalidate the directory access cache.
+    Mark the directory access snapshots for rebuilding.
 
-    Forces the next GET request to recompute from the database.
+    The rebuild runs in the background on the next GET; until it lands,
+    GETs keep getting the current snapshot.
 
     Returns:
         JSON with {"status": "ok"}
     """
-    cache.delete_memoized(get_directory_access)
-    cache.delete_memoized(get_directory_access_branch)
-    # Also clear any cached versions by key pattern
-    caching.clear('flask')
+    invalidate_snapshots('directory_access')
     return jsonify({'status': 'ok'})
@@ -9,7 +9,7 @@ Example usage:
     GET /api/v1/fstree_access/              — all HPC+DAV resources
     GET /api/v1/fstree_access/Derecho       — single resource
     GET /api/v1/fstree_access/Derecho%20GPU — resource with space (URL-encoded)
-    POST /api/v1/fstree_access/refresh      — invalidate cache
+    POST /api/v1/fstree_access/refresh      — rebuild the snapshots
 
     GET /api/v1/fstree_access/projects/                      — all projects (project-keyed view)
     GET /api/v1/fstree_access/projects/SCSG0001              — single project
@@ -20,6 +20,14 @@ Example usage:
     GET /api/v1/fstree_access/users/benkirk                  — single user
     GET /api/v1/fstree_access/users/?resource=Derecho        — filtered by resource
     GET /api/v1/fstree_access/users/benkirk?resource=Derecho
+    GET /api/v1/fstree_access/users/?since=<etag>            — changes since that snapshot
+
+Responses are versioned snapshots (see ``webapp.api.snapshots``): send the
+last ``ETag`` back as ``If-None-Match`` and an unchanged document is a 304.
+The project- and user-keyed views also take ``?since=<ETag>`` and then
+return only the entries added, changed or removed since that snapshot
+(``X-Snapshot-Delta: delta``; the body's ``etag`` is the next base), or the
+full view (``full``) if that snapshot is no longer retained.
 
 Response format (partial):
     {
@@ -66,35 +74,55 @@ Response format (partial):
 from flask import Blueprint, jsonify, abort, request
 from webapp.utils.rbac import Permission
 from webapp.utils.api_auth import login_or_token_required
-from webapp.extensions import db, cache, csrf
-from webapp.caching import caching
+from webapp.extensions import db, csrf
 from webapp.api.helpers import register_error_handlers
-from sam.queries.fstree_access import get_fstree_data, get_project_fsdata, get_user_fsdata
+from webapp.api.snapshots import (
+    delta_response,
+    get_snapshot,
+    invalidate_snapshots,
+    snapshot_response,
+)
+from sam.queries.fstree_access import (
+    build_fsdata_delta,
+    get_fstree_data,
+    get_project_fsdata,
+    get_user_fsdata,
+)
 
 bp = Blueprint('api_fstree_access', __name__)
 register_error_handlers(bp)
 
 
 # ---------------------------------------------------------------------------
-# Memoized query wrappers
-# (keyed on resource_name so all item endpoints share one cached computation
-#  per resource filter — @cache.memoize differs from @cache.cached in that it
-#  keys on function arguments rather than the request URL)
+# Snapshots
+# (keyed on resource_name so all item endpoints share one snapshot per
+#  resource filter; the item endpoints pick their entry out of it)
 # ---------------------------------------------------------------------------
 
-@cache.memoize()
-def _fstree_data(resource_name=None):
-    return get_fstree_data(db.session, resource_name=resource_name)
+_FSTREE_DOCUMENTS = ('fstree', 'fstree_projects', 'fstree_users')
+
+
+def _fstree_snapshot(resource_name=None):
+    return get_snapshot('fstree', resource_name,
+                        lambda: get_fstree_data(db.session, resource_name=resource_name),
+                        found=lambda result: bool(result.get('facilities')))
+
+
+def _project_fstree_snapshot(resource_name=None):
+    return get_snapshot('fstree_projects', resource_name,
+                        lambda: get_project_fsdata(db.session, resource_name=resource_name))
 
 
-@cache.memoize()
-def _project_fstree_data(resource_name=None):
-    return get_project_fsdata(db.session, resource_name=resource_name)
+def _user_fstree_snapshot(resource_name=None):
+    return get_snapshot('fstree_users', resource_name,
+                        lambda: get_user_fsdata(db.session, resource_name=resource_name))
 
 
-@cache.memoize()
-def _user_fstree_data(resource_name=None):
-    return get_user_fsdata(db.session, resource_name=resource_name)
+def _keyed_view_response(document, snapshot, resource_name):
+    if 'since' in request.args:
+        return delta_response(document, resource_name, snapshot,
+                              request.args.get('since'), build_fsdata_delta)
+    return snapshot_response(snapshot)
 
 
 # ---------------------------------------------------------------------------
@@ -103,7 +131,6 @@ def _user_fstree_data(resource_name=None):
 
 @bp.route('/', methods=['GET'])
 @login_or_token_required(Permission.VIEW_PROJECTS)
-@cache.cached(query_string=True)
 def get_fstree():
     """
     Return the fairshare tree for all HPC+DAV resources.
@@ -116,12 +143,11 @@ def get_fstree():
         project hierarchy; allocation amounts are raw per-project values,
         not deduplicated across a tree.
     """
-    return jsonify(_fstree_data())
+    return snapshot_response(_fstree_snapshot())
 
 
 @bp.route('/<path:resource_name>', methods=['GET'])
 @login_or_token_required(Permission.VIEW_PROJECTS)
-@cache.cached(query_string=True)
 def get_fstree_resource(resource_name: str):
     """
     Return the fairshare tree filtered to a single resource.
@@ -136,21 +162,21 @@ def get_fstree_resource(resource_name: str):
         only entries for the specified resource.
         404 if the resource name is not recognized or has no data.
     """
-    result = _fstree_data(resource_name)
-    if not result.get('facilities'):
+    snapshot = _fstree_snapshot(resource_name)
+    if not snapshot.found:
         abort(404, f'Resource {resource_name!r} not found or has no fairshare data')
-    return jsonify(result)
+    return snapshot_response(snapshot)
 
 
 @bp.route('/projects/', methods=['GET'])
 @login_or_token_required(Permission.VIEW_PROJECTS)
-@cache.cached(query_string=True)
 def get_project_fstree():
     """
     Return fairshare data reorganized by project code.
 
-    Optional query parameter:
+    Optional query parameters:
         resource: Filter to a single resource (e.g. ``?resource=Derecho``).
+        since:    ETag of the snapshot to return changes from (see module docstring).
 
     Returns:
         JSON with "name" (``"projectFairShareData"``) and "projects" keys.
@@ -158,12 +184,12 @@ def get_project_fstree():
         allocationTypeDescription, and resources (sorted by name).
     """
     resource_name = request.args.get('resource')
-    return jsonify(_project_fstree_data(resource_name))
+    return _keyed_view_response('fstree_projects',
+                                _project_fstree_snapshot(resource_name), resource_name)
 
 
 @bp.route('/projects/<projcode>', methods=['GET'])
 @login_or_token_required(Permission.VIEW_PROJECTS)
-@cache.cached(query_string=True)
 def get_project_fstree_item(projcode: str):
     """
     Return fairshare data for a single project.
@@ -178,35 +204,38 @@ def get_project_fstree_item(projcode: str):
         JSON dict keyed by projcode with the project's fairshare entry.
         404 if the project is not found in the fairshare data.
     """
+    def select(result):
+        proj = result['projects'].get(projcode)
+        if proj is None:
+            abort(404, f'Project {projcode!r} not found in fairshare data')
+        return {projcode: proj}
+
     resource_name = request.args.get('resource')
-    result = _project_fstree_data(resource_name)
-    proj = result['projects'].get(projcode)
-    if proj is None:
-        abort(404, f'Project {projcode!r} not found in fairshare data')
-    return jsonify({projcode: proj})
+    return snapshot_response(_project_fstree_snapshot(resource_name),
+                             item=projcode, select=select)
 
 
 @bp.route('/users/', methods=['GET'])
 @login_or_token_required(Permission.VIEW_PROJECTS)
-@cache.cached(query_string=True)
 def get_user_fstree():
     """
     Return fairshare data reorganized by username.
 
-    Optional query parameter:
+    Optional query parameters:
         resource: Filter to a single resource (e.g. ``?resource=Derecho``).
+        since:    ETag of the snapshot to return changes from (see module docstring).
 
     Returns:
         JSON with "name" (``"userFairShareData"``) and "users" keys.
         Each user entry contains uid and projects (keyed by projcode).
     """
     resource_name = request.args.get('resource')
-    return jsonify(_user_fstree_data(resource_name))
+    return _keyed_view_response('fstree_users',
+                                _user_fstree_snapshot(resource_name), resource_name)
 
 
 @bp.route('/users/<username>', methods=['GET'])
 @login_or_token_required(Permission.VIEW_PROJECTS)
-@cache.cached(query_string=True)
 def get_user_fstree_item(username: str):
     """
     Return fairshare data for a single user.
@@ -221,12 +250,15 @@ def get_user_fstree_item(username: str):
         JSON dict keyed by username with the user's fairshare entry.
         404 if the user has no active allocations in the fairshare data.
     """
+    def select(result):
+        user = result['users'].get(username)
+        if user is None:
+            abort(404, f'User {username!r} not found in fairshare data')
+        return {username: user}
+
     resource_name = request.args.get('resource')
-    result = _user_fstree_data(resource_name)
-    user = result['users'].get(username)
-    if user is None:
-        abort(404, f'User {username!r} not found in fairshare data')
-    return jsonify({username: user})
+    return snapshot_response(_user_fstree_snapshot(resource_name),
+                             item=username, select=select)
 
 
 @bp.route('/refresh', methods=['POST'])
@@ -236,21 +268,13 @@ def get_user_fstree_item(username: str):
 @login_or_token_required(Permission.VIEW_PROJECTS)
 def refresh_cache():
     """
-    Invalidate the fairshare tree cache.
+    Mark the fairshare tree snapshots for rebuilding.
 
-    Forces the next GET request to recompute from the database.
+    The rebuild runs in the background on the next GET; until it lands,
+    GETs keep getting the current snapshot.
 
     Returns:
         JSON with {"status": "ok"}
     """
-    cache.delete_memoized(get_fstree)
-    cache.delete_memoized(get_fstree_resource)
-    cache.delete_memoized(get_project_fstree)
-    cache.delete_memoized(get_project_fstree_item)
-    cache.delete_memoized(get_user_fstree)
-    cache.delete_memoized(get_user_fstree_item)
-    cache.delete_memoized(_fstree_data)
-    cache.delete_memoized(_project_fstree_data)
-    cache.delete_memoized(_user_fstree_data)
-    caching.clear('flask')
+    invalidate_snapshots(*_FSTREE_DOCUMENTS)
     return jsonify({'status': 'ok'})
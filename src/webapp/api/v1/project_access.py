@@ -9,7 +9,10 @@ Example usage:
     GET /api/v1/project_access/           — all access branches
     GET /api/v1/project_access/hpc        — single branch
     GET /api/v1/project_access/hpc-data   — single branch
-    POST /api/v1/project_access/refresh   — invalidate cache
+    POST /api/v1/project_access/refresh   — rebuild the snapshots
+
+Responses are versioned snapshots (see ``webapp.api.snapshots``): send the
+last ``ETag`` back as ``If-None-Match`` and an unchanged document is a 304.
 
 Response format (all-branches):
     {
@@ -36,22 +39,30 @@ Response format (all-branches):
 from flask import Blueprint, jsonify, abort
 from webapp.utils.rbac import Permission
 from webapp.utils.api_auth import login_or_token_required
-from webapp.extensions import db, cache, csrf
-from webapp.caching import caching
+from webapp.extensions import db, csrf
 from webapp.api.helpers import register_error_handlers
+from webapp.api.snapshots import get_snapshot, invalidate_snapshots, snapshot_response
 from sam.queries.project_access import get_project_group_status, ACCESS_GRACE_PERIOD
 
 bp = Blueprint('api_project_access', __name__)
 register_error_handlers(bp)
 
 
+def _snapshot(access_branch: str | None = None):
+    return get_snapshot(
+        'project_access', access_branch,
+        lambda: get_project_group_status(db.session, access_branch=access_branch,
+                                         grace_period_days=ACCESS_GRACE_PERIOD),
+        found=bool,
+    )
+
+
 # ---------------------------------------------------------------------------
 # Routes
 # ---------------------------------------------------------------------------
 
 @bp.route('/', methods=['GET'])
 @login_or_token_required(Permission.VIEW_PROJECTS)
-@cache.cached(query_string=True)
 def get_project_access():
     """
     Return project group status for all access branches.
@@ -61,13 +72,11 @@ def get_project_access():
         group status objects containing groupName, panel, autoRenewing,
         projectActive, status, expiration, and resourceGroupStatuses.
     """
-    return jsonify(get_project_group_status(db.session,
-                                            grace_period_days=ACCESS_GRACE_PERIOD))
+    return snapshot_response(_snapshot())
 
 
 @bp.route('/<access_branch_name>', methods=['GET'])
 @login_or_token_required(Permission.VIEW_PROJECTS)
-@cache.cached(query_string=True)
 def get_project_access_branch(access_branch_name: str):
     """
     Return project group status for a single access branch.
@@ -79,12 +88,10 @@ def get_project_access_branch(access_branch_name: str):
         JSON dict with a single key matching the branch name.
         404 if the access branch has no data.
     """
-    result = get_project_group_status(db.session,
-                                      access_branch=access_branch_name,
-                                      grace_period_days=ACCESS_GRACE_PERIOD)
-    if not result:
+    snapshot = _snapshot(access_branch_name)
+    if not snapshot.found:
         abort(404, f'Access branch {access_branch_name!r} not found or has no data')
-    return jsonify(result)
+    return snapshot_response(snapshot)
 
 
 @bp.route('/refresh', methods=['POST'])
@@ -94,14 +101,13 @@ def get_project_access_branch(access_branch_name: str):
 @login_or_token_required(Permission.VIEW_PROJECTS)
 def refresh_cache():
     """
-    Invalidate the project access cache.
+    Mark the project access snapshots for rebuilding.
 
-    Forces the next GET request to recompute from the database.
+    The rebuild runs in the background on the next GET; until it lands,
+    GETs keep getting the current snapshot.
 
     Returns:
         JSON with {"status": "ok"}
     """
-    cache.delete_memoized(get_project_access)
-    cache.delete_memoized(get_project_access_branch)
-    caching.clear('flask')
+    invalidate_snapshots('project_access')
     return jsonify({'status': 'ok'})
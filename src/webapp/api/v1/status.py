@@ -9,6 +9,10 @@ POST endpoints (data ingestion, requires MANAGE_SYSTEM_STATUS permission):
     POST /api/v1/status/jupyterhub
     POST /api/v1/status/outage
 
+The collector ingest endpoints accept ``Content-Encoding: gzip`` or ``zstd``
+bodies, and derecho/casper also accept delta payloads against the last
+accepted snapshot (see ``system_status.delta``).
+
 GET endpoints (status retrieval, public with login):
     GET /api/v1/status/derecho/latest
     GET /api/v1/status/casper/latest
@@ -17,12 +21,19 @@ GET endpoints (status retrieval, public with login):
     GET /api/v1/status/reservations
 """
 
-from flask import Blueprint, jsonify, request
+import copy
+import json
+import secrets
+import time
+import zlib
+
+from flask import Blueprint, current_app, jsonify, request
 from flask_login import login_required
 from webapp.utils.rbac import require_permission, Permission
 from webapp.utils.api_auth import api_key_required
 from webapp.api.helpers import register_error_handlers
 from webapp.extensions import db, csrf
+from webapp.caching import caching
 from datetime import datetime
 from system_status.timeutil import utcnow_naive  # status timestamps are naive-UTC
 import sys
@@ -43,15 +54,27 @@ from system_status import (
     System,
 )
 from system_status.schemas.status import (
-    DerechoStatusSchema,
+    DerechoStatusSchema, DerechoStatusBulkSchema,
 
-    CasperStatusSchema, CasperNodeTypeSchema,
+    CasperStatusSchema, CasperStatusBulkSchema, CasperNodeTypeSchema,
     JupyterHubStatusSchema,
     LoginNodeSchema,
     QueueSchema,
     FilesystemSchema,
     SystemOutageSchema, ResourceReservationSchema,
 )
+from system_status.queries.history import fold_snapshot
+from system_status.delta import (
+    BASE_FIELD as DELTA_BASE_FIELD,
+    DeltaBaseMismatch,
+    SnapshotStore,
+    expand_delta,
+)
+
+try:
+    import zstandard
+except ImportError:  # optional: zstd bodies are refused with 415 without it
+    zstandard = None
 
 bp = Blueprint('api_status', __name__)
 register_error_handlers(bp)
@@ -61,6 +84,88 @@ register_error_handlers(bp)
 # Helper Functions
 # ============================================================================
 
+class _BodyError(Exception):
+    """Request body that cannot be decoded; carries the HTTP status."""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+def _decompress_body(raw, encoding, limit):
+    """Undo a gzip/zstd Content-Encoding, refusing output beyond ``limit`` bytes."""
+    if encoding == 'gzip':
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        try:
+            body = decoder.decompress(raw, limit + 1)
+        except zlib.error as e:
+            raise _BodyError(f'Corrupt gzip body: {e}', 400)
+        if len(body) > limit:
+            raise _BodyError(f'Decoded body exceeds {limit} bytes', 413)
+        if not decoder.eof:
+            raise _BodyError('Truncated gzip body', 400)
+        return body
+
+    if encoding == 'zstd':
+        if zstandard is None:
+            raise _BodyError('zstd bodies are not supported by this server', 415)
+        chunks, size = [], 0
+        try:
+            with zstandard.ZstdDecompressor().stream_reader(raw) as reader:
+                while chunk := reader.read(1 << 20):
+                    size += len(chunk)
+                    if size > limit:
+                        raise _BodyError(f'Decoded body exceeds {limit} bytes', 413)
+                    chunks.append(chunk)
+        except zstandard.ZstdError as e:
+            raise _BodyError(f'Corrupt zstd body: {e}', 400)
+        return b''.join(chunks)
+
+    raise _BodyError(f'Unsupported Content-Encoding: {encoding}', 415)
+
+
+def _request_json():
+    """
+    Parse the request's JSON body, honouring a gzip/zstd Content-Encoding.
+
+    An uncompressed body goes through ``request.get_json()`` unchanged.
+
+    Returns:
+        The decoded JSON value
+
+    Raises:
+        _BodyError: Unsupported encoding, corrupt or oversized body
+    """
+    encoding = (request.headers.get('Content-Encoding') or '').strip().lower()
+    if encoding in ('', 'identity'):
+        return request.get_json()
+
+    body = _decompress_body(request.get_data(cache=False), encoding,
+                            current_app.config.get('STATUS_MAX_BODY_BYTES', 64 << 20))
+    try:
+        return json.loads(body)
+    except ValueError as e:
+        raise _BodyError(f'Invalid JSON body: {e}', 400)
+
+
+_SNAPSHOT_STORE_EXT = 'status_delta_store'
+
+
+def _snapshots():
+    """The app's ``SnapshotStore``: Redis-backed when the caches are.
+
+    Kept in ``app.extensions`` rather than at module level, so each app
+    (tests build several) gets its own config and Redis client.
+    """
+    store = current_app.extensions.get(_SNAPSHOT_STORE_EXT)
+    if store is None:
+        store = current_app.extensions.setdefault(_SNAPSHOT_STORE_EXT, SnapshotStore(
+            client=caching.redis_client,
+            ttl=current_app.config.get('STATUS_DELTA_BASE_TTL', 3600),
+        ))
+    return store
+
+
 def _validate_timestamp(data):
     """
     Validate and parse timestamp from request data.
@@ -141,27 +246,54 @@ def _handle_reservations(reservations_data, system_name):
     return reservation_ids
 
 
-def _ingest_system_status(system_name, StatusSchema, id_mappers):
+def _ingest_system_status(system_name, StatusSchema, BulkSchema, id_mappers):
     """
     Generic helper to ingest system status for Derecho and Casper.
 
+    With ``STATUS_BULK_INGEST`` set, the tick is validated by ``BulkSchema``
+    and written with multi-row INSERTs (``system_status.queries.bulk_ingest``)
+    instead of through ORM objects. Either way the response carries
+    ``ingest_ms``, the wall time from parsed body to commit, which is also
+    logged per tick.
+
     Args:
         system_name (str): The name of the system (e.g., 'derecho').
         StatusSchema (marshmallow.Schema): The schema for the system status.
+        BulkSchema (marshmallow.Schema): Its plain-dict bulk ingest schema.
         id_mappers (dict): A mapping to extract IDs from nested objects.
 
     Returns:
         Flask Response: JSON response with success or error.
     """
-    data = request.get_json()
+    try:
+        data = _request_json()
+    except _BodyError as e:
+        return jsonify({'error': str(e)}), e.status
     if not data:
         return jsonify({'error': 'JSON body required'}), 400
 
+    # A delta names the snapshot it was computed against; anything but the
+    # last one accepted here is refused so the collector resends in full.
+    if DELTA_BASE_FIELD in data:
+        try:
+            base = _snapshots().get(system_name, str(data[DELTA_BASE_FIELD]))
+        except DeltaBaseMismatch as e:
+            return jsonify({'error': str(e), 'resend_full': True}), 409
+        try:
+            data = expand_delta(base, data)
+        except (AttributeError, TypeError) as e:
+            return jsonify({'error': f'Malformed delta payload: {e}'}), 400
+
+    # Kept as the next delta base; taken before the pops below mutate `data`.
+    snapshot = copy.deepcopy(data)
+
     try:
         timestamp = _validate_timestamp(data)
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
 
+    started = time.perf_counter()
+    bulk = current_app.config.get('STATUS_BULK_INGEST', False)
     try:
         # Extract reservations before loading (handled separately due to upsert logic)
         reservations = data.pop('reservations', [])
@@ -170,35 +302,67 @@ def _ingest_system_status(system_name, StatusSchema, id_mappers):
         # lookup, not stored as snapshot rows — see update_queue_definitions).
         queue_definitions = data.pop('queue_definitions', [])
 
-        # Schema loads EVERYTHING - main status + all nested objects
+        # Collector per-stage wall times (seconds): logged so a slow tick's
+        # critical path is visible server-side, not stored.
+        stage_timings = data.pop('stage_timings', None)
+        if stage_timings:
+            current_app.logger.info('%s collector stage timings: %s',
+                                    system_name, stage_timings)
+
         data['timestamp'] = timestamp
-        schema = StatusSchema()
-        schema.context = {'session': db.session}
-        status_object = schema.load(data)
-
-        # Coalesce per-user/project/queue rows into spans: identical
-        # adjacent ticks UPDATE last_seen instead of inserting duplicates.
-        # Must run before db.session.add() so detached duplicates never
-        # enter the unit of work.
-        from system_status.queries.user_proj_queue_ingest import (
-            coalesce_user_proj_queue_spans,
-        )
-        coalesce_user_proj_queue_spans(db.session, status_object, timestamp)
-
-        # Add to session - all nested objects are already linked
-        db.session.add(status_object)
-        db.session.flush()  # Get IDs for all objects
-
-        # Collect IDs from relationships for response
+        if bulk:
+            # Plain-dict load, cached lookup ids, one INSERT per table.
+            from system_status.queries.bulk_ingest import (
+                ingest_status_bulk, snapshot_child_ids,
+            )
+            status_object = ingest_status_bulk(
+                db.session, system_name, BulkSchema().load(data), timestamp)
+            child_ids = snapshot_child_ids(
+                db.session, system_name, status_object.status_id, id_mappers)
+        else:
+            # Schema loads EVERYTHING - main status + all nested objects
+            schema = StatusSchema()
+            schema.context = {'session': db.session}
+            status_object = schema.load(data)
+
+            # Coalesce per-user/project/queue rows into spans: identical
+            # adjacent ticks UPDATE last_seen instead of inserting duplicates.
+            # Must run before db.session.add() so detached duplicates never
+            # enter the unit of work.
+            from system_status.queries.user_proj_queue_ingest import (
+                coalesce_user_proj_queue_spans,
+            )
+            coalesce_user_proj_queue_spans(db.session, status_object, timestamp)
+
+            # Add to session - all nested objects are already linked
+            db.session.add(status_object)
+            db.session.flush()  # Get IDs for all objects
+
+            # Collect IDs from relationships for response
+            child_ids = {
+                result_key: [getattr(obj, id_attr) for obj in getattr(status_object, object_list_attr)]
+                for result_key, (object_list_attr, id_attr) in id_mappers.items()
+                if hasattr(status_object, object_list_attr)
+            }
+
         result = {
             'success': True,
             'message': f'{system_name.capitalize()} status ingested successfully',
             'status_id': status_object.status_id,
             'timestamp': timestamp.isoformat(),
+            **child_ids,
         }
-        for result_key, (object_list_attr, id_attr) in id_mappers.items():
-            if hasattr(status_object, object_list_attr):
-                result[result_key] = [getattr(obj, id_attr) for obj in getattr(status_object, object_list_attr)]
+
+        # Fold the tick into the hourly/daily history rollups. A SAVEPOINT
+        # keeps a rollup failure (e.g. two collectors racing to create the
+        # same bucket) from losing the snapshot itself; the gap is repaired
+        # by scripts/rebuild_status_rollups.py.
+        try:
+            with db.session.begin_nested():
+                fold_snapshot(db.session, system_name, status_object)
+        except Exception as e:
+            current_app.logger.warning(
+                'History rollup fold failed for %s @ %s: %s', system_name, timestamp, e)
 
         # Handle reservation status if provided
         if reservations:
@@ -212,13 +376,35 @@ def _ingest_system_status(system_name, StatusSchema, id_mappers):
                 db.session, system_name, queue_definitions, timestamp
             )
 
+        # Opaque to the collector; the nonce keeps a token from an earlier
+        # database (restore, test reset) from matching a reused status_id.
+        result['snapshot_token'] = f'{status_object.status_id}.{secrets.token_hex(4)}'
         db.session.commit()
-        return jsonify(result), 201
 
     except Exception as e:
+        # Lookup ids the bulk path learned are staged on the session and
+        # dropped by the rollback; the shared dimension cache never saw them.
         db.session.rollback()
         return jsonify({'error': f'Database error: {str(e)}'}), 500
 
+    result['ingest_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    current_app.logger.info('%s status ingest: %.1f ms (%s path)', system_name,
+                            result['ingest_ms'], 'bulk' if bulk else 'orm')
+
+    # The tick is already committed; a store hiccup only means the
+    # collector's next delta is refused and it resends in full.
+    try:
+        _snapshots().put(system_name, result['snapshot_token'], snapshot)
+    except Exception as e:
+        current_app.logger.warning(
+            'Could not store %s delta base %s: %s', system_name, result['snapshot_token'], e)
+
+    # New tick, new history data: re-render the most-viewed status charts
+    # before their next viewer does.
+    from webapp.dashboards.charts.warm import chart_warmer
+    chart_warmer.request_warm('status')
+    return jsonify(result), 201
+
 
 # ============================================================================
 # POST Endpoints - Data Ingestion
@@ -244,9 +430,14 @@ def ingest_derecho():
         - queue_definitions (optional): qstat -Q roster dicts (upserted onto the queues lookup)
         - filesystems (optional): List of filesystem status dicts
         - reservations (optional): List of reservation dicts
+        - stage_timings (optional): Collector stage wall times in seconds (logged only)
+        - delta_base (optional): snapshot_token this payload is a delta against;
+          list fields may then be {"upsert": [...], "remove": [[key...]]}
 
     Returns:
-        JSON with success status and created record IDs
+        JSON with success status, created record IDs, ingest_ms and the
+        snapshot_token for the next delta (409 with resend_full=true if
+        delta_base is stale)
     """
     id_mappers = {
         'login_node_ids': ('login_nodes', 'login_node_id'),
@@ -257,6 +448,7 @@ def ingest_derecho():
     return _ingest_system_status(
         system_name='derecho',
         StatusSchema=DerechoStatusSchema,
+        BulkSchema=DerechoStatusBulkSchema,
         id_mappers=id_mappers
     )
 
@@ -281,9 +473,14 @@ def ingest_casper():
         - user_project_queues (optional): List of per-user/project/queue rollup dicts
         - queue_definitions (optional): qstat -Q roster dicts (upserted onto the queues lookup)
         - reservations (optional): List of reservation dicts
+        - stage_timings (optional): Collector stage wall times in seconds (logged only)
+        - delta_base (optional): snapshot_token this payload is a delta against;
+          list fields may then be {"upsert": [...], "remove": [[key...]]}
 
     Returns:
-        JSON with success status and created record IDs
+        JSON with success status, created record IDs, ingest_ms and the
+        snapshot_token for the next delta (409 with resend_full=true if
+        delta_base is stale)
     """
     id_mappers = {
         'login_node_ids': ('login_nodes', 'login_node_id'),
@@ -295,6 +492,7 @@ def ingest_casper():
     return _ingest_system_status(
         system_name='casper',
         StatusSchema=CasperStatusSchema,
+        BulkSchema=CasperStatusBulkSchema,
         id_mappers=id_mappers
     )
 
@@ -317,7 +515,10 @@ def ingest_jupyterhub():
     Returns:
         JSON with success status and created record ID
     """
-    data = request.get_json()
+    try:
+        data = _request_json()
+    except _BodyError as e:
+        return jsonify({'error': str(e)}), e.status
     if not data:
         return jsonify({'error': 'JSON body required'}), 400
 
@@ -326,6 +527,8 @@ def ingest_jupyterhub():
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
 
+    started = time.perf_counter()
+    bulk = current_app.config.get('STATUS_BULK_INGEST', False)
     try:
         # Create main status record using schema
         data['timestamp'] = timestamp
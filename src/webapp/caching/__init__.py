@@ -26,7 +26,7 @@ Decorating a chart-generating function::
 Inspecting all caches (used by the admin Configuration card)::
 
     caching.stats()            # → dict for the template
-    caching.clear('chart')     # category in {'flask','chart','usage','scans','jobs',None}
+    caching.clear('chart')     # category in {'flask','chart','usage','scans','jobs','snapshots',None}
 """
 
 import importlib
@@ -50,6 +50,7 @@ _BUCKETED_CACHE_MODULES = (
     'webapp.disk_scans.cache',
     'webapp.jobs.cache',
     'sam.integration.awards.cache',
+    'webapp.api.snapshots',
 )
 
 
@@ -154,6 +155,11 @@ class Caching:
                                module, exc)
         return registered_caches()
 
+    @property
+    def redis_client(self):
+        """The shared Redis client, or None when running per-worker."""
+        return self._redis_client
+
     @property
     def categories(self) -> tuple:
         """Valid ``clear(category)`` values, in admin-card order."""
@@ -5,6 +5,12 @@ Mirrors `webapp.caching.chart.ChartCache` so the `chart_cached` decorator
 needs no changes. Eviction is Redis-wide (allkeys-lru); per-cache
 `maxsize` is dropped. Hits/misses survive worker rotation because the
 counters live in Redis under `chart:hits:{name}` / `chart:misses:{name}`.
+
+SVGs are text and compress ~5-10x, so values go through the shared
+`sam.caching.codec` layer; raw vs stored byte totals accumulate in
+`chart:bytes:{name}` for the Admin card. Encoded entries carry the codec
+tag byte after the name prefix, so a pre-codec worker (which would
+`.decode()` the compressed bytes as SVG) never reads them.
 """
 
 from collections import namedtuple
@@ -13,6 +19,7 @@ from typing import Any, Callable, Optional
 import redis
 
 from sam.caching import CacheBase
+from sam.caching.codec import MAGIC, Codec, codec_from_env
 
 
 _CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
@@ -27,20 +34,23 @@ class RedisChartCache(CacheBase):
                  name: str,
                  *,
                  client: redis.Redis,
-                 ttl: int = _DEFAULT_TTL):
+                 ttl: int = _DEFAULT_TTL,
+                 codec: Optional[Codec] = None):
         self.name = name
         self._client = client
         self._ttl = int(ttl)
+        self._codec = codec if codec is not None else codec_from_env()
         self._key_prefix = f'chart:{name}:'.encode()
         self._hits_key = f'chart:hits:{name}'.encode()
         self._misses_key = f'chart:misses:{name}'.encode()
+        self._bytes_key = f'chart:bytes:{name}'.encode()
         # Recorded for legacy cache_info() consumers; not enforced.
         self._maxsize = None
 
     # ── helpers ──────────────────────────────────────────────────────────
 
     def _entry_key(self, key: str) -> bytes:
-        return self._key_prefix + key.encode()
+        return self._key_prefix + bytes((MAGIC,)) + key.encode()
 
     def _scan_entries(self):
         return self._client.scan_iter(match=self._key_prefix + b'*', count=200)
@@ -49,18 +59,27 @@ class RedisChartCache(CacheBase):
 
     def get(self, key: str) -> Optional[str]:
         raw = self._client.get(self._entry_key(key))
-        if raw is None:
+        value = None
+        if raw is not None:
+            try:
+                value = self._codec.decode(raw)
+            except Exception:
+                # Newer codec version, a compressor this worker lacks, or a
+                # corrupt value — re-render and overwrite.
+                value = None
+        if value is None:
             self._client.incr(self._misses_key)
             return None
         self._client.incr(self._hits_key)
-        return raw.decode() if isinstance(raw, bytes) else raw
+        return value
 
     def put(self, key: str, value: str) -> None:
-        self._client.set(
-            self._entry_key(key),
-            value.encode() if isinstance(value, str) else value,
-            ex=self._ttl,
-        )
+        payload, raw_size = self._codec.encode(value)
+        pipe = self._client.pipeline(transaction=False)
+        pipe.set(self._entry_key(key), payload, ex=self._ttl)
+        pipe.hincrby(self._bytes_key, 'raw', raw_size)
+        pipe.hincrby(self._bytes_key, 'stored', len(payload))
+        pipe.execute()
 
     def cache_info(self) -> _CacheInfo:
         return _CacheInfo(
@@ -107,7 +126,11 @@ class RedisChartCache(CacheBase):
             'hits':         self._read_counter(self._hits_key),
             'misses':       self._read_counter(self._misses_key),
             'bytes_approx': self.bytes_used(),
-            'extras':       {'backend': 'redis'},
+            'extras':       {
+                'backend':     'redis',
+                'codec':       self._codec.describe(),
+                'bytes_saved': self._bytes_saved(),
+            },
         }
 
     def clear(self) -> int:
@@ -116,7 +139,8 @@ class RedisChartCache(CacheBase):
             for key in list(self._scan_entries()):
                 if self._client.delete(key):
                     n += 1
-            self._client.delete(self._hits_key, self._misses_key)
+            self._client.delete(self._hits_key, self._misses_key,
+                                self._bytes_key)
         except redis.RedisError:
             pass
         return n
@@ -129,6 +153,15 @@ class RedisChartCache(CacheBase):
         except redis.RedisError:
             return 0
 
+    def _bytes_saved(self) -> int:
+        try:
+            raw = self._client.hgetall(self._bytes_key)
+        except redis.RedisError:
+            return 0
+        stats = {k.decode() if isinstance(k, bytes) else k: int(v)
+                 for k, v in raw.items()}
+        return stats.get('raw', 0) - stats.get('stored', 0)
+
     def _read_counter(self, key: bytes) -> int:
         try:
             raw = self._client.get(key)
@@ -34,6 +34,9 @@ class SAMWebappConfig(SAMConfig):
     # refreshes on every lookup (see TestingConfig). See webapp.utils.api_auth.
     API_KEYS_DB_ENABLED = os.getenv('API_KEYS_DB_ENABLED', '1').lower() in ('1', 'true', 'yes')
     API_KEYS_DB_TTL     = int(os.getenv('API_KEYS_DB_TTL', 60))
+    # Successful Basic-Auth verifications remembered (per process) for the same
+    # TTL, so repeat collector posts skip the bcrypt cost. 0 disables.
+    API_KEYS_VERIFY_CACHE_SIZE = int(os.getenv('API_KEYS_VERIFY_CACHE_SIZE', 256))
 
     # Auth provider ('stub' | 'ldap' | 'oidc')
     AUTH_PROVIDER = os.getenv('AUTH_PROVIDER', 'stub')
@@ -74,6 +77,42 @@ class SAMWebappConfig(SAMConfig):
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE  = os.getenv('LOG_FILE', '')       # empty = console only
 
+    # Answer the user / project / contract autocomplete searches from an
+    # in-process n-gram index (sam.search) instead of ILIKE scans. Rows changed
+    # elsewhere are picked up every SEARCH_INDEX_REFRESH seconds; the index is
+    # rebuilt (and its snapshot shared via CACHE_REDIS_URL) every
+    # SEARCH_INDEX_REBUILD seconds.
+    SEARCH_INDEX_ENABLED = os.getenv('SEARCH_INDEX_ENABLED', '0').lower() in ('1', 'true', 'yes')
+    SEARCH_INDEX_REFRESH = int(os.getenv('SEARCH_INDEX_REFRESH', 30))
+    SEARCH_INDEX_REBUILD = int(os.getenv('SEARCH_INDEX_REBUILD', 3600))
+
+    # Draw dashboard charts in CHART_RENDER_POOL_SIZE spawned worker processes
+    # (per gunicorn worker; 0 = in the request thread) so concurrent chart
+    # fragments stop serializing on one interpreter's GIL. A pooled render
+    # that takes over CHART_RENDER_TIMEOUT seconds is redone in-process; each
+    # process is replaced after CHART_RENDER_MAX_TASKS renders.
+    CHART_RENDER_POOL_SIZE = int(os.getenv('CHART_RENDER_POOL_SIZE', 0))
+    CHART_RENDER_TIMEOUT = float(os.getenv('CHART_RENDER_TIMEOUT', 10))
+    CHART_RENDER_MAX_TASKS = int(os.getenv('CHART_RENDER_MAX_TASKS', 200))
+
+    # Write pies, the Usage Trend bars and small stacked areas as SVG directly
+    # (charts/svg.py) instead of through matplotlib; anything else still goes
+    # through matplotlib. Flushing the chart caches after flipping it keeps
+    # the two renderings from mixing on one page.
+    CHART_DIRECT_SVG = os.getenv('CHART_DIRECT_SVG', '0').lower() in ('1', 'true', 'yes')
+
+    # Re-request the CHART_WARM_TOP_N most-viewed chart fragments in the
+    # background after a restart, a cache purge, a status tick or a charge
+    # ingest (charts/warm.py), so the first viewer gets a cache hit. Triggers
+    # within CHART_WARM_DELAY seconds share one run; view counts halve every
+    # CHART_WARM_HALF_LIFE seconds. 0 = off. Replays run as the SAM user_id
+    # CHART_WARM_USER_ID (a read-only service account), never as a viewer;
+    # unset, only fragments open to anonymous requests are warmed.
+    CHART_WARM_TOP_N = int(os.getenv('CHART_WARM_TOP_N', 0))
+    CHART_WARM_DELAY = float(os.getenv('CHART_WARM_DELAY', 30))
+    CHART_WARM_HALF_LIFE = float(os.getenv('CHART_WARM_HALF_LIFE', 86400))
+    CHART_WARM_USER_ID = os.getenv('CHART_WARM_USER_ID') or None
+
     # Google Calendar embed URL (public calendar shown on the Events tab; empty = hidden)
     GOOGLE_CALENDAR_EMBED_URL = os.getenv('GOOGLE_CALENDAR_EMBED_URL', '')
 
@@ -82,6 +121,20 @@ class SAMWebappConfig(SAMConfig):
     # on the status dashboard.
     STATUS_STALE_MINUTES = int(os.getenv('STATUS_STALE_MINUTES', 15))
 
+    # Collector POSTs may be gzip/zstd-compressed; this caps the decoded body
+    # (bytes). Delta POSTs expand against the last accepted snapshot, which is
+    # kept this many seconds (Redis when CACHE_REDIS_URL is set, else per worker).
+    STATUS_MAX_BODY_BYTES = int(os.getenv('STATUS_MAX_BODY_BYTES', 64 * 1024 * 1024))
+    STATUS_DELTA_BASE_TTL = int(os.getenv('STATUS_DELTA_BASE_TTL', 3600))
+
+    # Write derecho/casper ticks with multi-row INSERTs and cached lookup ids
+    # (system_status.queries.bulk_ingest) instead of one ORM object per row.
+    STATUS_BULK_INGEST = os.getenv('STATUS_BULK_INGEST', '0').lower() in ('1', 'true', 'yes')
+
+    # Lookup-table ids (systems, queues, users, ...) are cached per worker and,
+    # with CACHE_REDIS_URL, shared through Redis hashes expiring after this long.
+    STATUS_DIMENSION_CACHE_TTL = int(os.getenv('STATUS_DIMENSION_CACHE_TTL', 86400))
+
     # Content-Security-Policy mode: 'enforce' | 'report-only' | 'off'.
     # The policy itself is generated from webapp.vendor_assets (see
     # webapp/utils/csp.py); with every asset vendored it is essentially
@@ -116,6 +169,9 @@ class SAMWebappConfig(SAMConfig):
     # TTL=0 disables caching; SIZE controls max LRU entries
     ALLOCATION_USAGE_CACHE_TTL  = int(os.getenv('ALLOCATION_USAGE_CACHE_TTL', 3600))   # seconds
     ALLOCATION_USAGE_CACHE_SIZE = int(os.getenv('ALLOCATION_USAGE_CACHE_SIZE', 200))    # max entries
+    # Soft TTL: past it a hit is served stale and refreshed in the background
+    # (0 = off; must be below the TTL to take effect)
+    ALLOCATION_USAGE_CACHE_SOFT_TTL = int(os.getenv('ALLOCATION_USAGE_CACHE_SOFT_TTL', 0))  # seconds
 
     # Award-source lookup cache (sam.integration.awards). Award records are
     # near-immutable, so this sits at the long end of the range like
@@ -129,6 +185,15 @@ class SAMWebappConfig(SAMConfig):
     AWARD_SEARCH_CACHE_TTL  = int(os.getenv('AWARD_SEARCH_CACHE_TTL', 86400))    # 1 day
     AWARD_SEARCH_CACHE_SIZE = int(os.getenv('AWARD_SEARCH_CACHE_SIZE', 256))     # max entries
 
+    # Provisioning API snapshots (webapp.api.snapshots): directory_access,
+    # project_access and fstree_access documents, served with ETags. Past
+    # the soft TTL a snapshot is rebuilt in the background while still served.
+    PROVISIONING_SNAPSHOT_TTL      = int(os.getenv('PROVISIONING_SNAPSHOT_TTL', 86400))     # seconds
+    PROVISIONING_SNAPSHOT_SIZE     = int(os.getenv('PROVISIONING_SNAPSHOT_SIZE', 512))      # max entries
+    PROVISIONING_SNAPSHOT_SOFT_TTL = int(os.getenv('PROVISIONING_SNAPSHOT_SOFT_TTL', 900))  # seconds
+    # Prior versions kept per document for ?since= deltas (0 = always full)
+    PROVISIONING_SNAPSHOT_HISTORY  = int(os.getenv('PROVISIONING_SNAPSHOT_HISTORY', 24))
+
     # hpc-usage-queries plugin (per-job rows on resource-usage detail pages).
     # The plugin owns its own database — typically a per-machine PostgreSQL
     # database (derecho_jobs, casper_jobs) on the shared `csg-postgres` cluster.
@@ -222,6 +287,14 @@ class SAMWebappConfig(SAMConfig):
         if name.strip() and db.strip()
     }
 
+    # Post-scan cache warmer (webapp.disk_scans.warm): every INTERVAL seconds
+    # each worker checks for collections with a new scan and precomputes the
+    # Filesystem Scans card for the projects on them, WORKERS scopes at a
+    # time. 0 leaves the background check off (`sam-admin cache --warm-scans`
+    # still runs it by hand).
+    FS_SCANS_WARM_INTERVAL = int(os.getenv('FS_SCANS_WARM_INTERVAL', 0))   # seconds
+    FS_SCANS_WARM_WORKERS  = int(os.getenv('FS_SCANS_WARM_WORKERS', 2))
+
     # Session cookies (common defaults; subclasses tighten for prod)
     SESSION_COOKIE_HTTPONLY    = True
     SESSION_COOKIE_SAMESITE    = 'Lax'
@@ -349,6 +422,11 @@ class TestingConfig(SAMWebappConfig):
     AWARD_SEARCH_CACHE_TTL  = 0
     AWARD_SEARCH_CACHE_SIZE = 0
 
+    # Snapshots would otherwise carry one test's fixture data into the next;
+    # with the bucket off each request builds its document (ETags still work).
+    PROVISIONING_SNAPSHOT_TTL  = 0
+    PROVISIONING_SNAPSHOT_SIZE = 0
+
     # Rate limiting off in tests — xdist parallelism would otherwise trip
     # global limits across worker processes. The one test module that
     # *does* exercise rate limiting (tests/integration/test_rate_limit_flow.py)
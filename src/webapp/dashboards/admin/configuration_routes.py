@@ -28,7 +28,8 @@ from .blueprint import bp
 
 # Categories accepted by caching.clear(); mirrors the JSON API's set
 # (webapp.api.v1.admin). None (omitted) clears everything.
-_VALID_CACHE_CATEGORIES = {'flask', 'chart', 'usage', 'scans', 'jobs', 'awards'}
+_VALID_CACHE_CATEGORIES = {'flask', 'chart', 'usage', 'scans', 'jobs', 'awards',
+                           'snapshots'}
 
 
 @bp.route('/htmx/configuration', methods=['GET'])
@@ -80,6 +81,9 @@ def htmx_clear_cache():
     if category is not None and category not in _VALID_CACHE_CATEGORIES:
         category = None  # ignore a bad param rather than 500 the fragment
     cleared = caching.clear(category)
+    if category in (None, 'chart'):
+        from webapp.dashboards.charts.warm import chart_warmer
+        chart_warmer.request_warm('purge')
     state = gather_runtime_state(current_app, db)
     return render_template(
         'dashboards/admin/fragments/caching_card_body.html',
@@ -10,8 +10,11 @@ and caching are handled internally.
       base.py         BaseChart lifecycle + chart_view (the cache binder)
       theme.py        fonts, rcParams, the Unity palettes, Theme
       layout.py       Layout — the geometry axis
+      pool.py         out-of-process render pool (CHART_RENDER_POOL_SIZE)
+      warm.py         view counts + warm-up of the top fragments (CHART_WARM_TOP_N)
       links.py        drill targets                     [no matplotlib]
       series.py       stacked-band normalization        [no matplotlib]
+      svg.py          direct-SVG backend, simple shapes [no matplotlib]
       jobs_metrics.py plugin-envelope accessors         [no matplotlib]
       pie.py stacked.py histogram.py dualpanel.py pace.py    the families
 
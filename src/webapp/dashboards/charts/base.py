@@ -14,6 +14,8 @@ instead — `links.py` and `series.py` import no matplotlib, enforced by test.
         self.layout/self.theme    resolved, for hooks that run pre-draw
         prepare()                 raw payload -> plot-ready state on self
         is_empty()  -> empty_state()      short-circuit
+        svg.render()  -> SVG              direct-SVG fast path (svg.py), if it can
+        draw_svg()                the rest — here, or in a pool worker (pool.py)
         make_figure(layout)       plt.subplots(figsize=layout.figsize)
         apply_tick_fontsize()     layout.base_fontsize on every Axes
         draw(axes, ...)           REQUIRED — the family draws the marks
@@ -43,8 +45,11 @@ import matplotlib.pyplot as plt
 from sam import fmt
 from webapp.caching import caching
 from webapp.caching.chart import content_hash
+from webapp.dashboards.charts import svg as svg_backend
 from webapp.dashboards.charts.layout import resolve_layout
+from webapp.dashboards.charts.pool import render_pool
 from webapp.dashboards.charts.theme import resolve_theme
+from webapp.dashboards.charts.warm import chart_warmer
 
 
 def fig_to_svg(fig) -> str:
@@ -92,6 +97,11 @@ class BaseChart:
     LAYOUTS: dict = None
 
     # --- rendering defaults ----------------------------------------------
+    #: `svg.py` drawer for this chart's prepared state, or None for matplotlib
+    #: only. A drawer that cannot take a given rendering declines and
+    #: matplotlib draws it instead, so naming one is always safe.
+    direct_svg: str = None
+
     empty_message: str = 'No data available'
     empty_classes: str = ''
 
@@ -343,7 +353,17 @@ class BaseChart:
         self.prepare()
         if self.is_empty():
             return empty_state(self.empty_message, self.empty_classes)
+        svg = svg_backend.render(self)
+        return svg if svg is not None else render_pool.render(self)
+
+    def draw_svg(self) -> str:
+        """The figure half of `render()`: prepared state on `self` -> SVG.
 
+        Split from `render()` at the point where nothing but `self` is needed,
+        so `pool.py` can run it in a worker process on a pickled copy of the
+        prepared chart. Called directly when the pool is off.
+        """
+        lay, thm = self.layout, self.theme
         fig, axes = self.make_figure(lay)
         self.apply_tick_fontsize(axes, lay)
         self.draw(axes, lay, thm)
@@ -396,10 +416,19 @@ def chart_view(cls):
 
     @caching.chart_cached(name=cls.cache_name, maxsize=cls.cache_maxsize,
                           key_fn=_key)
-    @functools.wraps(cls, assigned=('__doc__',), updated=())
-    def view(*args, layout='desktop', theme='light', **kwargs):
+    def cached(*args, layout='desktop', theme='light', **kwargs):
         return cls(*args, **kwargs).render(layout=layout, theme=theme)
 
+    # Outside the cache, so a hit counts as a view too: the warmer ranks
+    # fragments by how often they are read, not by how often they miss.
+    # `updated` carries `cache_info` / `cache_clear` / `cache_bytes` over.
+    @functools.wraps(cached, assigned=(), updated=('__dict__',))
+    def view(*args, layout='desktop', theme='light', **kwargs):
+        chart_warmer.record(cls.cache_name, layout, theme)
+        return cached(*args, layout=layout, theme=theme, **kwargs)
+
+    view.__doc__ = cls.__doc__
+
     # Keep the callable introspectable: `inspect.signature` should report the
     # chart's own arguments, not `(*args, **kwargs)`. The signature-drift test
     # and anyone reading the facade both depend on this.
@@ -7,15 +7,22 @@ legend on each, `autofmt_xdate` — and differ only in what they plot.
 
 Chosen as the pilot for the class hierarchy: no drill links, no custom cache
 key, two charts, and the smallest blast radius of any family.
+
+Both accept either the history getters' list of dicts or their NumPy-backed
+`SeriesColumns` (``as_columns=True``) and draw from arrays either way; the
+status routes pass the columns so a year of history is never re-boxed into
+dicts just to be unpacked again here.
 """
 
-from typing import Dict, List
+from typing import Dict, List, Union
 
 import matplotlib.pyplot as plt
+import numpy as np
 
 from sam import fmt
 from webapp.dashboards.charts.base import BaseChart
 from webapp.dashboards.charts.layout import profile
+from system_status.queries.columns import SeriesColumns
 from webapp.dashboards.charts.theme import (
     UNITY_NCAR_BLUE, UNITY_NCAR_ORANGE, UNITY_NCAR_SKY, UNITY_NCAR_TEAL,
     UNITY_NCAR_VERMILION,
@@ -42,16 +49,21 @@ class DualPanelTimeSeriesChart(BaseChart):
     #: an outside legend gets two columns.
     legend_ncol_below = 2
 
-    def __init__(self, history_data: List[Dict]):
-        self.history_data = history_data or []
+    #: Metrics `draw` reads; list-of-dicts input is packed into these columns.
+    metrics = ()
+
+    def __init__(self, history_data: Union[List[Dict], SeriesColumns]):
+        if not isinstance(history_data, SeriesColumns):
+            history_data = SeriesColumns.from_rows(history_data or [], self.metrics)
+        self.history = history_data
         self.timestamps = []
 
     def prepare(self):
-        self.timestamps = [_to_display_tz(d['timestamp'])
-                           for d in self.history_data]
+        self.timestamps = [_to_display_tz(ts) for ts in
+                           self.history.timestamps.astype('datetime64[us]').tolist()]
 
     def is_empty(self) -> bool:
-        return not self.history_data
+        return not len(self.history)
 
     def make_figure(self, layout):
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=layout.figsize, sharex=True)
@@ -91,8 +103,25 @@ class DualPanelTimeSeriesChart(BaseChart):
                   fontsize=layout.legend_fontsize or self.legend_fontsize,
                   frameon=False)
 
-    def column(self, key, default=0):
-        return [d.get(key, default) for d in self.history_data]
+    def column(self, key, default=0) -> np.ndarray:
+        """*key*'s values, a missing reading (NaN) read as *default*."""
+        return np.nan_to_num(self.history[key], nan=default)
+
+    def present(self, key):
+        """``(times, values)`` of *key* with the missing readings dropped."""
+        values = self.history[key]
+        keep = ~np.isnan(values)
+        return [t for t, k in zip(self.timestamps, keep) if k], values[keep]
+
+    @staticmethod
+    def cache_key(history_data):
+        # Single argument, so the decorator's default key_fn would also be
+        # correct — but `chart_view` composes layout/theme in, and doing that
+        # requires an explicit key. See `chart_view`'s docstring.
+        if isinstance(history_data, SeriesColumns):
+            return history_data.fingerprint()
+        from webapp.caching.chart import content_hash
+        return content_hash(history_data)
 
     def finish(self, fig, axes, layout, theme):
         # sharex=True, so the lower panel owns the visible tick labels.
@@ -103,6 +132,8 @@ class NodetypeHistoryChart(DualPanelTimeSeriesChart):
     """Node availability (stacked) over CPU/GPU + memory utilization."""
 
     cache_name = 'nodetype_history'
+    metrics = ('nodes_down', 'nodes_allocated', 'nodes_available',
+               'utilization_percent', 'memory_utilization_percent')
     #: One entry per node type; can be O(10s) across all machines. Raised
     #: 64 -> 96 for the second layout profile, 96 -> 144 for the third.
     cache_maxsize = 144
@@ -115,14 +146,6 @@ class NodetypeHistoryChart(DualPanelTimeSeriesChart):
     #: bbox at ~736pt, i.e. 9.3px in that card.
     LAYOUTS = profile((18, 10), (4.0, 4.7), (12, 7.2))
 
-    @staticmethod
-    def cache_key(history_data):
-        # Single argument, so the decorator's default key_fn would also be
-        # correct — but `chart_view` composes layout/theme in, and doing that
-        # requires an explicit key. See `chart_view`'s docstring.
-        from webapp.caching.chart import content_hash
-        return content_hash(history_data)
-
     def draw(self, axes, layout, theme):
         ax1, ax2 = axes
         # Series colours through the theme: only ncar-blue actually moves (it
@@ -139,17 +162,14 @@ class NodetypeHistoryChart(DualPanelTimeSeriesChart):
             labels=['Down', 'Fully Allocated', 'Resources Available'],
             colors=[vermilion, blue, sky])
 
-        utilization = [d.get('utilization_percent') for d in self.history_data]
-        memory = [d.get('memory_utilization_percent') for d in self.history_data]
-
-        if any(u is not None for u in utilization):
-            times = [self.timestamps[i] for i, u in enumerate(utilization) if u is not None]
-            ax2.plot(times, [u for u in utilization if u is not None],
+        times, utilization = self.present('utilization_percent')
+        if len(utilization):
+            ax2.plot(times, utilization,
                      color=blue, linewidth=3, label='CPU/GPU Utilization')
 
-        if any(m is not None for m in memory):
-            times = [self.timestamps[i] for i, m in enumerate(memory) if m is not None]
-            ax2.plot(times, [m for m in memory if m is not None],
+        times, memory = self.present('memory_utilization_percent')
+        if len(memory):
+            ax2.plot(times, memory,
                      color=teal, linewidth=3, label='Memory Utilization')
 
     def decorate(self, axes, layout, theme):
@@ -178,6 +198,8 @@ class QueueHistoryChart(DualPanelTimeSeriesChart):
     """Job flow over resource demand (GPUs when present, else cores)."""
 
     cache_name = 'queue_history'
+    metrics = ('running_jobs', 'pending_jobs', 'held_jobs', 'active_users',
+               'cores_allocated', 'cores_pending', 'gpus_allocated', 'gpus_pending')
     #: One entry per queue; queue counts can be O(10s) across all resources.
     #: Raised 64 -> 96 for the second layout profile, 96 -> 144 for the third.
     cache_maxsize = 144
@@ -187,11 +209,6 @@ class QueueHistoryChart(DualPanelTimeSeriesChart):
     #: narrower, because the legend is what the tight bbox is made of.
     LAYOUTS = profile((14, 8), (4.0, 4.2), (12, 7.2))
 
-    @staticmethod
-    def cache_key(history_data):
-        from webapp.caching.chart import content_hash
-        return content_hash(history_data)
-
     def draw(self, axes, layout, theme):
         ax1, ax2 = axes
         ts = self.timestamps
@@ -209,7 +226,7 @@ class QueueHistoryChart(DualPanelTimeSeriesChart):
 
         gpus_alloc = self.column('gpus_allocated')
         gpus_pend = self.column('gpus_pending')
-        if any(gpus_alloc) or any(gpus_pend):
+        if np.nan_to_num(gpus_alloc).any() or np.nan_to_num(gpus_pend).any():
             ax2.plot(ts, gpus_alloc, color=blue, linewidth=3,
                      label='GPUs Running')
             ax2.plot(ts, gpus_pend, color=teal, linewidth=3,
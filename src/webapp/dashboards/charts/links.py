@@ -33,6 +33,12 @@ drift is gone.
 drill target spans three artists (bar + legend patch + legend text), an ``<a>``
 is keyboard-focusable where a ``<g id>`` is not, and a ``#``-fragment degrades
 safely when JS fails.
+
+A render-pool worker (``pool.py``) has no Flask app, so `ModalRoute` cannot
+call ``url_for`` there. The parent resolves each modal's URL once per render
+with a placeholder for the value (`route_templates`), and the worker fills it
+in (`use_route_templates`), quoting as werkzeug's default converter does — so
+the href is the same string whichever process drew the chart.
 """
 
 from dataclasses import dataclass
@@ -41,6 +47,16 @@ from urllib.parse import quote
 #: Leading segment identifying our sentinels. Matched by `svg-chart-links.js`.
 SCHEME = '#sam'
 
+#: Stands in for a `ModalRoute` value in a resolved URL template. Nothing in it
+#: needs quoting, so `url_for` passes it through verbatim.
+_PLACEHOLDER = '__sam_route_value__'
+
+#: werkzeug's default converter's ``safe`` set (``BaseConverter.to_url``).
+_PATH_SAFE = "!$&'()*+,/:;=@"
+
+#: endpoint -> URL template, set only inside a render-pool worker.
+_route_templates = {}
+
 
 def encode(action: str, *segments) -> str:
     """``#sam/<action>/<encoded segment>/...``
@@ -106,6 +122,9 @@ class ModalRoute:
     param: str
 
     def url(self, value) -> str:
+        template = _route_templates.get(self.endpoint)
+        if template is not None:
+            return template.replace(_PLACEHOLDER, quote(str(value), safe=_PATH_SAFE))
         # Resolved lazily: `url_for` needs an application context, so a
         # module-level instance must not resolve at class-definition time.
         from flask import url_for
@@ -142,3 +161,23 @@ JOB_PROJECT = RowDrill('data-job-project')
 #: Legend entries that open a quick-view modal.
 PROJECT_MODAL = ModalRoute('user_dashboard.project_details_modal', 'projcode')
 USER_MODAL = ModalRoute('admin_dashboard.user_card', 'username')
+
+#: Every `ModalRoute` above, for `route_templates`.
+MODAL_ROUTES = (PROJECT_MODAL, USER_MODAL)
+
+
+def route_templates() -> dict:
+    """Each modal's URL with a placeholder value. Needs a request context."""
+    from flask import url_for
+    return {route.endpoint: url_for(route.endpoint, **{route.param: _PLACEHOLDER})
+            for route in MODAL_ROUTES}
+
+
+def use_route_templates(templates: dict) -> None:
+    """Resolve `ModalRoute` URLs from *templates* rather than ``url_for``.
+
+    For render-pool workers only: a process-wide setting, and a worker renders
+    one chart at a time.
+    """
+    global _route_templates
+    _route_templates = dict(templates or {})
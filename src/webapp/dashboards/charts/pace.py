@@ -156,6 +156,8 @@ class PaceChart(BaseChart):
     legend_fontsize = 9
     legend_anchor = (1.01, 0.5)
 
+    direct_svg = 'pace'
+
     def __init__(self, allocations: List[Dict], active_at: datetime,
                  window_days: int = 180, top_n: int = 20,
                  resource_name: str = '', sort_by: str = 'size'):
@@ -315,19 +317,49 @@ class PaceChart(BaseChart):
         # ambiguous". Length is the only safe question to ask.
         return not self.allocations or len(self._bands) == 0
 
+    def y_top(self):
+        """The clamped ymax, or None to autoscale.
+
+        The larger of the stacked totals at the window edges, plus 25%
+        headroom. Allocations expiring within a day or two of active_at
+        otherwise produce future-rates of remaining/1d that dominate the axis
+        and squash the rest of the chart into a flat strip.
+        """
+        totals_by_day = np.sum(self.rates_matrix, axis=0)
+        edge_bound = max(float(totals_by_day[0]), float(totals_by_day[-1]))
+        return (1.25 * edge_bound) if edge_bound > 0 else None
+
+    def legend_items(self, theme):
+        """`[(colour, label, url), ...]` in legend order.
+
+        Deduplicated: one entry per top-N projcode + one Other. The number
+        next to each project tracks the active sort_by. For rate sorts, scale
+        per-day → per-year so the number matches the axis units, and tag with
+        "/yr" to keep that explicit. Each top-N entry opens the project modal;
+        the trailing "Other" gets no URL — it is not a single project.
+        """
+        if self.sort_by == 'size':
+            def _fmt(v):
+                return fmt.number(v)
+        else:
+            def _fmt(v):
+                return f'{fmt.number(v * _PACE_RATE_SCALE)}/yr'
+
+        items = [(self.color_map[pc], f'{pc} ({_fmt(self.rank_metric[pc])})',
+                  links.PROJECT_MODAL.url(pc))
+                 for pc in self.top_projs]
+        if self.n_other_projs > 0:
+            items.append((_pace_other_color(theme),
+                          f'{self.other_label} '
+                          f'({_fmt(self.group_sort_totals[OTHER_KEY])})', None))
+        return items
+
     # --- drawing ----------------------------------------------------------
 
     def draw(self, ax, layout, theme):
         ax.stackplot(self.days, self.rates_matrix, colors=self.colors,
                      edgecolor='none', linewidth=0, antialiased=True)
-
-        # Clamp ymax to the larger of the stacked totals at the window edges,
-        # plus 25% headroom. Allocations expiring within a day or two of
-        # active_at otherwise produce future-rates of remaining/1d that
-        # dominate the axis and squash the rest of the chart into a flat strip.
-        totals_by_day = np.sum(self.rates_matrix, axis=0)
-        edge_bound = max(float(totals_by_day[0]), float(totals_by_day[-1]))
-        ax.set_ylim(bottom=0, top=(1.25 * edge_bound) if edge_bound > 0 else None)
+        ax.set_ylim(bottom=0, top=self.y_top())
 
         # Today marker — placed after set_ylim so the label sits at the
         # clamped ymax rather than the auto-scaled spike.
@@ -338,36 +370,19 @@ class PaceChart(BaseChart):
                 fontsize=8, va='top', ha='left')
 
     def add_legend(self, ax, layout, theme):
-        # Deduplicated: one handle per top-N projcode + one Other. The number
-        # next to each project tracks the active sort_by. For rate sorts,
-        # scale per-day → per-year so the number matches the axis units, and
-        # tag with "/yr" to keep that explicit.
-        if self.sort_by == 'size':
-            def _fmt(v):
-                return fmt.number(v)
-        else:
-            def _fmt(v):
-                return f'{fmt.number(v * _PACE_RATE_SCALE)}/yr'
-
-        handles = [mpatches.Patch(color=self.color_map[pc],
-                                  label=f'{pc} ({_fmt(self.rank_metric[pc])})')
-                   for pc in self.top_projs]
-        if self.n_other_projs > 0:
-            handles.append(mpatches.Patch(
-                color=_pace_other_color(theme),
-                label=f'{self.other_label} '
-                      f'({_fmt(self.group_sort_totals[OTHER_KEY])})'))
+        items = self.legend_items(theme)
+        handles = [mpatches.Patch(color=color, label=label)
+                   for color, label, _url in items]
         legend = ax.legend(handles=handles, frameon=False,
                            **self.legend_kwargs(layout))
 
-        # Tag each top-N legend entry with the project-modal URL. The trailing
-        # "Other" patch (if present) gets none — it is not a single project.
         # NOTE this legend is built FORWARD over top_projs, unlike the
         # StackedSeriesChart family's reversed legends, so it must not use
         # `link_legend`.
-        for pc, patch, text in zip(self.top_projs, legend.get_patches(),
-                                   legend.get_texts()):
-            url = links.PROJECT_MODAL.url(pc)
+        for (_color, _label, url), patch, text in zip(
+                items, legend.get_patches(), legend.get_texts()):
+            if url is None:
+                continue
             patch.set_url(url)
             text.set_url(url)
 
@@ -105,6 +105,8 @@ class PieChart(BaseChart):
     legend_fontsize = 9
     legend_anchor = (1.01, 0.5)
 
+    direct_svg = 'pie'
+
     #: A drill target (`RowDrill`/`UserDrill`) or None. When None the legend
     #: is built but its return value discarded, exactly as before — the two
     #: allocation pies have never been clickable.
@@ -142,6 +144,12 @@ class PieChart(BaseChart):
     def is_empty(self) -> bool:
         return not self.values
 
+    def autopct_colors(self) -> list:
+        """Percent-label colour per wedge — from the WEDGE's luminance, not the
+        page, so already correct in both themes and needing no theme argument.
+        """
+        return [autopct_color_for(c) for c in self.colors]
+
     def draw(self, ax, layout, theme):
         wedges, _texts, autotexts = ax.pie(
             self.values,
@@ -153,10 +161,8 @@ class PieChart(BaseChart):
             colors=self.colors,
             pctdistance=self.pctdistance,
         )
-        # Percent labels take their colour from the WEDGE's luminance, not the
-        # page — already correct in both themes, so no theme argument.
-        for at, wedge_color in zip(autotexts, self.colors):
-            at.set_color(autopct_color_for(wedge_color))
+        for at, color in zip(autotexts, self.autopct_colors()):
+            at.set_color(color)
             at.set_fontweight('bold')
             at.set_fontsize(self.autopct_fontsize)
         self.wedges = wedges
@@ -0,0 +1,243 @@
+"""Out-of-process chart rendering.
+
+Matplotlib layout and SVG serialization are CPU-bound and hold the GIL, so
+when a dashboard fans out its chart fragments at once they queue on one
+gunicorn worker's interpreter, however many threads it has. With
+``CHART_RENDER_POOL_SIZE`` set, `BaseChart.render` hands the figure half of
+the lifecycle to a small pool of worker processes instead:
+
+    parent (request thread)             worker process
+    ───────────────────────             ──────────────
+    prepare(), is_empty()
+    route_templates()        ──pickle──> use_route_templates()
+                                         draw_svg()  make_figure … fig_to_svg
+    SVG                      <────────── str
+
+`prepare()` stays in the parent because it is where request state is read —
+and the plot-ready state it leaves on the chart is small (a few KB pickled),
+where the raw payload behind it may not be. Drill links need one more thing
+from the parent: `ModalRoute` resolves through ``url_for``, so the parent
+resolves the modal URL templates and the worker fills them in (see
+`links.py`).
+
+Workers are spawned, not forked — the parent is a threaded gunicorn worker —
+on first use rather than at app creation, so a preloading master never owns
+a pool. Each imports matplotlib, the fonts and every chart family, and draws
+one throwaway figure, before taking its first render — and the pool is not
+handed out until every worker has, so a cold start (several seconds) is never
+charged to a render's timeout. A worker is replaced after
+``CHART_RENDER_MAX_TASKS`` renders (Python 3.11+), which bounds what
+matplotlib's caches can accumulate.
+
+Everything falls back to rendering in-process, which is exactly what runs
+with the pool off: a chart that will not pickle, a render that overruns
+``CHART_RENDER_TIMEOUT`` (its workers are killed, so it cannot hold one), a
+worker that died (the pool is rebuilt on the next render). A chart that raises in the worker is re-rendered in-process too, so
+the exception the caller sees is the one it always saw. `chart_view` and the
+chart caches are in front of all of this and know nothing about it.
+
+Config (Flask app.config or env):
+  CHART_RENDER_POOL_SIZE  — worker processes per gunicorn worker (default 0 = off)
+  CHART_RENDER_TIMEOUT    — seconds to wait for a pooled render, once the
+                            workers are up (default 10)
+  CHART_RENDER_MAX_TASKS  — renders before a worker is replaced (default 200)
+"""
+
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from webapp.dashboards.charts import links
+
+logger = logging.getLogger(__name__)
+
+#: Seconds to wait for a new pool's workers to start and warm up. Generous:
+#: it only guards against a worker that never comes up.
+_START_TIMEOUT = 120.0
+
+
+def _warm_worker(started):
+    """Pool initializer: pay the imports and the first-figure costs up front.
+
+    Reports the worker's PID on *started* first, so the parent can kill a
+    hung worker — including one that replaced a retired worker.
+    """
+    started.put(os.getpid())
+    import matplotlib.pyplot as plt
+
+    from webapp.dashboards import charts  # noqa: F401 — fonts, rcParams, families
+    from webapp.dashboards.charts.base import fig_to_svg
+
+    fig, ax = plt.subplots()
+    ax.plot([0, 1], [0, 1], label='warm')
+    ax.set_title('warm')
+    ax.legend()
+    fig_to_svg(fig)
+
+
+def _ready():
+    """A no-op task: returns once a worker has finished `_warm_worker`."""
+    return os.getpid()
+
+
+def _draw(chart, templates):
+    """Worker side of a render: a prepared chart in, its SVG out."""
+    links.use_route_templates(templates)
+    return chart.draw_svg()
+
+
+class RenderPool:
+    """A lazily started `ProcessPoolExecutor` for `BaseChart.draw_svg`.
+
+    One per process, `render_pool` below; `configure` is called from
+    ``create_app``. Disabled (size 0) it is a direct call to ``draw_svg``.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.timeout = 10.0
+        self.max_tasks = 200
+        self._executor = None
+        self._started = {}        # executor -> the queue its workers report PIDs on
+        self._lock = threading.Lock()
+        self.stats = {'pooled': 0, 'fallbacks': 0, 'timeouts': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def configure(self, *, size: int = 0, timeout: float = 10.0,
+                  max_tasks: int = 200) -> None:
+        """(Re)configure; a running pool is shut down and restarts on demand."""
+        self.shutdown()
+        self.size = max(0, int(size or 0))
+        self.timeout = float(timeout)
+        self.max_tasks = max(0, int(max_tasks or 0))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+            if executor is not None:
+                self._started.pop(executor, None)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """The running pool, started and warmed first if there is none.
+
+        The warm-up waits on one no-op task per worker under the lock, so a
+        render arriving meanwhile waits for the workers here — bounded only by
+        ``_START_TIMEOUT`` — rather than inside its own timeout. A pool that fails to come up is torn
+        down and the error raised; the next render tries again.
+        """
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context('spawn')
+                started = context.SimpleQueue()
+                kwargs = {}
+                if self.max_tasks and sys.version_info >= (3, 11):
+                    kwargs['max_tasks_per_child'] = self.max_tasks
+                executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=context,
+                    initializer=_warm_worker,
+                    initargs=(started,),
+                    **kwargs,
+                )
+                logger.info('Chart render pool: starting %d worker(s)', self.size)
+                self._started[executor] = started
+                try:
+                    for future in [executor.submit(_ready) for _ in range(self.size)]:
+                        future.result(timeout=_START_TIMEOUT)
+                except BaseException:
+                    self._kill(executor)
+                    raise
+                self._executor = executor
+            return self._executor
+
+    def _kill(self, executor) -> None:
+        """Shut *executor* down and terminate its workers, mid-render or not.
+
+        Terminates the processes that reported on *executor*'s PID queue and
+        are still children of this process, so a recycled PID is never hit.
+        Call with the lock held.
+        """
+        started, pids = self._started.pop(executor, None), set()
+        while started is not None and not started.empty():
+            pids.add(started.get())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in multiprocessing.active_children():
+            if process.pid in pids:
+                process.terminate()
+
+    def _discard(self, executor, *, kill: bool = False) -> None:
+        """Drop a broken *executor*, unless another thread already has.
+
+        ``shutdown`` never stops a worker mid-render, so *kill* also
+        terminates its processes: a hung render would otherwise hold its
+        worker until it returned. Renders in flight on the other workers see
+        `BrokenProcessPool` and fall back in-process.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+            if kill:
+                self._kill(executor)
+            else:
+                self._started.pop(executor, None)
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def render(self, chart) -> str:
+        """SVG for a prepared, non-empty *chart* — pooled when enabled."""
+        if not self.enabled:
+            return chart.draw_svg()
+
+        executor = None
+        try:
+            templates = links.route_templates()
+        except Exception:
+            # No request, or an app without those routes: only a chart that
+            # draws a modal link cares, and it fails over to in-process, where
+            # `url_for` raises what it always raised.
+            templates = {}
+        try:
+            executor = self._get_executor()
+        except Exception as exc:
+            logger.warning('Chart render pool: workers did not start (%s: %s); '
+                           'rendering in-process', type(exc).__name__, exc)
+            self.stats['fallbacks'] += 1
+            return chart.draw_svg()
+        try:
+            future = executor.submit(_draw, chart, templates)
+            try:
+                svg = future.result(timeout=self.timeout)
+            except FutureTimeout:
+                self.stats['timeouts'] += 1
+                raise
+        except BrokenProcessPool as exc:
+            logger.warning('Chart render pool: %s broke (%s); restarting',
+                           type(chart).__name__, exc)
+            self._discard(executor)
+        except FutureTimeout:
+            logger.warning('Chart render pool: %s took over %.1fs; restarting, '
+                           'rendering in-process', type(chart).__name__, self.timeout)
+            self._discard(executor, kill=True)
+        except Exception as exc:
+            logger.warning('Chart render pool: %s failed in the pool (%s: %s); '
+                           'rendering in-process',
+                           type(chart).__name__, type(exc).__name__, exc)
+        else:
+            self.stats['pooled'] += 1
+            return svg
+
+        self.stats['fallbacks'] += 1
+        return chart.draw_svg()
+
+
+#: The process's pool. `BaseChart.render` goes through it.
+render_pool = RenderPool()
@@ -56,6 +56,7 @@ class StackedSeriesChart(BaseChart):
 
     #: 'bar' — discrete bars per x position; 'area' — filled stackplot.
     stack_mode = 'bar'
+    direct_svg = 'stacked'
 
     bar_width = 1
     bar_linewidth = 0.3
@@ -0,0 +1,480 @@
+"""Direct-SVG rendering for the simple chart shapes.
+
+A pie is a dozen wedges and a legend; the Usage Trend chart is one row of
+bars. Through matplotlib each still costs a full figure, a layout pass and
+``savefig(bbox_inches='tight')`` — hundreds of milliseconds for a few dozen
+SVG elements. This module writes those elements directly from the state
+`prepare()` left on the chart, for the shapes it knows:
+
+    pie       every `PieChart`
+    stacked   `StackedSeriesChart` — one unlegended bar band (Usage Trend),
+              or a small stacked area (≤ `_MAX_BANDS` bands, ≤ `_MAX_POINTS`
+              dates)
+    pace      `PaceChart`, within the same limits
+
+A chart names its drawer with `BaseChart.direct_svg`. A drawer that meets
+anything outside its shape — a categorical axis, a multi-band bar stack, a
+colour it cannot parse — returns None, and `render()` goes on to matplotlib,
+as it does for every chart while ``CHART_DIRECT_SVG`` is off (the default).
+
+The output keeps the contracts the matplotlib output has, which is what
+`test_chart_direct_svg.py` compares: the same drill ``<a xlink:href>``s in
+the same order (marks, then legend swatch + text), the same legend and
+percentage labels as real ``<text>`` (the app sets ``svg.fonttype: none``
+too), the same fills, and a tight box of about the same size at each
+`Layout`. Geometry follows matplotlib's defaults — subplot margins, legend
+paddings, 5% data margins — but text is measured with an average glyph
+width rather than font metrics, so a long legend can sit a few points off,
+and the axis ticks re-implement the locators' rules rather than run them, so
+an axis can come out a tick apart.
+
+Chrome colours come from the chart's `Theme` exactly as `apply_chrome` sets
+them. **No matplotlib or numpy import here**, like `links.py` — a test
+enforces it; the pace chart's arrays are read element by element.
+"""
+
+import itertools
+import logging
+import math
+import zlib
+from datetime import date, datetime, timedelta
+from html import escape
+
+from sam import fmt
+
+logger = logging.getLogger(__name__)
+
+#: Set from ``CHART_DIRECT_SVG`` by ``create_app``; see `configure`.
+enabled = False
+
+#: "Small" for the area drawers: more than this goes to matplotlib.
+_MAX_BANDS = 12
+_MAX_POINTS = 400
+
+_FONT = "font-family: 'Poppins', 'DejaVu Sans'"
+#: Average advance of a Poppins glyph, in ems — for sizing boxes, not layout.
+_EM = 0.6
+#: matplotlib's default subplot box, and ``pad_inches`` of the tight bbox.
+_LEFT, _RIGHT, _BOTTOM, _TOP = 0.125, 0.9, 0.11, 0.88
+_PAD = 7.2
+_TICK = 3.5
+
+
+def configure(*, enabled: bool = False) -> None:
+    globals()['enabled'] = bool(enabled)
+
+
+class _Unsupported(Exception):
+    """The chart is outside what this backend draws."""
+
+
+def _num(v) -> str:
+    return f'{v:.3f}'.rstrip('0').rstrip('.')
+
+
+def _paint(color, alpha=None) -> str:
+    """``fill: #rrggbb`` (+ opacity) for a hex string or an RGB(A) tuple."""
+    if isinstance(color, str) and color.startswith('#') and len(color) in (4, 7):
+        hex_, a = color.lower(), 1.0
+    elif isinstance(color, (tuple, list)) and len(color) in (3, 4):
+        rgb = [max(0, min(255, round(float(c) * 255))) for c in color[:3]]
+        hex_ = '#%02x%02x%02x' % tuple(rgb)
+        a = float(color[3]) if len(color) == 4 else 1.0
+    else:
+        raise _Unsupported(f'colour {color!r}')
+    if alpha is not None:
+        a *= alpha
+    return f'fill: {hex_}' + (f'; fill-opacity: {_num(a)}' if a < 1 else '')
+
+
+def _stroke(color, width, *, alpha=None, dash=None) -> str:
+    style = _paint(color, alpha).replace('fill', 'stroke') + f'; stroke-width: {_num(width)}'
+    return style + (f'; stroke-dasharray: {dash}' if dash else '')
+
+
+class _Canvas:
+    """SVG elements in figure points (y down), plus their running extent."""
+
+    def __init__(self):
+        self.parts = []
+        self.box = [math.inf, math.inf, -math.inf, -math.inf]
+
+    def extend(self, x0, y0, x1, y1):
+        b = self.box
+        b[0], b[1] = min(b[0], x0, x1), min(b[1], y0, y1)
+        b[2], b[3] = max(b[2], x0, x1), max(b[3], y0, y1)
+
+    def add(self, markup, url=None, box=None):
+        if url:
+            markup = f'<a xlink:href="{escape(url)}" target="_blank">{markup}</a>'
+        self.parts.append(markup)
+        if box is not None:
+            self.extend(*box)
+
+    def rect(self, x, y, w, h, style, url=None):
+        self.add(f'<path d="M {_num(x)} {_num(y)} h {_num(w)} v {_num(h)} h {_num(-w)} z" '
+                 f'style="{style}"/>', url, (x, y, x + w, y + h))
+
+    def line(self, x0, y0, x1, y1, style):
+        self.add(f'<path d="M {_num(x0)} {_num(y0)} L {_num(x1)} {_num(y1)}" '
+                 f'style="fill: none; {style}"/>', box=(x0, y0, x1, y1))
+
+    def text(self, x, y, s, size, color, *, anchor='start', weight=None,
+             rotate=False, url=None):
+        """*s* at baseline *y*; each ``\n`` line below the last, as its own
+        ``<text>`` — matplotlib's spelling, so the fingerprints read alike."""
+        lines = str(s).split('\n')
+        width = max(len(l) for l in lines) * size * _EM
+        height = size * 1.2 * len(lines)
+        shift = {'start': 0, 'middle': width / 2, 'end': width}[anchor]
+        style = (f'{_FONT}; font-size: {_num(size)}px; text-anchor: {anchor}; '
+                 f'{_paint(color)}' + (f'; font-weight: {weight}' if weight else ''))
+        transform = f' transform="rotate(-90 {_num(x)} {_num(y)})"' if rotate else ''
+        body = ''.join(
+            f'<text x="{_num(x)}" y="{_num(y + i * size * 1.2)}" style="{style}"'
+            f'{transform}>{escape(l)}</text>' for i, l in enumerate(lines))
+        if rotate:
+            box = (x - size, y - width + shift, x + size * 0.3, y + shift)
+        else:
+            box = (x - shift, y - size, x - shift + width, y - size + height)
+        self.add(body, url, box)
+
+    def svg(self) -> str:
+        x0, y0, x1, y1 = self.box
+        x0, y0, w, h = x0 - _PAD, y0 - _PAD, x1 - x0 + 2 * _PAD, y1 - y0 + 2 * _PAD
+        return ('<?xml version="1.0" encoding="utf-8" standalone="no"?>\n'
+                f'<svg xmlns:xlink="http://www.w3.org/1999/xlink" width="{_num(w)}pt" '
+                f'height="{_num(h)}pt" viewBox="{_num(x0)} {_num(y0)} {_num(w)} {_num(h)}" '
+                'xmlns="http://www.w3.org/2000/svg" version="1.1">\n'
+                + '\n'.join(self.parts) + '\n</svg>\n')
+
+
+# ---------------------------------------------------------------------------
+# Shared pieces: the legend, the cartesian frame
+# ---------------------------------------------------------------------------
+
+def _legend(cv, items, frame, placement, *, fontsize, color, spacing=0.5,
+            ncol=1, anchor_x=1.01):
+    """matplotlib's legend box. *items* are ``(fill_style, label, url)``.
+
+    *frame* is the axes box ``(x, y, w, h)``; 'right' centres the legend on
+    its right edge at *anchor_x*, 'below' hangs it under the axes.
+    """
+    if placement == 'none' or not items:
+        return
+    fs = fontsize
+    pitch = fs * (1.4 + spacing)
+    handle, gap = 2.0 * fs, 0.8 * fs
+    ncol = max(1, min(ncol if placement == 'below' else 1, len(items)))
+    nrow = math.ceil(len(items) / ncol)
+    col_w = handle + gap + max(len(label) for _, label, _ in items) * fs * _EM
+    width = ncol * col_w + (ncol - 1) * 2.0 * fs
+    height = nrow * pitch - spacing * fs
+    fx, fy, fw, fh = frame
+    if placement == 'below':
+        left = fx + fw / 2 - width / 2
+        top = fy + fh + 0.22 * fh + 0.9 * fs
+    else:
+        left = fx + anchor_x * fw + 0.9 * fs
+        top = fy + fh / 2 - height / 2
+    for i, (style, label, url) in enumerate(items):
+        col, row = divmod(i, nrow)
+        x = left + col * (col_w + 2.0 * fs)
+        base = top + row * pitch + fs
+        cv.rect(x, base - 0.7 * fs, handle, 0.7 * fs, style, url)
+        cv.text(x + handle + gap, base, label, fs, color, url=url)
+
+
+def _nice_ticks(lo, hi, nbins):
+    """`AutoLocator`'s ticks over ``[lo, hi]``: steps of 1, 2, 2.5, 5 × 10ⁿ."""
+    span = hi - lo
+    if span <= 0:
+        return [lo]
+    raw = span / nbins
+    mag = 10 ** math.floor(math.log10(raw))
+    step = next(m * mag for m in (1, 2, 2.5, 5, 10) if m * mag >= raw)
+    first = math.ceil(lo / step - 1e-9) * step
+    return [first + i * step for i in range(int((hi - first) / step + 1e-9) + 1)]
+
+
+def _days(x) -> float:
+    """A date/datetime as days since 0001-01-01 — the axis coordinate."""
+    if isinstance(x, datetime):
+        x = x.replace(tzinfo=None)
+        return (x.toordinal() + (x - datetime.combine(x.date(), datetime.min.time()))
+                .total_seconds() / 86400)
+    if isinstance(x, date):
+        return float(x.toordinal())
+    raise _Unsupported(f'x value {x!r}')
+
+
+def _from_days(v) -> datetime:
+    return datetime.fromordinal(int(v)) + timedelta(days=v - int(v))
+
+
+#: Calendar tick steps, finest first: ``(unit, k, approximate days per step)``.
+_DATE_STEPS = ([('hour', k, k / 24) for k in (1, 2, 3, 4, 6, 12)]
+               + [('day', k, k) for k in (1, 2, 4, 7, 14)]
+               + [('month', k, 30.4 * k) for k in (1, 2, 3, 4, 6)]
+               + [('year', k, 365.2 * k) for k in (1, 2, 5, 10, 20, 50)])
+
+
+def _date_ticks(lo, hi, max_ticks):
+    """Tick dates in ``[lo, hi]`` (days): the finest calendar step that fits.
+
+    Steps and alignment follow ``AutoDateLocator``'s — hours on multiples of
+    the step, days counted from the 1st of each month, months from January.
+    """
+    start, end = _from_days(lo), _from_days(hi)
+    for unit, k, days in _DATE_STEPS:
+        if (hi - lo) / days > max_ticks * 1.5:
+            continue                        # far too fine; don't enumerate it
+        ticks = []
+        if unit in ('hour', 'day'):
+            one = timedelta(hours=1) if unit == 'hour' else timedelta(days=1)
+            t = start.replace(minute=0, second=0, microsecond=0)
+            if unit == 'day':
+                t = t.replace(hour=0)
+            while t <= end:
+                if t >= start and ((t.hour if unit == 'hour' else t.day - 1) % k == 0):
+                    ticks.append(t)
+                t += one
+        else:
+            y, m = start.year, (start.month if unit == 'month' else 1)
+            while (t := datetime(y, m, 1)) <= end:
+                if t >= start and ((m - 1) % k == 0 if unit == 'month' else y % k == 0):
+                    ticks.append(t)
+                y, m = (y + m // 12, m % 12 + 1) if unit == 'month' else (y + 1, 1)
+        if 0 < len(ticks) <= max_ticks:
+            return ticks
+    return [start]
+
+
+class _Frame:
+    """One matplotlib Axes: data → point transform, ticks, spines, grid."""
+
+    def __init__(self, chart, layout, theme, xlim, ylim):
+        w, h = layout.figsize[0] * 72, layout.figsize[1] * 72
+        self.x, self.y = _LEFT * w, (1 - _TOP) * h
+        self.w, self.h = (_RIGHT - _LEFT) * w, (_TOP - _BOTTOM) * h
+        self.xlim, self.ylim = xlim, ylim
+        self.chart, self.layout, self.theme = chart, layout, theme
+
+    @property
+    def box(self):
+        return self.x, self.y, self.w, self.h
+
+    def px(self, v):
+        lo, hi = self.xlim
+        return self.x + (v - lo) / (hi - lo) * self.w
+
+    def py(self, v):
+        lo, hi = self.ylim
+        return self.y + self.h - (v - lo) / (hi - lo) * self.h
+
+    def chrome(self, cv, ylabel):
+        """Grid, spines, ticks and labels — `decorate` + `apply_chrome`."""
+        chart, layout, theme = self.chart, self.layout, self.theme
+        size = layout.tick_fontsize or chart.tick_fontsize or layout.base_fontsize
+        grid = chart.grid
+        nbins = max(1, min(9, int(self.h / (2 * size))))     # `YAxis.get_tick_space`
+        yticks = [v for v in _nice_ticks(*self.ylim, nbins)
+                  if self.ylim[0] <= v <= self.ylim[1]]
+        xticks = _date_ticks(*self.xlim, layout.max_ticks)
+        if grid:
+            style = _stroke(theme.grid, 0.5, alpha=grid.get('alpha'))
+            if grid.get('axis', 'both') in ('both', 'y'):
+                for v in yticks:
+                    cv.line(self.x, self.py(v), self.x + self.w, self.py(v), style)
+            if grid.get('axis', 'both') in ('both', 'x'):
+                for t in xticks:
+                    cv.line(self.px(_days(t)), self.y, self.px(_days(t)), self.y + self.h, style)
+        spine = _stroke(theme.spine, 0.8)
+        cv.line(self.x, self.y, self.x, self.y + self.h, spine)
+        cv.line(self.x, self.y + self.h, self.x + self.w, self.y + self.h, spine)
+
+        tick = _stroke(theme.text, 0.8)
+        label_w = 0
+        for v in yticks:
+            y, label = self.py(v), fmt.number(v)
+            cv.line(self.x - _TICK, y, self.x, y, tick)
+            cv.text(self.x - 2 * _TICK, y + size * 0.35, label, size, theme.text, anchor='end')
+            label_w = max(label_w, len(label) * size * _EM)
+        for t, label in zip(xticks, fmt.date_tick_labels(xticks)):
+            x = self.px(_days(t))
+            cv.line(x, self.y + self.h, x, self.y + self.h + _TICK, tick)
+            cv.text(x, self.y + self.h + 2 * _TICK + size, label, size, theme.text,
+                    anchor='middle')
+
+        lsize = chart.label_kw(layout).get('fontsize', 11)
+        cv.text(self.x - 2 * _TICK - label_w - 4, self.y + self.h / 2, ylabel, lsize,
+                theme.text, anchor='middle', weight=600, rotate=True)
+
+    def clip_open(self, cv, key) -> None:
+        clip_id = f'c{zlib.crc32(key.encode()):08x}'
+        cv.add(f'<defs><clipPath id="{clip_id}"><rect x="{_num(self.x)}" y="{_num(self.y)}" '
+               f'width="{_num(self.w)}" height="{_num(self.h)}"/></clipPath></defs>'
+               f'<g clip-path="url(#{clip_id})">')
+
+    def stacked_areas(self, cv, xs, matrix, fills):
+        """One closed path per band, each on top of the running total."""
+        bottom = [0.0] * len(xs)
+        for values, style in zip(matrix, fills):
+            top = [b + float(v) for b, v in zip(bottom, values)]
+            upper = ' L '.join(f'{_num(self.px(x))} {_num(self.py(v))}' for x, v in zip(xs, top))
+            lower = ' L '.join(f'{_num(self.px(x))} {_num(self.py(v))}'
+                               for x, v in reversed(list(zip(xs, bottom))))
+            cv.add(f'<path d="M {upper} L {lower} z" style="{style}"/>')
+            bottom = top
+
+
+# ---------------------------------------------------------------------------
+# Drawers
+# ---------------------------------------------------------------------------
+
+def _pie(chart, cv):
+    layout, theme = chart.layout, chart.theme
+    w, h = layout.figsize[0] * 72, layout.figsize[1] * 72
+    side = min((_RIGHT - _LEFT) * w, (_TOP - _BOTTOM) * h)
+    cx, cy = _LEFT * w + (_RIGHT - _LEFT) * w / 2, (1 - _TOP) * h + (_TOP - _BOTTOM) * h / 2
+    r = side / 2.5
+    values = [float(v) for v in chart.values]
+    total = sum(values)
+    if total <= 0:
+        raise _Unsupported('no wedge area')
+    urls = [chart.drill.url(k) if chart.drill is not None and k is not None else None
+            for k in chart.link_keys]
+    urls += [None] * (len(values) - len(urls))      # `_FixedCapPie` links nothing
+    # `ax.pie` cycles a short palette — 'Others' is the 11th of ten colours.
+    colors = list(itertools.islice(itertools.cycle(chart.colors), len(values)))
+    pct_colors = itertools.cycle(chart.autopct_colors())
+
+    def at(deg, dist):
+        return cx + dist * math.cos(math.radians(deg)), cy - dist * math.sin(math.radians(deg))
+
+    theta, labels = float(chart.start_angle), []
+    for value, color, url in zip(values, colors, urls):
+        frac = value / total
+        end = theta - 360 * frac
+        (x0, y0), (x1, y1) = at(theta, r), at(end, r)
+        if frac >= 1 - 1e-9:
+            xm, ym = at(theta - 180, r)
+            d = (f'M {_num(x0)} {_num(y0)} A {_num(r)} {_num(r)} 0 1 1 {_num(xm)} {_num(ym)} '
+                 f'A {_num(r)} {_num(r)} 0 1 1 {_num(x0)} {_num(y0)} z')
+        elif frac > 0:
+            d = (f'M {_num(cx)} {_num(cy)} L {_num(x0)} {_num(y0)} A {_num(r)} {_num(r)} 0 '
+                 f'{int(frac > 0.5)} 1 {_num(x1)} {_num(y1)} z')
+        else:
+            d = None
+        if d:
+            cv.add(f'<path d="{d}" style="{_paint(color)}"/>', url)
+        if 100 * frac >= chart.autopct_min_pct:
+            labels.append((at((theta + end) / 2, chart.pctdistance * r),
+                           fmt.pct(100 * frac, decimals=1)))
+        else:
+            labels.append(None)
+        theta = end
+    cv.extend(cx - r, cy - r, cx + r, cy + r)
+    for label, color in zip(labels, pct_colors):
+        if label is not None:
+            (x, y), text = label
+            cv.text(x, y + chart.autopct_fontsize * 0.35, text, chart.autopct_fontsize,
+                    color, anchor='middle', weight=700)
+
+    items = [(_paint(c), chart.legend_label(l, v), u)
+             for l, v, c, u in zip(chart.labels, chart.values, colors, urls)]
+    _legend(cv, items, (cx - side / 2, cy - side / 2, side, side),
+            layout.legend_placement, fontsize=layout.legend_fontsize or chart.legend_fontsize,
+            color=theme.text, ncol=chart.legend_ncol_below, anchor_x=chart.legend_anchor[0])
+
+
+def _stacked(chart, cv):
+    layout, theme = chart.layout, chart.theme
+    xs = [_days(x) for x in chart.x]
+    matrix = [[float(v) for v in chart.band_values(b)] for b in chart.bands]
+    if chart.stack_mode == 'bar':
+        if len(chart.bands) != 1 or chart.show_legend:
+            raise _Unsupported('stacked bars')
+        lo, hi = min(xs) - chart.bar_width / 2, max(xs) + chart.bar_width / 2
+    elif len(chart.bands) <= _MAX_BANDS and len(xs) <= _MAX_POINTS:
+        lo, hi = min(xs), max(xs)
+    else:
+        raise _Unsupported('large area')
+    top = max([sum(col) for col in zip(*matrix)] or [0]) or 1.0
+    pad = (hi - lo) * 0.05 or 1.0
+    frame = _Frame(chart, layout, theme, (lo - pad, hi + pad), (0, top * 1.05))
+
+    if chart.stack_mode == 'bar':
+        style = f'{_paint(chart.colors[0])}; {_stroke(theme.bar_edge, chart.bar_linewidth)}'
+        for i, (x, v) in enumerate(zip(xs, matrix[0])):
+            if not v:
+                continue
+            x0, y0 = frame.px(x - chart.bar_width / 2), frame.py(v)
+            cv.rect(x0, y0, frame.px(x + chart.bar_width / 2) - x0, frame.py(0) - y0,
+                    style, chart.bar_url(i))
+    else:
+        frame.stacked_areas(cv, xs, matrix,
+                            [_paint(c, theme.area_alpha) for c in chart.colors])
+    frame.chrome(cv, chart.ylabel())
+
+    if chart.show_legend:
+        drill = chart.legend_drill
+        items = [(_paint(c), chart.legend_label(b),
+                  drill.url(b.link_key) if drill is not None and b.is_linkable else None)
+                 for b, c in chart.legend_entries(layout)]
+        _legend(cv, items, frame.box, layout.legend_placement,
+                fontsize=layout.legend_fontsize or chart.legend_fontsize, color=theme.text,
+                spacing=chart.legend_labelspacing or 0.5, ncol=chart.legend_ncol_below,
+                anchor_x=chart.legend_anchor[0])
+
+
+def _pace(chart, cv):
+    layout, theme = chart.layout, chart.theme
+    if len(chart.rates_matrix) > _MAX_BANDS or len(chart.days) > _MAX_POINTS:
+        raise _Unsupported('large pace chart')
+    xs = [_days(d) for d in chart.days]
+    matrix = [[float(v) for v in band] for band in chart.rates_matrix]
+    top = chart.y_top()
+    if top is None:
+        top = max(sum(col) for col in zip(*matrix)) * 1.05 or 1.0
+    frame = _Frame(chart, layout, theme,
+                   (_days(chart.window_start), _days(chart.window_end)), (0, top))
+
+    frame.clip_open(cv, f'{chart.cache_name}:{layout.name}:{xs[0]}:{len(xs)}:{top}')
+    frame.stacked_areas(cv, xs, matrix, [_paint(c) for c in chart.colors])
+    cv.add('</g>')
+    today = frame.px(_days(chart.active_at))
+    cv.line(today, frame.y, today, frame.y + frame.h, _stroke(theme.accent, 1, dash='3.7,1.6'))
+    cv.text(today, frame.y + 8, ' today', 8, theme.accent)
+    frame.chrome(cv, 'Rate (per year)')
+
+    items = [(_paint(c), label, url) for c, label, url in chart.legend_items(theme)]
+    _legend(cv, items, frame.box, layout.legend_placement,
+            fontsize=layout.legend_fontsize or chart.legend_fontsize, color=theme.text,
+            ncol=chart.legend_ncol_below, anchor_x=chart.legend_anchor[0])
+
+
+_DRAWERS = {'pie': _pie, 'stacked': _stacked, 'pace': _pace}
+
+
+def render(chart):
+    """SVG for a prepared, non-empty *chart*, or None for matplotlib to draw.
+
+    None when the backend is off, the chart names no drawer, or its drawer
+    meets something outside its shape. A drawer that fails outright is logged
+    and left to matplotlib too — which raises whatever the data really
+    warrants.
+    """
+    drawer = _DRAWERS.get(chart.direct_svg) if enabled else None
+    if drawer is None:
+        return None
+    cv = _Canvas()
+    try:
+        drawer(chart, cv)
+    except _Unsupported:
+        return None
+    except Exception as exc:
+        logger.warning('Direct SVG: %s failed (%s: %s); using matplotlib',
+                       type(chart).__name__, type(exc).__name__, exc)
+        return None
+    return cv.svg()
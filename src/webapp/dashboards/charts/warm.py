@@ -0,0 +1,335 @@
+"""Pre-render the most-viewed chart fragments before anyone asks for them.
+
+Every chart cache is keyed on a content hash of the chart's data, so an entry
+exists only once someone has paid for the render. After a deploy or a cache
+purge every facility pie, pace chart and status history is cold; after a
+status tick or a charge ingest the popular ones are cold again, under the new
+keys their new data hashes to. Either way the first viewer waits.
+
+`chart_warmer` counts views and re-requests the top ones in the background:
+
+* **Counting.** Every `chart_view` call made while serving a GET — hit or
+  miss — adds one to ``(cache_name, layout, theme, url)``, where *url* is the
+  fragment's path and query string less ``layout``/``theme``. Who viewed it
+  is not kept.
+* **Warming.** `request_warm(reason)` arms a timer; triggers inside
+  ``CHART_WARM_DELAY`` seconds coalesce into one run, so two collectors'
+  status ticks become one warm. The run takes the top ``CHART_WARM_TOP_N``
+  entries whose chart the trigger can have changed (`_TRIGGERS`), and
+  re-dispatches each distinct fragment URL, with its ``?layout=``/``?theme=``,
+  as the service account ``CHART_WARM_USER_ID`` — never as a real viewer. A
+  fragment the account may not see fails its replay and stays cold; with no
+  account set, only fragments open to anonymous requests warm.
+
+Why replay requests rather than chart calls: a chart's arguments *are* its
+data. Replaying recorded arguments would re-create the entry the purge just
+dropped, and after an ingest it would re-create the stale one. The fragment
+route re-reads the data, calls `chart_view` exactly as a page load does, and
+the SVG lands under the key the next viewer will read. A replay runs the view
+function only (`Flask.dispatch_request`): no request-id, logging or
+rate-limit hooks, so a warm never spends a user's rate limit.
+
+With ``CACHE_REDIS_URL`` set the counts are a sorted set shared by every
+worker, and they survive a deploy, which is what gives the startup warm
+something to do. A lease lets one worker run each warm, and holding it for
+the delay afterwards coalesces triggers across workers too. Without Redis
+each worker counts and warms its own cache, starting empty. Counts are halved
+once per ``CHART_WARM_HALF_LIFE`` so last month's popular panel ages out, and
+at most `_MAX_TRACKED` entries are kept.
+
+Config (Flask app.config or env):
+  CHART_WARM_TOP_N      — fragments re-requested per warm (default 0 = off)
+  CHART_WARM_DELAY      — seconds a trigger waits to coalesce (default 30)
+  CHART_WARM_HALF_LIFE  — seconds between count halvings (default 86400)
+  CHART_WARM_USER_ID    — SAM user_id replays run as (default unset = anonymous)
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, NamedTuple, Optional
+from urllib.parse import urlencode
+
+from flask import Flask, g, has_request_context, request, session
+from werkzeug.exceptions import HTTPException
+
+logger = logging.getLogger(__name__)
+
+#: The charts each data-change trigger can have changed, by `cache_name`.
+#: Triggers not listed here (startup, purge) warm every chart.
+_TRIGGERS = {
+    'status': frozenset({'nodetype_history', 'queue_history', 'user_proj_stacked_area'}),
+    'charges': frozenset({'facility_pie_chart', 'allocation_type_pie_chart', 'pace_chart',
+                          'usage_timeseries', 'usage_timeseries_stacked',
+                          'user_usage_pie_chart'}),
+}
+
+#: The render axes, which a replay sets explicitly rather than recording.
+_AXES = ('layout', 'theme')
+
+#: Entries kept once the counts are halved; anything less viewed is dropped.
+_MAX_TRACKED = 1000
+
+_COUNTS_KEY = 'chart-warm:views'
+_DECAY_KEY = 'chart-warm:decayed'
+_LEASE_KEY = 'chart-warm:lease'
+_LEASE_TTL = 1800
+
+
+class View(NamedTuple):
+    """One counted fragment view, as `top` returns it."""
+
+    cache_name: str
+    layout: str
+    theme: str
+    url: str
+    count: float = 0
+
+
+class FragmentTiming(NamedTuple):
+    """One replayed fragment: where it went, how long, and what came back."""
+
+    url: str
+    layout: str
+    theme: str
+    seconds: float
+    status: Optional[int] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class WarmReport:
+    """Outcome of one `ChartWarmer.warm` run.
+
+    ``busy`` means another worker held the lease, so nothing was replayed.
+    """
+
+    reasons: List[str] = field(default_factory=list)
+    fragments: List[FragmentTiming] = field(default_factory=list)
+    busy: bool = False
+
+    @property
+    def errors(self) -> List[FragmentTiming]:
+        return [f for f in self.fragments if f.error]
+
+
+def _member(cache_name, layout, theme, url) -> str:
+    return json.dumps([cache_name, layout, theme, url])
+
+
+def _fragment_url() -> str:
+    """This request's path and query, less the render axes."""
+    query = [(k, v) for k, v in request.args.items(multi=True) if k not in _AXES]
+    return request.path + ('?' + urlencode(query) if query else '')
+
+
+class ChartWarmer:
+    """View counts and the warm-up timer. One per process, `chart_warmer`.
+
+    `configure` is called from ``create_app``; until then, and with
+    ``top_n`` 0, `record` and `request_warm` return at once.
+    """
+
+    def __init__(self):
+        self.top_n = 0
+        self.delay = 30.0
+        self.half_life = 86400.0
+        self.user_id: Optional[str] = None
+        self._app: Optional[Flask] = None
+        self._client = None
+        self._lock = threading.Lock()
+        self._counts: Counter = Counter()
+        self._decayed_at = time.monotonic()
+        self._timer: Optional[threading.Timer] = None
+        self._pending: set = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.top_n > 0 and self._app is not None
+
+    def configure(self, app: Optional[Flask], *, top_n: int = 0, delay: float = 30.0,
+                  half_life: float = 86400.0, client=None,
+                  user_id: Optional[str] = None) -> None:
+        """(Re)configure; a pending warm is cancelled and the local counts kept.
+
+        *user_id* is the Flask-Login id replays run as (``None``: anonymous).
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer, self._pending = None, set()
+        self._app = app
+        self.top_n = max(0, int(top_n or 0))
+        self.delay = float(delay)
+        self.half_life = float(half_life)
+        self.user_id = str(user_id) if user_id else None
+        self._client = client
+
+    # --- counting ---------------------------------------------------------
+
+    def record(self, cache_name: str, layout, theme) -> None:
+        """Count one view of *cache_name* by the current request, if any."""
+        if (not self.enabled or not has_request_context()
+                or request.method != 'GET' or g.get('chart_warming')):
+            return
+        member = _member(cache_name, getattr(layout, 'name', layout),
+                         getattr(theme, 'name', theme), _fragment_url())
+        if self._client is None:
+            with self._lock:
+                self._counts[member] += 1
+            return
+        try:
+            self._client.zincrby(_COUNTS_KEY, 1, member)
+        except Exception as exc:
+            # A view count is not worth a failed page.
+            logger.debug('Chart warm: could not count a view: %s', exc)
+
+    def top(self, n: int, caches=None) -> List[View]:
+        """The *n* most-viewed entries, optionally only for *caches*."""
+        views: List[View] = []
+        if n <= 0:
+            return views
+        for member, count in self._ranked(n):
+            cache_name, layout, theme, url = json.loads(member)
+            if caches is not None and cache_name not in caches:
+                continue
+            views.append(View(cache_name, layout, theme, url, count))
+            if len(views) == n:
+                break
+        return views
+
+    def _ranked(self, page: int):
+        """``(member, count)`` from the most viewed down.
+
+        From Redis in ranges of *page*: the unfiltered top N is one
+        ``ZREVRANGE 0 N-1``, and a filtered one reads on only while
+        entries are being skipped.
+        """
+        if self._client is None:
+            with self._lock:
+                ranked = self._counts.most_common()
+            yield from ranked
+            return
+        start = 0
+        while True:
+            chunk = self._client.zrevrange(_COUNTS_KEY, start, start + page - 1,
+                                           withscores=True)
+            for member, count in chunk:
+                yield (member.decode() if isinstance(member, bytes) else member), count
+            if len(chunk) < page:
+                return
+            start += page
+
+    def _decay(self) -> None:
+        """Halve every count, once per ``half_life``, and drop the tail."""
+        if self._client is None:
+            with self._lock:
+                if time.monotonic() - self._decayed_at < self.half_life:
+                    return
+                self._decayed_at = time.monotonic()
+                self._counts = Counter({m: c / 2 for m, c
+                                        in self._counts.most_common(_MAX_TRACKED)
+                                        if c >= 1})
+            return
+        if not self._client.set(_DECAY_KEY, 1, nx=True, ex=int(self.half_life)):
+            return
+        pipe = self._client.pipeline()
+        pipe.zunionstore(_COUNTS_KEY, {_COUNTS_KEY: 0.5})
+        pipe.zremrangebyscore(_COUNTS_KEY, '-inf', '(0.5')
+        pipe.zremrangebyrank(_COUNTS_KEY, 0, -(_MAX_TRACKED + 1))
+        pipe.execute()
+
+    # --- warming ----------------------------------------------------------
+
+    def request_warm(self, reason: str) -> None:
+        """Warm the top views in ``delay`` seconds; sooner triggers coalesce.
+
+        *reason* is a `_TRIGGERS` key or anything else ('startup', 'purge')
+        for every chart. Cheap, and safe to call from a request.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._pending.add(reason)
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.delay, self._run)
+            self._timer.name = 'chart-warmer'
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self) -> None:
+        with self._lock:
+            reasons, self._pending, self._timer = sorted(self._pending), set(), None
+        try:
+            self.warm(reasons)
+        except Exception:
+            logger.warning('Chart warm: background run failed', exc_info=True)
+
+    def warm(self, reasons=('startup',)) -> WarmReport:
+        """Replay the top-N fragments for *reasons* now, in this thread."""
+        report = WarmReport(reasons=list(reasons))
+        if not self.enabled:
+            return report
+        token = None
+        if self._client is not None:
+            token = uuid.uuid4().hex
+            if not self._client.set(_LEASE_KEY, token, nx=True, ex=_LEASE_TTL):
+                report.busy = True
+                return report
+
+        try:
+            caches = None
+            if all(r in _TRIGGERS for r in reasons):
+                caches = frozenset().union(*(_TRIGGERS[r] for r in reasons))
+            # A fragment drawing three charts is one replay, not three.
+            seen = set()
+            for view in self.top(self.top_n, caches):
+                key = (view.url, view.layout, view.theme)
+                if key not in seen:
+                    seen.add(key)
+                    report.fragments.append(self._replay(view))
+            self._decay()
+        finally:
+            if token is not None:
+                # Held a little longer, so other workers' triggers for the
+                # same change coalesce with this run instead of repeating it.
+                self._client.expire(_LEASE_KEY, max(1, int(self.delay)))
+
+        logger.info('Chart warm (%s): %d fragment(s), %d failed, %.1fs',
+                    ', '.join(reasons), len(report.fragments), len(report.errors),
+                    sum(f.seconds for f in report.fragments))
+        return report
+
+    def _replay(self, view: View) -> FragmentTiming:
+        """Dispatch *view*'s fragment as the service account; `chart_view` fills the cache."""
+        app = self._app
+        sep = '&' if '?' in view.url else '?'
+        url = f'{view.url}{sep}{urlencode({"layout": view.layout, "theme": view.theme})}'
+        started = time.perf_counter()
+        status = error = None
+        with app.test_request_context(url, headers={'HX-Request': 'true'}):
+            g.chart_warming = True
+            if self.user_id:
+                session['_user_id'] = self.user_id
+            try:
+                status = app.make_response(app.dispatch_request()).status_code
+            except HTTPException as exc:
+                status = exc.code
+            except Exception as exc:
+                error = f'{type(exc).__name__}: {exc}'
+            if status is not None and status >= 300:    # a login redirect renders nothing
+                error = f'HTTP {status}'
+        if error:
+            logger.warning('Chart warm: %s (%s/%s) failed: %s',
+                           view.url, view.layout, view.theme, error)
+        return FragmentTiming(view.url, view.layout, view.theme,
+                              time.perf_counter() - started, status, error)
+
+
+#: The process's warmer. `chart_view` counts through it.
+chart_warmer = ChartWarmer()
@@ -26,6 +26,11 @@ from webapp.jobs import service as jobs_service
 bp = Blueprint('status_dashboard', __name__, url_prefix='/status')
 logger = logging.getLogger(__name__)
 
+# History pages draw at most this many points per series; longer windows are
+# served from the hourly/daily rollups and LTTB-downsampled to fit.
+HISTORY_MAX_POINTS = 1000
+
+
 def _parse_selected_hours():
     """Parse the optional ``hours`` (or legacy ``days``) query param.
 
@@ -273,13 +278,15 @@ def nodetype_history(system, node_type):
         hours = 168  # 7-day default
     end_date = utcnow_naive()
     start_date = end_date - timedelta(hours=hours)
+    resolution = status_queries.pick_resolution(start_date, end_date, HISTORY_MAX_POINTS)
 
     session = db.session
 
     if system.lower() == 'casper':
         # Query Casper node type history
-        history_data = status_queries.get_casper_nodetype_history(
-            session, node_type, start_date, end_date
+        history = status_queries.get_casper_nodetype_history(
+            session, node_type, start_date, end_date,
+            resolution=resolution, max_points=HISTORY_MAX_POINTS, as_columns=True,
         )
 
         # Get latest record for current status
@@ -293,7 +300,7 @@ def nodetype_history(system, node_type):
 
     # Generate chart
     chart_svg = generate_nodetype_history_matplotlib(
-        history_data, layout=read_layout(), theme=read_theme())
+        history, layout=read_layout(), theme=read_theme())
 
     return render_template(
         'dashboards/status/nodetype_history.html',
@@ -301,11 +308,12 @@ def nodetype_history(system, node_type):
         system=system,
         node_type=node_type,
         latest_status=latest_status,
-        history_data=history_data,
+        history_data=history.rows(),
         chart_svg=chart_svg,
         hours=hours,
         start_date=start_date,
         end_date=end_date,
+        history_resolution=resolution,
     )
 
 
@@ -327,6 +335,7 @@ def partition_history(system, partition):
         hours = 168  # 7-day default
     end_date = utcnow_naive()
     start_date = end_date - timedelta(hours=hours)
+    resolution = status_queries.pick_resolution(start_date, end_date, HISTORY_MAX_POINTS)
 
     session = db.session
 
@@ -347,8 +356,9 @@ def partition_history(system, partition):
         return redirect(url_for('status_dashboard.index'))
 
     # Query partition history using generic function
-    history_data = status_queries.get_system_partition_history(
-        session, system, partition, start_date, end_date
+    history = status_queries.get_system_partition_history(
+        session, system, partition, start_date, end_date,
+        resolution=resolution, max_points=HISTORY_MAX_POINTS, as_columns=True,
     )
 
     # Get latest status using generic function
@@ -361,7 +371,7 @@ def partition_history(system, partition):
 
     # Generate chart
     chart_svg = generate_nodetype_history_matplotlib(
-        history_data, layout=read_layout(), theme=read_theme())
+        history, layout=read_layout(), theme=read_theme())
 
     return render_template(
         'dashboards/status/nodetype_history.html',
@@ -371,11 +381,12 @@ def partition_history(system, partition):
         partition=partition,
         is_partition=True,
         latest_status=latest_status,
-        history_data=history_data,
+        history_data=history.rows(),
         chart_svg=chart_svg,
         hours=hours,
         start_date=start_date,
         end_date=end_date,
+        history_resolution=resolution,
     )
 
 
@@ -397,12 +408,14 @@ def queue_history(system, queue_name):
         hours = 168  # 7-day default
     end_date = utcnow_naive()
     start_date = end_date - timedelta(hours=hours)
+    resolution = status_queries.pick_resolution(start_date, end_date, HISTORY_MAX_POINTS)
 
     session = db.session
 
     # Query queue history
-    history_data = status_queries.get_queue_history(
-        session, system, queue_name, start_date, end_date
+    history = status_queries.get_queue_history(
+        session, system, queue_name, start_date, end_date,
+        resolution=resolution, max_points=HISTORY_MAX_POINTS, as_columns=True,
     )
 
     # Get latest record for current status
@@ -412,7 +425,7 @@ def queue_history(system, queue_name):
 
     # Generate chart
     chart_svg = generate_queue_history_matplotlib(
-        history_data, layout=read_layout(), theme=read_theme())
+        history, layout=read_layout(), theme=read_theme())
 
     # Per-user / per-project rollup table — only fetched and rendered for
     # operators with VIEW_SYSTEM_STATUS_USER_INFO. Skipping the query
@@ -435,11 +448,12 @@ def queue_history(system, queue_name):
         system=system,
         queue_name=queue_name,
         latest_status=latest_status,
-        history_data=history_data,
+        history_data=history.rows(),
         chart_svg=chart_svg,
         hours=hours,
         start_date=start_date,
         end_date=end_date,
+        history_resolution=resolution,
         can_view_user_info=can_view_user_info,
         user_proj_rows=user_proj_rows,
     )
@@ -11,6 +11,9 @@ collection (e.g. ``/ncar/USGS_Water``) takes the on-the-fly path, which is
 30-120s for the large collections (see the per-collection fast-path notes
 in ``facade.py``). Whole-collection-root projects hit the pre-computed
 tables and are sub-second — caching them is cheap insurance, not the win.
+Since a new scan turns every such entry cold at once,
+:mod:`webapp.disk_scans.warm` re-fills the landing queries after each scan
+rather than leaving the first visitor to pay.
 
 Backend, lazy init and the get/compute/store dance all come from
 :class:`sam.caching.BucketedTTLCache` (shared with ``jobs/cache.py`` and
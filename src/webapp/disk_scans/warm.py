@@ -0,0 +1,345 @@
+"""Post-scan warmer for the fs-scans ``default`` cache bucket.
+
+The scan cache (:mod:`webapp.disk_scans.cache`) keys every entry on the
+per-collection scan dates, so a new weekly scan turns a collection's
+entries cold all at once — and a project whose directories are sub-paths
+of the collection then pays the 30-120s on-the-fly query the first time
+anyone opens its Filesystem Scans card.
+
+:func:`warm_scan_caches` pays it ahead of time. For each configured scan
+resource it compares every collection's latest scan date with the one it
+last warmed; for each collection with a new scan it resolves the card's
+scope for every active project owning a ``ProjectDirectory`` there, and
+runs the card's passive/landing queries (default Large-directories listing,
+owner/group rollups, access-history and file-size histograms) through the
+service layer, so the results land under exactly the keys a page load
+reads. Projects whose scopes resolve to the same paths are warmed once.
+
+The queries run on a small thread pool (``FS_SCANS_WARM_WORKERS``), each
+scope resolved up front on the caller's session — the pool threads only
+talk to the fs-scans backend. A collection is recorded as warmed only once
+all of its scopes succeeded, so a failed prefix is retried next run.
+
+Two ways in:
+
+* ``sam-admin cache --warm-scans`` — one pass, with per-prefix progress and
+  timings. Useful only with ``CACHE_REDIS_URL`` set (the webapp's shared
+  cache); a per-process cache would be thrown away on exit.
+* :func:`start_scan_warmer` — a daemon thread in each webapp worker that
+  checks every ``FS_SCANS_WARM_INTERVAL`` seconds (0, the default, leaves it
+  off). Under Redis a lease lets one worker warm for all of them; without
+  it each worker warms its own cache. The lease is renewed as each scope
+  finishes, and a run that finds it lost stops without recording anything.
+
+Config (Flask app.config or env):
+  FS_SCANS_WARM_INTERVAL  — background check period seconds (default 0 = off)
+  FS_SCANS_WARM_WORKERS   — concurrent scopes per run (default 2)
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from flask import Flask, current_app
+
+from sam.projects.projects import Project, ProjectDirectory
+
+from webapp.disk_scans import service
+from webapp.disk_scans.cache import get_cache_adapter
+from webapp.disk_scans.scope import ProjectScanScope, ScanScope
+from webapp.disk_scans.session import (
+    collections_for_resource,
+    database_for_resource,
+    get_module,
+    is_enabled,
+)
+
+logger = logging.getLogger(__name__)
+
+#: The card's passive/landing queries, called as a page load calls them
+#: (route defaults), so the warmed entries are the ones it reads.
+_WARM_QUERIES: Tuple[Tuple[str, Callable[[ScanScope], Any]], ...] = (
+    ('directories',    lambda scope: service.scan_directories(scope)),
+    ('owner',          lambda scope: service.scan_entity_summary(scope, 'owner')),
+    ('group',          lambda scope: service.scan_entity_summary(scope, 'group')),
+    ('access_history', lambda scope: service.scan_distribution(scope, 'access_history')),
+    ('file_sizes',     lambda scope: service.scan_distribution(scope, 'file_sizes')),
+)
+
+#: Cross-worker lease for a whole run, renewed as each scope finishes and
+#: before each stamp is written. It only has to outlast the slowest scope
+#: (five queries of up to 120s each), however long the whole run takes.
+_RUN_LEASE_KEY = ('warming',)
+_RUN_LEASE_TTL = 30 * 60.0
+
+#: In-process guard for the same, for the per-worker adapter (no leases).
+_RUN_LOCK = threading.Lock()
+
+
+def _stamp_key(database: Optional[str], collection: str) -> tuple:
+    return ('warmed', database, collection)
+
+
+class PrefixTiming(NamedTuple):
+    """One warmed scope: the project whose card it is, and how long it took."""
+
+    resource: str
+    projcode: str
+    path_prefixes: Tuple[str, ...]
+    seconds: float
+    error: Optional[str] = None
+
+
+@dataclass
+class WarmReport:
+    """Outcome of one :func:`warm_scan_caches` run.
+
+    ``collections`` maps ``(resource, collection)`` to ``'warmed'``,
+    ``'current'`` (already warmed for its latest scan), ``'unscanned'`` or
+    ``'failed'``. ``busy`` means another worker held the run lease, so
+    nothing was looked at — or that this run lost it part-way, so nothing
+    was recorded.
+    """
+
+    collections: Dict[Tuple[str, str], str] = field(default_factory=dict)
+    prefixes: List[PrefixTiming] = field(default_factory=list)
+    busy: bool = False
+
+    @property
+    def errors(self) -> List[PrefixTiming]:
+        return [p for p in self.prefixes if p.error]
+
+
+class _ResolvedScope(ScanScope):
+    """A :class:`ProjectScanScope` already resolved on the caller's session.
+
+    Lets the pool threads run the service queries without touching the SAM
+    session, which is not theirs to share.
+    """
+
+    mode = 'project'
+
+    def __init__(self, resource_name: str, resolved):
+        super().__init__(resource_name)
+        self._resolved = resolved
+
+    def resolve(self):
+        return self._resolved
+
+
+class _Job(NamedTuple):
+    scope: _ResolvedScope
+    projcode: str
+    #: The newly scanned ``(resource, collection)`` pairs this scope covers.
+    triggers: Tuple[Tuple[str, str], ...]
+
+
+def _still_leader(adapter, token: Optional[str]) -> bool:
+    """Renew the run lease; ``False`` if it is no longer ours."""
+    if token is None:
+        return True                     # per-worker adapter: `_RUN_LOCK` guards
+    if adapter.renew_lease(_RUN_LEASE_KEY, token, _RUN_LEASE_TTL):
+        return True
+    logger.warning('fs-scans warm: lost the run lease; stopping without '
+                   'recording this run')
+    return False
+
+
+def _latest_scan(mod, database: Optional[str], collection: str) -> Optional[str]:
+    q = mod.FsScanQueries(filesystems=[collection], database=database)
+    dates = q.scan_dates(filesystems=[collection])
+    return max(dates).isoformat() if dates else None
+
+
+def _projects_on(session, mod, collections) -> List[Project]:
+    """Active projects with an active directory in any of *collections*."""
+    wanted = set(collections)
+    rows = (session.query(ProjectDirectory.directory_name, Project)
+            .join(Project, Project.project_id == ProjectDirectory.project_id)
+            .filter(ProjectDirectory.is_active, Project.active == True)  # noqa: E712
+            .all())
+    projects: Dict[int, Project] = {}
+    for directory_name, project in rows:
+        if mod.collection_for_path(directory_name) in wanted:
+            projects.setdefault(project.project_id, project)
+    return sorted(projects.values(), key=lambda p: p.projcode)
+
+
+def _plan(session, mod, resource: str,
+          stale: List[str], seen: Dict[tuple, _Job]) -> None:
+    """Add a job per distinct scope on *resource* touching a *stale* collection."""
+    database = database_for_resource(resource)
+    stale_set = set(stale)
+    for project in _projects_on(session, mod, stale):
+        resolved = ProjectScanScope(session, project, resource).resolve()
+        _mod, path_prefixes, collections = resolved
+        touched = tuple((resource, c) for c in collections if c in stale_set)
+        if not touched:
+            continue                    # directories elsewhere, or unreachable
+        key = (database, tuple(sorted(path_prefixes)))
+        job = seen.get(key)
+        if job is None:
+            seen[key] = _Job(_ResolvedScope(resource, resolved), project.projcode, touched)
+        else:
+            seen[key] = job._replace(
+                triggers=tuple(dict.fromkeys(job.triggers + touched)))
+
+
+def _run_job(app: Flask, job: _Job) -> PrefixTiming:
+    started = time.perf_counter()
+    error = None
+    with app.app_context():
+        for name, query in _WARM_QUERIES:
+            try:
+                query(job.scope)
+            except Exception as exc:
+                error = f'{name}: {exc}'
+                logger.warning('fs-scans warm: %s for %s on %s failed: %s',
+                               name, job.projcode, job.scope.resource_name, exc)
+    _mod, path_prefixes, _collections = job.scope.resolve()
+    return PrefixTiming(job.scope.resource_name, job.projcode,
+                        tuple(path_prefixes), time.perf_counter() - started, error)
+
+
+def warm_scan_caches(session, *, resources: Optional[List[str]] = None,
+                     force: bool = False, workers: Optional[int] = None,
+                     progress: Optional[Callable[[int, int, PrefixTiming], None]] = None,
+                     ) -> WarmReport:
+    """Precompute the Filesystem Scans card for collections with a new scan.
+
+    Runs inside an app context; *session* is the SAM session used to find the
+    projects and resolve their scopes. *resources* defaults to
+    ``FS_SCAN_RESOURCES``; *force* re-warms collections already warmed for
+    their latest scan. *progress(done, total, timing)* is called as each scope
+    finishes. Does nothing (an empty report) when the plugin or the
+    ``default`` bucket is off.
+    """
+    report = WarmReport()
+    mod = get_module()
+    adapter = get_cache_adapter('default')
+    if mod is None or not is_enabled() or adapter is None:
+        return report
+
+    acquire = getattr(adapter, 'acquire_lease', None)
+    token = None
+    if acquire is not None:
+        token = acquire(_RUN_LEASE_KEY, _RUN_LEASE_TTL)
+        if token is None:
+            report.busy = True
+            return report
+    elif not _RUN_LOCK.acquire(blocking=False):
+        report.busy = True
+        return report
+
+    try:
+        # 1. Which collections have a scan we haven't warmed?
+        scans: Dict[Tuple[str, str], Tuple[Optional[str], str]] = {}
+        stale_by_resource: Dict[str, List[str]] = {}
+        for resource in resources or current_app.config.get('FS_SCAN_RESOURCES') or []:
+            database = database_for_resource(resource)
+            for collection in collections_for_resource(resource):
+                scan = _latest_scan(mod, database, collection)
+                if scan is None:
+                    report.collections[(resource, collection)] = 'unscanned'
+                    continue
+                with adapter.lock:
+                    warmed = adapter.get(_stamp_key(database, collection))
+                if warmed == scan and not force:
+                    report.collections[(resource, collection)] = 'current'
+                    continue
+                scans[(resource, collection)] = (database, scan)
+                stale_by_resource.setdefault(resource, []).append(collection)
+
+        # 2. One job per distinct scope touching them, resolved here.
+        jobs: Dict[tuple, _Job] = {}
+        for resource, stale in stale_by_resource.items():
+            _plan(session, mod, resource, stale, jobs)
+
+        # 3. Run them, a few at a time.
+        failed = set()
+        app = current_app._get_current_object()
+        max_workers = workers or int(current_app.config.get('FS_SCANS_WARM_WORKERS', 2))
+        total = len(jobs)
+        if total:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total)),
+                                    thread_name_prefix='fs-scans-prewarm') as pool:
+                futures = {pool.submit(_run_job, app, job): job for job in jobs.values()}
+                for done, future in enumerate(as_completed(futures), 1):
+                    timing = future.result()
+                    report.prefixes.append(timing)
+                    if timing.error:
+                        failed.update(futures[future].triggers)
+                    if progress is not None:
+                        progress(done, total, timing)
+                    if not _still_leader(adapter, token):
+                        for pending in futures:
+                            pending.cancel()
+                        report.busy = True
+                        break
+
+        # 4. Record the scans we warmed, so the next run skips them — but
+        #    only while the lease is still ours.
+        for (resource, collection), (database, scan) in scans.items():
+            if report.busy:
+                break
+            if (resource, collection) in failed:
+                report.collections[(resource, collection)] = 'failed'
+                continue
+            if not _still_leader(adapter, token):
+                report.busy = True
+                break
+            report.collections[(resource, collection)] = 'warmed'
+            with adapter.lock:
+                try:
+                    adapter[_stamp_key(database, collection)] = scan
+                except ValueError:
+                    pass                # full; the next run just re-checks
+    finally:
+        if token is not None:
+            adapter.release_lease(_RUN_LEASE_KEY, token)
+        elif acquire is None:
+            _RUN_LOCK.release()
+
+    logger.info('fs-scans warm: %d scope(s) across %d new scan(s), %d failed',
+                len(report.prefixes),
+                sum(1 for s in report.collections.values() if s in ('warmed', 'failed')),
+                len(report.errors))
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Background task
+# ---------------------------------------------------------------------------
+
+def start_scan_warmer(app: Flask) -> Optional[threading.Thread]:
+    """Start this worker's warming thread if ``FS_SCANS_WARM_INTERVAL`` is set.
+
+    Each pass is cheap when nothing was re-scanned: one ``scan_metadata``
+    lookup per collection. Returns the thread, or ``None`` when off.
+    """
+    interval = int(app.config.get('FS_SCANS_WARM_INTERVAL', 0) or 0)
+    if interval <= 0 or not is_enabled(app):
+        return None
+
+    def _loop():
+        from webapp.extensions import db
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    warm_scan_caches(db.session)
+                except Exception:
+                    logger.warning('fs-scans warm: background run failed',
+                                   exc_info=True)
+                finally:
+                    db.session.remove()
+
+    thread = threading.Thread(target=_loop, name='fs-scans-warmer', daemon=True)
+    thread.start()
+    logger.info('fs-scans warm: checking for new scans every %ds', interval)
+    return thread
@@ -12,6 +12,12 @@ picked by whether the requested window can still change:
   * ``recent`` (``jobs_recent``) — the window touches today (or has no
     end bound), so new jobs keep landing in it. Short TTL keeps the
     staleness window at ~15 minutes.
+  * ``partials`` (``jobs_partials``) — per-chunk pieces of a window-
+    composable aggregation (see ``webapp/jobs/partials.py``). A chunk that
+    ended more than ``PARTIAL_SETTLE_DAYS`` ago has stopped collecting late
+    job records, so it can live for hours; younger chunks fall back to the
+    historical / recent buckets by the same rule as whole windows. Off by
+    default (TTL 0) — while off, every aggregation is cached whole.
 
 Note the chart SVG caches (``webapp.caching.chart_cached``) are NOT the
 freshness lever they look like: their keys are content hashes of the data
@@ -36,6 +42,17 @@ Config (Flask app.config or env; 0 disables the corresponding bucket):
   JOBS_CACHE_SIZE         — historical max LRU entries (default 512)
   JOBS_RECENT_CACHE_TTL   — recent TTL seconds (default 900 = 15 min)
   JOBS_RECENT_CACHE_SIZE  — recent max LRU entries (default 512)
+  JOBS_CACHE_SOFT_TTL, JOBS_RECENT_CACHE_SOFT_TTL
+                          — per-bucket stale-while-revalidate threshold
+                            seconds (0 = off, default). Past it a hit is
+                            served immediately and refreshed in the
+                            background; the compute opens its own plugin
+                            session, so it is safe off the request thread.
+  JOBS_PARTIAL_CACHE_TTL  — partials TTL seconds (default 0 = off, which also
+                            turns window composition off; 86400 is a good
+                            production value)
+  JOBS_PARTIAL_CACHE_SIZE — partials max LRU entries (default 4096: a 1 yr
+                            window is ~64 chunks per query type and filter set)
 
 The sizes are set for the explorer, which fans out far more distinct keys
 than the cards ever did: per filter combination, up to 8 histogram
@@ -48,19 +65,27 @@ Key shape (hashable tuple):
   (query_type, machine, sorted(normalized opts))
 ``opts`` carries every parameter that shapes the result — the flat
 filter set plus dimension/limit — normalized so dates and lists hash
-stably.
+stably. Partial keys use the query type suffixed ``:partial`` and
+carry the chunk's own ``start``/``end`` in place of the window's.
+
+Bundles: a page's aggregation tabs share one filter set, so they are
+computed together (:func:`cached_jobs_bundle`, behind
+``service.jobs_aggregation_bundle``) and each stored under the exact key
+its own fragment will read. A bundle stores no entry of its own.
 """
 
 from __future__ import annotations
 
 import logging
-from datetime import date
-from typing import Any, Callable, Dict, List, Optional
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
 
 from sam.caching import BucketedTTLCache, BucketSpec, CacheBase, norm
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
 
 #: Bucket specs: the Redis prefix / Admin-card label plus the config knobs.
 #: Both buckets use the same backend, differing only here. Declaration order
@@ -70,14 +95,25 @@ _CACHE = BucketedTTLCache('jobs', 'jobs', {
         name='jobs',
         ttl_key='JOBS_CACHE_TTL', ttl_default=1800,          # 30 minutes
         size_key='JOBS_CACHE_SIZE', size_default=512,
+        soft_ttl_key='JOBS_CACHE_SOFT_TTL',
     ),
     'recent': BucketSpec(
         name='jobs_recent',
         ttl_key='JOBS_RECENT_CACHE_TTL', ttl_default=900,    # 15 minutes
         size_key='JOBS_RECENT_CACHE_SIZE', size_default=512,
+        soft_ttl_key='JOBS_RECENT_CACHE_SOFT_TTL',
+    ),
+    'partials': BucketSpec(
+        name='jobs_partials',
+        ttl_key='JOBS_PARTIAL_CACHE_TTL', ttl_default=0,     # off; see above
+        size_key='JOBS_PARTIAL_CACHE_SIZE', size_default=4096,
     ),
 })
 
+#: Days after which a closed chunk stops receiving late job records and may
+#: move to the long-lived ``partials`` bucket.
+PARTIAL_SETTLE_DAYS = 2
+
 #: Test seams. ``_BUCKETS`` enumerates the bucket keys; ``_adapters`` IS the
 #: cache's memo dict (same object), so a test that clears it re-initialises
 #: this cache — the pre-existing idiom, preserved through the extraction.
@@ -102,6 +138,23 @@ def bucket_for_window(end: Optional[date]) -> str:
     return 'recent'
 
 
+def partials_enabled() -> bool:
+    """True when the ``partials`` bucket is on — and with it, composition."""
+    return _CACHE.adapter('partials') is not None
+
+
+def bucket_for_partial(end: date) -> str:
+    """Pick the bucket for a chunk ending at *end*.
+
+    Settled chunks (older than ``PARTIAL_SETTLE_DAYS``) go to ``partials``;
+    the rest follow :func:`bucket_for_window`, so yesterday's chunk is never
+    held longer than a closed whole window would be.
+    """
+    if end < date.today() - timedelta(days=PARTIAL_SETTLE_DAYS):
+        return 'partials'
+    return bucket_for_window(end)
+
+
 def cached_jobs_aggregation(
     query_type: str,
     machine: str,
@@ -117,12 +170,72 @@ def cached_jobs_aggregation(
     the result — the caller passes the exact plugin kwargs plus any
     SAM-side knobs (dimension, limit).
     """
-    key = (
+    key = _aggregation_key(query_type, machine, opts)
+    return _CACHE.get_or_compute(bucket, key, compute, refresh=compute)
+
+
+def _aggregation_key(query_type: str, machine: str,
+                     opts: Dict[str, Any]) -> Hashable:
+    return (
         query_type,
         machine,
         tuple(sorted((k, norm(v)) for k, v in opts.items())),
     )
-    return _CACHE.get_or_compute(bucket, key, compute)
+
+
+def cached_jobs_partial(
+    query_type: str,
+    machine: str,
+    opts: Dict[str, Any],
+    compute: Callable[[], Any],
+) -> Any:
+    """Return one cached chunk of a composable aggregation.
+
+    *opts* must carry the chunk's own ``start``/``end``; the bucket follows
+    the chunk's end (:func:`bucket_for_partial`). The ``:partial`` suffix
+    keeps chunk entries from ever satisfying a whole-window lookup.
+    """
+    return cached_jobs_aggregation(
+        f'{query_type}:partial', machine, opts, compute,
+        bucket=bucket_for_partial(opts['end']),
+    )
+
+
+def cached_jobs_bundle(
+    machine: str,
+    entries: Dict[Hashable, Tuple[str, Dict[str, Any]]],
+    compute: Callable[[List[Hashable]], Dict[Hashable, Any]],
+    bucket: str,
+    *,
+    need: Optional[Hashable] = None,
+) -> Dict[Hashable, Any]:
+    """Return every entry's result, computing only the missing ones — together.
+
+    *entries* maps a caller-chosen name to ``(query_type, opts)``: exactly
+    what that aggregation's own :func:`cached_jobs_aggregation` call passes,
+    so each result is stored under the key that call reads. *compute* gets
+    the names that missed and returns ``{name: result}`` for all of them in
+    one go. Lookups here are peeks — they count as neither hits nor misses.
+    *need* is the entry the caller is about to show. When it is found,
+    nothing is computed: the others are filled by the next miss instead of
+    delaying a hit. With the bucket disabled nothing is found or kept, so
+    only *need* is computed then — or every entry, when there is no *need*.
+    """
+    if need is not None and _CACHE.adapter(bucket) is None:
+        entries = {need: entries[need]}
+    keys = {name: _aggregation_key(query_type, machine, opts)
+            for name, (query_type, opts) in entries.items()}
+    results: Dict[Hashable, Any] = {}
+    for name, key in keys.items():
+        value = _CACHE.peek(bucket, key, _MISSING)
+        if value is not _MISSING:
+            results[name] = value
+    missing = [name for name in keys if name not in results]
+    if missing and need not in results:
+        for name, value in compute(missing).items():
+            _CACHE.put(bucket, keys[name], value)
+            results[name] = value
+    return results
 
 
 # ---------------------------------------------------------------------------
@@ -139,6 +252,7 @@ def jobs_cache_info() -> List[Dict]:
 
     Returns a list (historical bucket first) so the Configuration card can
     loop and surface each bucket's TTL — making the 15-min recent TTL
-    visible alongside the 30-min historical one.
+    visible alongside the 30-min historical one (and the partials bucket's,
+    when composition is on).
     """
     return _CACHE.info()
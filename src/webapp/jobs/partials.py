@@ -0,0 +1,171 @@
+"""Window-composable job aggregations: per-chunk partials merged in Python.
+
+The card pills (30d / 60d / 90d / 1 yr) and every explorer date range are
+distinct cache keys, so a whole-window cache never lets one window reuse
+another's work — switching pills is a cold plugin query each time. Usage
+rollups and daily series are *additive* over disjoint date ranges, though:
+a window's per-user totals are the sums of its days' per-user totals. This
+module splits a window into chunks, lets the service cache one plugin
+result per chunk, and merges chunk results back into the exact envelope the
+whole-window query would have returned.
+
+Chunks are ISO weeks (Monday–Sunday) wherever a whole week fits inside the
+window, single days at the ragged edges. Week alignment is what makes the
+chunks shareable: the 30d and 90d windows ending on the same day cover the
+same Mondays, so the longer window only computes the weeks the shorter one
+never saw. A 1 yr window is ~52 week chunks plus at most 12 edge days.
+
+Merging is only exact for what the plugin sums:
+
+  * usage-by (``jobs_usage_by``) — chunks are computed unranked and
+    untruncated (``limit=None``), rows are summed by ``value``, then ranked
+    by the requested metric and truncated here. ``sort_by`` and ``limit``
+    therefore never reach the chunk keys: every ranking shares one set of
+    partials.
+  * daily series (``jobs_timeseries('day')``) — a day band depends only on
+    its own day, so chunk bands concatenate. Owners are the exception: the
+    top-N is ranked once over the whole window, so chunks are fetched with
+    every owner (``EVERY_OWNER``) and the window's top-N is picked, ordered
+    and zero-filled here. Week and month bands are not composed — their
+    boundaries belong to the plugin — and go through the whole-window path.
+
+The numeric fields summed are whatever int/float fields the envelope
+carries, so a plugin that grows a metric is merged without a change here.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+#: ``owners_limit`` for series chunks: large enough to return every owner,
+#: so the window-level top-N can be ranked from complete per-band data.
+EVERY_OWNER = 1_000_000
+
+#: Envelope keys the merges rebuild; everything else is copied from the
+#: first chunk (``dimension``, ``period``, ``owners_by``, …).
+_USAGE_MERGED = ('rows', 'totals')
+_SERIES_MERGED = ('bands', 'totals', 'null_count', 'total_count', 'start', 'end')
+
+
+def composable_window(start: Any, end: Any) -> bool:
+    """True when [*start*, *end*] is a bounded, non-empty window of dates.
+
+    Unbounded windows go to the whole-window path (the plugin resolves
+    their start itself), and so do datetimes: chunks are whole days.
+    """
+    return (isinstance(start, date) and isinstance(end, date)
+            and not isinstance(start, datetime)
+            and not isinstance(end, datetime)
+            and start <= end)
+
+
+def split_window(start: date, end: date) -> List[Tuple[date, date]]:
+    """Cover [*start*, *end*] with ISO-week chunks and single edge days.
+
+    Chunks are inclusive ``(first, last)`` pairs, in order, disjoint and
+    exactly covering the window.
+    """
+    chunks = []
+    day = start
+    while day <= end:
+        week_end = day + timedelta(days=6)
+        if day.weekday() == 0 and week_end <= end:
+            chunks.append((day, week_end))
+            day = week_end + timedelta(days=1)
+        else:
+            chunks.append((day, day))
+            day += timedelta(days=1)
+    return chunks
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _accumulate(into: Dict[str, Any], metrics: Dict[str, Any]) -> Dict[str, Any]:
+    """Add every numeric field of *metrics* into *into* (in place)."""
+    for k, v in metrics.items():
+        if _is_number(v):
+            into[k] = into.get(k, 0) + v
+    return into
+
+
+def rank_value(metrics: Dict[str, Any], sort_by: Optional[str]) -> float:
+    """The plugin's ranking metric: combined hours unless *sort_by* names one.
+
+    ``'charges'`` is CPU + GPU charges, matching the routes' sort pills.
+    """
+    if sort_by == 'charges':
+        return (metrics.get('cpu_charges') or 0) + (metrics.get('gpu_charges') or 0)
+    if sort_by:
+        return metrics.get(sort_by) or 0
+    return (metrics.get('cpu_hours') or 0) + (metrics.get('gpu_hours') or 0)
+
+
+def _ranked(items: Iterable[Tuple[Any, Dict[str, Any]]],
+            sort_by: Optional[str]) -> List[Tuple[Any, Dict[str, Any]]]:
+    # Name breaks ties so the order is stable across merges.
+    return sorted(items, key=lambda kv: (-rank_value(kv[1], sort_by), str(kv[0])))
+
+
+def merge_usage(parts: List[Dict[str, Any]], *, limit: Optional[int],
+                sort_by: Optional[str]) -> Dict[str, Any]:
+    """Merge unranked ``jobs_usage_by`` chunks into one ranked envelope.
+
+    ``totals`` stay pre-truncation, as the plugin's do, so a pie's "Other"
+    slice is still ``totals − Σ rows``.
+    """
+    rows: Dict[Any, Dict[str, Any]] = {}
+    totals: Dict[str, Any] = {}
+    for part in parts:
+        for row in part.get('rows') or ():
+            _accumulate(rows.setdefault(row['value'], {'value': row['value']}), row)
+        _accumulate(totals, part.get('totals') or {})
+
+    ranked = [row for _, row in _ranked(rows.items(), sort_by)]
+    if limit is not None:
+        ranked = ranked[:limit]
+    out = {k: v for k, v in parts[0].items() if k not in _USAGE_MERGED}
+    out.update(rows=ranked, totals=totals)
+    return out
+
+
+def merge_day_series(parts: List[Dict[str, Any]], *,
+                     owners_limit: Optional[int],
+                     owners_sort_by: Optional[str]) -> Dict[str, Any]:
+    """Concatenate ``jobs_timeseries('day')`` chunks into one envelope.
+
+    With *owners_limit*, chunks must carry every owner (``EVERY_OWNER``);
+    the window's top-N is ranked by *owners_sort_by* over all bands and
+    every band gets exactly those keys, in rank order, zero-filled.
+    """
+    bands = [dict(band) for part in parts for band in part.get('bands') or ()]
+    totals: Dict[str, Any] = {}
+    for part in parts:
+        _accumulate(totals, part.get('totals') or {})
+
+    if owners_limit is not None:
+        window: Dict[str, Dict[str, Any]] = {}
+        for band in bands:
+            for name, metrics in (band.get('owners') or {}).items():
+                _accumulate(window.setdefault(name, {}), metrics)
+        top = [name for name, _ in _ranked(window.items(), owners_sort_by)]
+        top = top[:owners_limit]
+        for band in bands:
+            owners = band.get('owners') or {}
+            band['owners'] = {
+                name: dict(owners.get(name) or {k: 0 * v for k, v in window[name].items()})
+                for name in top
+            }
+
+    out = {k: v for k, v in parts[0].items() if k not in _SERIES_MERGED}
+    out.update(
+        start=parts[0].get('start'),
+        end=parts[-1].get('end'),
+        bands=bands,
+        totals=totals,
+        null_count=sum(part.get('null_count') or 0 for part in parts),
+        total_count=sum(part.get('total_count') or 0 for part in parts),
+    )
+    return out
@@ -831,6 +831,39 @@ def panel_relevance(*, mode: str, user_filter=None, account_filter=None,
     }
 
 
+def _panel_group_by(rel: dict) -> str:
+    """The histograms' owner axis: the pill where offered, else the free axis."""
+    return _parse_group_by() if rel['owners_toggle'] else rel['default_group_by']
+
+
+def _card_bundle(rel: dict, *, hist_metric: str = _DEFAULT_METRIC_HIST,
+                 usage_metric: str = _DEFAULT_METRIC_PIE,
+                 facets: bool = False) -> service.JobsBundle:
+    """The card's aggregation tabs, as one ``service.jobs_aggregation_bundle``.
+
+    Whichever tab misses first computes them all, each under the key that
+    tab's own fragment will read — so every value here must be what that
+    fragment passes: the asking fragment's metric for its own family, the
+    pill defaults for the other, the same owner axis and limits, and only
+    the tabs ``rel`` shows. Job Sizes contributes the dimension it opens
+    on; its other pills are one click further away and each another scan,
+    so they load on demand. *facets* adds the explorer's chip counts.
+    """
+    group_by = _panel_group_by(rel)
+    usage_by = (('user',) if rel['show_by_user'] else ()) + \
+        (('account',) if rel['show_by_project'] else ())
+    return service.JobsBundle(
+        histograms=('wait', _panel_dimension(_SIZE_DIMENSIONS[0], True), 'duration'),
+        owners_limit=_HIST_OWNERS_LIMIT if rel['owners_enabled'] else None,
+        owners_sort_by=_USAGE_SORT_BY[hist_metric],
+        owners_by='account' if group_by == 'project' else 'user',
+        usage_by=usage_by,
+        usage_limit=_BY_USER_LIMIT,
+        usage_sort_by=_USAGE_SORT_BY[usage_metric],
+        facets=_EXPLORER_FACETS if facets else (),
+    )
+
+
 #: Plugin metric keys carried on every usage row / totals dict. The full
 #: vector, so the remainder below can be shown in whichever metric the panel
 #: is ranked by — a charges view whose "Other" row has no charges figure is
@@ -929,16 +962,31 @@ def _render_usage_panel(*, entity_key, mode, machine, fragment_url,
 
     filters = _parse_job_filters(include_user=(username is None))
     metric = _parse_metric(_DEFAULT_METRIC_PIE)
+    rel = panel_relevance(
+        mode=mode,
+        user_filter=username or filters.get('user'),
+        account_filter=(request.args.get('account') or '').strip() or None,
+        account_projcodes=account_projcodes,
+    )
 
     usage = None
     error = None
+    scope = _agg_scope(mode, username=username,
+                       account_projcodes=account_projcodes)
+    bundle = _card_bundle(rel, usage_metric=metric)
+    plugin_entity = 'account' if entity_key == 'project' else 'user'
     try:
-        usage = getattr(service, entity['service'])(
-            machine,
-            _agg_scope(mode, username=username,
-                       account_projcodes=account_projcodes),
-            limit=_BY_USER_LIMIT, sort_by=_USAGE_SORT_BY[metric], **filters,
-        )
+        if plugin_entity in bundle.usage_by:
+            # With the card's other tabs, on a miss: one round for all.
+            usage = service.jobs_aggregation_bundle(
+                machine, scope, bundle, need=('usage_by', plugin_entity),
+                **filters,
+            )['usage_by'][plugin_entity]
+        else:
+            usage = getattr(service, entity['service'])(
+                machine, scope,
+                limit=_BY_USER_LIMIT, sort_by=_USAGE_SORT_BY[metric], **filters,
+            )
     except Exception as exc:
         from flask import current_app
         current_app.logger.exception(
@@ -1113,7 +1161,7 @@ def _render_timeline(*, mode, machine, fragment_url, target_id,
         account_projcodes=account_projcodes,
     )
     owners_toggle = rel['owners_toggle']
-    group_by = _parse_group_by() if owners_toggle else rel['default_group_by']
+    group_by = _panel_group_by(rel)
     owners_by = 'account' if group_by == 'project' else 'user'
     entity = _USAGE_ENTITIES[group_by]
 
@@ -1232,7 +1280,7 @@ def _render_histogram(*, mode, machine, dimension, dimension_toggle,
         account_projcodes=account_projcodes,
     )
     owners_toggle = rel['owners_toggle']
-    group_by = _parse_group_by() if owners_toggle else rel['default_group_by']
+    group_by = _panel_group_by(rel)
     # The plugin's word for a project owner is 'account'; the URL and the
     # shared view-preference bucket speak 'project'. Translate here, at
     # the one boundary between the two vocabularies.
@@ -1240,22 +1288,31 @@ def _render_histogram(*, mode, machine, dimension, dimension_toggle,
 
     hist = None
     error = None
+    scope = _agg_scope(mode, username=username,
+                       account_projcodes=account_projcodes)
+    bundle = _card_bundle(rel, hist_metric=metric)
     try:
-        hist = service.jobs_histogram(
-            machine, dimension,
-            _agg_scope(mode, username=username,
-                       account_projcodes=account_projcodes),
-            # Both axes pinned ⇒ every band has exactly one owner, so
-            # skip the grouping entirely: flat bars, and a band drills
-            # straight to its jobs instead of through a one-row tier.
-            owners_limit=_HIST_OWNERS_LIMIT if rel['owners_enabled'] else None,
-            # Which top-N survives must follow the displayed metric —
-            # hours-ranked owners cover ~1% of band GPU-hours (plugin
-            # PR #100 review data), rendering a GPU stack as all-"Other".
-            owners_sort_by=_USAGE_SORT_BY[metric],
-            owners_by=owners_by,
-            **filters,
-        )
+        if dimension in bundle.histograms:
+            # With the card's other tabs, on a miss: one round for all. The
+            # bundle carries exactly the owner knobs spelled out below.
+            hist = service.jobs_aggregation_bundle(
+                machine, scope, bundle, need=('histogram', dimension),
+                **filters,
+            )['histograms'][dimension]
+        else:
+            hist = service.jobs_histogram(
+                machine, dimension, scope,
+                # Both axes pinned ⇒ every band has exactly one owner, so
+                # skip the grouping entirely: flat bars, and a band drills
+                # straight to its jobs instead of through a one-row tier.
+                owners_limit=_HIST_OWNERS_LIMIT if rel['owners_enabled'] else None,
+                # Which top-N survives must follow the displayed metric —
+                # hours-ranked owners cover ~1% of band GPU-hours (plugin
+                # PR #100 review data), rendering a GPU stack as all-"Other".
+                owners_sort_by=_USAGE_SORT_BY[metric],
+                owners_by=owners_by,
+                **filters,
+            )
     except Exception as exc:
         from flask import current_app
         current_app.logger.exception(
@@ -1459,8 +1516,13 @@ def _explorer_panel_params(panel: dict, scope: Optional[str] = None,
     return params
 
 
+#: The chip strip's facet dimensions — ``service.jobs_facets``' defaults.
+_EXPLORER_FACETS = ('queue', 'qos', 'exit_status')
+
+
 def _explorer_facets(mode: str, machine: str, panel: dict, project=None,
-                     username=None) -> Optional[dict]:
+                     username=None, rel=None,
+                     active_tab: str = 'jobs') -> Optional[dict]:
     """Facet counts for the chip strip, under the current filter set.
 
     Computed by the shell rather than out-of-band from the table, because
@@ -1469,16 +1531,27 @@ def _explorer_facets(mode: str, machine: str, panel: dict, project=None,
     previous filter set. It also stops the strip recomputing on a sort or
     page click, neither of which can change a facet count.
 
+    With a chart tab open, the card's aggregation tabs come along in the
+    same ``jobs_aggregation_bundle`` round (*rel* decides which), so the
+    tab about to load — and any opened after it — is a hit. On the Jobs
+    tab only the facets run: a visit that reads the table pays for no chart.
+
     Degrades to no chips on any failure — the panels are the content.
     """
+    scope = _agg_scope(mode, username=username,
+                       account_projcodes=(_tree_projcodes(project)
+                                          if project is not None else None))
+    filters = _parse_job_filters(include_user=(username is None))
+    qos_names = panel.get('qos_options') or ()
     try:
+        if rel is not None and active_tab != 'jobs':
+            return service.jobs_aggregation_bundle(
+                machine, scope, _card_bundle(rel, facets=True),
+                need=('facets',), valid_qos_names=qos_names, **filters,
+            )['facets']
         return service.jobs_facets(
-            machine,
-            _agg_scope(mode, username=username,
-                       account_projcodes=(_tree_projcodes(project)
-                                          if project is not None else None)),
-            valid_qos_names=panel.get('qos_options') or (),
-            **_parse_job_filters(include_user=(username is None)),
+            machine, scope, facets=_EXPLORER_FACETS,
+            valid_qos_names=qos_names, **filters,
         )
     except Exception:
         from flask import current_app
@@ -1495,9 +1568,10 @@ def _explorer_card_context(*, mode: str, machine: str, project=None,
 
     Shared by the three ``explore_*`` page routes and the three ``/card``
     routes when the filter panel submits to them, so a deep link and an
-    Apply produce the same card. The panels are lazy, so a visit that
-    only reads the table costs exactly what it did before the charts
-    moved in.
+    Apply produce the same card. The panels are lazy, and the shell
+    computes the charts' aggregations only with a chart tab open, so a
+    visit that only reads the table costs exactly what it did before the
+    charts moved in.
     """
     from flask_login import current_user
     username = current_user.username if mode == 'user' else None
@@ -1506,6 +1580,14 @@ def _explorer_card_context(*, mode: str, machine: str, project=None,
                                           include_user=(username is None))
     active_tab = _parse_active_tab()
     panel['active_tab'] = active_tab      # the form round-trips it back
+    account_projcodes = (_tree_projcodes(project)
+                         if project is not None else None)
+    rel = panel_relevance(
+        mode=mode,
+        user_filter=panel_params.get('user'),
+        account_filter=panel_params.get('account'),
+        account_projcodes=account_projcodes,
+    )
     return panel, _card_context(
         active_tab=active_tab,
         mode=mode, machine=machine,
@@ -1514,10 +1596,10 @@ def _explorer_card_context(*, mode: str, machine: str, project=None,
         panel_params=panel_params,
         # The table takes one param the aggregations have no use for.
         jobs_params=dict(panel_params, per_page=panel['per_page']),
-        account_projcodes=(_tree_projcodes(project)
-                           if project is not None else None),
+        account_projcodes=account_projcodes,
         facet_chips=_explorer_facets(mode, machine, panel,
-                                     project=project, username=username),
+                                     project=project, username=username,
+                                     rel=rel, active_tab=active_tab),
         facet_filters=_parse_job_filters(include_user=(username is None)),
         facet_form_id=f'jobs-filters-panel-{_EXPLORER_CID}-jobs',
         # The filter panel's own date fields own the window here; a pill
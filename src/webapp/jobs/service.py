@@ -14,10 +14,18 @@ mode and can reject a filter combination before it reaches the plugin (see
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import date, timedelta
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
 
 from webapp.jobs import cache as jobs_cache
+from webapp.jobs.partials import (
+    EVERY_OWNER,
+    composable_window,
+    merge_day_series,
+    merge_usage,
+    split_window,
+)
 from webapp.jobs.scope import JobScope, ProjectJobScope
 from webapp.jobs.session import (
     get_engines,
@@ -371,6 +379,191 @@ def _cached_aggregation(
     )
 
 
+def _composed_aggregation(
+    query_type: str,
+    machine: str,
+    kwargs: Dict[str, Any],
+    call,
+    *,
+    chunk_kwargs: Dict[str, Any],
+    chunk_call,
+    merge,
+    **extra_opts,
+) -> Any:
+    """Like :func:`_cached_aggregation`, but built from cached window chunks.
+
+    Args:
+        chunk_kwargs: the plugin kwargs every chunk runs with — *kwargs*
+            minus whatever the merge applies itself (ranking, truncation,
+            owner top-N). They key the chunk cache, so two windows, or two
+            rankings of one window, share every chunk they have in common.
+        chunk_call: ``(JobQueries, chunk_opts) -> chunk result``, where
+            ``chunk_opts`` is *chunk_kwargs* with the chunk's start/end.
+        merge: ``[chunk results] -> final result``, in window order.
+
+    Composition needs the ``partials`` bucket on and a bounded date window
+    (``webapp/jobs/partials.py``); otherwise this is exactly
+    :func:`_cached_aggregation` with *call*. The merged result is still
+    cached whole under the window's own key, so a repeated window is one
+    lookup, not one per chunk.
+    """
+    start, end = kwargs.get('start'), kwargs.get('end')
+    if not (jobs_cache.partials_enabled() and composable_window(start, end)):
+        return _cached_aggregation(query_type, machine, kwargs, call, **extra_opts)
+
+    def _chunk(first: date, last: date) -> Any:
+        opts = {**chunk_kwargs, 'start': first, 'end': last}
+
+        def _compute():
+            JobQueries = get_module().JobQueries
+            with job_history_session(machine) as session:
+                return chunk_call(JobQueries(session, machine=machine), opts)
+
+        return jobs_cache.cached_jobs_partial(query_type, machine, opts, _compute)
+
+    def _compute():
+        return merge([_chunk(first, last) for first, last in split_window(start, end)])
+
+    return jobs_cache.cached_jobs_aggregation(
+        query_type, machine, {**kwargs, **extra_opts}, _compute,
+        bucket=jobs_cache.bucket_for_window(end),
+    )
+
+
+@dataclass(frozen=True)
+class JobsBundle:
+    """The aggregation tabs one page shows over a single filter set.
+
+    Each field is what the matching per-dimension call would be passed:
+    the histograms share one owner breakdown (their panes share the metric
+    and User|Project pills), the usage rollups one limit and ranking.
+    ``usage_by`` names plugin entities — ``'user'`` and/or ``'account'``;
+    ``facets`` and ``facets_limit`` are :func:`jobs_facets`' arguments.
+    """
+
+    histograms: Tuple[str, ...] = ()
+    owners_limit: Optional[int] = None
+    owners_sort_by: Optional[str] = None
+    owners_by: Optional[str] = None
+    usage_by: Tuple[str, ...] = ()
+    usage_limit: Optional[int] = None
+    usage_sort_by: Optional[str] = None
+    facets: Tuple[str, ...] = ()
+    facets_limit: Optional[int] = 8
+
+
+def _with_owners(kwargs: Dict[str, Any], owners_limit, owners_sort_by,
+                 owners_by) -> Dict[str, Any]:
+    """*kwargs* plus the owner-breakdown knobs that are set.
+
+    ``owners_by`` only when non-default, so a pre-``owners_by`` plugin never
+    sees the kwarg (see :func:`jobs_histogram`).
+    """
+    kwargs = dict(kwargs)
+    if owners_limit is not None:
+        kwargs['owners_limit'] = owners_limit
+    if owners_sort_by is not None:
+        kwargs['owners_sort_by'] = owners_sort_by
+    if owners_by is not None and owners_by != 'user':
+        kwargs['owners_by'] = owners_by
+    return kwargs
+
+
+def _bundle_entries(bundle: JobsBundle,
+                    kwargs: Dict[str, Any]) -> Dict[Hashable, tuple]:
+    """``{name: (query_type, opts, call)}`` for every aggregation in *bundle*.
+
+    *opts* is exactly the cache ``opts`` the per-dimension function builds
+    for the same arguments — that equality is the whole contract, since a
+    bundle-filled entry is only useful if the sibling's own lookup hits it.
+    Names are ``('histogram', dimension)``, ``('usage_by', entity)`` and
+    ``('facets',)``.
+    """
+    entries: Dict[Hashable, tuple] = {}
+    hist = _with_owners(kwargs, bundle.owners_limit, bundle.owners_sort_by,
+                        bundle.owners_by)
+    for dimension in bundle.histograms:
+        entries['histogram', dimension] = (
+            'histogram', {**hist, 'dimension': dimension},
+            lambda q, dimension=dimension: q.jobs_histogram(dimension, **hist),
+        )
+    usage = dict(kwargs)
+    if bundle.usage_sort_by is not None:
+        usage['sort_by'] = bundle.usage_sort_by
+    limit = bundle.usage_limit
+    for entity in bundle.usage_by:
+        entries['usage_by', entity] = (
+            f'usage_by_{entity}', {**usage, 'limit': limit},
+            lambda q, entity=entity: q.jobs_usage_by(entity, limit=limit, **usage),
+        )
+    if bundle.facets:
+        facets, facets_limit = tuple(bundle.facets), bundle.facets_limit
+        entries[('facets',)] = (
+            'facets', {**kwargs, 'facets': facets, 'limit': facets_limit},
+            lambda q: q.jobs_facets(facets=facets, limit=facets_limit, **kwargs),
+        )
+    return entries
+
+
+def _compute_entries(machine: str, entries: Dict[Hashable, tuple],
+                     names: Sequence[Hashable]) -> Dict[Hashable, Any]:
+    """Run *names* from *entries* back to back in one plugin session."""
+    JobQueries = get_module().JobQueries
+    with job_history_session(machine) as session:
+        queries = JobQueries(session, machine=machine)
+        return {name: entries[name][2](queries) for name in names}
+
+
+def jobs_aggregation_bundle(
+    machine: str,
+    scope: JobScope,
+    bundle: JobsBundle,
+    *,
+    need: Optional[Hashable] = None,
+    valid_qos_names: Sequence[str] = (),
+    **filters,
+) -> Dict[str, Any]:
+    """Every aggregation in *bundle*, for one filter set, computed together.
+
+    Vets and resolves the filters once, looks each aggregation up under the
+    key its per-dimension function uses, and runs whatever missed back to
+    back in a single plugin session, storing each result under that key —
+    so a page's tabs cost one round of queries between them, and each tab's
+    own fragment is a hit afterwards.
+
+    *need* names the member the caller is about to show
+    (``('histogram', dimension)``, ``('usage_by', entity)`` or
+    ``('facets',)``). When it is already cached nothing is computed — a hit
+    is not delayed to fill its siblings. With the jobs cache off nothing
+    computed here could be kept for the others, so only *need* is computed
+    then (everything, with no *need*).
+
+    Returns ``{'histograms': {dimension: envelope}, 'usage_by': {entity:
+    envelope}, 'facets': {dim: [...]} or None}`` over the members computed
+    or found, each envelope exactly what :func:`jobs_histogram` /
+    :func:`jobs_usage_by_user` / :func:`jobs_usage_by_project` /
+    :func:`jobs_facets` would return.
+    """
+    scope.check_filters(filters)
+    kwargs = _plugin_filter_kwargs(valid_qos_names=valid_qos_names, **filters)
+    scope.apply(kwargs)
+
+    entries = _bundle_entries(bundle, kwargs)
+    results = jobs_cache.cached_jobs_bundle(
+        machine, {name: entry[:2] for name, entry in entries.items()},
+        lambda names: _compute_entries(machine, entries, names),
+        bucket=jobs_cache.bucket_for_window(kwargs.get('end')),
+        need=need,
+    )
+    return {
+        'histograms': {dim: results['histogram', dim] for dim in bundle.histograms
+                       if ('histogram', dim) in results},
+        'usage_by': {entity: results['usage_by', entity] for entity in bundle.usage_by
+                     if ('usage_by', entity) in results},
+        'facets': results.get(('facets',)),
+    }
+
+
 def jobs_histogram(
     machine: str,
     dimension: str,
@@ -398,16 +591,15 @@ def jobs_histogram(
 
     The envelope is self-describing (``min_param`` / ``max_param``) — use
     those for bar drill-downs, never a hardcoded dimension→kwarg map.
+
+    A page showing several aggregations over one filter set should fetch
+    them through :func:`jobs_aggregation_bundle`, which stores each under
+    this function's key.
     """
     scope.check_filters(filters)
     kwargs = _plugin_filter_kwargs(valid_qos_names=valid_qos_names, **filters)
     scope.apply(kwargs)
-    if owners_limit is not None:
-        kwargs['owners_limit'] = owners_limit
-    if owners_sort_by is not None:
-        kwargs['owners_sort_by'] = owners_sort_by
-    if owners_by is not None and owners_by != 'user':
-        kwargs['owners_by'] = owners_by
+    kwargs = _with_owners(kwargs, owners_limit, owners_sort_by, owners_by)
 
     return _cached_aggregation(
         'histogram', machine, kwargs,
@@ -464,20 +656,36 @@ def jobs_timeseries(
 
     Hosts differ deliberately: the cards keep it behind a collapse, the
     explorer opens it (``timeline_open``) — see ``jobs_card.html``.
+
+    Daily series compose from cached week/day chunks when the partials
+    bucket is on (:func:`_composed_aggregation`): chunks carry every owner
+    and the window's top-N is re-ranked in the merge, so overlapping
+    windows and every ``owners_sort_by`` share chunks. Week and month
+    series are cached whole.
     """
     scope.check_filters(filters)
     kwargs = _plugin_filter_kwargs(valid_qos_names=valid_qos_names, **filters)
     scope.apply(kwargs)
-    if owners_limit is not None:
-        kwargs['owners_limit'] = owners_limit
-    if owners_sort_by is not None:
-        kwargs['owners_sort_by'] = owners_sort_by
-    if owners_by is not None and owners_by != 'user':
-        kwargs['owners_by'] = owners_by
+    kwargs = _with_owners(kwargs, owners_limit, owners_sort_by, owners_by)
 
-    return _cached_aggregation(
+    if period != 'day':
+        return _cached_aggregation(
+            'timeseries', machine, kwargs,
+            lambda q: q.jobs_timeseries(period, **kwargs),
+            period=period,
+        )
+
+    chunk_kwargs = {k: v for k, v in kwargs.items()
+                    if k not in ('owners_limit', 'owners_sort_by')}
+    if owners_limit is not None:
+        chunk_kwargs['owners_limit'] = EVERY_OWNER
+    return _composed_aggregation(
         'timeseries', machine, kwargs,
         lambda q: q.jobs_timeseries(period, **kwargs),
+        chunk_kwargs=chunk_kwargs,
+        chunk_call=lambda q, opts: q.jobs_timeseries('day', **opts),
+        merge=lambda parts: merge_day_series(
+            parts, owners_limit=owners_limit, owners_sort_by=owners_sort_by),
         period=period,
     )
 
@@ -500,6 +708,10 @@ def jobs_usage_by_user(
     ``sort_by`` joins the cache ``opts`` — different rankings are
     different result sets. No self-exclusion of any filter — the scope's
     ``account`` pin always applies (it's the security boundary).
+
+    With the partials bucket on, bounded windows compose from unranked,
+    untruncated week/day chunks (:func:`_composed_aggregation`), ranked and
+    cut to ``limit`` in the merge — the pills and sort orders share chunks.
     """
     scope.check_filters(filters)
     kwargs = _plugin_filter_kwargs(valid_qos_names=valid_qos_names, **filters)
@@ -507,9 +719,12 @@ def jobs_usage_by_user(
     if sort_by is not None:
         kwargs['sort_by'] = sort_by
 
-    return _cached_aggregation(
+    return _composed_aggregation(
         'usage_by_user', machine, kwargs,
         lambda q: q.jobs_usage_by('user', limit=limit, **kwargs),
+        chunk_kwargs={k: v for k, v in kwargs.items() if k != 'sort_by'},
+        chunk_call=lambda q, opts: q.jobs_usage_by('user', limit=None, **opts),
+        merge=lambda parts: merge_usage(parts, limit=limit, sort_by=sort_by),
         limit=limit,
     )
 
@@ -534,7 +749,8 @@ def jobs_usage_by_project(
     ``None``) BEFORE the limit truncation; ``totals`` is pre-truncation,
     so "Other" is ``totals − Σ rows``. Cached as query type
     ``'usage_by_account'`` — its own key family, so it never aliases with
-    a By User call over the same window.
+    a By User call over the same window. Composes from chunks exactly as
+    :func:`jobs_usage_by_user` does.
     """
     scope.check_filters(filters)
     kwargs = _plugin_filter_kwargs(valid_qos_names=valid_qos_names, **filters)
@@ -542,9 +758,12 @@ def jobs_usage_by_project(
     if sort_by is not None:
         kwargs['sort_by'] = sort_by
 
-    return _cached_aggregation(
+    return _composed_aggregation(
         'usage_by_account', machine, kwargs,
         lambda q: q.jobs_usage_by('account', limit=limit, **kwargs),
+        chunk_kwargs={k: v for k, v in kwargs.items() if k != 'sort_by'},
+        chunk_call=lambda q, opts: q.jobs_usage_by('account', limit=None, **opts),
+        merge=lambda parts: merge_usage(parts, limit=limit, sort_by=sort_by),
         limit=limit,
     )
 
@@ -212,6 +212,45 @@ def create_app(*, config_overrides: dict | None = None):
     from webapp.caching import caching
     caching.init_app(app)
 
+    # system_status lookup ids and active span sets: shared through the same
+    # Redis when there is one.
+    from system_status.queries.dimensions import dimension_cache
+    from system_status.queries.user_proj_queue_ingest import span_index
+    dimension_cache.configure(
+        client=caching.redis_client,
+        ttl=app.config.get('STATUS_DIMENSION_CACHE_TTL', 86400),
+    )
+    span_index.configure(client=caching.redis_client)
+
+    from sam.search import search_index
+    search_index.configure(
+        enabled=app.config.get('SEARCH_INDEX_ENABLED', False),
+        client=caching.redis_client,
+        refresh_interval=app.config.get('SEARCH_INDEX_REFRESH', 30),
+        rebuild_interval=app.config.get('SEARCH_INDEX_REBUILD', 3600),
+    )
+
+    from webapp.dashboards.charts.pool import render_pool
+    render_pool.configure(
+        size=app.config.get('CHART_RENDER_POOL_SIZE', 0),
+        timeout=app.config.get('CHART_RENDER_TIMEOUT', 10),
+        max_tasks=app.config.get('CHART_RENDER_MAX_TASKS', 200),
+    )
+    from webapp.dashboards.charts import svg as chart_svg
+    chart_svg.configure(enabled=app.config.get('CHART_DIRECT_SVG', False))
+    # Armed here, run once the app is serving: the startup warm is the
+    # post-deploy one, and it has counts to go on only under Redis.
+    from webapp.dashboards.charts.warm import chart_warmer
+    chart_warmer.configure(
+        app,
+        top_n=app.config.get('CHART_WARM_TOP_N', 0),
+        delay=app.config.get('CHART_WARM_DELAY', 30),
+        half_life=app.config.get('CHART_WARM_HALF_LIFE', 86400),
+        client=caching.redis_client,
+        user_id=app.config.get('CHART_WARM_USER_ID'),
+    )
+    chart_warmer.request_warm('startup')
+
     # =========================================================================
     # RATE LIMITING INITIALIZATION
     # =========================================================================
@@ -385,10 +424,13 @@ def create_app(*, config_overrides: dict | None = None):
     # Initialize the fs-scans plugin (optional). Loads the fs_scans
     # package, discovers the available collection schemas, and pre-warms
     # one Engine per collection on the CNPG backend. Disabled in tests
-    # (TestingConfig.FS_SCANS_ENABLED = False).
+    # (TestingConfig.FS_SCANS_ENABLED = False). The post-scan cache warmer
+    # only starts when FS_SCANS_WARM_INTERVAL is set.
     from webapp.disk_scans import init_fs_scans
     from webapp.disk_scans.routes import bp as disk_scans_bp
+    from webapp.disk_scans.warm import start_scan_warmer
     init_fs_scans(app)
+    start_scan_warmer(app)
 
     # Register blueprints
     app.register_blueprint(auth_bp)
@@ -28,7 +28,14 @@ Usage:
         ...
 """
 
+import hashlib
+import hmac
+import json
+import secrets
+import threading
 import time
+from collections import OrderedDict
+
 import bcrypt
 from functools import wraps
 from typing import Optional
@@ -45,6 +52,26 @@ from webapp.utils.rbac import has_permission, Permission
 _DB_KEY_CACHE = {'at': None, 'map': {}}
 
 
+# Successful bcrypt verifications, so a collector posting every tick pays one
+# ~250ms cost-12 ``checkpw`` per ``API_KEYS_DB_TTL`` instead of one per request.
+# Keys are an HMAC of (username, password, stored hash) under a secret that
+# never leaves this process: nothing here can be turned back into a password,
+# and a rotated hash can never match an old entry. Only *successes* are
+# recorded, so a wrong guess always pays full bcrypt cost. Entries expire
+# ``API_KEYS_DB_TTL`` seconds after verification (``TTL=0`` disables the cache,
+# as it does the DB-key cache) and are all dropped when the enabled
+# ``api_credentials`` map changes. LRU-bounded by ``API_KEYS_VERIFY_CACHE_SIZE``.
+_VERIFIED_SECRET = secrets.token_bytes(32)
+_VERIFIED: 'OrderedDict[bytes, float]' = OrderedDict()
+_VERIFIED_LOCK = threading.Lock()
+
+
+def clear_verified_credentials() -> None:
+    """Forget every cached verification; the next attempt pays bcrypt again."""
+    with _VERIFIED_LOCK:
+        _VERIFIED.clear()
+
+
 def _auth_challenge(message: str = 'Authentication required'):
     """Standard 401 + WWW-Authenticate response for the Basic-Auth realm."""
     return (
@@ -62,6 +89,38 @@ def _bcrypt_matches(password: str, stored_hash: str) -> bool:
         return False
 
 
+def _credential_digest(username: str, password: str, stored_hash: str) -> bytes:
+    # JSON-encoding the triple keeps the fields unambiguous whatever they contain.
+    message = json.dumps([username, password, stored_hash]).encode('utf-8')
+    return hmac.new(_VERIFIED_SECRET, message, hashlib.sha256).digest()
+
+
+def _verified_match(username: str, password: str, stored_hash: str) -> bool:
+    """``_bcrypt_matches`` behind the verified-credential cache."""
+    ttl = current_app.config.get('API_KEYS_DB_TTL', 60)
+    size = current_app.config.get('API_KEYS_VERIFY_CACHE_SIZE', 256)
+    if not ttl or not size:
+        return _bcrypt_matches(password, stored_hash)
+
+    digest = _credential_digest(username, password, stored_hash)
+    now = time.monotonic()
+    with _VERIFIED_LOCK:
+        at = _VERIFIED.get(digest)
+        if at is not None and (now - at) < ttl:
+            _VERIFIED.move_to_end(digest)
+            return True
+
+    if not _bcrypt_matches(password, stored_hash):
+        return False
+
+    with _VERIFIED_LOCK:
+        _VERIFIED[digest] = now
+        _VERIFIED.move_to_end(digest)
+        while len(_VERIFIED) > size:
+            _VERIFIED.popitem(last=False)
+    return True
+
+
 def _get_db_api_keys() -> dict:
     """Return ``{username: {'hash', 'roles'}}`` for enabled ``api_credentials``.
 
@@ -90,6 +149,9 @@ def _get_db_api_keys() -> dict:
         )
         return _DB_KEY_CACHE['map']
 
+    if fresh != _DB_KEY_CACHE['map']:
+        # A credential was added, rotated, disabled or re-roled.
+        clear_verified_credentials()
     _DB_KEY_CACHE['at'] = now
     _DB_KEY_CACHE['map'] = fresh
     return fresh
@@ -108,12 +170,12 @@ def _verify_api_key(username: str, password: str) -> Optional[dict]:
     """
     config_keys = current_app.config.get('API_KEYS', {})
     if username in config_keys:
-        if _bcrypt_matches(password, config_keys[username]):
+        if _verified_match(username, password, config_keys[username]):
             return {'username': username, 'source': 'config', 'roles': []}
         return None
 
     entry = _get_db_api_keys().get(username)
-    if entry and _bcrypt_matches(password, entry['hash']):
+    if entry and _verified_match(username, password, entry['hash']):
         return {'username': username, 'source': 'db', 'roles': entry['roles']}
     return None
 
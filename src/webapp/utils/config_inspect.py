@@ -471,6 +471,7 @@ def gather_runtime_state(app, db) -> Dict[str, Any]:
         'api_key_usernames':   sorted(list((cfg.get('API_KEYS') or {}).keys())),
         'api_keys_db_enabled': bool(cfg.get('API_KEYS_DB_ENABLED', False)),
         'api_keys_db_ttl':     int(cfg.get('API_KEYS_DB_TTL', 0)),
+        'api_keys_verify_cache_size': int(cfg.get('API_KEYS_VERIFY_CACHE_SIZE', 0)),
         'oidc_active':         cfg.get('AUTH_PROVIDER') == 'oidc',
         'oidc_issuer':         cfg.get('OIDC_ISSUER', '') or None,
         'oidc_client_id':      cfg.get('OIDC_CLIENT_ID', '') or None,
@@ -37,11 +37,12 @@ class TestAdminCacheRefreshBehavior:
     def test_clear_all_covers_every_category(self, auth_client):
         data = auth_client.post('/api/v1/admin/cache/refresh').get_json()
         assert set(data['cleared'].keys()) == {'flask', 'chart', 'usage',
-                                               'scans', 'jobs', 'awards'}
+                                               'scans', 'jobs', 'awards',
+                                               'snapshots'}
 
     @pytest.mark.parametrize('category',
                              ['flask', 'chart', 'usage', 'scans', 'jobs',
-                              'awards'])
+                              'awards', 'snapshots'])
     def test_single_category_scopes_the_clear(self, auth_client, category):
         data = auth_client.post(
             f'/api/v1/admin/cache/refresh?category={category}'
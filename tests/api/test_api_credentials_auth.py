@@ -7,6 +7,7 @@ their existing `api_credentials` rows on the new API paths:
   - ApiCredentials.as_api_key_map (enabled filter, role resolution, hash)
   - _verify_api_key precedence: config['API_KEYS'] always wins over the DB
   - _get_db_api_keys TTL cache + graceful degradation on DB error
+  - the verified-credential cache in front of bcrypt
   - Both decorators accept a DB-sourced key and stash g.api_key_source/roles
 
 Precedence and cache logic is exercised by monkeypatching the DB-map loader,
@@ -39,8 +40,10 @@ def _reset_db_key_cache():
     """The api_auth DB-key cache is a process-global dict — wipe it around each
     test so cached maps never leak between tests."""
     api_auth._DB_KEY_CACHE.update(at=None, map={})
+    api_auth.clear_verified_credentials()
     yield
     api_auth._DB_KEY_CACHE.update(at=None, map={})
+    api_auth.clear_verified_credentials()
 
 
 @pytest.fixture
@@ -187,6 +190,100 @@ class TestDbKeyCache:
         assert result == {"cached": {"hash": "h", "roles": []}}
 
 
+# ---------------------------------------------------------------------------
+# Verified-credential cache
+# ---------------------------------------------------------------------------
+
+class TestVerifiedCache:
+    @pytest.fixture
+    def checkpw_calls(self, monkeypatch):
+        calls = []
+        real = bcrypt.checkpw
+
+        def counting(password, hashed):
+            calls.append(password)
+            return real(password, hashed)
+
+        monkeypatch.setattr(api_auth.bcrypt, "checkpw", counting)
+        return calls
+
+    @pytest.fixture
+    def cached_app(self, api_app, monkeypatch):
+        monkeypatch.setitem(api_app.config, "API_KEYS_DB_TTL", 60)
+        return api_app
+
+    def test_ttl_zero_always_pays_bcrypt(self, api_app, checkpw_calls):
+        with api_app.test_request_context("/"):
+            for _ in range(3):
+                assert api_auth._verify_api_key("testuser", "good-password")
+        assert len(checkpw_calls) == 3
+
+    def test_repeat_success_skips_bcrypt(self, cached_app, checkpw_calls):
+        with cached_app.test_request_context("/"):
+            for _ in range(3):
+                assert api_auth._verify_api_key("testuser", "good-password")
+        assert len(checkpw_calls) == 1
+
+    def test_failures_are_never_cached(self, cached_app, checkpw_calls):
+        with cached_app.test_request_context("/"):
+            assert api_auth._verify_api_key("testuser", "good-password")
+            for _ in range(3):
+                assert api_auth._verify_api_key("testuser", "guess") is None
+        assert len(checkpw_calls) == 4
+
+    def test_rotated_hash_misses(self, cached_app, checkpw_calls):
+        with cached_app.test_request_context("/"):
+            assert api_auth._verify_api_key("testuser", "good-password")
+            cached_app.config["API_KEYS"] = {"testuser": bcrypt.hashpw(
+                b"new-password", bcrypt.gensalt(rounds=4)).decode()}
+            assert api_auth._verify_api_key("testuser", "good-password") is None
+            assert api_auth._verify_api_key("testuser", "new-password")
+        assert len(checkpw_calls) == 3
+
+    def test_entries_expire_with_the_ttl(self, cached_app, checkpw_calls, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(api_auth.time, "monotonic", lambda: clock[0])
+        with cached_app.test_request_context("/"):
+            api_auth._verify_api_key("testuser", "good-password")
+            clock[0] += 59
+            api_auth._verify_api_key("testuser", "good-password")
+            clock[0] += 2
+            api_auth._verify_api_key("testuser", "good-password")
+        assert len(checkpw_calls) == 2
+
+    def test_db_map_change_clears(self, cached_app, checkpw_calls, monkeypatch):
+        db_hash = bcrypt.hashpw(b"legacy-pw", bcrypt.gensalt(rounds=4)).decode()
+        rows = {"legacyusr": {"hash": db_hash, "roles": []}}
+        monkeypatch.setattr(ApiCredentials, "as_api_key_map",
+                            classmethod(lambda cls, session: dict(rows)))
+        with cached_app.test_request_context("/"):
+            assert api_auth._verify_api_key("legacyusr", "legacy-pw")
+            assert api_auth._verify_api_key("legacyusr", "legacy-pw")
+            assert len(checkpw_calls) == 1
+
+            rows["other"] = {"hash": db_hash, "roles": []}
+            api_auth._DB_KEY_CACHE["at"] = None        # force the refresh
+            assert api_auth._verify_api_key("legacyusr", "legacy-pw")
+        assert len(checkpw_calls) == 2
+
+    def test_size_bound_evicts_oldest(self, cached_app, checkpw_calls, monkeypatch):
+        monkeypatch.setitem(cached_app.config, "API_KEYS_VERIFY_CACHE_SIZE", 1)
+        other = bcrypt.hashpw(b"other-pw", bcrypt.gensalt(rounds=4)).decode()
+        cached_app.config["API_KEYS"] = dict(cached_app.config["API_KEYS"], other=other)
+        with cached_app.test_request_context("/"):
+            api_auth._verify_api_key("testuser", "good-password")
+            api_auth._verify_api_key("other", "other-pw")
+            api_auth._verify_api_key("testuser", "good-password")
+        assert len(checkpw_calls) == 3
+        assert len(api_auth._VERIFIED) == 1
+
+    def test_cache_holds_no_plaintext(self, cached_app):
+        with cached_app.test_request_context("/"):
+            api_auth._verify_api_key("testuser", "good-password")
+        (digest,) = api_auth._VERIFIED
+        assert b"good-password" not in digest and len(digest) == 32
+
+
 # ---------------------------------------------------------------------------
 # Decorator end-to-end (token path)
 # ---------------------------------------------------------------------------
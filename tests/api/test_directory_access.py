@@ -190,3 +190,25 @@ class TestCacheRefresh:
         """Unauthenticated request returns 302 (redirect to login) or 401."""
         response = client.post('/api/v1/directory_access/refresh')
         assert response.status_code in [302, 401]
+
+
+class TestSnapshotETags:
+    """Responses carry an ETag; an unchanged document answers 304."""
+
+    def test_etag_and_version_headers(self, auth_client):
+        response = auth_client.get('/api/v1/directory_access/')
+        assert response.headers.get('ETag')
+        assert response.headers.get('X-Snapshot-Version')
+
+    def test_matching_if_none_match_returns_304(self, auth_client):
+        etag = auth_client.get('/api/v1/directory_access/').headers['ETag']
+        response = auth_client.get('/api/v1/directory_access/',
+                                   headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_stale_if_none_match_returns_body(self, auth_client):
+        response = auth_client.get('/api/v1/directory_access/',
+                                   headers={'If-None-Match': '"not-current"'})
+        assert response.status_code == 200
+        assert 'accessBranchDirectories' in response.get_json()
@@ -151,6 +151,18 @@ class TestFstreeProjectsRemap:
             if proj['parentProject'] is not None:
                 assert proj['parentProject'] in projects
 
+    def test_item_etag_differs_from_document(self, auth_client):
+        url = '/api/v1/fstree_access/projects/?resource=Derecho'
+        document = auth_client.get(url)
+        projcode = next(iter(document.get_json()['projects']))
+        item = auth_client.get(f'/api/v1/fstree_access/projects/{projcode}?resource=Derecho')
+        assert item.status_code == 200
+        assert item.headers['ETag'] != document.headers['ETag']
+
+        again = auth_client.get(f'/api/v1/fstree_access/projects/{projcode}?resource=Derecho',
+                                headers={'If-None-Match': item.headers['ETag']})
+        assert again.status_code == 304
+
 
 class TestFstreeAuth:
     """Test authentication and authorization."""
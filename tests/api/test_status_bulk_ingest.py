@@ -0,0 +1,165 @@
+"""
+Parity tests for the bulk status ingest path (``STATUS_BULK_INGEST``).
+
+The same sequence of ticks is POSTed once through the ORM path and once
+through ``system_status.queries.bulk_ingest``; the stored snapshot rows
+(with lookup ids replaced by their names), spans and history rollups must
+match, as must the response ids.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from system_status import (
+    CasperNodeTypeStatus,
+    CasperStatus,
+    DerechoStatus,
+    FilesystemStatus,
+    LoginNodeStatus,
+    QueueStatus,
+    StatusHistoryRollup,
+    UserProjQueueStatus,
+)
+
+
+pytestmark = pytest.mark.integration
+
+T0 = datetime(2026, 5, 4, 10, 0)
+
+# model → lookup-backed properties to compare instead of the raw FK ids
+_MODELS = {
+    DerechoStatus: (),
+    CasperStatus: (),
+    LoginNodeStatus: ('system_name', 'node_name', 'node_type'),
+    CasperNodeTypeStatus: (),
+    QueueStatus: ('system_name', 'queue_name'),
+    FilesystemStatus: ('system_name', 'filesystem_name'),
+    UserProjQueueStatus: ('system_name', 'queue_name', 'username', 'project_code'),
+    StatusHistoryRollup: (),
+}
+_SKIP = ('created_at', 'updated_at')
+
+
+def _casper_tick(i):
+    return {
+        'timestamp': (T0 + timedelta(minutes=5 * i)).isoformat(),
+        'cpu_nodes_total': 50, 'cpu_nodes_available': 30 - i, 'cpu_nodes_down': 0,
+        'gpu_nodes_total': 20, 'gpu_nodes_available': 10, 'gpu_nodes_down': 0,
+        'viz_nodes_total': 5, 'viz_nodes_available': 5,
+        'cpu_cores_total': 2000, 'cpu_cores_allocated': 1000, 'cpu_cores_idle': 1000,
+        'gpu_count_total': 80, 'gpu_count_allocated': 40, 'gpu_count_idle': 40,
+        'viz_count_total': 5, 'viz_count_allocated': 2, 'viz_count_idle': 3,
+        'memory_total_gb': 5000.0, 'memory_allocated_gb': 2500.0,
+        'cpu_utilization_percent': 50.0,
+        'login_nodes': [
+            {'node_name': 'casper-login1', 'available': True, 'user_count': 10 + i},
+            {'node_name': 'casper-login2', 'node_type': 'gpu', 'load_1min': 1.5},
+        ],
+        'node_types': [
+            {'node_type': 'gpu-a100', 'nodes_total': 8, 'nodes_available': 8 - i,
+             'gpu_model': 'A100', 'utilization_percent': 12.5 * i,
+             'total_cores': 512},            # unknown key, dropped by both paths
+        ],
+        'queues': [
+            {'queue_name': 'casper', 'running_jobs': 10 + i, 'active_users': 3},
+            {'queue_name': 'gpudev', 'pending_jobs': 2},
+        ],
+        'user_project_queues': [
+            # unchanged every tick → one span extended twice
+            {'username': 'benkirk', 'project_code': 'SCSG0001',
+             'queue_name': 'casper', 'running_jobs': 1, 'cores_allocated': 64},
+            # changes every tick → a new span each time
+            {'username': 'bdobbins', 'project_code': 'SCSG0002',
+             'queue_name': 'gpudev', 'running_jobs': i, 'gpus_allocated': i},
+        ],
+        'filesystems': [
+            {'filesystem_name': 'glade', 'capacity_tb': 20000.0, 'used_tb': 100.0 + i},
+        ],
+    }
+
+
+def _snapshot_rows(session):
+    out = {}
+    for model, props in _MODELS.items():
+        rows = []
+        for obj in session.query(model).all():
+            row = {c.key: getattr(obj, c.key) for c in model.__table__.columns
+                   if c.key not in _SKIP and not (c.key.endswith('_id') and props)
+                   and not c.primary_key}
+            row.update((p, getattr(obj, p)) for p in props)
+            rows.append(repr(sorted(row.items())))
+        out[model.__tablename__] = sorted(rows)
+    return out
+
+
+def _wipe(session):
+    from webapp.extensions import db
+    from system_status.queries.dimensions import dimension_cache
+    from system_status.queries.user_proj_queue_ingest import span_index
+
+    for tbl in reversed(db.metadatas['system_status'].sorted_tables):
+        session.execute(tbl.delete())
+    session.commit()
+    dimension_cache.clear()
+    span_index.clear()
+
+
+def _run(client, app, monkeypatch, bulk, ticks):
+    monkeypatch.setitem(app.config, 'STATUS_BULK_INGEST', bulk)
+    responses = []
+    for tick in ticks:
+        response = client.post('/api/v1/status/casper', json=tick)
+        assert response.status_code == 201, response.get_json()
+        responses.append(response.get_json())
+    return responses
+
+
+def _ids(response):
+    return {k: v for k, v in response.items() if k.endswith('_ids')}
+
+
+class TestBulkIngestParity:
+
+    def test_rows_match_orm_path(self, api_key_client, status_session, app, monkeypatch):
+        ticks = [_casper_tick(i) for i in range(3)]
+
+        orm = _run(api_key_client, app, monkeypatch, False, ticks)
+        expected = _snapshot_rows(status_session)
+        _wipe(status_session)
+
+        bulk = _run(api_key_client, app, monkeypatch, True, ticks)
+        assert _snapshot_rows(status_session) == expected
+        assert [_ids(r) for r in bulk] == [_ids(r) for r in orm]
+
+    def test_spans_extend(self, api_key_client, status_session, app, monkeypatch):
+        _run(api_key_client, app, monkeypatch, True, [_casper_tick(i) for i in range(3)])
+
+        spans = status_session.query(UserProjQueueStatus).all()
+        benkirk = [s for s in spans if s.username == 'benkirk']
+        assert len(benkirk) == 1
+        assert benkirk[0].timestamp == T0
+        assert benkirk[0].last_seen == T0 + timedelta(minutes=10)
+        assert len([s for s in spans if s.username == 'bdobbins']) == 3
+
+    def test_lookups_reused_across_ticks(self, api_key_client, status_session, app,
+                                         monkeypatch):
+        from system_status import QueueDef, UserDef
+
+        _run(api_key_client, app, monkeypatch, True, [_casper_tick(i) for i in range(2)])
+        assert status_session.query(QueueDef).count() == 2
+        assert status_session.query(UserDef).count() == 2
+
+    def test_ingest_ms_reported(self, api_key_client, status_session, app, monkeypatch):
+        for bulk in (False, True):
+            response, = _run(api_key_client, app, monkeypatch, bulk,
+                             [_casper_tick(int(bulk))])
+            assert response['ingest_ms'] >= 0
+
+    def test_invalid_payload_rolls_back(self, api_key_client, status_session, app,
+                                        monkeypatch):
+        monkeypatch.setitem(app.config, 'STATUS_BULK_INGEST', True)
+        bad = dict(_casper_tick(0), cpu_nodes_total='not an int')
+        response = api_key_client.post('/api/v1/status/casper', json=bad)
+        assert response.status_code == 500
+        assert status_session.query(CasperStatus).count() == 0
@@ -729,6 +729,96 @@ class TestIngestErrorHandling:
         assert 'error' in response.get_json()
 
 
+class TestCompressedAndDeltaPost:
+    """Content-Encoding bodies and the delta protocol (system_status.delta)."""
+
+    _UPQ = [
+        {'username': 'benkirk', 'project_code': 'SCSG0001',
+         'queue_name': 'main', 'running_jobs': 1, 'cores_allocated': 64},
+        {'username': 'bdobbins', 'project_code': 'SCSG0002',
+         'queue_name': 'main', 'running_jobs': 2, 'cores_allocated': 128},
+    ]
+
+    def _post(self, client, payload, encoding=None):
+        import gzip
+        import json
+        body = json.dumps(payload).encode()
+        headers = {}
+        if encoding == 'gzip':
+            body = gzip.compress(body)
+            headers['Content-Encoding'] = 'gzip'
+        elif encoding is not None:
+            headers['Content-Encoding'] = encoding
+        return client.post('/api/v1/status/derecho', data=body,
+                           content_type='application/json', headers=headers)
+
+    def test_gzip_body_accepted(self, api_key_client, status_session):
+        data = dict(_DERECHO_MINIMAL, user_project_queues=self._UPQ)
+        response = self._post(api_key_client, data, encoding='gzip')
+        assert response.status_code == 201, response.get_json()
+        assert len(response.get_json()['user_project_queue_ids']) == 2
+
+    def test_unsupported_encoding_returns_415(self, api_key_client, status_session):
+        response = self._post(api_key_client, _DERECHO_MINIMAL, encoding='br')
+        assert response.status_code == 415
+
+    def test_corrupt_gzip_returns_400(self, api_key_client, status_session):
+        response = api_key_client.post(
+            '/api/v1/status/derecho', data=b'\x1f\x8bnot gzip',
+            content_type='application/json', headers={'Content-Encoding': 'gzip'})
+        assert response.status_code == 400
+
+    def test_delta_expands_against_last_snapshot(self, api_key_client, status_session):
+        """Unchanged rows omitted from the delta are carried over; removed
+        rows end their span; changed rows start a new one."""
+        first = dict(_DERECHO_MINIMAL, timestamp='2026-05-04T10:00:00',
+                     user_project_queues=self._UPQ)
+        r1 = self._post(api_key_client, first)
+        assert r1.status_code == 201
+        token = r1.get_json()['snapshot_token']
+
+        delta = dict(_DERECHO_MINIMAL, timestamp='2026-05-04T10:05:00',
+                     delta_base=token,
+                     user_project_queues={
+                         'upsert': [dict(self._UPQ[1], running_jobs=3)],
+                         'remove': [],
+                     })
+        r2 = self._post(api_key_client, delta, encoding='gzip')
+        assert r2.status_code == 201, r2.get_json()
+        assert r2.get_json()['snapshot_token'] != token
+
+        # benkirk's span extended, bdobbins' changed → one new span.
+        rows = status_session.query(UserProjQueueStatus).all()
+        assert len(rows) == 3
+        benkirk = [r for r in rows if r.user.username == 'benkirk']
+        assert len(benkirk) == 1
+        assert benkirk[0].last_seen.isoformat() == '2026-05-04T10:05:00'
+
+        # Removing benkirk's row against the new base ends that span.
+        third = dict(_DERECHO_MINIMAL, timestamp='2026-05-04T10:10:00',
+                     delta_base=r2.get_json()['snapshot_token'],
+                     user_project_queues={
+                         'upsert': [],
+                         'remove': [['benkirk', 'SCSG0001', 'main']],
+                     })
+        r3 = self._post(api_key_client, third)
+        assert r3.status_code == 201, r3.get_json()
+        benkirk = [r for r in status_session.query(UserProjQueueStatus).all()
+                   if r.user.username == 'benkirk']
+        assert benkirk[0].last_seen.isoformat() == '2026-05-04T10:05:00'
+
+    def test_stale_delta_base_returns_409(self, api_key_client, status_session):
+        r1 = self._post(api_key_client, _DERECHO_MINIMAL)
+        assert r1.status_code == 201
+        stale = r1.get_json()['snapshot_token']
+        assert self._post(api_key_client, _DERECHO_MINIMAL).status_code == 201
+
+        response = self._post(api_key_client,
+                              dict(_DERECHO_MINIMAL, delta_base=stale))
+        assert response.status_code == 409
+        assert response.get_json()['resend_full'] is True
+
+
 class TestOutageEndpointValidation:
     """Cover the field-validation arms of POST /api/v1/status/outage."""
 
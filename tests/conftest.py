@@ -385,9 +385,15 @@ def _truncate_status_tables(db):
     uses SQLAlchemy's `sorted_tables` so the FK ordering is automatic.
     `reversed(sorted_tables)` deletes children before parents.
     """
+    from system_status.queries.dimensions import dimension_cache
+    from system_status.queries.user_proj_queue_ingest import span_index
+
     for tbl in reversed(db.metadatas["system_status"].sorted_tables):
         db.session.execute(tbl.delete())
     db.session.commit()
+    # Cached lookup ids and held span sets point at the rows just deleted.
+    dimension_cache.clear()
+    span_index.clear()
 
 
 @pytest.fixture
@@ -0,0 +1,114 @@
+"""Query count + wall time: batch subtree charges, raw scan vs monthly rollup.
+
+Builds a year of daily ``comp_charge_summary`` rows for a small project
+tree on an in-memory SQLite database, then answers a year-long allocation
+window for every node with ``Project.batch_get_subtree_charges`` twice:
+once on the raw path (rollup tables absent) and once after
+``refresh_charge_rollup``. The rollup path's query count is what
+``baselines.json`` pins — it must stay flat in the window length, since
+every covered month is one prefix-sum row per account.
+
+Run::
+
+    pytest -m perf -n 0 -v tests/perf/test_charge_rollup.py
+"""
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import sam.projects.projects as projects_mod
+from sam.summaries.comp_summaries import CompChargeSummary
+from factories import make_account, make_project, make_resource, make_resource_type
+
+from ._query_count import count_queries
+from .conftest import get_baseline
+
+pytestmark = pytest.mark.perf
+
+_SQLITE_TABLES = (
+    "users", "email_address", "area_of_interest_group", "area_of_interest",
+    "facility", "panel", "allocation_type", "project", "resource_type",
+    "resources", "account", "account_user", "comp_charge_summary",
+    "dav_charge_summary_status", "dav_charge_summary", "charge_adjustment",
+)
+
+N_CHILDREN = 20
+YEAR = 2025
+
+
+@pytest.fixture
+def sqlite_session(monkeypatch):
+    from sam.base import Base
+
+    monkeypatch.setattr(projects_mod, '_values_cte_supported', False)
+    engine = create_engine("sqlite://", future=True)
+    Base.metadata.create_all(
+        engine, tables=[Base.metadata.tables[t] for t in _SQLITE_TABLES]
+    )
+    sess = sessionmaker(bind=engine, autoflush=False, future=True)()
+    try:
+        yield sess
+    finally:
+        sess.close()
+        engine.dispose()
+
+
+def _build(session):
+    resource = make_resource(session, resource_type=make_resource_type(
+        session, resource_type='HPC'))
+    root = make_project(session)
+    nodes = [root] + [make_project(session, parent=root) for _ in range(N_CHILDREN)]
+    rng = random.Random(0)
+    rows = []
+    for project in nodes:
+        account = make_account(session, project=project, resource=resource)
+        for day in range(365):
+            rows.append(dict(activity_date=date(YEAR, 1, 1) + timedelta(days=day),
+                             act_username='u', act_projcode=f'{project.projcode}-{day}',
+                             machine='m', queue='q', account_id=account.account_id,
+                             charges=rng.uniform(1, 100)))
+    session.execute(insert(CompChargeSummary), rows)
+    session.flush()
+    return [dict(key=p.projcode, resource_id=resource.resource_id, resource_type='HPC',
+                 tree_root=p.tree_root, tree_left=p.tree_left, tree_right=p.tree_right,
+                 start_date=datetime(YEAR, 1, 10, 6), end_date=datetime(YEAR, 12, 20))
+            for p in nodes]
+
+
+def test_batch_get_subtree_charges_rollup(sqlite_session):
+    from sam.projects.projects import Project
+    from sam.summaries.charge_rollup import (
+        ensure_rollup_tables, months_between, refresh_charge_rollup,
+    )
+
+    session = sqlite_session
+    infos = _build(session)
+    engine = session.get_bind()
+
+    t0 = time.perf_counter()
+    raw = Project.batch_get_subtree_charges(session, infos)
+    raw_ms = (time.perf_counter() - t0) * 1000
+
+    ensure_rollup_tables(session)
+    refresh_charge_rollup(session, 'comp', months_between(date(YEAR, 1, 1), date(YEAR, 12, 31)))
+
+    with count_queries(engine) as stats:
+        t0 = time.perf_counter()
+        rolled = Project.batch_get_subtree_charges(session, infos)
+        rollup_ms = (time.perf_counter() - t0) * 1000
+
+    for key, entry in raw.items():
+        assert rolled[key]['charges_by_type']['comp'] == pytest.approx(
+            entry['charges_by_type']['comp'], rel=1e-9)
+    print(f"\nraw {raw_ms:.1f}ms, rollup {rollup_ms:.1f}ms; {stats.summary()}")
+
+    baseline = get_baseline("batch_get_subtree_charges_rollup")
+    assert stats.count <= baseline, (
+        f"batch_get_subtree_charges (rollup) query count regression: "
+        f"{stats.count} queries > {baseline} baseline. "
+        f"Breakdown: {stats.summary()}"
+    )
@@ -0,0 +1,90 @@
+"""Throughput benchmark: concurrent chart fragments, in-process vs render pool.
+
+A dashboard fans out its chart fragments as parallel htmx requests, which a
+threaded gunicorn worker serves on concurrent threads — and in-process they
+still take turns on the GIL. Each round renders a dashboard's worth of charts
+(``FRAGMENTS``) from as many threads, once with the render pool off and once
+with ``POOL_SIZE`` workers (``webapp.dashboards.charts.pool``). Fragments per
+second land in each benchmark's ``extra_info``.
+
+The charts are constructed and rendered directly, not through ``chart_view``,
+so no round is a cache hit. The pool is started and warmed before timing:
+its spawn cost is paid once per process, not per render.
+
+Run::
+
+    pytest -m perf -n 0 -v tests/perf/test_chart_render_throughput.py
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+
+pytestmark = pytest.mark.perf
+
+
+FRAGMENTS = 8
+POOL_SIZE = 4
+
+_DAYS = [date(2026, 3, d) for d in range(1, 29)]
+
+
+def _fragments():
+    """A dashboard's worth of ``(chart_class, args)`` — pies and time series."""
+    from webapp.dashboards import charts
+
+    daily = {'dates': list(_DAYS), 'values': [float((i * 37) % 90) for i in range(len(_DAYS))]}
+    stacked = {'dates': list(_DAYS), 'series': [
+        {'label': name, 'values': [float((i * k) % 50) for i in range(len(_DAYS))]}
+        for name, k in (('Others', 3), ('alice', 7), ('bob', 11), ('carol', 13))]}
+    facilities = [{'facility': n, 'annualized_rate': v, 'count': 3, 'percent': 10}
+                  for n, v in [('UNIV', 5_000_000), ('WNA', 2_500_000), ('NCAR', 1_250_000)]]
+    types = [{'allocation_type': f'Type{i:02d}', 'total_amount': 10_000 * (13 - i),
+              'count': 2, 'avg_amount': 5000} for i in range(12)]
+    shapes = [
+        (charts.generate_usage_timeseries_matplotlib.chart_class, (daily,)),
+        (charts.generate_usage_timeseries_stacked_by_user.chart_class, (stacked,)),
+        (charts.generate_facility_pie_chart_matplotlib.chart_class, (facilities,)),
+        (charts.generate_allocation_type_pie_chart_matplotlib.chart_class, (types,)),
+    ]
+    return [shapes[i % len(shapes)] for i in range(FRAGMENTS)]
+
+
+@pytest.fixture
+def render_pool_size(request):
+    from webapp.dashboards.charts.pool import render_pool
+    render_pool.configure(size=request.param, timeout=60)
+    yield render_pool
+    render_pool.configure(size=0)
+
+
+@pytest.mark.parametrize("render_pool_size", [0, POOL_SIZE],
+                         indirect=True, ids=["in_process", "pool"])
+def test_concurrent_fragment_throughput(benchmark, app, render_pool_size):
+    """Fragments/second for one dashboard's concurrent chart requests."""
+    fragments = _fragments()
+    elapsed = []
+
+    def _one(cls, args):
+        with app.test_request_context('/'):
+            return cls(*args).render()
+
+    with ThreadPoolExecutor(max_workers=FRAGMENTS) as threads:
+        # Warm-up: start the pool's workers (or matplotlib's caches, in-process).
+        list(threads.map(lambda f: _one(*f), fragments))
+
+        def _run():
+            t0 = time.perf_counter()
+            svgs = list(threads.map(lambda f: _one(*f), fragments))
+            elapsed.append(time.perf_counter() - t0)
+            assert all(s.lstrip().startswith('<?xml') for s in svgs)
+
+        benchmark.pedantic(_run, rounds=5, iterations=1)
+
+    per_sec = FRAGMENTS / (sum(elapsed) / len(elapsed))
+    benchmark.extra_info["fragments"] = FRAGMENTS
+    benchmark.extra_info["pool_size"] = render_pool_size.size
+    benchmark.extra_info["fragments_per_sec"] = round(per_sec, 2)
+    assert render_pool_size.stats["fallbacks"] == 0
+    print(f"\npool={render_pool_size.size}: {per_sec:,.1f} fragments/s")
@@ -0,0 +1,157 @@
+"""Throughput benchmark: row-at-a-time vs bulk ``comp_charge_summary`` ingest.
+
+Posts the same synthetic daily-summary chunk through
+``upsert_comp_charge_summary`` (one resolve + query-then-insert per row,
+the historical ``sam-admin accounting --comp`` path) and through
+``bulk_upsert_comp_charge_summaries`` (``--bulk``), on both the
+mysql-test container and an in-memory SQLite database. Rows per second
+land in each benchmark's ``extra_info`` so the comparison shows up in
+``--benchmark-json`` output and the terminal table.
+
+Every round posts a fresh set of activity dates, so all rounds measure
+the INSERT-heavy backfill shape; the second half of each chunk re-posts
+the first half's keys to exercise the UPDATE batch too.
+
+Run::
+
+    pytest -m perf -n 0 -v tests/perf/test_comp_ingest_throughput.py
+"""
+import itertools
+import time
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from factories import (
+    make_account,
+    make_machine,
+    make_project,
+    make_queue,
+    make_resource,
+    make_resource_type,
+    make_user,
+    next_seq,
+)
+
+pytestmark = pytest.mark.perf
+
+
+N_USERS = 20
+N_PROJECTS = 10
+ROWS_PER_ROUND = 1000
+
+# Tables the factory graph + both ingest paths touch. The full SAM schema
+# does not materialize on SQLite (composite autoincrement PKs, MySQL-only
+# DDL), but this subset is portable.
+_SQLITE_TABLES = (
+    "users", "email_address", "area_of_interest_group", "area_of_interest",
+    "facility", "panel", "allocation_type", "project", "resource_type",
+    "resources", "account", "account_user", "machine", "queue",
+    "comp_charge_summary",
+)
+
+_round_dates = itertools.count()
+
+
+@pytest.fixture
+def sqlite_session():
+    """Fresh in-memory SQLite session holding the comp-ingest table subset."""
+    from sam.base import Base
+
+    engine = create_engine("sqlite://", future=True)
+    Base.metadata.create_all(
+        engine, tables=[Base.metadata.tables[t] for t in _SQLITE_TABLES]
+    )
+    sess = sessionmaker(bind=engine, autoflush=False, future=True)()
+    try:
+        yield sess
+    finally:
+        sess.close()
+        engine.dispose()
+
+
+@pytest.fixture(params=["mysql", "sqlite"])
+def backend_session(request):
+    return request.getfixturevalue(
+        "session" if request.param == "mysql" else "sqlite_session"
+    )
+
+
+def _build_graph(session):
+    """Users × projects on one fresh HPC resource with accounts for every project."""
+    rt = make_resource_type(session, resource_type=next_seq("HPCRT"))
+    resource = make_resource(session, resource_type=rt)
+    machine = make_machine(session, resource=resource)
+    queue = make_queue(session, resource=resource)
+    users = [make_user(session) for _ in range(N_USERS)]
+    projects = [make_project(session, lead=users[0]) for _ in range(N_PROJECTS)]
+    for project in projects:
+        make_account(session, project=project, resource=resource)
+    return resource, machine, queue, users, projects
+
+
+def _make_rows(graph):
+    """One chunk of daily-summary-shaped upsert kwargs on never-used dates."""
+    resource, machine, queue, users, projects = graph
+    half = ROWS_PER_ROUND // 2
+    pairs = list(itertools.product(users, projects))
+    start = date(2099, 1, 1) + timedelta(days=next(_round_dates) * 10)
+    rows = []
+    for i in range(half):
+        user, project = pairs[i % len(pairs)]
+        rows.append(dict(
+            activity_date=start + timedelta(days=i // len(pairs)),
+            act_username=user.username,
+            act_projcode=project.projcode,
+            act_unix_uid=None,
+            resource_name=resource.resource_name,
+            machine_name=machine.name,
+            queue_name=queue.queue_name,
+            num_jobs=i % 17 + 1,
+            core_hours=128.0 * (i % 11 + 1),
+            charges=128.0 * (i % 11 + 1),
+        ))
+    # Re-post the same keys with new values → UPDATE batch
+    rows += [dict(r, charges=r["charges"] * 2) for r in rows]
+    return rows
+
+
+def _post_row_path(session, rows):
+    from sam.manage.summaries import upsert_comp_charge_summary
+    for r in rows:
+        upsert_comp_charge_summary(session, **r)
+
+
+def _post_bulk_path(session, rows):
+    from sam.manage.summaries import bulk_upsert_comp_charge_summaries
+    # Split at the half so the second call diffs against the first's rows,
+    # matching how consecutive --chunk-size chunks behave.
+    half = len(rows) // 2
+    bulk_upsert_comp_charge_summaries(session, rows[:half])
+    bulk_upsert_comp_charge_summaries(session, rows[half:])
+
+
+@pytest.mark.parametrize("path", ["row", "bulk"])
+def test_comp_ingest_throughput(benchmark, backend_session, path):
+    """Rows/second for each ingest path on each backend."""
+    session = backend_session
+    graph = _build_graph(session)
+    post = _post_bulk_path if path == "bulk" else _post_row_path
+    elapsed = []
+
+    def _setup():
+        return (session, _make_rows(graph)), {}
+
+    def _run(sess, rows):
+        t0 = time.perf_counter()
+        post(sess, rows)
+        elapsed.append(time.perf_counter() - t0)
+
+    benchmark.pedantic(_run, setup=_setup, rounds=3, iterations=1)
+
+    rows_per_sec = ROWS_PER_ROUND / (sum(elapsed) / len(elapsed))
+    benchmark.extra_info["rows_per_round"] = ROWS_PER_ROUND
+    benchmark.extra_info["rows_per_sec"] = round(rows_per_sec, 1)
+    print(f"\n{path:>4} path: {rows_per_sec:,.0f} rows/s")
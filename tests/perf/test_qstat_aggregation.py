@@ -0,0 +1,145 @@
+"""Collector job parsing: three passes vs one pass vs streamed, on 100k jobs.
+
+Builds a synthetic ``qstat -f -F json`` document of 100,000 jobs shaped like
+Derecho's (array jobs, multi-node ``exec_host`` strings, missing
+``Account_Name``, ownerless and exiting jobs) and turns it into the job part
+of the collector payload three ways:
+
+  * ``three_pass``  — ``json.loads`` then ``JobParser.parse_jobs`` +
+    ``QueueParser.parse_queues`` + ``QueueParser.parse_user_project_queues``
+    (the collector before ``aggregate_jobs``).
+  * ``single_pass`` — ``json.loads`` then ``QueueParser.aggregate_jobs``.
+  * ``streamed``    — ``iter_qstat_jobs`` over the text stream into
+    ``aggregate_jobs``; the document is never materialized.
+
+All three payloads must serialize byte-identically. Wall time lands in the
+benchmark table, traced peak allocation in ``extra_info``.
+
+Run::
+
+    pytest -m perf -n 0 -v tests/perf/test_qstat_aggregation.py
+"""
+import importlib.util
+import json
+import os
+import random
+import tracemalloc
+
+import pytest
+
+pytestmark = pytest.mark.perf
+
+_PARSERS = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))), "collectors", "lib", "parsers")
+
+
+def _load(name):
+    spec = importlib.util.spec_from_file_location(
+        f"_collector_{name}_perf", os.path.join(_PARSERS, f"{name}.py"))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+JobParser = _load("jobs").JobParser
+QueueParser = _load("queues").QueueParser
+iter_qstat_jobs = _load("qstat_stream").iter_qstat_jobs
+
+N_JOBS = 100_000
+
+
+def _synthetic_qstat(n=N_JOBS, seed=12):
+    rng = random.Random(seed)
+    queues = ["main", "develop", "preempt", "cpu", "gpu", "casper", "htc", "economy"]
+    # Users charge a handful of projects each, as on the real machines.
+    projects = {u: [f"P{rng.randrange(300):07d}" for _ in range(rng.randint(1, 3))]
+                for u in range(400)}
+    jobs = {}
+    for i in range(n):
+        state = rng.choices("RQHE", weights=[30, 60, 8, 2])[0]
+        uid = rng.randrange(400)
+        owner = f"user{uid:03d}@derecho{rng.randrange(1, 9)}"
+        if rng.random() < 0.002:
+            owner = ""
+        nodes = rng.choice([1, 1, 1, 2, 4, 16])
+        job = {
+            "Job_Name": f"job{i}",
+            "Job_Owner": owner,
+            "job_state": state,
+            "queue": rng.choice(queues),
+            "Resource_List": {
+                "ncpus": 128 * nodes,
+                "ngpus": rng.choice([0, 0, 0, 4 * nodes]),
+                "nodect": nodes,
+                "select": f"{nodes}:ncpus=128:mpiprocs=128",
+                "walltime": "12:00:00",
+            },
+            "Variable_List": {"PBS_O_HOME": f"/glade/u/home/user{i % 400}",
+                              "PBS_O_WORKDIR": f"/glade/derecho/scratch/run{i}"},
+        }
+        if rng.random() > 0.01:
+            job["Account_Name"] = rng.choice(projects[uid])
+        if state == "R":
+            base = rng.randrange(2400)
+            job["exec_host"] = "+".join(f"dec{base + k:04d}/0*128" for k in range(nodes))
+        suffix = "[]" if state == "Q" and rng.random() < 0.3 else ""
+        jobs[f"{4_000_000 + i}{suffix}.desched1"] = job
+    return json.dumps({"timestamp": 1760000000, "pbs_version": "2022.1.1",
+                       "pbs_server": "desched1", "Jobs": jobs}, indent=4)
+
+
+@pytest.fixture(scope="module")
+def qstat_text():
+    return _synthetic_qstat()
+
+
+def _three_pass(text):
+    doc = json.loads(text)
+    return {"job_stats": JobParser.parse_jobs(doc),
+            "queues": QueueParser.parse_queues(doc),
+            "user_project_queues": QueueParser.parse_user_project_queues(doc)}
+
+
+def _single_pass(text):
+    return QueueParser.aggregate_jobs(json.loads(text).get("Jobs", {}).items())
+
+
+class _Pipe:
+    """``read(n)`` over an existing string, like ssh stdout: only the chunk
+    handed out is allocated (``io.StringIO`` would copy the whole text)."""
+
+    def __init__(self, text):
+        self.text, self.pos = text, 0
+
+    def read(self, n):
+        chunk = self.text[self.pos:self.pos + n]
+        self.pos += len(chunk)
+        return chunk
+
+
+def _streamed(text):
+    return QueueParser.aggregate_jobs(iter_qstat_jobs(_Pipe(text)))
+
+
+PATHS = {"three_pass": _three_pass, "single_pass": _single_pass, "streamed": _streamed}
+
+
+@pytest.mark.parametrize("path", list(PATHS))
+def test_qstat_aggregation(benchmark, qstat_text, path):
+    run = PATHS[path]
+    payload = benchmark.pedantic(run, args=(qstat_text,), rounds=3, iterations=1)
+
+    assert json.dumps(payload) == json.dumps(_three_pass(qstat_text))
+    assert sum(payload["job_stats"][k] for k in
+               ("running_jobs", "pending_jobs", "held_jobs")) == pytest.approx(
+        0.98 * N_JOBS, rel=0.01)
+
+    tracemalloc.start()
+    try:
+        run(qstat_text)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info["jobs"] = N_JOBS
+    benchmark.extra_info["peak_mib"] = round(peak / 2**20, 1)
+    print(f"\n{path:>11}: peak {peak / 2**20:,.1f} MiB")
@@ -0,0 +1,100 @@
+"""Latency and memory: ORM-row vs column-array status history loading.
+
+Seeds a year of 5-minute ``derecho_status`` ticks (~105k rows) on the
+per-worker SQLite status bind, then loads the CPU-partition series for a
+90-day and a 1-year window two ways:
+
+  * ``orm``     — ``session.query(DerechoStatus)`` entities unpacked into
+    dicts, the history getters' shape before the column loaders.
+  * ``columns`` — ``raw_partition_columns``: a Core column select streamed
+    into NumPy arrays (``system_status.queries.columns``).
+
+Wall time lands in the benchmark table; peak traced allocation for each
+path lands in ``extra_info`` (``--benchmark-json``). The assertion is only
+the coarse one — the array path must not allocate more than the entity
+path — since absolute numbers are machine-dependent.
+
+Run::
+
+    pytest -m perf -n 0 -v tests/perf/test_status_history_loaders.py
+"""
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from system_status import DerechoStatus
+from system_status.queries import history
+
+pytestmark = pytest.mark.perf
+
+
+END = datetime(2026, 6, 1)
+N_TICKS = 365 * 288     # a year of 5-minute ticks
+
+
+@pytest.fixture
+def year_of_ticks(status_session):
+    start = END - timedelta(minutes=5 * (N_TICKS - 1))
+    rows = [dict(
+        timestamp=start + timedelta(minutes=5 * i),
+        cpu_nodes_total=2488, cpu_nodes_available=300 + i % 97, cpu_nodes_down=i % 13,
+        gpu_nodes_total=82, gpu_nodes_available=10, gpu_nodes_down=0,
+        cpu_cores_total=318464, cpu_cores_allocated=250000, cpu_cores_idle=68464,
+        gpu_count_total=328, gpu_count_allocated=300, gpu_count_idle=28,
+        cpu_utilization_percent=80.0 + i % 17, gpu_utilization_percent=90.0,
+        memory_total_gb=600000.0, memory_allocated_gb=400000.0,
+        memory_utilization_percent=66.0 + i % 7,
+    ) for i in range(N_TICKS)]
+    status_session.execute(insert(DerechoStatus), rows)
+    status_session.commit()
+    return status_session
+
+
+def _orm_rows(session, start, end):
+    records = session.query(DerechoStatus).filter(
+        DerechoStatus.timestamp >= start, DerechoStatus.timestamp <= end,
+    ).order_by(DerechoStatus.timestamp).all()
+    out = [{'timestamp': r.timestamp, **history.partition_metrics(r, 'cpu')}
+           for r in records]
+    session.expunge_all()
+    return out
+
+
+def _column_arrays(session, start, end):
+    return history.raw_partition_columns(session, 'derecho', 'cpu', start, end)
+
+
+def _peak_bytes(fn, *args):
+    tracemalloc.start()
+    try:
+        result = fn(*args)
+        return len(result), tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.parametrize('days', [90, 365])
+@pytest.mark.parametrize('path', ['orm', 'columns'])
+def test_history_load(benchmark, year_of_ticks, days, path):
+    session = year_of_ticks
+    start = END - timedelta(days=days)
+    load = _column_arrays if path == 'columns' else _orm_rows
+
+    n = benchmark.pedantic(lambda: len(load(session, start, END)),
+                           rounds=3, iterations=1)
+    assert n == pytest.approx(days * 288, abs=1)
+
+    t0 = time.perf_counter()
+    _, peak = _peak_bytes(load, session, start, END)
+    benchmark.extra_info['rows'] = n
+    benchmark.extra_info['peak_mib'] = round(peak / 2**20, 1)
+    benchmark.extra_info['traced_seconds'] = round(time.perf_counter() - t0, 3)
+
+    if path == 'columns':
+        _, orm_peak = _peak_bytes(_orm_rows, session, start, END)
+        benchmark.extra_info['orm_peak_mib'] = round(orm_peak / 2**20, 1)
+        assert peak < orm_peak
+    print(f"\n{path:>7} {days:>3}d: {n:,} rows, peak {peak / 2**20:,.1f} MiB")
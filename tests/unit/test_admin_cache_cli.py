@@ -1,5 +1,5 @@
 """
-CliRunner tests for `sam-admin cache --refresh`.
+CliRunner tests for `sam-admin cache --refresh` (and --warm-scans' guards).
 
 The command is a thin HTTP client for POST /api/v1/admin/cache/refresh —
 the caches live in the webapp worker (and shared Redis), not the DB, so it
@@ -99,3 +99,20 @@ class TestCacheCli:
             result = runner.invoke(cli, ['cache', '--refresh'])
         assert result.exit_code == 2
         assert 'could not reach' in result.output
+
+    def test_both_actions_error(self, runner, mock_db_session, api_creds):
+        result = runner.invoke(cli, ['cache', '--refresh', '--warm-scans'])
+        assert result.exit_code == 2
+        assert 'exactly one action' in result.output
+
+    def test_warm_scans_needs_shared_cache(self, runner, mock_db_session, monkeypatch):
+        monkeypatch.delenv('CACHE_REDIS_URL', raising=False)
+        result = runner.invoke(cli, ['cache', '--warm-scans'])
+        assert result.exit_code == 2
+        assert 'CACHE_REDIS_URL' in result.output
+
+    def test_warm_scans_options_rejected_with_refresh(self, runner, mock_db_session,
+                                                      api_creds):
+        result = runner.invoke(cli, ['cache', '--refresh', '--force'])
+        assert result.exit_code == 2
+        assert '--warm-scans' in result.output
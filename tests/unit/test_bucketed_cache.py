@@ -0,0 +1,338 @@
+"""Tests for BucketedTTLCache.get_or_compute single-flight behaviour.
+
+In-process concurrency runs on the per-worker ``TTLCacheAdapter``; the
+cross-worker lease runs on fakeredis, with two cache instances standing in
+for two gunicorn workers that share one Redis.
+"""
+
+import threading
+import time
+
+import fakeredis
+import pytest
+
+import sam.caching.buckets as buckets
+from sam.caching import RedisTTLAdapter
+from sam.caching.buckets import BucketedTTLCache, BucketSpec
+
+
+_SPEC = BucketSpec('sf_test', 'SF_TEST_TTL', 60, 'SF_TEST_SIZE', 16)
+
+
+@pytest.fixture
+def make_cache(monkeypatch):
+    """Build throwaway caches and drop them from the facade registry after."""
+    monkeypatch.setenv('SF_TEST_TTL', '60')
+    monkeypatch.setenv('SF_TEST_SIZE', '16')
+    monkeypatch.delenv('CACHE_REDIS_URL', raising=False)
+
+    def _make(label='sf_test', spec=_SPEC, **kwargs):
+        return BucketedTTLCache(label, 'sf_test', {'default': spec}, **kwargs)
+
+    yield _make
+    with buckets._REGISTRY_LOCK:
+        buckets._INSTANCES[:] = [c for c in buckets._INSTANCES
+                                 if c.category != 'sf_test']
+
+
+@pytest.fixture
+def shared_redis(monkeypatch):
+    client = fakeredis.FakeRedis()
+    monkeypatch.setenv('CACHE_REDIS_URL', 'redis://fake:6379/0')
+    monkeypatch.setattr(buckets, 'make_redis_client',
+                        lambda url=None, **kw: client)
+    return client
+
+
+def _run_threads(n, target):
+    results, errors = [], []
+
+    def _wrap():
+        try:
+            results.append(target())
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_wrap) for _ in range(n)]
+    for t in threads:
+        t.start()
+    return threads, results, errors
+
+
+class TestInProcessSingleFlight:
+
+    def test_concurrent_misses_compute_once(self, make_cache):
+        cache = make_cache()
+        release = threading.Event()
+        calls = {'n': 0}
+
+        def compute():
+            calls['n'] += 1
+            release.wait(5)
+            return {'value': 42}
+
+        threads, results, errors = _run_threads(
+            8, lambda: cache.get_or_compute('default', ('k',), compute))
+        time.sleep(0.2)
+        release.set()
+        for t in threads:
+            t.join(5)
+
+        assert not errors
+        assert calls['n'] == 1
+        assert results == [{'value': 42}] * 8
+        assert cache._inflight == {}
+
+    def test_leader_exception_reaches_waiters_and_is_not_cached(self, make_cache):
+        cache = make_cache()
+        release = threading.Event()
+        calls = {'n': 0}
+
+        def failing():
+            calls['n'] += 1
+            release.wait(5)
+            raise RuntimeError('boom')
+
+        threads, results, errors = _run_threads(
+            4, lambda: cache.get_or_compute('default', ('k',), failing))
+        time.sleep(0.2)
+        release.set()
+        for t in threads:
+            t.join(5)
+
+        assert calls['n'] == 1
+        assert len(errors) == 4 and not results
+        assert all(isinstance(e, RuntimeError) for e in errors)
+        # Nothing stored, nothing left in flight — the next call recomputes.
+        assert cache.get_or_compute('default', ('k',), lambda: 'ok') == 'ok'
+
+    def test_force_refresh_serves_stale_to_concurrent_readers(self, make_cache):
+        cache = make_cache()
+        cache.get_or_compute('default', ('k',), lambda: 'old')
+        release = threading.Event()
+
+        def slow_new():
+            release.wait(5)
+            return 'new'
+
+        refresher = threading.Thread(target=lambda: cache.get_or_compute(
+            'default', ('k',), slow_new, force_refresh=True))
+        refresher.start()
+        time.sleep(0.1)
+        # Refresh in flight: plain readers still get the old entry at once.
+        assert cache.get_or_compute('default', ('k',), lambda: 'unused') == 'old'
+        release.set()
+        refresher.join(5)
+        assert cache.get_or_compute('default', ('k',), lambda: 'unused') == 'new'
+
+    def test_distinct_keys_do_not_serialise(self, make_cache):
+        cache = make_cache()
+        release = threading.Event()
+
+        def blocked():
+            release.wait(5)
+            return 'a'
+
+        t = threading.Thread(target=lambda: cache.get_or_compute(
+            'default', ('a',), blocked))
+        t.start()
+        time.sleep(0.1)
+        assert cache.get_or_compute('default', ('b',), lambda: 'b') == 'b'
+        release.set()
+        t.join(5)
+
+
+class TestCrossWorkerLease:
+
+    def test_peer_waits_for_lease_holder_instead_of_computing(
+            self, make_cache, shared_redis):
+        worker_a = make_cache('sf_test_a')
+        worker_b = make_cache('sf_test_b')
+        assert isinstance(worker_a.adapter('default'), RedisTTLAdapter)
+        release = threading.Event()
+        calls = {'a': 0, 'b': 0}
+
+        def compute_a():
+            calls['a'] += 1
+            release.wait(5)
+            return 'from-a'
+
+        def compute_b():
+            calls['b'] += 1
+            return 'from-b'
+
+        t = threading.Thread(target=lambda: worker_a.get_or_compute(
+            'default', ('k',), compute_a))
+        t.start()
+        time.sleep(0.1)
+        threading.Timer(0.2, release.set).start()
+
+        assert worker_b.get_or_compute('default', ('k',), compute_b) == 'from-a'
+        t.join(5)
+        assert calls == {'a': 1, 'b': 0}
+        # Lease released on completion.
+        assert not worker_a.adapter('default').lease_held(('k',))
+
+    def test_expired_lease_without_value_falls_back_to_compute(
+            self, make_cache, shared_redis):
+        worker = make_cache('sf_test_a', lease_ttl=5)
+        adapter = worker.adapter('default')
+        # A peer that took the lease and died before storing anything.
+        assert adapter.acquire_lease(('k',), 0.2) is not None
+
+        t0 = time.monotonic()
+        assert worker.get_or_compute('default', ('k',), lambda: 'mine') == 'mine'
+        assert time.monotonic() - t0 < 2
+        assert adapter[('k',)] == 'mine'
+
+    def test_unencodable_value_is_served_but_not_stored(self, make_cache, shared_redis):
+        worker = make_cache('sf_test_a')
+        value = {'lock': threading.Lock()}          # pickle raises TypeError
+        assert worker.get_or_compute('default', ('k',), lambda: value) is value
+        assert worker.peek('default', ('k',)) is None
+
+    def test_lease_is_exclusive_and_owner_checked(self, shared_redis):
+        adapter = RedisTTLAdapter(name='sf_lease', client=shared_redis, ttl=60)
+        token = adapter.acquire_lease(('k',), 10)
+        assert token is not None
+        assert adapter.acquire_lease(('k',), 10) is None
+        adapter.release_lease(('k',), 'not-the-owner')
+        assert adapter.lease_held(('k',))
+        adapter.release_lease(('k',), token)
+        assert not adapter.lease_held(('k',))
+
+
+# ---------------------------------------------------------------------------
+# Stale-while-revalidate
+# ---------------------------------------------------------------------------
+
+_SOFT_SPEC = BucketSpec('swr_test', 'SF_TEST_TTL', 60, 'SF_TEST_SIZE', 16,
+                        soft_ttl_key='SF_TEST_SOFT_TTL')
+
+
+@pytest.fixture
+def soft_cache(make_cache, monkeypatch):
+    monkeypatch.setenv('SF_TEST_SOFT_TTL', '30')
+    return make_cache('swr_test', _SOFT_SPEC)
+
+
+def _age(cache, key, seconds):
+    """Back-date *key*'s stamp so it reads as *seconds* old."""
+    adapter = cache.adapter('default')
+    entry = adapter[key]
+    adapter[key] = buckets._Stamped(entry.value, time.time() - seconds)
+
+
+def _drain(cache, timeout=5):
+    deadline = time.monotonic() + timeout
+    while cache._inflight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not cache._inflight
+
+
+class TestStaleWhileRevalidate:
+
+    def test_fresh_hit_does_not_refresh(self, soft_cache):
+        soft_cache.get_or_compute('default', ('k',), lambda: 'v1')
+        refreshed = []
+        assert soft_cache.get_or_compute(
+            'default', ('k',), lambda: 'unused',
+            refresh=lambda: refreshed.append(1)) == 'v1'
+        assert not refreshed
+        extras = soft_cache.info()[0]['extras']
+        assert (extras['soft_ttl'], extras['stale_hits'], extras['refreshes']) == (30, 0, 0)
+
+    def test_stale_hit_serves_old_value_and_refreshes_in_background(self, soft_cache):
+        soft_cache.get_or_compute('default', ('k',), lambda: 'v1')
+        _age(soft_cache, ('k',), 45)
+        release = threading.Event()
+
+        def slow_refresh():
+            release.wait(5)
+            return 'v2'
+
+        assert soft_cache.get_or_compute(
+            'default', ('k',), lambda: 'unused', refresh=slow_refresh) == 'v1'
+        # Same single-flight key: a second stale hit doesn't queue another.
+        assert soft_cache.get_or_compute(
+            'default', ('k',), lambda: 'unused', refresh=slow_refresh) == 'v1'
+        assert len(soft_cache._inflight) == 1
+        release.set()
+        _drain(soft_cache)
+
+        assert soft_cache.get_or_compute('default', ('k',), lambda: 'unused') == 'v2'
+        info = soft_cache.info()[0]
+        assert info['extras']['stale_hits'] == 2
+        assert info['extras']['refreshes'] == 1
+        assert info['hits'] == 1 and info['misses'] == 1
+
+    def test_stale_hit_without_refresh_callable_is_served_as_is(self, soft_cache):
+        soft_cache.get_or_compute('default', ('k',), lambda: 'v1')
+        _age(soft_cache, ('k',), 45)
+        assert soft_cache.get_or_compute('default', ('k',), lambda: 'v2') == 'v1'
+        assert not soft_cache._inflight
+        assert soft_cache.info()[0]['extras']['refreshes'] == 0
+
+    def test_failed_refresh_keeps_stale_entry(self, soft_cache):
+        soft_cache.get_or_compute('default', ('k',), lambda: 'v1')
+        _age(soft_cache, ('k',), 45)
+
+        def broken():
+            raise RuntimeError('backend down')
+
+        assert soft_cache.get_or_compute(
+            'default', ('k',), lambda: 'unused', refresh=broken) == 'v1'
+        _drain(soft_cache)
+        assert soft_cache.get_or_compute('default', ('k',), lambda: 'unused') == 'v1'
+        assert soft_cache.info()[0]['extras']['refreshes'] == 0
+
+    def test_failed_refresh_hands_waiters_the_stale_entry(self, soft_cache):
+        soft_cache.get_or_compute('default', ('k',), lambda: 'v1')
+        _age(soft_cache, ('k',), 45)
+        started, release = threading.Event(), threading.Event()
+
+        def broken():
+            started.set()
+            release.wait(5)
+            raise RuntimeError('backend down')
+
+        soft_cache.schedule_refresh('default', ('k',), broken)
+        assert started.wait(5)
+        threading.Timer(0.1, release.set).start()
+        # Queues behind the refresh rather than computing; gets v1, not the error.
+        assert soft_cache.get_or_compute(
+            'default', ('k',), lambda: 'unused', force_refresh=True) == 'v1'
+
+    def test_soft_ttl_not_below_hard_ttl_is_ignored(self, make_cache, monkeypatch):
+        monkeypatch.setenv('SF_TEST_SOFT_TTL', '60')
+        cache = make_cache('swr_test', _SOFT_SPEC)
+        cache.get_or_compute('default', ('k',), lambda: 'v1')
+        # Stored unstamped, and info() carries no soft-TTL extras.
+        assert cache.adapter('default')[('k',)] == 'v1'
+        assert 'soft_ttl' not in cache.info()[0]['extras']
+
+    def test_background_refresh_defers_to_peer_lease(self, soft_cache, shared_redis):
+        adapter = soft_cache.adapter('default')
+        assert isinstance(adapter, RedisTTLAdapter)
+        soft_cache.get_or_compute('default', ('k',), lambda: 'v1')
+        _age(soft_cache, ('k',), 45)
+        # Another worker is already refreshing this key.
+        assert adapter.acquire_lease(('k',), 10) is not None
+        calls = []
+
+        assert soft_cache.get_or_compute(
+            'default', ('k',), lambda: 'unused',
+            refresh=lambda: calls.append(1) or 'v2') == 'v1'
+        _drain(soft_cache)
+        assert not calls
+        assert soft_cache.info()[0]['extras']['refreshes'] == 0
+
+    def test_put_stores_like_a_compute_would(self, soft_cache, make_cache, monkeypatch):
+        soft_cache.put('default', ('k',), 'v1')
+        assert isinstance(soft_cache.adapter('default')[('k',)], buckets._Stamped)
+        assert soft_cache.get_or_compute('default', ('k',), lambda: 'unused') == 'v1'
+
+        monkeypatch.setenv('SF_TEST_TTL', '0')
+        disabled = make_cache('off_test')
+        disabled.put('default', ('k',), 'v1')          # nowhere to put it
+        assert disabled.peek('default', ('k',)) is None
@@ -0,0 +1,134 @@
+"""Tests for the Redis cache value codec (sam.caching.codec) and its use
+by RedisTTLAdapter / RedisChartCache.
+
+zstd and msgpack are optional installs; their cases skip when absent.
+"""
+
+import os
+import pickle
+from datetime import date
+
+import fakeredis
+import pytest
+
+from sam.caching import Codec, CodecError, RedisTTLAdapter
+from sam.caching import codec as codec_mod
+from webapp.caching.redis_chart import RedisChartCache
+
+
+ROWS = [{'projcode': f'SCSG{i:04d}', 'used': i * 1.5, 'allocated': 1000}
+        for i in range(200)]
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+class TestCodec:
+
+    @pytest.mark.parametrize('value', [
+        ROWS, {'a': (1, 2)}, date(2025, 1, 1), None, 42, '<svg/>' * 500,
+    ])
+    def test_roundtrip(self, value):
+        codec = Codec(compression='zlib', min_bytes=64)
+        data, _ = codec.encode(value)
+        assert Codec.decode(data) == value
+
+    def test_header_records_codec(self):
+        data, raw_size = Codec(compression='zlib', min_bytes=64).encode(ROWS)
+        assert data[0] == codec_mod.MAGIC
+        assert data[1] == codec_mod.VERSION
+        assert data[2] == codec_mod.SER_PICKLE
+        assert data[3] == codec_mod.COMP_ZLIB
+        assert len(data) < raw_size
+
+    def test_below_threshold_is_not_compressed(self):
+        data, raw_size = Codec(compression='zlib', min_bytes=10_000).encode(ROWS)
+        assert data[3] == codec_mod.COMP_NONE
+        assert len(data) == raw_size + 4
+
+    def test_incompressible_payload_stays_raw(self):
+        data, _ = Codec(compression='zlib', min_bytes=1).encode(os.urandom(4096))
+        assert data[3] == codec_mod.COMP_NONE
+
+    def test_text_values_use_text_serializer(self):
+        data, _ = Codec(compression='none').encode('<svg>x</svg>')
+        assert data[2] == codec_mod.SER_TEXT
+        assert Codec.decode(data) == '<svg>x</svg>'
+
+    def test_newer_version_is_rejected(self):
+        data, _ = Codec(compression='none').encode(ROWS)
+        future = bytes((data[0], codec_mod.VERSION + 1)) + data[2:]
+        with pytest.raises(CodecError):
+            Codec.decode(future)
+
+    def test_headerless_bytes_are_rejected(self):
+        with pytest.raises(CodecError):
+            Codec.decode(pickle.dumps(ROWS, protocol=4))
+
+    def test_zstd_falls_back_to_zlib_when_missing(self, monkeypatch):
+        monkeypatch.setattr(codec_mod, 'zstandard', None)
+        assert Codec(compression='zstd').compression == 'zlib'
+
+    def test_zstd_roundtrip(self):
+        pytest.importorskip('zstandard')
+        codec = Codec(compression='zstd', min_bytes=64)
+        data, raw_size = codec.encode(ROWS)
+        assert data[3] == codec_mod.COMP_ZSTD and len(data) < raw_size
+        assert Codec.decode(data) == ROWS
+
+    def test_msgpack_only_for_plain_payloads(self):
+        pytest.importorskip('msgpack')
+        codec = Codec(compression='none', use_msgpack=True)
+        plain, _ = codec.encode(ROWS)
+        assert plain[2] == codec_mod.SER_MSGPACK
+        assert Codec.decode(plain) == ROWS
+        # Tuples would come back as lists — stays on pickle.
+        tupled, _ = codec.encode({'a': (1, 2)})
+        assert tupled[2] == codec_mod.SER_PICKLE
+
+    def test_codec_from_env(self, monkeypatch):
+        monkeypatch.setenv('CACHE_CODEC', 'none')
+        monkeypatch.setenv('CACHE_CODEC_MIN_BYTES', '2048')
+        codec = codec_mod.codec_from_env()
+        assert (codec.compression, codec.min_bytes) == ('none', 2048)
+
+
+class TestAdapterCodec:
+
+    def test_ttl_adapter_reports_bytes_saved(self, redis_client):
+        adapter = RedisTTLAdapter(name='usage', client=redis_client, ttl=60,
+                                  codec=Codec(compression='zlib', min_bytes=64))
+        adapter[('k',)] = ROWS
+        assert adapter[('k',)] == ROWS
+        extras = adapter.info()['extras']
+        assert extras['codec'] == 'zlib≥64'
+        assert extras['bytes_saved'] > 0
+
+    def test_undecodable_value_is_a_miss(self, redis_client):
+        adapter = RedisTTLAdapter(name='usage', client=redis_client, ttl=60)
+        adapter[('k',)] = ROWS
+        encoded = adapter._encode_key(('k',))
+        redis_client.set(encoded, bytes((codec_mod.MAGIC, 99, 0, 0)) + b'??')
+        assert adapter.get(('k',), 'miss') == 'miss'
+        assert adapter.info()['misses'] == 1
+
+    def test_pre_codec_entries_are_not_read(self, redis_client):
+        """A value written by a pre-codec worker lives under the untagged key."""
+        adapter = RedisTTLAdapter(name='usage', client=redis_client, ttl=60)
+        legacy_key = b'usage:' + pickle.dumps(('k',), protocol=4)
+        redis_client.set(legacy_key, pickle.dumps('legacy', protocol=4))
+        assert ('k',) not in adapter
+        assert adapter.clear() == 1     # still swept and counted
+
+    def test_chart_cache_compresses_svg(self, redis_client):
+        cache = RedisChartCache(name='pace_chart', client=redis_client,
+                                codec=Codec(compression='zlib', min_bytes=64))
+        svg = '<svg>' + '<path d="M0 0 L10 10"/>' * 200 + '</svg>'
+        cache.put('k', svg)
+        assert cache.get('k') == svg
+        info = cache.info()
+        assert info['extras']['bytes_saved'] > len(svg) // 2
+        cache.clear()
+        assert cache.info()['extras']['bytes_saved'] == 0
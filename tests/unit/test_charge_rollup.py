@@ -0,0 +1,269 @@
+"""Parity tests for the monthly charge rollup (sam.summaries.charge_rollup).
+
+The batch charge methods must return the same numbers whether charges come
+from the raw ``*_charge_summary`` scan or from the rollup, for any window —
+month edges, sub-day starts, partially covered or stale months. Runs on an
+in-memory SQLite table subset (like tests/perf/test_comp_ingest_throughput)
+because the rollup tables are created on demand and the MySQL test snapshot
+does not carry them. SQLite has no VALUES ROW() CTEs, so the raw side is
+the fallback path — the same one every raw-path assertion in the suite uses.
+"""
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, insert, update
+from sqlalchemy.orm import sessionmaker
+
+import sam.projects.projects as projects_mod
+from sam.accounting.adjustments import ChargeAdjustment
+from sam.projects.projects import Project
+from sam.summaries import charge_rollup
+from sam.summaries.charge_rollup import (
+    charge_rollup_month, ensure_rollup_tables, mark_rollup_stale,
+    refresh_charge_rollup, window_days,
+)
+from sam.summaries.comp_summaries import CompChargeSummary
+
+from factories import make_account, make_project, make_resource, make_resource_type, next_seq
+
+
+_SQLITE_TABLES = (
+    "users", "email_address", "area_of_interest_group", "area_of_interest",
+    "facility", "panel", "allocation_type", "project", "resource_type",
+    "resources", "account", "account_user", "comp_charge_summary",
+    "dav_charge_summary_status", "dav_charge_summary", "charge_adjustment",
+)
+
+FIRST_DAY = date(2025, 1, 1)
+N_DAYS = 120        # Jan–Apr 2025
+
+
+@pytest.fixture
+def sqlite_session(monkeypatch):
+    from sam.base import Base
+
+    monkeypatch.setattr(projects_mod, '_values_cte_supported', False)
+    engine = create_engine("sqlite://", future=True)
+    Base.metadata.create_all(
+        engine, tables=[Base.metadata.tables[t] for t in _SQLITE_TABLES]
+    )
+    sess = sessionmaker(bind=engine, autoflush=False, future=True)()
+    try:
+        yield sess
+    finally:
+        sess.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def graph(sqlite_session):
+    """root → (child_a → grandchild, child_b) on one HPC resource, with
+    daily comp charges on every account and one adjustment."""
+    session = sqlite_session
+    resource = make_resource(session, resource_type=make_resource_type(
+        session, resource_type='HPC'))
+    root = make_project(session)
+    child_a = make_project(session, parent=root)
+    grandchild = make_project(session, parent=child_a)
+    child_b = make_project(session, parent=root)
+    nodes = [root, child_a, grandchild, child_b]
+    accounts = [make_account(session, project=p, resource=resource) for p in nodes]
+
+    rng = random.Random(6)
+    rows = []
+    for acct in accounts:
+        for i in range(N_DAYS):
+            if rng.random() < 0.7:
+                rows.append(dict(
+                    activity_date=FIRST_DAY + timedelta(days=i),
+                    act_username='u', act_projcode=next_seq('P'),
+                    machine='m', queue='q', account_id=acct.account_id,
+                    charges=round(rng.uniform(1, 500), 3),
+                ))
+    session.execute(insert(CompChargeSummary), rows)
+    session.add(ChargeAdjustment(account_id=accounts[1].account_id,
+                                 charge_adjustment_type_id=1, amount=-40.0,
+                                 adjustment_date=datetime(2025, 2, 14)))
+    session.flush()
+    return resource, nodes, accounts
+
+
+# Midnight starts are passed as dates: SQLite compares DATE to DATETIME as
+# text and drops the start day, where MySQL (and window_days) keep it.
+_WINDOWS = [
+    (date(2025, 1, 1), datetime(2025, 4, 30, 23, 59, 59)),       # whole months
+    (date(2025, 1, 17), datetime(2025, 3, 3)),                    # two edges
+    (datetime(2025, 2, 5, 12, 0), datetime(2025, 2, 20)),         # sub-day start
+    (date(2025, 2, 1), datetime(2025, 2, 28)),                    # short month
+    (date(2024, 12, 20), datetime(2025, 1, 10)),                  # before data
+]
+
+
+def _subtree_infos(resource, nodes):
+    return [dict(key=(p.projcode, w), resource_id=resource.resource_id,
+                 resource_type='HPC', tree_root=p.tree_root, tree_left=p.tree_left,
+                 tree_right=p.tree_right, start_date=w[0], end_date=w[1])
+            for p in nodes for w in _WINDOWS]
+
+
+def _account_infos(accounts):
+    return [dict(key=(a.account_id, w), account_id=a.account_id,
+                 resource_type='HPC', start_date=w[0], end_date=w[1])
+            for a in accounts for w in _WINDOWS]
+
+
+def _both(session, resource, nodes, accounts):
+    return (Project.batch_get_subtree_charges(session, _subtree_infos(resource, nodes)),
+            Project.batch_get_account_charges(session, _account_infos(accounts)))
+
+
+def _assert_same(actual, expected):
+    assert actual.keys() == expected.keys()
+    for k, exp in expected.items():
+        got = actual[k]
+        assert got['adjustment'] == pytest.approx(exp['adjustment']), k
+        assert set(got['charges_by_type']) == set(exp['charges_by_type']), k
+        for ck, amount in exp['charges_by_type'].items():
+            assert got['charges_by_type'][ck] == pytest.approx(amount, rel=1e-9), (k, ck)
+
+
+def _refresh_all(session):
+    ensure_rollup_tables(session)
+    months = charge_rollup.months_between(FIRST_DAY, FIRST_DAY + timedelta(days=N_DAYS - 1))
+    refresh_charge_rollup(session, 'comp', months)
+    return months
+
+
+class TestParity:
+
+    def test_rollup_matches_raw_path(self, sqlite_session, graph):
+        raw = _both(sqlite_session, *graph)
+        assert not charge_rollup.rollup_available(sqlite_session)
+        _refresh_all(sqlite_session)
+        rolled = _both(sqlite_session, *graph)
+        for got, exp in zip(rolled, raw):
+            _assert_same(got, exp)
+        # Sanity: the subtree root really carries every descendant's charges.
+        root = graph[1][0]
+        whole = (root.projcode, _WINDOWS[0])
+        assert rolled[0][whole]['charges_by_type']['comp'] == pytest.approx(
+            sum(rolled[1][(a.account_id, _WINDOWS[0])]['charges_by_type'].get('comp', 0.0)
+                for a in graph[2]))
+
+    def test_clean_months_come_from_rollup(self, sqlite_session, graph):
+        _refresh_all(sqlite_session)
+        before = _both(sqlite_session, *graph)
+        # An out-of-band write that does not mark the month stale is not
+        # seen — proof that clean months are read from the rollup.
+        sqlite_session.execute(update(CompChargeSummary)
+                               .where(CompChargeSummary.activity_date == date(2025, 2, 10))
+                               .values(charges=CompChargeSummary.charges + 1000))
+        _assert_same(_both(sqlite_session, *graph)[1], before[1])
+
+    def test_stale_and_uncovered_months_take_residual_scan(self, sqlite_session, graph):
+        ensure_rollup_tables(sqlite_session)
+        # Jan + Mar covered, Feb refreshed then made stale, Apr never covered.
+        refresh_charge_rollup(sqlite_session, 'comp',
+                              [date(2025, 1, 1), date(2025, 2, 1), date(2025, 3, 1)])
+        sqlite_session.execute(update(CompChargeSummary)
+                               .where(CompChargeSummary.activity_date == date(2025, 2, 10))
+                               .values(charges=CompChargeSummary.charges + 1000))
+        mark_rollup_stale(sqlite_session, 'comp', [date(2025, 2, 10)])
+        rolled = _both(sqlite_session, *graph)
+
+        charge_rollup._available[sqlite_session.get_bind()] = (False, time.monotonic())
+        raw = _both(sqlite_session, *graph)
+        for got, exp in zip(rolled, raw):
+            _assert_same(got, exp)
+
+    def test_refresh_clears_staleness(self, sqlite_session, graph):
+        months = _refresh_all(sqlite_session)
+        mark_rollup_stale(sqlite_session, 'comp', [date(2025, 3, 9)])
+        assert charge_rollup.stale_months(sqlite_session) == {'comp': [date(2025, 3, 1)]}
+        refresh_charge_rollup(sqlite_session, 'comp', [date(2025, 3, 1)])
+        assert not charge_rollup.stale_months(sqlite_session)
+        clean = charge_rollup.clean_months(sqlite_session, ['comp'],
+                                           months[0], months[-1])
+        assert clean['comp'] == set(months)
+
+
+class TestMaintenance:
+
+    def test_stale_mark_is_one_update_per_month_per_transaction(self, sqlite_session, graph):
+        _refresh_all(sqlite_session)
+        statements = []
+        event.listen(sqlite_session.get_bind(), 'before_cursor_execute',
+                     lambda conn, cur, stmt, *a: statements.append(stmt))
+        for day in range(1, 20):
+            mark_rollup_stale(sqlite_session, 'comp', [date(2025, 1, day)])
+        mark_rollup_stale(sqlite_session, 'comp', [date(2025, 1, 3), date(2025, 2, 3)])
+        assert sum(s.lstrip().upper().startswith('UPDATE') for s in statements) == 2
+
+    def test_subtree_scan_is_bounded_to_the_requested_anchors(self, sqlite_session, graph):
+        resource, (root, child_a, grandchild, child_b), _ = graph
+        _refresh_all(sqlite_session)
+        sqlite_session.expire_all()                 # tree coordinates settled
+        anchors = [(child_a.tree_root, child_a.tree_left, child_a.tree_right),
+                   (grandchild.tree_root, grandchild.tree_left, grandchild.tree_right)]
+        start, end = _WINDOWS[1]
+        for clean in (set(), {date(2025, 2, 1)}):       # residual only, then both
+            got = charge_rollup.window_charges(
+                sqlite_session, 'comp', start, end, clean,
+                resource_ids=[resource.resource_id], subtrees=anchors)
+            everything = charge_rollup.window_charges(
+                sqlite_session, 'comp', start, end, clean,
+                resource_ids=[resource.resource_id])
+            inside = {k: v for k, v in everything.items()
+                      if child_a.tree_left <= k[1] and k[2] <= child_a.tree_right}
+            assert got == inside
+            assert (root.tree_root, root.tree_left, root.tree_right,
+                    resource.resource_id) in everything.keys() - got.keys()
+
+    def test_dav_is_never_rolled_up(self, sqlite_session, graph):
+        ensure_rollup_tables(sqlite_session)
+        assert refresh_charge_rollup(sqlite_session, 'dav', [date(2025, 1, 1)]) == 0
+        # Coverage left behind by an older build is not trusted either.
+        sqlite_session.execute(insert(charge_rollup_month).values(
+            charge_type='dav', activity_month=date(2025, 1, 1),
+            is_stale=False, refreshed_at=datetime(2025, 5, 1)))
+        assert not charge_rollup.clean_months(sqlite_session, ['dav'],
+                                              date(2025, 1, 1), date(2025, 1, 31))
+        mark_rollup_stale(sqlite_session, 'dav', [date(2025, 1, 3)])
+        assert not charge_rollup.stale_months(sqlite_session)
+
+    def test_tables_created_elsewhere_are_seen_after_the_ttl(self, sqlite_session,
+                                                             monkeypatch):
+        assert not charge_rollup.rollup_available(sqlite_session)
+        # Another process creates them: this one has no reason to know yet.
+        charge_rollup.rollup_metadata.create_all(sqlite_session.connection())
+        assert not charge_rollup.rollup_available(sqlite_session)
+        monkeypatch.setattr(charge_rollup, '_AVAILABLE_TTL', 0.0)
+        assert charge_rollup.rollup_available(sqlite_session)
+
+    def test_stale_mark_is_noop_without_tables(self, sqlite_session):
+        mark_rollup_stale(sqlite_session, 'comp', [date(2025, 1, 1)])
+        assert not charge_rollup.rollup_available(sqlite_session)
+
+    def test_refresh_writes_prefix_sums(self, sqlite_session, graph):
+        _refresh_all(sqlite_session)
+        row = sqlite_session.execute(
+            charge_rollup.charge_rollup.select()
+            .where(charge_rollup.charge_rollup.c.activity_month == date(2025, 2, 1))
+        ).mappings().first()
+        cums = [row[c] for c in charge_rollup.DAY_COLUMNS]
+        assert cums == sorted(cums)
+        # February: days 29–31 repeat the month total.
+        assert cums[27] == cums[28] == cums[29] == cums[30]
+        covered = sqlite_session.execute(charge_rollup_month.select()).all()
+        assert len(covered) == 4
+
+
+@pytest.mark.parametrize('start, end, expected', [
+    (datetime(2025, 1, 5), datetime(2025, 1, 9), (date(2025, 1, 5), date(2025, 1, 9))),
+    (datetime(2025, 1, 5, 8), datetime(2025, 1, 9, 23, 59), (date(2025, 1, 6), date(2025, 1, 9))),
+    (date(2025, 1, 5), date(2025, 1, 9), (date(2025, 1, 5), date(2025, 1, 9))),
+])
+def test_window_days_follow_date_vs_datetime_comparison(start, end, expected):
+    assert window_days(start, end) == expected
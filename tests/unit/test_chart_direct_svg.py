@@ -0,0 +1,103 @@
+"""The direct-SVG chart backend (`charts/svg.py`).
+
+It draws a subset of the chart shapes without matplotlib, so the contract is
+the one the render pool has, loosened to what a second drawing can keep: the
+same drill links, the same labels and data colors, roughly the same size — and
+anything it does not draw is handed back (``None``) for matplotlib to render.
+Tick labels are left out of the comparison: the backend follows matplotlib's
+locators, not its text metrics, so an axis can come out one tick apart.
+
+Renders here call the chart classes directly: through `chart_view` a cache hit
+would skip the renderer under test.
+"""
+
+import re
+
+import pytest
+
+from chart_fingerprint import svg_fingerprint
+from chart_samples import CASES
+from webapp.dashboards.charts import svg
+from webapp.dashboards.charts.layout import resolve_layout
+from webapp.dashboards.charts.pie import FacilityPie
+from webapp.dashboards.charts.theme import resolve_theme
+
+#: Axis tick labels — numbers with an optional SI suffix, months, years, days.
+_TICK_RE = re.compile(r'^[\d.,:]+[KMGTPB]?$|^[A-Z][a-z]{2}( \d{1,2})?$|^\d{4}$')
+
+_PIE = [{'facility': 'UNIV', 'annualized_rate': 600.0},
+        {'facility': 'WNA', 'annualized_rate': 400.0}]
+
+
+@pytest.fixture
+def direct():
+    svg.configure(enabled=True)
+    yield svg
+    svg.configure(enabled=False)
+
+
+def _prepared(cls, args, kwargs, layout, theme):
+    chart = cls(*args, **kwargs)
+    chart.layout = resolve_layout(chart.LAYOUTS, layout)
+    chart.theme = resolve_theme(theme)
+    chart.prepare()
+    return chart
+
+
+CASES_BY_ID = [(case_id, fn.chart_class, args, kwargs) for case_id, fn, args, kwargs in CASES
+               if getattr(fn, 'chart_class', None) is not None]
+
+
+def _direct_cases():
+    for case_id, fn, args, kwargs in CASES:
+        cls = getattr(fn, 'chart_class', None)
+        if cls is not None and cls.direct_svg and not case_id.endswith('.empty'):
+            yield case_id, cls, args, kwargs
+
+
+@pytest.mark.parametrize('theme', ['light', 'dark'])
+@pytest.mark.parametrize('layout', ['desktop', 'mobile'])
+def test_direct_renders_match_matplotlib(app, direct, layout, theme):
+    drawn = 0
+    with app.test_request_context('/'):
+        for case_id, cls, args, kwargs in _direct_cases():
+            chart = _prepared(cls, args, kwargs, layout, theme)
+            out = direct.render(chart)
+            if out is None:
+                continue
+            drawn += 1
+            got, want = svg_fingerprint(out), svg_fingerprint(chart.draw_svg())
+            assert got['drill_hrefs'] == want['drill_hrefs'], case_id
+            assert set(want['fills']) <= set(got['fills']) | {'#ffffff', '#000000'}, case_id
+            labels = sorted(l for l in want['labels'] if not _TICK_RE.match(l))
+            assert labels == sorted(l for l in got['labels'] if not _TICK_RE.match(l)), case_id
+            for g, w in zip(got['size'], want['size']):
+                assert abs(g - w) <= 0.3 * w, case_id
+    assert drawn
+
+
+def test_unsupported_shapes_fall_back(app, direct):
+    """Multi-band bars and the jobs time series are matplotlib's."""
+    declined = {case_id: (cls, args, kwargs) for case_id, cls, args, kwargs in CASES_BY_ID
+                if case_id in ('usage_stacked.core_hours', 'jobs_ts.user_linked')}
+    assert len(declined) == 2
+    with app.test_request_context('/'):
+        for case_id, (cls, args, kwargs) in declined.items():
+            chart = _prepared(cls, args, kwargs, 'desktop', 'light')
+            assert direct.render(chart) is None, case_id
+            assert chart.render().lstrip().startswith('<?xml'), case_id
+
+
+def test_disabled_backend_declines(app):
+    svg.configure(enabled=False)
+    with app.test_request_context('/'):
+        chart = _prepared(FacilityPie, (_PIE,), {}, 'desktop', 'light')
+        assert svg.render(chart) is None
+
+
+def test_render_uses_direct_backend(app, direct, monkeypatch):
+    monkeypatch.setattr(FacilityPie, 'draw_svg', lambda self: pytest.fail('matplotlib ran'))
+    with app.test_request_context('/'):
+        out = FacilityPie(_PIE).render()
+    assert out.lstrip().startswith('<?xml')
+    assert 'UNIV' in out and 'WNA' in out
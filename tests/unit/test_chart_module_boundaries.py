@@ -4,7 +4,8 @@ Three modules — `links.py`, `series.py`, `jobs_metrics.py` — must import no
 matplotlib. They are the ones a different rendering backend would reuse
 verbatim: URL construction, band normalization, and plugin-envelope
 arithmetic. Keeping them clean is the whole migration seam this refactor
-bought instead of an abstract base layer.
+bought instead of an abstract base layer. `svg.py` — that different backend,
+for the simple shapes — is held to the same rule, or it would save nothing.
 
 It has to be a test rather than a convention, because an accidental
 `import matplotlib` would never fail anything — it would just quietly weld the
@@ -22,7 +23,7 @@ import pytest
 PKG = Path(__file__).resolve().parents[2] / 'src' / 'webapp' / 'dashboards' / 'charts'
 
 #: Modules that must stay renderer-agnostic.
-BACKEND_FREE = ['links.py', 'series.py', 'jobs_metrics.py']
+BACKEND_FREE = ['links.py', 'series.py', 'jobs_metrics.py', 'svg.py']
 
 #: Every module in the package, for the general hygiene checks.
 ALL_MODULES = sorted(p.name for p in PKG.glob('*.py'))
@@ -59,7 +60,7 @@ def test_expected_package_layout():
     assert ALL_MODULES == [
         '__init__.py', 'base.py', 'dualpanel.py', 'histogram.py',
         'jobs_metrics.py', 'layout.py', 'links.py', 'pace.py', 'pie.py',
-        'series.py', 'stacked.py', 'theme.py',
+        'pool.py', 'series.py', 'stacked.py', 'svg.py', 'theme.py', 'warm.py',
     ]
 
 
@@ -0,0 +1,149 @@
+"""The out-of-process chart render pool (`charts/pool.py`).
+
+The pool is a second place `draw_svg()` can run, so the contract is that
+nobody can tell which place ran it: every sample chart fingerprints the same
+pooled as in-process — drill links included, which is the part that needs the
+parent's help (`links.route_templates`) — and every way the pool can fail ends
+in an in-process render rather than an error.
+
+Renders here call the chart classes directly: through `chart_view` a cache hit
+would skip the renderer under test.
+"""
+
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from chart_fingerprint import svg_fingerprint
+from chart_samples import CASES
+from webapp.dashboards.charts import links
+from webapp.dashboards.charts.pie import FacilityPie
+from webapp.dashboards.charts.pool import render_pool
+
+_PIE = [{'facility': 'UNIV', 'annualized_rate': 600.0},
+        {'facility': 'WNA', 'annualized_rate': 400.0}]
+
+
+def _in_worker():
+    return multiprocessing.parent_process() is not None
+
+
+class _SlowPie(FacilityPie):
+    def draw_svg(self):
+        if _in_worker():
+            time.sleep(30)
+        return super().draw_svg()
+
+
+class _CrashingPie(FacilityPie):
+    def draw_svg(self):
+        if _in_worker():
+            os._exit(1)
+        return super().draw_svg()
+
+
+class _UnpicklablePie(FacilityPie):
+    def prepare(self):
+        super().prepare()
+        self.hook = lambda: None
+
+
+@pytest.fixture(scope='module')
+def pool():
+    render_pool.configure(size=2, timeout=60, max_tasks=50)
+    yield render_pool
+    render_pool.configure(size=0)
+
+
+@pytest.fixture
+def stats(pool):
+    before = dict(pool.stats)
+    yield lambda: {k: pool.stats[k] - before[k] for k in before}
+
+
+def _chart_cases():
+    for case_id, fn, args, kwargs in CASES:
+        cls = getattr(fn, 'chart_class', None)
+        if cls is not None and not case_id.endswith('.empty'):
+            yield case_id, cls, args, kwargs
+
+
+def test_pooled_renders_match_in_process(app, pool, stats):
+    with app.test_request_context('/'):
+        for case_id, cls, args, kwargs in _chart_cases():
+            pool.size, local = 0, svg_fingerprint(cls(*args, **kwargs).render())
+            pool.size, pooled = 2, svg_fingerprint(cls(*args, **kwargs).render())
+            assert pooled == local, case_id
+    assert stats()['fallbacks'] == 0
+    assert stats()['pooled'] == len(list(_chart_cases()))
+
+
+def test_modal_links_resolve_from_templates(app):
+    with app.test_request_context('/'):
+        expected = links.PROJECT_MODAL.url('A b/c')
+        templates = links.route_templates()
+    links.use_route_templates(templates)
+    try:
+        assert links.PROJECT_MODAL.url('A b/c') == expected
+    finally:
+        links.use_route_templates({})
+
+
+def test_unpicklable_chart_renders_in_process(app, pool, stats):
+    with app.test_request_context('/'):
+        svg = _UnpicklablePie(_PIE).render()
+    assert svg.lstrip().startswith('<?xml')
+    assert stats() == {'pooled': 0, 'fallbacks': 1, 'timeouts': 0}
+
+
+def test_timeout_renders_in_process(app, pool, stats):
+    pool.timeout = 0.5
+    try:
+        with app.test_request_context('/'):
+            svg = _SlowPie(_PIE).render()
+    finally:
+        pool.timeout = 60
+    assert svg.lstrip().startswith('<?xml')
+    assert stats() == {'pooled': 0, 'fallbacks': 1, 'timeouts': 1}
+
+
+def test_hung_render_does_not_hold_a_worker(app, pool, stats):
+    pool.configure(size=1, timeout=0.5, max_tasks=50)
+    try:
+        with app.test_request_context('/'):
+            _SlowPie(_PIE).render()
+            pool.timeout = 60
+            started = time.monotonic()
+            assert FacilityPie(_PIE).render().lstrip().startswith('<?xml')
+            # A fresh worker's spawn and warm-up, not the rest of the 30s sleep.
+            assert time.monotonic() - started < 20
+    finally:
+        pool.configure(size=2, timeout=60, max_tasks=50)
+    assert stats() == {'pooled': 1, 'fallbacks': 1, 'timeouts': 1}
+
+
+def test_cold_start_is_not_charged_to_the_render_timeout(app, pool, stats):
+    # Spawning and warming a worker takes seconds; the draw itself does not.
+    pool.configure(size=1, timeout=2, max_tasks=50)
+    try:
+        with app.test_request_context('/'):
+            assert FacilityPie(_PIE).render().lstrip().startswith('<?xml')
+    finally:
+        pool.configure(size=2, timeout=60, max_tasks=50)
+    assert stats() == {'pooled': 1, 'fallbacks': 0, 'timeouts': 0}
+
+
+def test_dead_worker_rebuilds_the_pool(app, pool, stats):
+    with app.test_request_context('/'):
+        assert _CrashingPie(_PIE).render().lstrip().startswith('<?xml')
+        assert FacilityPie(_PIE).render().lstrip().startswith('<?xml')
+    assert stats() == {'pooled': 1, 'fallbacks': 1, 'timeouts': 0}
+
+
+def test_disabled_pool_never_starts(app):
+    render_pool.configure(size=0)
+    with app.test_request_context('/'):
+        FacilityPie(_PIE).render()
+    assert render_pool._executor is None
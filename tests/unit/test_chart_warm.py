@@ -0,0 +1,154 @@
+"""Chart warm-up (`charts/warm.py`): view counts, and replaying the top ones.
+
+A minimal Flask app stands in for the webapp: one login-protected fragment
+route that draws the facility pie through its real `chart_view` binding, so
+counting, the cache and the replay are the production ones. The Redis half
+runs on fakeredis, with two warmers standing in for two gunicorn workers.
+"""
+
+import threading
+
+import fakeredis
+import pytest
+from flask import Flask, request
+from flask_login import LoginManager, UserMixin, login_required, login_user
+
+from webapp.dashboards import charts
+from webapp.dashboards.charts.warm import ChartWarmer, chart_warmer
+
+_PIE = [{'facility': 'UNIV', 'annualized_rate': 600.0},
+        {'facility': 'WNA', 'annualized_rate': 400.0}]
+
+pie_view = charts.generate_facility_pie_chart_matplotlib
+
+
+class _User(UserMixin):
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+@pytest.fixture
+def mini_app():
+    app = Flask(__name__)
+    app.config.update(TESTING=True, SECRET_KEY='test')
+    login = LoginManager(app)
+    login.user_loader(lambda user_id: _User(user_id) if user_id == '7' else None)
+    app.data = list(_PIE)
+
+    @app.route('/frag')
+    @login_required
+    def frag():
+        return pie_view(app.data, layout=request.args.get('layout', 'desktop'),
+                        theme=request.args.get('theme', 'light'))
+
+    @app.route('/login')
+    def login_as():
+        login_user(_User('7'))
+        return 'ok'
+
+    return app
+
+
+@pytest.fixture
+def warmer(mini_app):
+    pie_view.cache_clear()
+    chart_warmer.configure(mini_app, top_n=5, delay=60, user_id='7')
+    chart_warmer._counts.clear()
+    yield chart_warmer
+    chart_warmer.configure(None)
+    pie_view.cache_clear()
+
+
+@pytest.fixture
+def client(mini_app):
+    client = mini_app.test_client()
+    client.get('/login')
+    return client
+
+
+def test_views_are_counted_per_fragment_and_axes(warmer, client):
+    for _ in range(3):
+        assert client.get('/frag?year=2026&layout=mobile').status_code == 200
+    client.get('/frag?year=2026&theme=dark')
+    top = warmer.top(5)
+    assert [(v.cache_name, v.layout, v.theme, v.url, v.count) for v in top] == [
+        ('facility_pie_chart', 'mobile', 'light', '/frag?year=2026', 3),
+        ('facility_pie_chart', 'desktop', 'dark', '/frag?year=2026', 1),
+    ]
+    assert pie_view.cache_info().hits == 2          # hits are views too
+
+
+def test_warm_renders_new_data_under_the_viewers_key(warmer, mini_app, client):
+    client.get('/frag?layout=mobile')
+    mini_app.data = [dict(row, annualized_rate=row['annualized_rate'] * 2) for row in _PIE]
+
+    report = warmer.warm(['charges'])
+    assert [(f.url, f.layout, f.status, f.error) for f in report.fragments] == [
+        ('/frag', 'mobile', 200, None)]
+    # The replay is not a view, and the viewer's next request is a hit.
+    assert warmer.top(5)[0].count == 1
+    before = pie_view.cache_info()
+    client.get('/frag?layout=mobile')
+    assert pie_view.cache_info().hits == before.hits + 1
+
+
+def test_a_trigger_warms_only_the_charts_it_changes(warmer, client):
+    client.get('/frag')
+    assert warmer.warm(['status']).fragments == []
+    assert len(warmer.warm(['status', 'purge']).fragments) == 1
+
+
+def test_replays_run_as_the_service_account_not_the_viewer(warmer, client):
+    client.get('/frag')                         # viewed as user 7
+    warmer.user_id = '8'                        # an account the loader rejects
+    (timing,) = warmer.warm(['startup']).fragments
+    assert timing.status == 401                 # so the viewer's session was not used
+
+
+def test_a_failed_replay_is_reported(warmer, client):
+    client.get('/frag')
+    warmer.user_id = None                       # anonymous
+    (timing,) = warmer.warm(['startup']).fragments
+    assert timing.status == 401 and timing.error == 'HTTP 401'
+
+
+def test_triggers_coalesce_into_one_run(warmer, monkeypatch):
+    runs, done = [], threading.Event()
+    monkeypatch.setattr(warmer, 'warm', lambda reasons: (runs.append(reasons), done.set()))
+    warmer.delay = 0.2
+    warmer.request_warm('status')
+    warmer.request_warm('charges')
+    warmer.request_warm('status')
+    assert done.wait(5)
+    assert runs == [['charges', 'status']]
+
+
+def test_off_by_default():
+    fresh = ChartWarmer()
+    fresh.request_warm('startup')
+    assert fresh._timer is None
+    assert fresh.warm().fragments == []
+
+
+def test_redis_counts_are_shared_and_one_worker_warms(mini_app, client):
+    redis = fakeredis.FakeRedis()
+    other = ChartWarmer()
+    other.configure(mini_app, top_n=5, delay=60, client=redis, user_id='7')
+    chart_warmer.configure(mini_app, top_n=5, delay=60, client=redis, user_id='7')
+    try:
+        client.get('/frag?layout=mobile')
+        client.get('/frag?layout=mobile')
+        client.get('/frag?layout=desktop')
+        (view,) = other.top(1)
+        assert (view.url, view.layout, view.count) == ('/frag', 'mobile', 2)
+        assert other.top(1, caches={'pace_chart'}) == []     # reads on, then stops
+
+        assert len(other.warm(['startup']).fragments) == 2
+        assert chart_warmer.warm(['startup']).busy      # inside the other's delay
+        assert redis.ttl('chart-warm:lease') <= 60
+
+        # The first warm halved the counts.
+        assert other.top(5)[0].count == 1
+    finally:
+        chart_warmer.configure(None)
+        pie_view.cache_clear()
@@ -0,0 +1,247 @@
+"""Tests for the collector tick pipeline (collectors/lib/base_collector.py).
+
+A fake ``ssh`` on PATH replays fixture outputs for each PBS / df / login-node
+command after an artificial latency, and charges an extra "handshake" delay
+unless the command names a ControlPath whose master already exists — the
+same cost model as real ssh multiplexing. Covers:
+
+- the concurrent, multiplexed tick posts the same payload as the
+  historical one-command-at-a-time tick, with its command groups in flight
+  together where the historical tick ran them one at a time
+- one handshake per tick when multiplexed, one per command otherwise
+- ``stage_timings`` lands in the payload and bounds the tick's critical path
+- a failing command group degrades only its own keys
+"""
+
+import importlib
+import importlib.util
+import json
+import os
+import stat
+import sys
+import textwrap
+import time
+
+import pytest
+
+# Import collectors/lib as a package under a private name: its relative
+# imports resolve, and nothing is put on sys.path (collectors/lib/config.py
+# would shadow the SAM `config` module — see test_collector_queue_parser.py).
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_LIB = os.path.join(_REPO_ROOT, "collectors", "lib")
+_PKG = "_collector_lib_under_test"
+if _PKG not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        _PKG, os.path.join(_LIB, "__init__.py"), submodule_search_locations=[_LIB])
+    sys.modules[_PKG] = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(sys.modules[_PKG])
+base_collector = importlib.import_module(f"{_PKG}.base_collector")
+NodeParser = importlib.import_module(f"{_PKG}.parsers.nodes").NodeParser
+
+LATENCY = 0.15      # per command
+HANDSHAKE = 0.25    # per new connection
+
+FIXTURES = {
+    "nodes.json": json.dumps({"nodes": {
+        f"dec{i:04d}": {
+            "state": "job-busy" if i % 3 else "free",
+            "resources_available": {"ncpus": 128, "ngpus": 0, "mem": "256gb",
+                                    "Qlist": "cpu"},
+            "resources_assigned": {"ncpus": 128 if i % 3 else 0, "mem": "200gb"},
+        } for i in range(1, 7)}}),
+    "jobs.json": json.dumps({"Jobs": {
+        "1.desched1": {"job_state": "R", "Job_Owner": "benkirk@derecho1",
+                       "Account_Name": "SCSG0001", "queue": "main",
+                       "Resource_List": {"ncpus": 256, "ngpus": 0},
+                       "exec_host": "dec0001/0*128+dec0002/0*128"},
+        "2.desched1": {"job_state": "Q", "Job_Owner": "bdobbins@derecho2",
+                       "Account_Name": "SCSG0002", "queue": "develop",
+                       "Resource_List": {"ncpus": 4}},
+    }}),
+    "queues.json": json.dumps({"Queue": {
+        "main": {"queue_type": "Execution", "enabled": "True", "started": "True",
+                 "total_jobs": 1},
+        "route": {"queue_type": "Route", "enabled": "True", "started": "True"},
+    }}),
+    "rstat.txt": "",
+    "df.txt": ("Filesystem 1TiB-blocks Used Available Use% Mounted on\n"
+               "gpfs 100TiB 40TiB 60TiB 40% /glade\n~~~\n"
+               "Filesystem Inodes IUsed IFree IUse% Mounted on\n"
+               "gpfs 1000 250 750 25% /glade\n"),
+    "login.txt": "12.80 6.40 3.20 3/900 1234\n---\n17\n---\n128\n",
+}
+
+SHIM = textwrap.dedent('''\
+    #!{python}
+    """Fake ssh: replay fixtures with latency; model ControlMaster reuse."""
+    import json, os, sys, time
+
+    args, opts = sys.argv[1:], {{}}
+    while args and args[0] == "-o":
+        key, _, value = args[1].partition("=")
+        opts[key] = value
+        args = args[2:]
+    host, cmd = args[0], " ".join(args[1:])
+    fixtures = os.environ["FAKE_SSH_FIXTURES"]
+
+    start = time.time()
+    handshake = True
+    if "ControlPath" in opts:
+        try:
+            open(opts["ControlPath"].replace("%C", host), "x").close()
+        except FileExistsError:
+            handshake = False
+    if handshake:
+        time.sleep({handshake})
+    time.sleep({latency})
+
+    fail = os.environ.get("FAKE_SSH_FAIL")
+    if fail and cmd.startswith(fail):
+        sys.stderr.write("fake ssh: command failed\\n")
+        sys.exit(1)
+
+    if cmd.startswith("ssh "):
+        out = open(os.path.join(fixtures, "login.txt")).read()
+    elif "df " in cmd:
+        block = open(os.path.join(fixtures, "df.txt")).read()
+        out = "---\\n".join([block] * (cmd.count("echo ---") + 1))
+    else:
+        name = {{"pbsnodes": "nodes.json", "qstat -f": "jobs.json",
+                 "qstat -Q": "queues.json", "pbs_rstat": "rstat.txt",
+                 "true": None}}[" ".join(cmd.split()[:2]) if cmd.startswith("qstat")
+                                else cmd.split()[0]]
+        out = open(os.path.join(fixtures, name)).read() if name else ""
+    sys.stdout.write(out)
+
+    with open(os.environ["FAKE_SSH_LOG"], "a") as log:
+        log.write(json.dumps({{"host": host, "cmd": cmd, "opts": opts,
+                              "handshake": handshake, "start": start,
+                              "end": time.time()}}) + "\\n")
+''')
+
+
+class _Collector(base_collector.BaseCollector):
+    def _collect_node_data(self, data):
+        data.update(NodeParser.parse_nodes(self.pbs.get_nodes_json(), 'derecho'))
+
+
+@pytest.fixture
+def fake_ssh(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    fixtures = tmp_path / "fixtures"
+    bin_dir.mkdir()
+    fixtures.mkdir()
+    for name, text in FIXTURES.items():
+        (fixtures / name).write_text(text)
+    shim = bin_dir / "ssh"
+    shim.write_text(SHIM.format(python=sys.executable, latency=LATENCY,
+                                handshake=HANDSHAKE))
+    shim.chmod(shim.stat().st_mode | stat.S_IEXEC)
+
+    log = tmp_path / "ssh.log"
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_SSH_FIXTURES", str(fixtures))
+    monkeypatch.setenv("FAKE_SSH_LOG", str(log))
+    monkeypatch.setenv("STATUS_API_KEY", "test-key")
+    monkeypatch.delenv("FAKE_SSH_FAIL", raising=False)
+    monkeypatch.delenv("QSTAT_STREAM", raising=False)
+
+    def run(workers, persist, control_dir=None):
+        log.write_text("")
+        monkeypatch.setenv("COLLECT_WORKERS", str(workers))
+        monkeypatch.setenv("SSH_CONTROL_PERSIST", persist)
+        monkeypatch.setenv("SSH_CONTROL_DIR", str(control_dir or tmp_path / f"cm-{workers}"))
+        start = time.perf_counter()
+        data = _Collector('derecho', json_only=True).collect()
+        elapsed = time.perf_counter() - start
+        calls = [json.loads(line) for line in log.read_text().splitlines()]
+        return data, elapsed, calls
+
+    return run
+
+
+def _comparable(data):
+    data = dict(data)
+    data.pop('timestamp')
+    data.pop('stage_timings')
+    data['login_nodes'] = sorted(data['login_nodes'], key=lambda n: n['node_name'])
+    return data
+
+
+def _peak_concurrency(calls):
+    """Most PBS / df command groups in flight at once, from each call's
+    start/end times. Login-node probes (``ssh <node> ...``) and the master
+    warm-up are left out: the probes always ran side by side."""
+    groups = [c for c in calls if not c['cmd'].startswith('ssh ') and c['cmd'] != 'true']
+    events = sorted([(c['start'], 1) for c in groups] + [(c['end'], -1) for c in groups])
+    peak = running = 0
+    for _, step in events:
+        running += step
+        peak = max(peak, running)
+    return peak
+
+
+def test_concurrent_multiplexed_tick_matches_sequential(fake_ssh):
+    seq, seq_elapsed, seq_calls = fake_ssh(workers=1, persist='no')
+    par, _, par_calls = fake_ssh(workers=6, persist='600')
+
+    assert _comparable(par) == _comparable(seq)
+    assert par['running_jobs'] == 1 and par['pending_jobs'] == 1
+    assert len(par['login_nodes']) == 8
+    assert all(n['available'] for n in par['login_nodes'])
+    assert [q['queue_name'] for q in par['queue_definitions']] == ['main', 'route']
+    assert len(par['filesystems']) == 5
+
+    # Sequential: a handshake plus latency per command group, one after
+    # another. Concurrent: one handshake, then the groups overlap — judged
+    # from the commands' own start/end times, not the wall clock, which a
+    # loaded CI runner stretches.
+    assert seq_elapsed > 5 * (HANDSHAKE + LATENCY)
+    assert _peak_concurrency(seq_calls) == 1
+    assert _peak_concurrency(par_calls) >= 3
+    assert len(par_calls) == len(seq_calls) + 1      # + the master warm-up
+
+
+def test_one_handshake_per_tick_when_multiplexed(fake_ssh, tmp_path):
+    control_dir = tmp_path / "control"
+    _, _, calls = fake_ssh(workers=6, persist='600', control_dir=control_dir)
+    assert calls[0]['cmd'] == 'true'
+    assert [c['handshake'] for c in calls] == [True] + [False] * (len(calls) - 1)
+    for c in calls:
+        assert c['opts']['ControlMaster'] == 'auto'
+        assert c['opts']['ControlPersist'] == '600'
+        assert c['opts']['ControlPath'] == str(control_dir / '%C')
+    assert stat.S_IMODE(control_dir.stat().st_mode) == 0o700
+
+    # The master outlives the run: the next tick pays no handshake at all.
+    _, _, calls = fake_ssh(workers=6, persist='600', control_dir=control_dir)
+    assert not any(c['handshake'] for c in calls)
+
+
+def test_multiplexing_off(fake_ssh):
+    data, _, calls = fake_ssh(workers=6, persist='no')
+    assert 'ssh_master' not in data['stage_timings']
+    assert all(c['handshake'] for c in calls)
+    assert not any('ControlMaster' in c['opts'] for c in calls)
+
+
+def test_stage_timings(fake_ssh):
+    data, elapsed, _ = fake_ssh(workers=6, persist='600')
+    timings = data['stage_timings']
+    stages = [name for name, _ in base_collector.BaseCollector.STAGES]
+    assert list(timings) == ['ssh_master', *stages, 'total']
+    for name in stages:
+        assert LATENCY <= timings[name] < timings['total']
+    assert timings['ssh_master'] >= HANDSHAKE
+    # The tick is the warm-up plus its slowest stage, not the sum.
+    critical = timings['ssh_master'] + max(timings[s] for s in stages)
+    assert critical <= timings['total'] + 0.01 < sum(timings[s] for s in stages)
+    assert timings['total'] <= elapsed
+
+
+def test_failing_group_degrades_only_its_keys(fake_ssh, monkeypatch):
+    monkeypatch.setenv("FAKE_SSH_FAIL", "qstat -Q")
+    data, _, _ = fake_ssh(workers=6, persist='600')
+    assert data['queue_definitions'] == []
+    assert data['running_jobs'] == 1
+    assert len(data['queues']) == 2
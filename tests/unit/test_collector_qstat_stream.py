@@ -0,0 +1,99 @@
+"""Tests for collectors/lib/parsers/qstat_stream.py.
+
+The incremental parser must yield exactly what
+``json.loads(doc)['Jobs'].items()`` would, whatever the chunk boundaries,
+and fail on input ``json.loads`` would reject.
+"""
+
+import importlib.util
+import io
+import json
+import os
+
+import pytest
+
+# Loaded via importlib for the same reason as test_collector_queue_parser.py:
+# collectors/lib on sys.path would shadow the SAM `config` module.
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PATH = os.path.join(_REPO_ROOT, "collectors", "lib", "parsers", "qstat_stream.py")
+_spec = importlib.util.spec_from_file_location("_collector_qstat_stream_under_test", _PATH)
+_mod = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_mod)
+iter_qstat_jobs = _mod.iter_qstat_jobs
+iter_json_object_items = _mod.iter_json_object_items
+
+
+DOC = {
+    "timestamp": 1760000000,
+    "pbs_version": "2022.1.1",
+    "pbs_server": "desched1",
+    "Jobs": {
+        "1001.desched1": {
+            "Job_Name": "wrf \"run\" \\ 1",
+            "Job_Owner": "benkirk@derecho1",
+            "job_state": "R",
+            "queue": "main",
+            "Resource_List": {"ncpus": 128, "ngpus": 0, "walltime": "12:00:00"},
+            "exec_host": "dec0001/0*128",
+            "Variable_List": {"PBS_O_HOME": "/glade/u/home/benkirk", "LANG": "en_US.UTF-8"},
+            "comment": "Job run at Thu Oct 16 at 09:00 on (dec0001:ncpus=128) ✓",
+        },
+        "1002[].desched1": {
+            "Job_Owner": "bdobbins@derecho2",
+            "job_state": "Q",
+            "queue": "develop",
+            "Resource_List": {"ncpus": 4, "mem": "10gb"},
+            "array_indices_remaining": "1-9999",
+            "Priority": -1.5e3,
+            "Rerunable": True,
+            "Exit_status": None,
+        },
+    },
+    "trailing": [1, 2, {"x": "}"}],
+}
+
+
+def _items(text, chunk_size):
+    return list(iter_qstat_jobs(io.StringIO(text), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 1 << 20])
+@pytest.mark.parametrize("indent", [None, 4])
+def test_matches_json_loads(chunk_size, indent):
+    text = json.dumps(DOC, indent=indent, ensure_ascii=False)
+    assert _items(text, chunk_size) == list(json.loads(text)["Jobs"].items())
+
+
+def test_number_split_across_chunks():
+    text = '{"n": 1234567, "Jobs": {"a": 98765}, "m": 42}'
+    for size in range(1, len(text) + 1):
+        assert _items(text, size) == [("a", 98765)]
+
+
+@pytest.mark.parametrize("text", ['{}', '{"Jobs": {}}', '{"timestamp": 1}', ' \n{ "Jobs" : { } }\n'])
+def test_no_jobs(text):
+    assert _items(text, 3) == []
+
+
+def test_other_key():
+    text = json.dumps({"Queue": {"main": {"enabled": "True"}}, "Jobs": {"x": {}}})
+    assert list(iter_json_object_items(io.StringIO(text), "Queue", 5)) == [
+        ("main", {"enabled": "True"})]
+
+
+@pytest.mark.parametrize("text", [
+    json.dumps(DOC)[:-40],                          # truncated mid-document
+    '{"Jobs": {"a": {"x": 1} "b": {}}}',            # missing comma
+    '{"Jobs": {"a": {}}} junk',                     # trailing data
+    '',
+])
+def test_malformed_raises_like_json_loads(text):
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(text)
+    with pytest.raises(json.JSONDecodeError):
+        _items(text, 8)
+
+
+def test_document_must_be_an_object():
+    with pytest.raises(json.JSONDecodeError):
+        _items('[{"Jobs": {}}]', 8)
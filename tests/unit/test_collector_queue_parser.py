@@ -3,10 +3,12 @@
 Covers both ``parse_queues`` (queue-grain rollup) and the new
 ``parse_user_project_queues`` (user/project/queue grain) — focusing on
 the new path's user + Account_Name extraction, sentinel handling, and
-counter aggregation.
+counter aggregation — and that the single-pass ``aggregate_jobs``
+reproduces them and ``JobParser.parse_jobs`` exactly.
 """
 
 import importlib.util
+import json
 import os
 
 import pytest
@@ -22,6 +24,12 @@ _mod = importlib.util.module_from_spec(_spec)
 _spec.loader.exec_module(_mod)
 QueueParser = _mod.QueueParser
 
+_JOBS_PATH = os.path.join(_REPO_ROOT, "collectors", "lib", "parsers", "jobs.py")
+_jspec = importlib.util.spec_from_file_location("_collector_jobs_under_test", _JOBS_PATH)
+_jmod = importlib.util.module_from_spec(_jspec)
+_jspec.loader.exec_module(_jmod)
+JobParser = _jmod.JobParser
+
 
 def _make_job(state, owner, account, queue, ncpus=0, ngpus=0, exec_host=None):
     """Build a single ``Jobs`` entry as it appears in qstat -f -F json."""
@@ -130,6 +138,44 @@ class TestParseUserProjectQueues:
         assert sum(r["cores_pending"] for r in per_user) == q["cores_pending"]
 
 
+class TestAggregateJobs:
+    """``aggregate_jobs`` is a drop-in for the three per-document parsers."""
+
+    @staticmethod
+    def _three_pass(qstat):
+        return {
+            "job_stats": JobParser.parse_jobs(qstat),
+            "queues": QueueParser.parse_queues(qstat),
+            "user_project_queues": QueueParser.parse_user_project_queues(qstat),
+        }
+
+    def _assert_identical(self, qstat):
+        single = QueueParser.aggregate_jobs(qstat.get("Jobs", {}).items())
+        assert json.dumps(single) == json.dumps(self._three_pass(qstat))
+
+    def test_matches_three_pass_parsers(self):
+        self._assert_identical(_qstat([
+            _make_job("R", "benkirk@d", "SCSG0001", "main", ncpus=64, exec_host="dn1/0+dn2/0*64"),
+            _make_job("R", "benkirk@d", "SCSG0001", "main", ncpus=128, ngpus=4, exec_host="dn2/1"),
+            _make_job("Q", "bdobbins@d", None, "develop", ncpus=32),
+            _make_job("H", "bdobbins@d", "  ", "main", ncpus=16, ngpus=1),
+            _make_job("E", "other@d", "P2", "preempt", ncpus=8),
+            _make_job("R", "", "SCSG0001", "main", ncpus=8, exec_host="dn9/0"),
+            _make_job("R", "nohost", "P2", "develop", ncpus=1),
+            _make_job("R", "x@d", "P2", "develop", ncpus=2, exec_host="+dn3/0"),
+        ]))
+
+    def test_queue_without_attributable_jobs(self):
+        """Ownerless jobs still create their queue row, but no user rows."""
+        self._assert_identical(_qstat([
+            _make_job("Q", "", "P1", "lonely", ncpus=4),
+        ]))
+
+    def test_no_jobs(self):
+        self._assert_identical({})
+        self._assert_identical({"Jobs": {}})
+
+
 class TestParseQueueDefinitions:
     """qstat -Q -f -F json roster parsing — the source of the 'PBS still
     defines this queue' signal, which covers routing queues that never
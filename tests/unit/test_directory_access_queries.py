@@ -17,6 +17,7 @@ from sam import (
 )
 from sam.core.groups import DEFAULT_COMMON_GROUP, DEFAULT_COMMON_GROUP_GID
 from sam.queries.directory_access import (
+    build_directory_access_delta,
     build_directory_access_response,
     group_populator,
     user_populator,
@@ -441,3 +442,52 @@ class TestBuildDirectoryAccessResponse:
 
     def test_empty_inputs_return_empty_directories(self):
         assert build_directory_access_response({}, {}) == {'accessBranchDirectories': []}
+
+
+# ============================================================================
+# build_directory_access_delta()
+# ============================================================================
+
+
+def _directory(groups, accounts):
+    return build_directory_access_response(
+        {'hpc': {'groups': groups}},
+        {'hpc': {'accounts': {
+            u: {'uid': uid, 'gid': 1000, 'home_directory': f'/home/{u}',
+                'login_shell': shell, 'name': u, 'upid': uid, 'gecos': u}
+            for u, (uid, shell) in accounts.items()}}},
+    )
+
+
+class TestBuildDirectoryAccessDelta:
+
+    def test_identical_documents_have_no_changes(self):
+        doc = _directory({'ncar': {'gid': 1000, 'usernames': {'a'}}}, {'a': (1, '/bin/bash')})
+        assert build_directory_access_delta(doc, doc) == {'accessBranchDirectories': []}
+
+    def test_added_changed_removed(self):
+        old = _directory({'ncar': {'gid': 1000, 'usernames': {'a', 'b'}},
+                          'gone': {'gid': 2000, 'usernames': {'a'}}},
+                         {'a': (1, '/bin/bash'), 'b': (2, '/bin/bash')})
+        new = _directory({'ncar': {'gid': 1000, 'usernames': {'a', 'c'}},
+                          'fresh': {'gid': 3000, 'usernames': {'c'}}},
+                         {'a': (1, '/bin/tcsh'), 'c': (3, '/bin/bash')})
+        [branch] = build_directory_access_delta(old, new)['accessBranchDirectories']
+
+        assert branch['accessBranchName'] == 'hpc'
+        groups, accounts = branch['unixGroups'], branch['unixAccounts']
+        assert [g['groupName'] for g in groups['added']] == ['fresh']
+        assert [g['groupName'] for g in groups['changed']] == ['ncar']
+        assert groups['changed'][0]['usernames'] == ['a', 'c']
+        assert groups['removed'] == ['gone']
+        assert [a['username'] for a in accounts['added']] == ['c']
+        assert [(a['username'], a['loginShell']) for a in accounts['changed']] == \
+            [('a', '/bin/tcsh')]
+        assert accounts['removed'] == ['b']
+
+    def test_removed_branch_lists_everything_removed(self):
+        old = _directory({'ncar': {'gid': 1000, 'usernames': {'a'}}}, {'a': (1, '/bin/bash')})
+        new = {'accessBranchDirectories': []}
+        [branch] = build_directory_access_delta(old, new)['accessBranchDirectories']
+        assert branch['unixGroups']['removed'] == ['ncar']
+        assert branch['unixAccounts']['removed'] == ['a']
@@ -25,7 +25,12 @@ from datetime import datetime
 import pytest
 from sqlalchemy.orm import sessionmaker
 
-from sam.queries.fstree_access import get_fstree_data, get_project_fsdata, get_user_fsdata
+from sam.queries.fstree_access import (
+    build_fsdata_delta,
+    get_fstree_data,
+    get_project_fsdata,
+    get_user_fsdata,
+)
 
 
 pytestmark = pytest.mark.unit
@@ -719,3 +724,24 @@ class TestFacilityResourceOverride:
         assert restored == expected
 
         session.rollback()
+
+
+class TestBuildFsdataDelta:
+    """build_fsdata_delta() — pure, over hand-built keyed views."""
+
+    def test_project_view(self):
+        old = {'name': 'projectFairShareData',
+               'projects': {'A': {'active': True}, 'B': {'active': True}}}
+        new = {'name': 'projectFairShareData',
+               'projects': {'A': {'active': False}, 'C': {'active': True}}}
+        assert build_fsdata_delta(old, new) == {
+            'name': 'projectFairShareData',
+            'projects': {'added': {'C': {'active': True}},
+                         'changed': {'A': {'active': False}},
+                         'removed': ['B']},
+        }
+
+    def test_user_view_unchanged(self):
+        doc = {'name': 'userFairShareData', 'users': {'u': {'uid': 1, 'projects': {}}}}
+        assert build_fsdata_delta(doc, doc)['users'] == \
+            {'added': {}, 'changed': {}, 'removed': []}
@@ -30,6 +30,7 @@ from sam.manage.summaries import (
     _resolve_project,
     _resolve_resource,
     _resolve_user,
+    bulk_upsert_comp_charge_summaries,
     upsert_archive_charge_summary,
     upsert_comp_charge_summary,
     upsert_disk_charge_summary,
@@ -381,6 +382,163 @@ class TestUpsertCompChargeSummary:
         assert record.queue_id is not None
 
 
+# ---------------------------------------------------------------------------
+# bulk_upsert_comp_charge_summaries
+# ---------------------------------------------------------------------------
+
+
+def _comp_rows(graph, n_days=3):
+    """One row per day for the graph's user/project — distinct natural keys."""
+    base = graph["kwargs"]
+    return [
+        dict(base, activity_date=date(2098, 7, 1 + i), num_jobs=i + 1, charges=10.0 * (i + 1))
+        for i in range(n_days)
+    ]
+
+
+def _summary_state(session, activity_dates):
+    """Comparable projection of comp_charge_summary rows for parity checks."""
+    session.expire_all()
+    return sorted(
+        (c.activity_date, c.act_username, c.act_projcode, c.machine, c.queue,
+         c.resource, c.username, c.projcode, c.unix_uid, c.user_id,
+         c.account_id, c.machine_id, c.queue_id, c.facility_name,
+         c.num_jobs, c.core_hours, c.charges, c.cos)
+        for c in session.query(CompChargeSummary).filter(
+            CompChargeSummary.activity_date.in_(activity_dates)
+        )
+    )
+
+
+class TestBulkUpsertCompChargeSummaries:
+
+    def test_insert_new(self, session):
+        graph = _build_comp_graph(session)
+        rows = _comp_rows(graph)
+        result = bulk_upsert_comp_charge_summaries(session, rows)
+        assert result.actions == ["created"] * 3
+        assert (result.n_created, result.n_updated, result.n_errors) == (3, 0, 0)
+
+        stored = session.query(CompChargeSummary).filter(
+            CompChargeSummary.act_username == graph["user"].username
+        ).all()
+        assert len(stored) == 3
+        assert {r.machine_id for r in stored} == {graph["machine"].machine_id}
+        assert {r.act_unix_uid for r in stored} == {graph["user"].unix_uid}
+
+    def test_update_existing(self, session):
+        graph = _build_comp_graph(session)
+        rows = _comp_rows(graph)
+        bulk_upsert_comp_charge_summaries(session, rows)
+
+        updated = [dict(r, charges=555.55, cos=3) for r in rows]
+        result = bulk_upsert_comp_charge_summaries(session, updated)
+        assert result.actions == ["updated"] * 3
+        state = _summary_state(session, [r["activity_date"] for r in rows])
+        assert len(state) == 3
+        assert {s[16] for s in state} == {555.55}
+        assert {s[17] for s in state} == {3}
+
+    def test_duplicate_key_within_chunk_last_wins(self, session):
+        graph = _build_comp_graph(session)
+        first = dict(graph["kwargs"], charges=1.0)
+        second = dict(graph["kwargs"], charges=2.0)
+        result = bulk_upsert_comp_charge_summaries(session, [first, second])
+        assert result.actions == ["created", "updated"]
+        stored = session.query(CompChargeSummary).filter(
+            CompChargeSummary.act_username == graph["user"].username
+        ).all()
+        assert len(stored) == 1
+        assert stored[0].charges == 2.0
+
+    def test_case_variant_keys_within_chunk_are_one_row(self, session):
+        """'Bob' then 'BOB' is one row, as on the row path: the first
+        spelling of the key columns, the last row's figures."""
+        graph = _build_comp_graph(session)
+        first = dict(graph["kwargs"], charges=1.0)
+        second = dict(graph["kwargs"], charges=2.0,
+                      act_username=graph["user"].username.upper())
+        result = bulk_upsert_comp_charge_summaries(session, [first, second])
+        assert result.actions == ["created", "updated"]
+        assert (result.n_created, result.n_updated) == (1, 1)
+        session.expire_all()
+        stored = session.query(CompChargeSummary).filter(
+            CompChargeSummary.user_id == graph["user"].user_id
+        ).all()
+        assert len(stored) == 1
+        assert stored[0].act_username == graph["user"].username
+        assert stored[0].charges == 2.0
+
+    def test_parity_with_row_path(self, session):
+        """Same input through both paths → same actions and same stored rows."""
+        graph_a = _build_comp_graph(session)
+        graph_b = _build_comp_graph(session)
+        rows_a = _comp_rows(graph_a)
+        rows_b = [
+            dict(r, act_username=graph_b["user"].username,
+                 act_projcode=graph_b["project"].projcode,
+                 act_unix_uid=graph_b["user"].unix_uid,
+                 resource_name=graph_b["resource"].resource_name,
+                 queue_name=graph_b["queue"].queue_name)
+            for r in rows_a
+        ]
+        # Second pass re-posts day 0 (update) on top of the first pass.
+        seq_actions = [upsert_comp_charge_summary(session, **r)[1]
+                       for r in rows_a + rows_a[:1]]
+        bulk_actions = (bulk_upsert_comp_charge_summaries(session, rows_b).actions
+                        + bulk_upsert_comp_charge_summaries(session, rows_b[:1]).actions)
+        assert seq_actions == bulk_actions
+
+        def _normalize(state, graph):
+            # Strip the per-graph identity columns; everything else must match.
+            return [s[:1] + s[14:] for s in state
+                    if s[1] == graph["user"].username]
+
+        dates = [r["activity_date"] for r in rows_a]
+        state = _summary_state(session, dates)
+        assert _normalize(state, graph_a) == _normalize(state, graph_b)
+
+    def test_skip_errors_collects_messages(self, session):
+        graph = _build_comp_graph(session)
+        good = graph["kwargs"]
+        bad_user = dict(good, act_username="nobody_xyz", act_unix_uid=999_999_999)
+        bad_project = dict(good, act_projcode="ZZZZ9999")
+        result = bulk_upsert_comp_charge_summaries(
+            session, [bad_user, good, bad_project], skip_errors=True,
+        )
+        assert result.actions == [None, "created", None]
+        assert [i for i, _ in result.errors] == [0, 2]
+        assert "User" in result.errors[0][1]
+        assert "Project" in result.errors[1][1]
+
+    def test_error_raises_before_any_write(self, session):
+        graph = _build_comp_graph(session)
+        bad = dict(graph["kwargs"], queue_name="fake_queue_xyz",
+                   activity_date=date(2098, 7, 9))
+        with pytest.raises(ValueError, match="create_queue_if_missing"):
+            bulk_upsert_comp_charge_summaries(session, [graph["kwargs"], bad])
+        assert session.query(CompChargeSummary).filter(
+            CompChargeSummary.act_username == graph["user"].username
+        ).count() == 0
+
+    def test_create_queue_if_missing_creates_once(self, session):
+        graph = _build_comp_graph(session)
+        new_queue_name = next_seq("autoq")
+        rows = [dict(r, queue_name=new_queue_name) for r in _comp_rows(graph)]
+        result = bulk_upsert_comp_charge_summaries(
+            session, rows, create_queue_if_missing=True,
+        )
+        assert result.n_created == 3
+        queues = session.query(Queue).filter_by(
+            queue_name=new_queue_name, resource_id=graph["resource"].resource_id
+        ).all()
+        assert len(queues) == 1
+
+    def test_empty_chunk(self, session):
+        result = bulk_upsert_comp_charge_summaries(session, [])
+        assert result.actions == [] and result.errors == []
+
+
 # ---------------------------------------------------------------------------
 # upsert_disk/archive_charge_summary (parametrized)
 # ---------------------------------------------------------------------------
@@ -0,0 +1,282 @@
+"""Unit tests for ``webapp.api.snapshots`` (provisioning API snapshots).
+
+A bare Flask app with a counting builder stands in for the populators, so
+these run without the database.
+
+Covers:
+- a snapshot is built once and served with ETag / X-Snapshot-Version
+- a current If-None-Match gets a 304
+- invalidation keeps serving the old snapshot while a rebuild runs
+- the version moves only when the content changes
+- item ETags, and 404 documents
+- a commit that writes a source table invalidates
+- ``?since=<ETag>`` deltas against retained bodies, and the full fallback
+  (including after a purge restarts the version count)
+"""
+
+import time
+from concurrent.futures import wait
+
+import pytest
+from flask import Flask, abort, request
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from webapp.api import snapshots
+from webapp.api.snapshots import (
+    delta_response,
+    get_snapshot,
+    invalidate_snapshots,
+    snapshot_response,
+)
+
+
+pytestmark = pytest.mark.unit
+
+
+def _clear_snapshot_state():
+    """Let background rebuilds land, then drop every snapshot, stamp and
+    parsed body — all of it module state in ``webapp.api.snapshots``."""
+    wait(list(snapshots._CACHE._inflight.values()), timeout=5)
+    snapshots._CACHE.reset_for_tests()
+    with snapshots._PARSED_LOCK:
+        snapshots._PARSED.clear()
+
+
+@pytest.fixture(autouse=True)
+def _isolated_snapshots(monkeypatch):
+    """Each test starts and ends with no snapshot state, whatever ran before
+    it in this worker. CACHE_REDIS_URL is dropped so the cache is the
+    in-process one: a shared Redis would carry stamps across xdist workers.
+    """
+    monkeypatch.delenv('CACHE_REDIS_URL', raising=False)
+    _clear_snapshot_state()
+    yield
+    _clear_snapshot_state()
+
+
+class _Source:
+    def __init__(self):
+        self.data = {'groups': ['a', 'b']}
+        self.builds = 0
+
+    def __call__(self):
+        self.builds += 1
+        return dict(self.data)
+
+
+@pytest.fixture
+def source():
+    return _Source()
+
+
+@pytest.fixture
+def client(source):
+    app = Flask(__name__)
+    app.config.update(PROVISIONING_SNAPSHOT_TTL=3600, PROVISIONING_SNAPSHOT_SIZE=16,
+                      PROVISIONING_SNAPSHOT_SOFT_TTL=0, PROVISIONING_SNAPSHOT_HISTORY=2)
+
+    @app.route('/doc')
+    @app.route('/doc/<param>')
+    def doc(param=None):
+        snapshot = get_snapshot('directory_access', param, source,
+                                found=lambda d: param != 'missing')
+        if not snapshot.found:
+            abort(404)
+        return snapshot_response(snapshot)
+
+    @app.route('/item/<name>')
+    def item(name):
+        def select(data):
+            if name not in data['groups']:
+                abort(404)
+            return {name: True}
+        return snapshot_response(get_snapshot('directory_access', None, source),
+                                 item=name, select=select)
+
+    @app.route('/delta')
+    def delta():
+        def changes(old, new):
+            return {'added': sorted(set(new['groups']) - set(old['groups'])),
+                    'removed': sorted(set(old['groups']) - set(new['groups']))}
+        return delta_response('directory_access', None,
+                              get_snapshot('directory_access', None, source),
+                              request.args.get('since'), changes)
+
+    with app.app_context():
+        snapshots._CACHE.reset_for_tests(disabled=False)
+        yield app.test_client()
+        snapshots._CACHE.reset_for_tests()
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, 'background rebuild did not land'
+        time.sleep(0.01)
+
+
+class TestServing:
+
+    def test_built_once(self, client, source):
+        first = client.get('/doc')
+        second = client.get('/doc')
+        assert source.builds == 1
+        assert first.get_json() == {'groups': ['a', 'b']}
+        assert first.headers['ETag'] == second.headers['ETag']
+        assert first.headers['X-Snapshot-Version'] == '1'
+
+    def test_not_modified(self, client):
+        etag = client.get('/doc').headers['ETag']
+        response = client.get('/doc', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+
+    def test_missing_document(self, client):
+        assert client.get('/doc/missing').status_code == 404
+        assert client.get('/doc/hpc').status_code == 200
+
+    def test_items(self, client):
+        document = client.get('/doc').headers['ETag']
+        item = client.get('/item/a')
+        assert item.get_json() == {'a': True}
+        assert item.headers['ETag'] != document
+        assert client.get('/item/a', headers={'If-None-Match': item.headers['ETag']}) \
+            .status_code == 304
+        assert client.get('/item/zzz').status_code == 404
+
+
+class TestInvalidation:
+
+    def test_old_snapshot_served_while_rebuilding(self, client, source):
+        first = client.get('/doc')
+        source.data = {'groups': ['a', 'b', 'c']}
+        invalidate_snapshots('directory_access')
+
+        # Served straight from the old snapshot; the rebuild runs behind it.
+        stale = client.get('/doc')
+        assert stale.headers['ETag'] == first.headers['ETag']
+        _wait_for(lambda: client.get('/doc').headers['X-Snapshot-Version'] == '2')
+
+        fresh = client.get('/doc')
+        assert fresh.get_json() == {'groups': ['a', 'b', 'c']}
+        assert client.get('/doc', headers={'If-None-Match': first.headers['ETag']}) \
+            .status_code == 200
+
+    def test_unchanged_content_keeps_version(self, client, source):
+        etag = client.get('/doc').headers['ETag']
+        invalidate_snapshots()
+        client.get('/doc')
+        _wait_for(lambda: source.builds == 2)
+        _wait_for(lambda: not snapshots._CACHE._inflight)
+
+        response = client.get('/doc', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['X-Snapshot-Version'] == '1'
+
+    def test_other_documents_untouched(self, client, source):
+        client.get('/doc')
+        invalidate_snapshots('fstree')
+        client.get('/doc')
+        assert source.builds == 1
+
+    def test_commit_to_source_table(self, client, source):
+        Base = declarative_base()
+
+        class Project(Base):
+            __tablename__ = 'project'
+            project_id = Column(Integer, primary_key=True)
+            projcode = Column(String(30))
+
+        class Other(Base):
+            __tablename__ = 'unrelated'
+            other_id = Column(Integer, primary_key=True)
+
+        engine = create_engine('sqlite://')
+        Base.metadata.create_all(engine)
+        client.get('/doc')
+
+        with Session(engine) as session:
+            session.add(Other())
+            session.commit()
+        client.get('/doc')
+        assert source.builds == 1
+
+        with Session(engine) as session:
+            session.add(Project(projcode='SCSG0001'))
+            session.flush()
+            session.rollback()
+        client.get('/doc')
+        assert source.builds == 1
+
+        with Session(engine) as session:
+            session.add(Project(projcode='SCSG0001'))
+            session.commit()
+        client.get('/doc')
+        _wait_for(lambda: source.builds == 2)
+
+
+class TestDeltas:
+
+    def _publish(self, client, source, groups):
+        """Change the source, wait until the rebuilt snapshot is served; its ETag."""
+        etag = client.get('/doc').headers['ETag']
+        source.data = {'groups': groups}
+        invalidate_snapshots()
+        client.get('/doc')
+        _wait_for(lambda: client.get('/doc').headers['ETag'] != etag)
+        return client.get('/doc').headers['ETag']
+
+    def test_changes_since_etag(self, client, source):
+        first = client.get('/doc').headers['ETag']
+        second = self._publish(client, source, ['a', 'b', 'c'])
+        third = self._publish(client, source, ['b', 'c', 'd'])
+        bare = third.strip('"')
+
+        response = client.get(f'/delta?since={first}')
+        assert response.headers['X-Snapshot-Delta'] == 'delta'
+        assert response.get_json() == {'since': first.strip('"'), 'etag': bare,
+                                       'version': 3, 'added': ['c', 'd'],
+                                       'removed': ['a']}
+        assert client.get(f'/delta?since={second}').get_json()['added'] == ['d']
+        assert client.get(f'/delta?since={bare}').get_json() == \
+            {'since': bare, 'etag': bare, 'version': 3, 'added': [], 'removed': []}
+
+        etag = response.headers['ETag']
+        assert client.get(f'/delta?since={first}', headers={'If-None-Match': etag}) \
+            .status_code == 304
+
+    def test_aged_out_base_gets_full_document(self, client, source):
+        first = client.get('/doc').headers['ETag']
+        second = self._publish(client, source, ['x'])
+        for groups in (['y'], ['z']):
+            self._publish(client, source, groups)
+
+        # History 2: the ['x'] and ['y'] bodies are kept, the first has aged out.
+        assert client.get(f'/delta?since={second}').headers['X-Snapshot-Delta'] == 'delta'
+        for since in (first, '1', '9', 'junk', ''):
+            response = client.get(f'/delta?since={since}')
+            assert response.headers['X-Snapshot-Delta'] == 'full'
+            assert response.get_json() == {'groups': ['z']}
+
+    def test_purge_never_answers_an_old_base_wrongly(self, client, source):
+        first = client.get('/doc').headers['ETag']
+        self._publish(client, source, ['a', 'b', 'c'])
+        assert client.get('/doc').headers['X-Snapshot-Version'] == '2'
+
+        snapshots.purge_snapshots()
+        source.data = {'groups': ['q']}
+        rebuilt = client.get('/doc')
+        # The count restarted: "version 1" now names different content.
+        assert rebuilt.headers['X-Snapshot-Version'] == '1'
+        for since in ('1', first):
+            response = client.get(f'/delta?since={since}')
+            assert response.headers['X-Snapshot-Delta'] == 'full'
+            assert response.get_json() == {'groups': ['q']}
+
+        # A new history builds up under ETags, not the restarted count.
+        second = self._publish(client, source, ['q', 'r'])
+        assert client.get(f'/delta?since={rebuilt.headers["ETag"]}').get_json() == \
+            {'since': rebuilt.headers['ETag'].strip('"'), 'etag': second.strip('"'),
+             'version': 2, 'added': ['r'], 'removed': []}
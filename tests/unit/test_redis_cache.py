@@ -87,10 +87,65 @@ class TestRedisTTLAdapter:
         assert info['currsize'] == 2
         assert info['maxsize'] == 200
         assert info['ttl'] == 60.0
-        assert info['hits'] is None
-        assert info['misses'] is None
+        assert info['hits'] == 0
+        assert info['misses'] == 0
+        assert info['bytes_approx'] > 0
         assert info['extras']['backend'] == 'redis'
 
+    def test_get_counts_hits_and_misses(self, redis_client):
+        adapter = RedisTTLAdapter(name='usage', client=redis_client, ttl=60)
+        adapter[('a',)] = 1
+        assert adapter.get(('a',)) == 1
+        assert adapter[('a',)] == 1
+        assert adapter.get(('absent',), 'dflt') == 'dflt'
+        assert ('a',) in adapter            # EXISTS probes are not counted
+        info = adapter.info()
+        assert (info['hits'], info['misses']) == (2, 1)
+
+    def test_counters_are_shared_across_workers(self, redis_client):
+        """Two adapter instances on one prefix = two gunicorn workers."""
+        w1 = RedisTTLAdapter(name='usage', client=redis_client, ttl=60)
+        w2 = RedisTTLAdapter(name='usage', client=redis_client, ttl=60)
+        w1[('a',)] = 1
+        w2.get(('a',))
+        w2.get(('b',))
+        assert (w1.info()['hits'], w1.info()['misses']) == (1, 1)
+
+    def test_info_does_not_scan(self, redis_client, monkeypatch):
+        adapter = RedisTTLAdapter(name='usage', client=redis_client, ttl=60)
+        adapter[('a',)] = 1
+
+        def _no_scan(*a, **kw):
+            raise AssertionError('info() must not SCAN')
+        monkeypatch.setattr(redis_client, 'scan_iter', _no_scan)
+        assert adapter.info()['currsize'] == 1
+
+    def test_currsize_drops_expired_entries(self, redis_client):
+        adapter = RedisTTLAdapter(name='usage', client=redis_client, ttl=1)
+        adapter[('a',)] = 1
+        assert adapter.info()['currsize'] == 1
+        time.sleep(1.1)
+        assert adapter.info()['currsize'] == 0
+
+    def test_renew_lease_extends_only_our_own_lease(self, redis_client):
+        adapter = RedisTTLAdapter(name='usage', client=redis_client, ttl=60)
+        token = adapter.acquire_lease(('a',), 1)
+        assert adapter.renew_lease(('a',), token, 60)
+        assert redis_client.pttl(adapter._lease_key(('a',))) > 1000
+        assert not adapter.renew_lease(('a',), 'not-ours', 60)
+        adapter.release_lease(('a',), token)
+        assert not adapter.renew_lease(('a',), token, 60)   # lapsed: not re-taken
+        assert not adapter.lease_held(('a',))
+
+    def test_clear_resets_counters_and_skips_bookkeeping_in_count(self, redis_client):
+        adapter = RedisTTLAdapter(name='usage', client=redis_client, ttl=60)
+        adapter[('a',)] = 1
+        adapter.get(('a',))
+        adapter.acquire_lease(('a',), 10)
+        assert adapter.clear() == 1
+        info = adapter.info()
+        assert (info['currsize'], info['hits'], info['misses']) == (0, 0, 0)
+
     def test_clear_removes_all_entries(self, redis_client):
         adapter = RedisTTLAdapter(name='usage', client=redis_client, ttl=60)
         adapter[('a',)] = 1
@@ -303,7 +358,8 @@ class TestUsageCacheBackendSwitch:
             assert adapter.info()['extras']['prefix'] == 'allocation_usage:'
             # Verify it actually uses the fake client.
             adapter[('k',)] = 'v'
+            # Entry key = prefix + codec tag byte + pickled key.
             assert client.exists(
-                b'allocation_usage:' + __import__('pickle').dumps(('k',), protocol=4))
+                b'allocation_usage:\xa7' + __import__('pickle').dumps(('k',), protocol=4))
         finally:
             uc._CACHE.reset_for_tests(disabled=False)
@@ -0,0 +1,304 @@
+"""Unit tests for ``sam.search`` (in-process autocomplete index).
+
+Runs against a throwaway SQLite database rather than the snapshot, since
+the index is process-wide state built from whole tables.
+
+Covers:
+- ``NgramIndex`` returns exactly the rows SQL ``LIKE`` does
+- ranking: exact > prefix > word prefix > substring, then the sort key
+- ``search_users_by_pattern`` / ``Project`` / ``Contract`` searches through
+  the index match their SQL path
+- in-process writes are visible to the next search; rollbacks are undone
+- rows changed elsewhere are picked up from ``modified_time``
+- a second worker starts from the Redis snapshot
+- a rebuild in one thread does not hold up searches in another
+"""
+
+import random
+import threading
+from datetime import datetime, timedelta
+
+import fakeredis
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+from sam.base import Base
+from sam.core.users import EmailAddress, User
+from sam.projects.contracts import Contract
+from sam.projects.projects import Project
+from sam.queries.users import search_users_by_pattern
+from sam.search import NgramIndex, SearchIndex, search_index
+
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sam.db'}")
+    for table in Base.metadata.sorted_tables:
+        try:
+            table.create(engine)
+        except Exception:
+            pass            # a few MySQL-only tables the searched models never load
+    search_index.configure(enabled=True, refresh_interval=0, rebuild_interval=3600)
+    yield engine
+    search_index.configure(enabled=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def statements(sqlite_engine):
+    seen = []
+    event.listen(sqlite_engine, 'before_cursor_execute',
+                 lambda conn, cursor, stmt, *a: seen.append(stmt))
+    return seen
+
+
+def _user(session, username, first, last, *emails, active=True):
+    user = User(username=username, unix_uid=random.randint(1000, 10 ** 6),
+                first_name=first, last_name=last, active=active)
+    session.add(user)
+    session.flush()
+    for i, address in enumerate(emails):
+        session.add(EmailAddress(user_id=user.user_id, email_address=address,
+                                 is_primary=(i == 0)))
+    session.flush()
+    return user
+
+
+def _seed(session):
+    _user(session, 'benkirk', 'Ben', 'Kirk', 'benkirk@ucar.edu')
+    _user(session, 'bdobbins', 'Brian', 'Dobbins', 'bdobbins@ucar.edu', 'brian@example.org')
+    _user(session, 'kben', 'Kelly', 'Benson', 'kbenson@ucar.edu')
+    _user(session, 'old', 'Ben', 'Oldfield', 'old@ucar.edu', active=False)
+    for code, title, active in (('UCSD0001', 'Climate of the ocean', True),
+                                ('UCSD0002', 'Ocean mixing', False),
+                                ('NCAR0001', 'Benchmarks', True)):
+        session.add(Project(projcode=code, title=title, active=active,
+                            project_lead_user_id=1, area_of_interest_id=1))
+    now = datetime.now()
+    for number, title, start, end in (
+            ('AGS-100', 'Open climate study', now - timedelta(days=9), None),
+            ('OCE-200', 'Expired ocean study', now - timedelta(days=99),
+             now - timedelta(days=9))):
+        session.add(Contract(contract_number=number, title=title, start_date=start,
+                             end_date=end, contract_source_id=1,
+                             principal_investigator_user_id=1))
+    session.commit()
+
+
+# ---------------------------------------------------------------------------
+# NgramIndex vs SQL LIKE
+# ---------------------------------------------------------------------------
+
+class TestLikeParity:
+
+    def test_matches_sqlite_like(self):
+        rnd = random.Random(7)
+        alphabet = 'abcAB_%- .@1'
+        rows = {i: [''.join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 12)))
+                    for _ in range(2)] for i in range(1, 400)}
+        engine = create_engine('sqlite://')
+        with engine.begin() as conn:
+            conn.execute(text('CREATE TABLE t (id INTEGER, a TEXT, b TEXT)'))
+            conn.execute(text('INSERT INTO t VALUES (:id, :a, :b)'),
+                         [{'id': i, 'a': a, 'b': b} for i, (a, b) in rows.items()])
+        index = NgramIndex(('a', 'b'))
+        index.build((i, {'a': a, 'b': b}, (i,), {}) for i, (a, b) in rows.items())
+
+        patterns = ['%ab%', 'ab%', '%ab', 'a_b', '%a%b%', '%', '_', '%A B%', '%@1%',
+                    r'%\%%', r'%\_a%', 'abc', '%c.%', '%-%', '%1'] + [
+            '%' + ''.join(rnd.choice('abcAB') for _ in range(rnd.randint(1, 4))) + '%'
+            for _ in range(40)]
+        with engine.connect() as conn:
+            for pattern in patterns:
+                expected = {r[0] for r in conn.execute(text(
+                    r"SELECT id FROM t WHERE (a <> '' AND a LIKE :p ESCAPE '\') "
+                    r"OR (b <> '' AND b LIKE :p ESCAPE '\')"), {'p': pattern})}
+                assert set(index.search(pattern, limit=10 ** 6)) == expected, pattern
+
+    def test_ranking(self):
+        index = NgramIndex(('name',))
+        index.build([
+            (1, {'name': 'Aben'}, ('aben',), {}),           # substring
+            (2, {'name': 'Ben Kirk'}, ('ben kirk',), {}),   # prefix
+            (3, {'name': 'Kirk-Ben'}, ('kirk-ben',), {}),   # word prefix
+            (4, {'name': 'ben'}, ('ben',), {}),             # exact
+            (5, {'name': 'Benson'}, ('benson',), {}),       # prefix, later sort key
+        ])
+        assert index.search('%ben%') == [4, 2, 5, 3, 1]
+        assert index.search('%ben%', limit=2) == [4, 2]
+        # Wildcard patterns keep plain sort-key order.
+        assert index.search('%b_n%') == [1, 4, 2, 5, 3]
+
+    def test_upsert_and_remove(self):
+        index = NgramIndex(('name',))
+        index.build([(1, {'name': 'alpha'}, (), {}), (2, {'name': 'beta'}, (), {})])
+        index.upsert(1, {'name': 'gamma'}, (), {})
+        index.remove(2)
+        index.upsert(3, {'name': 'alphabet'}, (), {})
+        assert index.search('%alpha%') == [3]
+        assert index.search('%gam%') == [1]
+        assert index.search('%bet%') == [3]
+
+
+# ---------------------------------------------------------------------------
+# SearchIndex over the SAM models
+# ---------------------------------------------------------------------------
+
+class TestSearches:
+
+    def test_users_match_sql_path(self, sqlite_engine):
+        with Session(sqlite_engine) as session:
+            _seed(session)
+            for q, active_only in (('ben', False), ('ben', True), ('ucar', False),
+                                   ('example', False), ('zzz', False), ('B_n', False)):
+                indexed = search_users_by_pattern(session, q, active_only=active_only)
+                search_index.enabled = False
+                plain = search_users_by_pattern(session, q, active_only=active_only)
+                search_index.enabled = True
+                assert {u.username for u in indexed} == {u.username for u in plain}, q
+
+    def test_users_ranked_and_excluded(self, sqlite_engine):
+        with Session(sqlite_engine) as session:
+            _seed(session)
+            names = [u.username for u in search_users_by_pattern(session, 'ben',
+                                                                  active_only=True)]
+            assert names == ['benkirk', 'kben']              # exact first name first
+            ben = session.query(User).filter_by(username='benkirk').one()
+            assert 'benkirk' not in [u.username for u in search_users_by_pattern(
+                session, 'ben', exclude_user_ids=[ben.user_id])]
+
+    def test_projects_and_contracts(self, sqlite_engine):
+        with Session(sqlite_engine) as session:
+            _seed(session)
+            assert [p.projcode for p in Project.search_by_pattern(session, 'UCSD%')] == \
+                ['UCSD0001']
+            assert [p.projcode for p in Project.search_by_pattern(
+                session, 'UCSD%', active_only=False)] == ['UCSD0001', 'UCSD0002']
+            assert Project.search_by_pattern(session, '%ocean%', search_title=False) == []
+            assert [c.contract_number for c in Contract.search_by_pattern(
+                session, 'study')] == ['AGS-100']
+            assert [c.contract_number for c in Contract.search_by_pattern(
+                session, 'OCE-%', active_only=False)] == ['OCE-200']
+
+    def test_one_fetch_per_search(self, sqlite_engine, statements):
+        with Session(sqlite_engine) as session:
+            _seed(session)
+            search_users_by_pattern(session, 'ben')           # builds
+            search_index.refresh_interval = 3600
+            del statements[:]
+            search_users_by_pattern(session, 'ben')
+            user_selects = [s for s in statements if 'FROM users' in s]
+            assert len(user_selects) == 1 and 'LIKE' not in user_selects[0].upper()
+
+
+class TestFreshness:
+
+    def test_own_writes_visible(self, sqlite_engine):
+        with Session(sqlite_engine) as session:
+            _seed(session)
+            search_index.refresh_interval = 3600
+            assert search_users_by_pattern(session, 'zed') == []
+            _user(session, 'zed', 'Zed', 'Zebra', 'zed@ucar.edu')
+            assert [u.username for u in search_users_by_pattern(session, 'zed')] == ['zed']
+
+    def test_rollback_undone(self, sqlite_engine):
+        with Session(sqlite_engine) as session:
+            _seed(session)
+            search_index.refresh_interval = 3600
+            kirk = session.query(User).filter_by(username='benkirk').one()
+            kirk.last_name = 'Renamed'
+            session.flush()
+            assert [u.username for u in search_users_by_pattern(session, 'renamed')] == \
+                ['benkirk']
+            session.rollback()
+            assert search_users_by_pattern(session, 'renamed') == []
+            assert 'benkirk' in [u.username for u in search_users_by_pattern(session, 'kirk')]
+
+    def test_other_writers_picked_up(self, sqlite_engine):
+        with Session(sqlite_engine) as session:
+            _seed(session)
+            search_users_by_pattern(session, 'ben')
+
+        # Another process: not seen by this one's flush hooks.
+        search_index.enabled = False
+        with Session(sqlite_engine) as other:
+            _user(other, 'newbie', 'New', 'Benedict', 'newbie@ucar.edu')
+            other.commit()
+        search_index.enabled = True
+
+        with Session(sqlite_engine) as session:
+            assert 'newbie' in [u.username for u in search_users_by_pattern(session, 'bened')]
+
+
+class TestConcurrency:
+
+    def test_rebuild_does_not_block_searches(self, sqlite_engine, monkeypatch):
+        with Session(sqlite_engine) as session:
+            _seed(session)
+            before = search_index.search(session, 'users', '%ben%')
+
+        started, release = threading.Event(), threading.Event()
+        rebuild = search_index._rebuild
+
+        def slow_rebuild(session, kind):
+            started.set()
+            assert release.wait(10)
+            return rebuild(session, kind)
+
+        monkeypatch.setattr(search_index, '_rebuild', slow_rebuild)
+        search_index.rebuild_interval = 0
+
+        def rebuilding_search():
+            with Session(sqlite_engine) as session:
+                search_index.search(session, 'users', '%ben%')
+
+        builder = threading.Thread(target=rebuilding_search)
+        builder.start()
+        try:
+            assert started.wait(10)
+            with Session(sqlite_engine) as session:
+                # Served from the current index while the rebuild is held.
+                assert search_index.search(session, 'users', '%ben%') == before
+        finally:
+            release.set()
+            builder.join(10)
+        assert not builder.is_alive()
+
+    def test_first_build_elsewhere_falls_back_to_sql(self, sqlite_engine):
+        search_index._maintaining['users'].acquire()
+        try:
+            with Session(sqlite_engine) as session:
+                _seed(session)
+                assert search_index.search(session, 'users', '%ben%') is None
+                assert {u.username for u in search_users_by_pattern(session, 'ben')} >= \
+                    {'benkirk', 'kben'}
+        finally:
+            search_index._maintaining['users'].release()
+
+
+class TestShared:
+
+    def test_second_worker_loads_snapshot(self, sqlite_engine, statements):
+        client = fakeredis.FakeRedis()
+        search_index.configure(enabled=True, client=client, refresh_interval=3600)
+        with Session(sqlite_engine) as session:
+            _seed(session)
+            first = search_index.search(session, 'users', '%ben%')
+
+            worker = SearchIndex()
+            worker.configure(enabled=True, client=client, refresh_interval=3600)
+            del statements[:]
+            assert worker.search(session, 'users', '%ben%') == first
+            # One incremental refresh from the snapshot's watermark, no full load.
+            assert all('modified_time >=' in s or 'FROM users' not in s
+                       for s in statements)
+        search_index.configure(enabled=False)
+
+    def test_disabled_returns_none(self, sqlite_engine):
+        search_index.configure(enabled=False)
+        with Session(sqlite_engine) as session:
+            assert search_index.search(session, 'users', '%ben%') is None
@@ -0,0 +1,265 @@
+"""Tests for the collector → status API delta protocol.
+
+Server side: ``system_status.delta`` (expansion, snapshot store). Client
+side: ``collectors/lib/api_client.py`` (its ``make_delta`` mirror, body
+compression, acknowledged-base bookkeeping and the 409 full-resend
+fallback) against a fake ``requests`` session.
+"""
+
+import gzip
+import importlib
+import importlib.util
+import json
+import os
+import sys
+
+import fakeredis
+import pytest
+
+from system_status.delta import (
+    DELTA_KEYS,
+    DeltaBaseMismatch,
+    SnapshotStore,
+    expand_delta,
+    make_delta,
+)
+
+# collectors/lib imported as a package under a private name, as in
+# test_collector_pipeline.py (on sys.path it would shadow SAM's `config`).
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_LIB = os.path.join(_REPO_ROOT, "collectors", "lib")
+_PKG = "_collector_lib_under_test"
+if _PKG not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        _PKG, os.path.join(_LIB, "__init__.py"), submodule_search_locations=[_LIB])
+    sys.modules[_PKG] = importlib.util.module_from_spec(_spec)
+    _spec.loader.exec_module(sys.modules[_PKG])
+api_client = importlib.import_module(f"{_PKG}.api_client")
+
+
+def _upq(user, running):
+    return {'username': user, 'project_code': 'SCSG0001', 'queue_name': 'main',
+            'running_jobs': running, 'cores_allocated': 64 * running}
+
+
+BASE = {
+    'timestamp': '2026-05-04T10:00:00',
+    'running_jobs': 3,
+    'queues': [{'queue_name': 'main', 'running_jobs': 3}],
+    'user_project_queues': [_upq('alice', 1), _upq('bob', 1), _upq('carol', 1)],
+    'stage_timings': {'total': 1.5},
+}
+CURRENT = {
+    'timestamp': '2026-05-04T10:05:00',
+    'running_jobs': 4,
+    'queues': [{'queue_name': 'main', 'running_jobs': 4}],
+    'user_project_queues': [_upq('alice', 1), _upq('carol', 2), _upq('dave', 1)],
+    'login_nodes': [{'node_name': 'derecho1', 'available': True}],
+    'stage_timings': {'total': 1.2},
+}
+
+
+def _by_key(payload):
+    return {name: sorted(rows, key=lambda r: [str(r.get(f)) for f in DELTA_KEYS[name]])
+            if name in DELTA_KEYS else rows
+            for name, rows in payload.items()}
+
+
+class TestExpandDelta:
+
+    def test_round_trip(self):
+        delta = make_delta(BASE, CURRENT, 'tok')
+        assert _by_key(expand_delta(BASE, delta)) == _by_key(CURRENT)
+
+    def test_delta_carries_only_changes(self):
+        delta = make_delta(BASE, CURRENT, 'tok')
+        assert delta['delta_base'] == 'tok'
+        upq = delta['user_project_queues']
+        assert [r['username'] for r in upq['upsert']] == ['carol', 'dave']
+        assert upq['remove'] == [['bob', 'SCSG0001', 'main']]
+        # Lists the base lacks, and scalars, go in full.
+        assert delta['login_nodes'] == CURRENT['login_nodes']
+        assert delta['running_jobs'] == 4
+
+    def test_unchanged_tick_is_empty(self):
+        delta = make_delta(BASE, BASE, 'tok')
+        assert delta['user_project_queues'] == {'upsert': [], 'remove': []}
+        assert expand_delta(BASE, delta) == BASE
+
+    def test_base_order_kept(self):
+        expanded = expand_delta(BASE, make_delta(BASE, CURRENT, 'tok'))
+        assert [r['username'] for r in expanded['user_project_queues']] == \
+            ['alice', 'carol', 'dave']
+
+    def test_plain_list_replaces(self):
+        delta = {'delta_base': 'tok', 'queues': [{'queue_name': 'cpu'}]}
+        assert expand_delta(BASE, delta) == {'queues': [{'queue_name': 'cpu'}]}
+
+    def test_base_not_mutated(self):
+        before = json.dumps(BASE, sort_keys=True)
+        expand_delta(BASE, make_delta(BASE, CURRENT, 'tok'))
+        assert json.dumps(BASE, sort_keys=True) == before
+
+    def test_collector_mirror_matches(self):
+        """collectors/lib/api_client.py carries a copy of the wire format."""
+        assert api_client.DELTA_KEYS == DELTA_KEYS
+        assert api_client.make_delta(BASE, CURRENT, 'tok') == make_delta(BASE, CURRENT, 'tok')
+
+
+@pytest.mark.parametrize('redis', [False, True], ids=['local', 'redis'])
+class TestSnapshotStore:
+
+    def _store(self, redis, ttl=3600):
+        return SnapshotStore(client=fakeredis.FakeRedis() if redis else None, ttl=ttl)
+
+    def test_get_last_put(self, redis):
+        store = self._store(redis)
+        store.put('derecho', 't1', BASE)
+        assert store.get('derecho', 't1') == BASE
+
+    def test_only_last_token_accepted(self, redis):
+        store = self._store(redis)
+        store.put('derecho', 't1', BASE)
+        store.put('derecho', 't2', CURRENT)
+        with pytest.raises(DeltaBaseMismatch):
+            store.get('derecho', 't1')
+        assert store.get('derecho', 't2') == CURRENT
+
+    def test_systems_are_separate(self, redis):
+        store = self._store(redis)
+        store.put('derecho', 't1', BASE)
+        with pytest.raises(DeltaBaseMismatch):
+            store.get('casper', 't1')
+
+    def test_clear(self, redis):
+        store = self._store(redis)
+        store.put('derecho', 't1', BASE)
+        store.put('casper', 't2', BASE)
+        store.clear('derecho')
+        with pytest.raises(DeltaBaseMismatch):
+            store.get('derecho', 't1')
+        assert store.get('casper', 't2') == BASE
+        store.clear()
+        with pytest.raises(DeltaBaseMismatch):
+            store.get('casper', 't2')
+
+
+def test_local_snapshot_is_not_shared_with_the_caller():
+    store = SnapshotStore()
+    store.put('derecho', 't1', {'rows': [{'n': 1}]})
+    base = store.get('derecho', 't1')
+    base['rows'][0]['n'] = 2
+    assert store.get('derecho', 't1') == {'rows': [{'n': 1}]}
+
+
+def test_local_snapshot_expires():
+    store = SnapshotStore(ttl=-1)
+    store.put('derecho', 't1', BASE)
+    with pytest.raises(DeltaBaseMismatch):
+        store.get('derecho', 't1')
+
+
+# ---------------------------------------------------------------------------
+# SAMAPIClient
+# ---------------------------------------------------------------------------
+
+class _Response:
+
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self._body = body
+        self.text = json.dumps(body)
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.exceptions.HTTPError(response=self)
+
+
+class _FakeServer:
+    """Records POSTs and answers like the ingest endpoint's delta logic."""
+
+    def __init__(self):
+        self.posts = []
+        self.store = SnapshotStore()
+        self.n = 0
+
+    def post(self, url, data, auth, timeout, headers):
+        raw = data
+        if headers.get('Content-Encoding') == 'gzip':
+            raw = gzip.decompress(raw)
+        payload = json.loads(raw)
+        self.posts.append((headers, len(data), payload))
+        if 'delta_base' in payload:
+            try:
+                base = self.store.get('derecho', payload['delta_base'])
+            except DeltaBaseMismatch:
+                return _Response(409, {'error': 'stale', 'resend_full': True})
+            payload = expand_delta(base, payload)
+        self.n += 1
+        token = f'tok{self.n}'
+        self.store.put('derecho', token, payload)
+        return _Response(201, {'success': True, 'status_id': self.n,
+                               'snapshot_token': token})
+
+
+def _client(tmp_path, **kwargs):
+    client = api_client.SAMAPIClient('http://sam', 'collector', 'key', **kwargs)
+    client.session = _FakeServer()
+    return client
+
+
+class TestSAMAPIClient:
+
+    def test_plain_post_unchanged(self, tmp_path):
+        client = _client(tmp_path)
+        client.post_status('derecho', CURRENT)
+        headers, _, payload = client.session.posts[0]
+        assert 'Content-Encoding' not in headers
+        assert payload == CURRENT
+
+    def test_gzip_body(self, tmp_path):
+        client = _client(tmp_path, compression='gzip')
+        client.post_status('derecho', CURRENT)
+        headers, size, payload = client.session.posts[0]
+        assert headers['Content-Encoding'] == 'gzip'
+        assert payload == CURRENT
+
+    def test_unknown_compression_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            _client(tmp_path, compression='brotli')
+
+    def test_delta_after_acknowledged_tick(self, tmp_path):
+        client = _client(tmp_path, compression='gzip', delta_state_dir=str(tmp_path))
+        client.post_status('derecho', BASE)
+        assert os.path.exists(tmp_path / 'derecho-snapshot.json.gz')
+
+        # A fresh client (next cron run) picks the base up from disk.
+        client2 = _client(tmp_path, compression='gzip', delta_state_dir=str(tmp_path))
+        client2.session = client.session
+        client2.post_status('derecho', CURRENT)
+
+        _, _, sent = client.session.posts[-1]
+        assert sent['delta_base'] == 'tok1'
+        assert len(sent['user_project_queues']['upsert']) == 2
+        assert _by_key(client.session.store.get('derecho', 'tok2')) == _by_key(CURRENT)
+
+    def test_stale_base_resends_full(self, tmp_path):
+        client = _client(tmp_path, delta_state_dir=str(tmp_path))
+        client.post_status('derecho', BASE)
+        client.session.store.clear()          # server restarted
+
+        result = client.post_status('derecho', CURRENT)
+        assert result['snapshot_token'] == 'tok2'
+        kinds = ['delta_base' in p for _, _, p in client.session.posts]
+        assert kinds == [False, True, False]
+        assert client.session.posts[-1][2] == CURRENT
+
+    def test_corrupt_state_ignored(self, tmp_path):
+        (tmp_path / 'derecho-snapshot.json.gz').write_bytes(b'garbage')
+        client = _client(tmp_path, delta_state_dir=str(tmp_path))
+        client.post_status('derecho', CURRENT)
+        assert 'delta_base' not in client.session.posts[0][2]
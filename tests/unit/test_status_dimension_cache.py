@@ -0,0 +1,221 @@
+"""Unit tests for ``system_status.queries.dimensions`` (lookup id cache).
+
+Covers:
+- ids inserted by a session are only published when it commits
+- a rollback leaves nothing behind in the cache
+- the ORM path's before_flush resolution reuses cached ids without queries
+- ``_resolve_system_id`` / ``_resolve_queue_id`` answer from the cache
+- two workers share ids through Redis
+- a lost insert race falls back to the winner's row
+"""
+
+from datetime import datetime
+
+import fakeredis
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from system_status import DerechoStatus, QueueDef, QueueStatus, System
+from system_status.queries.dimensions import DimensionCache, dimension_cache
+from system_status.queries.user_proj_queues import _resolve_queue_id, _resolve_system_id
+
+
+pytestmark = pytest.mark.unit
+
+T0 = datetime(2026, 5, 4, 10, 0)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'status.db'}")
+
+    # pysqlite's own transaction handling turns RELEASE SAVEPOINT into a
+    # commit; the SQLAlchemy recipe makes SAVEPOINTs behave as on MySQL.
+    @event.listens_for(engine, 'connect')
+    def _no_pysqlite_begin(dbapi_connection, record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def _begin(conn):
+        conn.exec_driver_sql('BEGIN')
+
+    System.__table__.metadata.create_all(engine)
+    dimension_cache.configure(client=None)
+    yield engine
+    dimension_cache.configure(client=None)
+    engine.dispose()
+
+
+@pytest.fixture
+def statements(engine):
+    """SQL statements executed on ``engine``, in order."""
+    seen = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, stmt, *a: seen.append(stmt))
+    return seen
+
+
+def _tick(session, ts, queues=('main', 'develop')):
+    parent = DerechoStatus(timestamp=ts, cpu_nodes_total=1, cpu_nodes_available=1,
+                           cpu_nodes_down=0, gpu_nodes_total=0, gpu_nodes_available=0,
+                           gpu_nodes_down=0, cpu_cores_total=1, cpu_cores_allocated=0,
+                           cpu_cores_idle=1, gpu_count_total=0, gpu_count_allocated=0,
+                           gpu_count_idle=0, memory_total_gb=1.0, memory_allocated_gb=0.0)
+    for name in queues:
+        parent.queues.append(QueueStatus(timestamp=ts, system_name='derecho',
+                                         queue_name=name, running_jobs=1))
+    session.add(parent)
+    return parent
+
+
+def _lookup_queries(statements):
+    return [s for s in statements
+            if s.lstrip().upper().startswith('SELECT') and ('systems' in s or 'queues' in s)]
+
+
+class TestPublishing:
+
+    def test_published_on_commit(self, engine):
+        with Session(engine) as writer, Session(engine) as reader:
+            system_id = dimension_cache.resolve(writer, 'system', ('derecho',))
+            assert dimension_cache.cached(writer, 'system', ('derecho',)) == system_id
+            assert dimension_cache.cached(reader, 'system', ('derecho',)) is None
+
+            writer.commit()
+            assert dimension_cache.cached(reader, 'system', ('derecho',)) == system_id
+
+    def test_rollback_discards(self, engine):
+        with Session(engine) as session:
+            dimension_cache.resolve(session, 'system', ('derecho',))
+            session.rollback()
+
+            assert dimension_cache.cached(session, 'system', ('derecho',)) is None
+            assert session.scalar(select(System)) is None
+
+    def test_orm_rollback_discards(self, engine):
+        with Session(engine) as session:
+            _tick(session, T0)
+            session.flush()
+            session.rollback()
+
+        assert len(dimension_cache) == 0
+
+
+class TestOrmPath:
+
+    def test_second_tick_skips_lookup_queries(self, engine, statements):
+        with Session(engine) as session:
+            _tick(session, T0)
+            session.commit()
+        assert len(dimension_cache) == 3            # derecho + two queues
+
+        del statements[:]
+        with Session(engine) as session:
+            parent = _tick(session, T0.replace(minute=5))
+            session.flush()
+            assert _lookup_queries(statements) == []
+            assert [q.queue_name for q in parent.queues] == ['main', 'develop']
+            session.commit()
+        with Session(engine) as session:
+            assert session.query(QueueDef).count() == 2
+            assert session.query(QueueStatus).count() == 4
+
+    def test_new_queue_added_to_known_system(self, engine):
+        with Session(engine) as session:
+            _tick(session, T0)
+            session.commit()
+        with Session(engine) as session:
+            _tick(session, T0.replace(minute=5), queues=('main', 'preempt'))
+            session.commit()
+
+            system_id = dimension_cache.cached(session, 'system', ('derecho',))
+            assert dimension_cache.cached(session, 'queue', (system_id, 'preempt')) is not None
+            assert session.query(QueueDef).count() == 3
+
+
+class TestReaders:
+
+    def test_resolve_ids(self, engine, statements):
+        with Session(engine) as session:
+            _tick(session, T0)
+            session.commit()
+            main_id = session.scalar(select(QueueDef.queue_id).where(QueueDef.name == 'main'))
+
+        dimension_cache.configure(client=None)      # a fresh worker
+        with Session(engine) as session:
+            assert _resolve_queue_id(session, 'derecho', 'main') == main_id
+            assert _resolve_queue_id(session, 'derecho', 'nope') is None
+            assert _resolve_system_id(session, 'casper') is None
+
+            del statements[:]
+            assert _resolve_queue_id(session, 'derecho', 'main') == main_id
+            assert _resolve_system_id(session, 'derecho') is not None
+            assert _lookup_queries(statements) == []
+
+    def test_misses_are_not_remembered(self, engine):
+        with Session(engine) as session:
+            assert _resolve_system_id(session, 'derecho') is None
+            _tick(session, T0)
+            session.commit()
+            assert _resolve_system_id(session, 'derecho') is not None
+
+
+class TestShared:
+
+    def test_ids_shared_through_redis(self, engine):
+        client = fakeredis.FakeRedis()
+        first, second = DimensionCache(client=client), DimensionCache(client=client)
+
+        with Session(engine) as session, Session(engine) as other:
+            system_id = first.resolve(session, 'system', ('derecho',))
+            queue_id = first.resolve(session, 'queue', (system_id, 'main'))
+            assert second.cached(other, 'queue', (system_id, 'main')) is None
+            session.commit()
+
+        # ``first`` staged in session.info; the global hooks publish to the
+        # process-wide instance, so publish explicitly for this pair.
+        first.publish({('system', ('derecho',)): system_id,
+                       ('queue', (system_id, 'main')): queue_id})
+        with Session(engine) as session:
+            assert second.cached(session, 'queue', (system_id, 'main')) == queue_id
+            assert second.cached(session, 'system', ('derecho',)) == system_id
+
+        first.clear()
+        with Session(engine) as session:
+            assert second.cached(session, 'system', ('derecho',)) == system_id   # local copy
+            assert DimensionCache(client=client).cached(session, 'system', ('derecho',)) is None
+
+    def test_redis_errors_fall_back_to_database(self, engine):
+        class Broken:
+            def __getattr__(self, name):
+                raise ConnectionError('redis down')
+
+        cache = DimensionCache(client=Broken())
+        with Session(engine) as session:
+            system_id = cache.resolve(session, 'system', ('derecho',))
+            session.commit()
+            cache.publish({('system', ('derecho',)): system_id})
+            assert cache.get(session, 'system', ('derecho',)) == system_id
+
+
+class TestRace:
+
+    def test_lost_insert_uses_winner(self, engine, monkeypatch):
+        with Session(engine) as winner:
+            winner.add(System(name='derecho'))
+            winner.commit()
+            winner_id = winner.scalar(select(System.system_id))
+        dimension_cache.configure(client=None)
+
+        # The loser's first SELECT ran before the winner committed.
+        select_ = DimensionCache._select
+        monkeypatch.setattr(
+            DimensionCache, '_select',
+            lambda self, session, dim, keys, locking=False:
+                select_(self, session, dim, keys, locking) if locking else {})
+
+        with Session(engine) as loser:
+            assert dimension_cache.resolve(loser, 'system', ('derecho',)) == winner_id
+            loser.commit()
+            assert loser.query(System).count() == 1
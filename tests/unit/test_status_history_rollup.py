@@ -0,0 +1,321 @@
+"""Unit tests for ``system_status.queries.history`` (history rollup tiers).
+
+Covers:
+- LTTB keeps the endpoints and a lone spike, and returns exactly threshold rows
+- SeriesColumns / load_columns: NULL round trip, chunked streaming, fingerprints
+- pick_resolution tiers
+- ingest-time fold_snapshot vs. on-the-fly bucketing of the raw rows
+- rebuild_rollups parity, and that it leaves buckets older than raw retention
+- the raw head fill when rollups only cover the tail of a window
+- the history getters' default (raw) output is unchanged
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from system_status import (
+    CasperNodeTypeStatus,
+    CasperStatus,
+    DerechoStatus,
+    QueueStatus,
+    StatusHistoryRollup,
+)
+from system_status import queries as status_queries
+from system_status.queries import history
+from system_status.queries.columns import SeriesColumns, load_columns
+
+
+pytestmark = pytest.mark.unit
+
+T0 = datetime(2026, 3, 2, 22, 0)
+N_TICKS = 60            # 22:00 → 02:55, crossing midnight
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _make_derecho(session, ts, i):
+    parent = DerechoStatus(
+        timestamp=ts,
+        cpu_nodes_total=100, cpu_nodes_available=50 - i % 7, cpu_nodes_down=i % 3,
+        gpu_nodes_total=10, gpu_nodes_available=5, gpu_nodes_down=0,
+        cpu_cores_total=12800, cpu_cores_allocated=6400, cpu_cores_idle=6400,
+        gpu_count_total=40, gpu_count_allocated=20, gpu_count_idle=20,
+        cpu_utilization_percent=40.0 + i, gpu_utilization_percent=None,
+        memory_total_gb=10000.0, memory_allocated_gb=5000.0,
+        memory_utilization_percent=50.0 + i % 5,
+    )
+    parent.queues.append(QueueStatus(
+        timestamp=ts, system_name='derecho', queue_name='main',
+        running_jobs=10 + i, pending_jobs=i % 4, held_jobs=0, active_users=3,
+        cores_allocated=128 * i, cores_pending=0, gpus_allocated=0, gpus_pending=0,
+    ))
+    session.add(parent)
+    return parent
+
+
+def _make_casper(session, ts, i):
+    parent = CasperStatus(
+        timestamp=ts,
+        cpu_nodes_total=50, cpu_nodes_available=30, cpu_nodes_down=0,
+        gpu_nodes_total=20, gpu_nodes_available=10 - i % 4, gpu_nodes_down=0,
+        viz_nodes_total=5, viz_nodes_available=5, viz_nodes_down=0,
+        cpu_cores_total=2000, cpu_cores_allocated=1000, cpu_cores_idle=1000,
+        gpu_count_total=80, gpu_count_allocated=40, gpu_count_idle=40,
+        viz_count_total=5, viz_count_allocated=2, viz_count_idle=3,
+        memory_total_gb=5000.0, memory_allocated_gb=2500.0,
+    )
+    parent.node_types.append(CasperNodeTypeStatus(
+        timestamp=ts, node_type='gpu-a100',
+        nodes_total=8, nodes_available=8 - i % 5, nodes_down=0, nodes_allocated=i % 5,
+        utilization_percent=10.0 * (i % 5), memory_utilization_percent=None,
+    ))
+    session.add(parent)
+    return parent
+
+
+def _ingest(session, n=N_TICKS, start=T0, fold=True):
+    """Add n derecho + casper ticks, folding each like the ingest route does."""
+    for i in range(n):
+        ts = start + timedelta(minutes=5 * i)
+        for system, make in (('derecho', _make_derecho), ('casper', _make_casper)):
+            status = make(session, ts, i)
+            session.flush()
+            if fold:
+                history.fold_snapshot(session, system, status)
+    session.flush()
+
+
+def _window():
+    return T0, T0 + timedelta(minutes=5 * (N_TICKS - 1))
+
+
+def _getters(session, start, end, **kwargs):
+    return {
+        'derecho/cpu': status_queries.get_system_partition_history(
+            session, 'derecho', 'cpu', start, end, **kwargs),
+        'casper/viz': status_queries.get_system_partition_history(
+            session, 'casper', 'viz', start, end, **kwargs),
+        'derecho/main': status_queries.get_queue_history(
+            session, 'derecho', 'main', start, end, **kwargs),
+        'casper/gpu-a100': status_queries.get_casper_nodetype_history(
+            session, 'gpu-a100', start, end, **kwargs),
+    }
+
+
+def _bucketized(raw, grain):
+    out = {}
+    for key, rows in raw.items():
+        names = [k for k in rows[0] if k != 'timestamp']
+        out[key] = history.bucketize(SeriesColumns.from_rows(rows, names), grain).rows()
+    return out
+
+
+def _assert_rows_equal(actual, expected):
+    assert [r['timestamp'] for r in actual] == [r['timestamp'] for r in expected]
+    for got, exp in zip(actual, expected):
+        for k, v in exp.items():
+            if k == 'timestamp':
+                continue
+            assert got[k] == pytest.approx(v), (got['timestamp'], k)
+
+
+# ---------------------------------------------------------------------------
+# Pure helpers
+# ---------------------------------------------------------------------------
+
+class TestLttb:
+
+    def _series(self, n, spike_at=None):
+        v = (np.arange(n) % 3).astype(np.float64)
+        if spike_at is not None:
+            v[spike_at] = 100.0
+        stamps = np.datetime64(T0, 'us') + np.arange(n) * np.timedelta64(5, 'm')
+        return SeriesColumns(stamps, {'v': v})
+
+    def test_returns_threshold_rows_with_endpoints(self):
+        series = self._series(1000)
+        out = history.lttb(series, 50, 'v')
+        assert len(out) == 50
+        assert out.timestamps[0] == series.timestamps[0]
+        assert out.timestamps[-1] == series.timestamps[-1]
+        assert (np.diff(out.timestamps) > np.timedelta64(0)).all()
+
+    def test_keeps_a_lone_spike(self):
+        out = history.lttb(self._series(1000, spike_at=437), 40, 'v')
+        assert 100.0 in out['v']
+
+    def test_short_input_unchanged(self):
+        series = self._series(10)
+        assert history.lttb(series, 50, 'v') is series
+
+    def test_matches_reference_implementation(self):
+        """The vectorized inner loop picks what the textbook loop picks."""
+        rng = np.random.default_rng(8)
+        x = np.cumsum(rng.uniform(1, 5, 500))
+        y = rng.normal(size=500)
+        expected = [0]
+        n, threshold = len(x), 37
+        every = (n - 2) / (threshold - 2)
+        a = 0
+        for i in range(threshold - 2):
+            lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+            nlo, nhi = hi, min(int((i + 2) * every) + 1, n)
+            avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+            best, best_area = None, -1.0
+            for j in range(lo, hi):
+                area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+                if area > best_area:
+                    best, best_area = j, area
+            expected.append(best)
+            a = best
+        expected.append(n - 1)
+        assert history.lttb_indices(x, y, threshold).tolist() == expected
+
+
+class TestSeriesColumns:
+
+    def test_rows_round_trip_nulls(self):
+        rows = [{'timestamp': T0, 'a': 1, 'b': None},
+                {'timestamp': T0 + timedelta(minutes=5), 'a': 2.5, 'b': 7}]
+        cols = SeriesColumns.from_rows(rows, ['a', 'b'])
+        assert np.isnan(cols['b'][0])
+        assert cols.rows() == rows
+
+    def test_fingerprint_tracks_contents(self):
+        rows = [{'timestamp': T0, 'a': 1.0}]
+        one = SeriesColumns.from_rows(rows, ['a'])
+        assert one.fingerprint() == SeriesColumns.from_rows(rows, ['a']).fingerprint()
+        assert one.fingerprint() != SeriesColumns.from_rows(
+            [{'timestamp': T0, 'a': 2.0}], ['a']).fingerprint()
+
+    def test_streamed_chunks_concatenate(self, status_session):
+        _ingest(status_session, fold=False)
+        start, end = _window()
+        stmt = (select(QueueStatus.timestamp, QueueStatus.running_jobs,
+                       QueueStatus.cores_allocated)
+                .order_by(QueueStatus.timestamp))
+        whole = load_columns(status_session, stmt, ['running_jobs', 'cores_allocated'])
+        chunked = load_columns(status_session, stmt, ['running_jobs', 'cores_allocated'],
+                               chunk_rows=7)
+        assert len(whole) == N_TICKS
+        assert whole.rows() == chunked.rows()
+
+    def test_getters_return_columns_on_request(self, status_session):
+        _ingest(status_session, fold=False)
+        start, end = _window()
+        cols = status_queries.get_queue_history(
+            status_session, 'derecho', 'main', start, end, as_columns=True)
+        assert isinstance(cols, SeriesColumns)
+        assert cols.rows() == status_queries.get_queue_history(
+            status_session, 'derecho', 'main', start, end)
+        assert len(status_queries.get_system_partition_history(
+            status_session, 'nowhere', 'cpu', start, end, as_columns=True)) == 0
+
+
+@pytest.mark.parametrize('hours, expected', [
+    (24, 'raw'),
+    (24 * 13, 'raw'),
+    (24 * 30, 'hour'),
+    (24 * 150, 'hour'),
+    (24 * 365, 'day'),
+])
+def test_pick_resolution_tiers(hours, expected):
+    end = datetime(2026, 6, 1)
+    assert history.pick_resolution(end - timedelta(hours=hours), end, 1000) == expected
+
+
+def test_pick_resolution_without_budget_is_raw():
+    end = datetime(2026, 6, 1)
+    assert history.pick_resolution(end - timedelta(days=365), end, None) == 'raw'
+
+
+def test_unknown_resolution_rejected(status_session):
+    start, end = _window()
+    with pytest.raises(ValueError):
+        status_queries.get_queue_history(status_session, 'derecho', 'main',
+                                         start, end, resolution='minute')
+
+
+# ---------------------------------------------------------------------------
+# Rollup parity
+# ---------------------------------------------------------------------------
+
+class TestRollupParity:
+
+    @pytest.mark.parametrize('grain', ['hour', 'day'])
+    def test_folded_rollups_match_bucketized_raw(self, status_session, grain):
+        _ingest(status_session)
+        start, end = _window()
+        raw = _getters(status_session, start, end)
+        rolled = _getters(status_session, start, end, resolution=grain)
+        for key, expected in _bucketized(raw, grain).items():
+            _assert_rows_equal(rolled[key], expected)
+
+    def test_fold_is_one_row_per_series_bucket(self, status_session):
+        _ingest(status_session)
+        rows = status_session.query(StatusHistoryRollup).filter_by(
+            family='queue', series='main', grain='hour').all()
+        assert len(rows) == 5                   # 22:00 … 02:00
+        assert sum(r.samples for r in rows) == N_TICKS
+
+    def test_rebuild_matches_fold(self, status_session):
+        _ingest(status_session)
+        start, end = _window()
+        folded = _getters(status_session, start, end, resolution='hour')
+
+        status_session.query(StatusHistoryRollup).delete()
+        for system in ('derecho', 'casper'):
+            history.rebuild_rollups(status_session, system, start, end)
+        for key, rows in _getters(status_session, start, end, resolution='hour').items():
+            _assert_rows_equal(rows, folded[key])
+
+    def test_rebuild_keeps_buckets_older_than_raw(self, status_session):
+        _ingest(status_session)
+        # Simulate retention: the first (partial) day's raw snapshots are gone.
+        midnight = history.bucket_start(T0, 'day') + timedelta(days=1)
+        status_session.query(DerechoStatus).filter(
+            DerechoStatus.timestamp < midnight).delete()
+        before = status_session.query(StatusHistoryRollup).filter(
+            StatusHistoryRollup.bucket_start < midnight).count()
+
+        history.rebuild_rollups(status_session, 'derecho', T0, _window()[1])
+        assert status_session.query(StatusHistoryRollup).filter(
+            StatusHistoryRollup.bucket_start < midnight).count() == before
+
+    def test_uncovered_head_filled_from_raw(self, status_session):
+        # Rollups only exist from 00:00 on (e.g. the table was created at
+        # midnight and no backfill has run yet).
+        _ingest(status_session, n=24, fold=False)
+        _ingest(status_session, n=N_TICKS - 24, start=T0 + timedelta(hours=2))
+        start, end = _window()
+        raw = _getters(status_session, start, end)
+        rolled = _getters(status_session, start, end, resolution='hour')
+        for key, expected in _bucketized(raw, 'hour').items():
+            _assert_rows_equal(rolled[key], expected)
+
+    def test_max_points_thins_output(self, status_session):
+        _ingest(status_session)
+        start, end = _window()
+        rows = status_queries.get_queue_history(
+            status_session, 'derecho', 'main', start, end, max_points=20)
+        assert len(rows) == 20
+        assert rows[-1]['timestamp'] == end
+
+
+def test_default_resolution_is_every_raw_tick(status_session):
+    _ingest(status_session, fold=False)
+    start, end = _window()
+    for key, rows in _getters(status_session, start, end).items():
+        assert len(rows) == N_TICKS, key
+    cpu = _getters(status_session, start, end)['derecho/cpu'][3]
+    assert cpu == {
+        'timestamp': T0 + timedelta(minutes=15),
+        'nodes_total': 100, 'nodes_available': 47, 'nodes_down': 0,
+        'nodes_allocated': 53, 'utilization_percent': 43.0,
+        'memory_utilization_percent': 53.0,
+    }
@@ -0,0 +1,261 @@
+"""Unit tests for the nightly ``user_proj_daily_usage`` summary.
+
+Covers:
+- summary + live-edge composition matches the all-live integral for windows
+  with partial, whole and midnight-aligned edges, and under every filter
+- the summary is actually read for covered days (and only for them)
+- a day whose last interval reaches past the window end is integrated live
+- closed-day detection, idempotent reruns and rebuilds
+- rolled days outlive their raw spans, and a rebuild leaves them (and any
+  day retention may have cut into) alone
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from system_status import (
+    DerechoStatus,
+    UserProjDailyUsage,
+    UserProjDailyUsageDay,
+    UserProjQueueStatus,
+)
+from system_status.queries import get_user_proj_usage
+from system_status.queries.user_proj_usage import rollup_user_proj_days
+
+
+pytestmark = pytest.mark.unit
+
+T0 = datetime(2026, 5, 3, 20, 10)
+DAY1 = datetime(2026, 5, 4)
+TUPLES = [
+    ('alice', 'P1', 'main'),
+    ('alice', 'P2', 'main'),
+    ('bob', 'P1', 'main'),
+    ('bob', 'P1', 'develop'),
+    ('carol', '_unknown_', 'main'),
+]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _make_derecho(session, ts):
+    parent = DerechoStatus(
+        timestamp=ts,
+        cpu_nodes_total=100, cpu_nodes_available=50, cpu_nodes_down=0,
+        gpu_nodes_total=10, gpu_nodes_available=5, gpu_nodes_down=0,
+        cpu_cores_total=12800, cpu_cores_allocated=6400, cpu_cores_idle=6400,
+        gpu_count_total=40, gpu_count_allocated=20, gpu_count_idle=20,
+        memory_total_gb=10000.0, memory_allocated_gb=5000.0,
+    )
+    session.add(parent)
+    return parent
+
+
+def _tick_times():
+    """~3.5 days of irregular ticks (20–70 min apart, one 5 h outage)."""
+    rng = random.Random(11)
+    ticks, ts = [], T0
+    while ts < T0 + timedelta(days=3, hours=12):
+        ticks.append(ts)
+        ts += timedelta(minutes=rng.choice([20, 25, 45, 70]))
+        if len(ticks) == 60:
+            ts += timedelta(hours=5)
+    return ticks
+
+
+@pytest.fixture
+def spans(status_session):
+    """Random runs of constant counters per tuple, spans crossing midnights."""
+    rng = random.Random(5)
+    ticks = _tick_times()
+    parents = [_make_derecho(status_session, t) for t in ticks]
+    for user, project, queue in TUPLES:
+        i = rng.randrange(4)
+        while i < len(ticks):
+            run = rng.randrange(1, 40)
+            j = min(i + run, len(ticks)) - 1
+            if rng.random() < 0.7:
+                row = UserProjQueueStatus(
+                    timestamp=ticks[i], last_seen=ticks[j],
+                    system_name='derecho', queue_name=queue,
+                    username=user, project_code=project,
+                    running_jobs=1, cores_allocated=rng.randrange(0, 512),
+                    gpus_allocated=rng.choice([0, 0, 4]),
+                    nodes_allocated=rng.randrange(0, 8),
+                )
+                row.derecho_status = parents[i]
+                status_session.add(row)
+            i = j + 1 + rng.randrange(3)
+    status_session.flush()
+    return ticks
+
+
+def _usage(session, start, end, **kwargs):
+    return get_user_proj_usage(session, system='derecho',
+                               start_date=start, end_date=end, **kwargs)
+
+
+def _assert_same(composed, live):
+    key = lambda r: (r['username'], r['project_code'], r['queue_name'])  # noqa: E731
+    assert sorted(map(key, composed)) == sorted(map(key, live))
+    live_by_key = {key(r): r for r in live}
+    for r in composed:
+        exp = live_by_key[key(r)]
+        for col in ('core_hours', 'gpu_hours', 'node_hours'):
+            assert r[col] == pytest.approx(exp[col], rel=1e-9, abs=1e-9), (key(r), col)
+        for col in ('first_seen', 'last_seen', 'tick_count'):
+            assert r[col] == exp[col], (key(r), col)
+
+
+def _closed_days(ticks):
+    """Every day before the last tick's day has a later tick."""
+    first = ticks[0].replace(hour=0, minute=0)
+    last = ticks[-1].replace(hour=0, minute=0)
+    return [first + timedelta(days=i) for i in range((last - first).days)]
+
+
+def _roll(session, ticks, **kwargs):
+    return rollup_user_proj_days(session, 'derecho', ticks[0], ticks[-1], **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Composition parity
+# ---------------------------------------------------------------------------
+
+class TestParity:
+
+    @pytest.mark.parametrize('start, end', [
+        (T0, T0 + timedelta(days=4)),                       # everything
+        (T0 + timedelta(hours=1), DAY1 + timedelta(days=2, hours=9)),
+        (DAY1, DAY1 + timedelta(days=2)),                   # midnight aligned
+        (DAY1 + timedelta(hours=13), DAY1 + timedelta(days=1, hours=2)),
+        (DAY1 - timedelta(microseconds=1), DAY1 + timedelta(days=3)),
+    ])
+    def test_composed_matches_live(self, status_session, spans, start, end):
+        days, _ = _roll(status_session, spans)
+        assert days == len(_closed_days(spans)) >= 3
+        _assert_same(_usage(status_session, start, end),
+                     _usage(status_session, start, end, use_daily_summary=False))
+
+    @pytest.mark.parametrize('kwargs', [
+        {'queue_name': 'develop'},
+        {'username': 'alice'},
+        {'project_code': 'P1'},
+        {'exclude_unknown_project': True},
+    ])
+    def test_filters_match_live(self, status_session, spans, kwargs):
+        _roll(status_session, spans)
+        start, end = T0, T0 + timedelta(days=4)
+        _assert_same(_usage(status_session, start, end, **kwargs),
+                     _usage(status_session, start, end, use_daily_summary=False,
+                            **kwargs))
+
+    def test_covered_days_come_from_the_summary(self, status_session, spans):
+        _roll(status_session, spans)
+        start, end = T0, T0 + timedelta(days=4)
+        before = sum(r['core_hours'] for r in _usage(status_session, start, end))
+        doubled = status_session.query(UserProjDailyUsage).filter_by(day=DAY1).all()
+        bump = sum(r.core_hours for r in doubled)
+        for r in doubled:
+            r.core_hours *= 2
+        status_session.flush()
+        after = sum(r['core_hours'] for r in _usage(status_session, start, end))
+        assert bump > 0
+        assert after == pytest.approx(before + bump)
+        # The all-live path ignores the summary entirely.
+        live = sum(r['core_hours'] for r in _usage(status_session, start, end,
+                                                   use_daily_summary=False))
+        assert live == pytest.approx(before)
+
+    def test_day_whose_last_interval_overruns_window_is_live(self, status_session, spans):
+        _roll(status_session, spans)
+        # End the window at the next midnight, before that day's first tick:
+        # the day's last interval reaches past the window end.
+        ledger = status_session.query(UserProjDailyUsageDay).filter_by(day=DAY1).one()
+        end = DAY1 + timedelta(days=1)
+        assert ledger.next_tick > end
+        composed = _usage(status_session, DAY1, end)
+        _assert_same(composed,
+                     _usage(status_session, DAY1, end, use_daily_summary=False))
+        # The summary row would have counted the overrunning interval.
+        rolled = status_session.execute(
+            select(func.sum(UserProjDailyUsage.core_hours))
+            .where(UserProjDailyUsage.day == DAY1)
+        ).scalar_one()
+        assert sum(r['core_hours'] for r in composed) < rolled
+
+
+# ---------------------------------------------------------------------------
+# Rollup maintenance
+# ---------------------------------------------------------------------------
+
+class TestRollup:
+
+    def test_only_closed_days_are_rolled(self, status_session, spans):
+        days, rows = _roll(status_session, spans)
+        rolled = status_session.execute(
+            select(UserProjDailyUsageDay.day).order_by(UserProjDailyUsageDay.day)
+        ).scalars().all()
+        # The first (partial) day is closed; the last day has no later tick.
+        assert rolled == _closed_days(spans)
+        assert rolled[0] == T0.replace(hour=0, minute=0)
+        assert rolled[-1] < spans[-1] < rolled[-1] + timedelta(days=2)
+        assert rows == status_session.query(UserProjDailyUsage).count()
+
+    def test_rerun_is_a_no_op_and_rebuild_replaces(self, status_session, spans):
+        _, rows = _roll(status_session, spans)
+        assert _roll(status_session, spans) == (0, 0)
+        n_days = len(_closed_days(spans))
+        # The first day starts before the earliest retained tick, so a
+        # rebuild cannot tell it from a half-purged day and leaves it be.
+        first_rows = status_session.query(UserProjDailyUsage).filter(
+            UserProjDailyUsage.day == T0.replace(hour=0, minute=0)).count()
+        assert _roll(status_session, spans, rebuild=True) == (
+            n_days - 1, rows - first_rows)
+        assert status_session.query(UserProjDailyUsage).count() == rows
+        assert status_session.query(UserProjDailyUsageDay).count() == n_days
+
+    def test_rebuild_keeps_a_partly_purged_day(self, status_session, spans):
+        _roll(status_session, spans)
+        window = (DAY1, DAY1 + timedelta(days=1, hours=1))
+        expected = _usage(status_session, *window)
+        cutoff = DAY1 + timedelta(hours=12)
+        status_session.query(UserProjQueueStatus).filter(
+            UserProjQueueStatus.timestamp < cutoff).delete()
+        status_session.query(DerechoStatus).filter(
+            DerechoStatus.timestamp < cutoff).delete()
+
+        days, _ = _roll(status_session, spans, rebuild=True)
+        assert days == len(_closed_days(spans)) - 2
+        day1 = _usage(status_session, *window)
+        assert sum(r['core_hours'] for r in day1) == pytest.approx(
+            sum(r['core_hours'] for r in expected))
+
+    def test_summary_outlives_raw_spans(self, status_session, spans):
+        _roll(status_session, spans)
+        start, end = T0, T0 + timedelta(days=4)
+        expected = _usage(status_session, DAY1, DAY1 + timedelta(days=1, hours=1))
+        cutoff = DAY1 + timedelta(days=1)
+        status_session.query(UserProjQueueStatus).filter(
+            UserProjQueueStatus.timestamp < cutoff).delete()
+        status_session.query(DerechoStatus).filter(
+            DerechoStatus.timestamp < cutoff).delete()
+
+        # A rebuild has no raw ticks for the pruned days and leaves them be.
+        _roll(status_session, [start, end], rebuild=True)
+        assert status_session.execute(
+            select(func.count()).select_from(UserProjDailyUsageDay)
+            .where(UserProjDailyUsageDay.day < cutoff)
+        ).scalar_one() == 2
+        day1 = _usage(status_session, DAY1, DAY1 + timedelta(days=1, hours=1))
+        assert sum(r['core_hours'] for r in day1) == pytest.approx(
+            sum(r['core_hours'] for r in expected))
+
+    def test_unknown_system_rejected(self, status_session):
+        with pytest.raises(ValueError):
+            rollup_user_proj_days(status_session, 'nowhere', T0, DAY1)
@@ -0,0 +1,229 @@
+"""Unit tests for the held active-span index in
+``system_status.queries.user_proj_queue_ingest``.
+
+Covers:
+- a committed tick's span set is reused by the next tick (no MAX scan)
+- results match a rebuild from the table, tick for tick
+- a stale index (another writer ticked since) is rebuilt
+- a held span deleted since (pruned) starts a new span
+- rollback leaves the held index untouched
+- the bulk path's inserted span ids, and sharing through Redis
+"""
+
+from datetime import datetime, timedelta
+
+import fakeredis
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from system_status import UserProjQueueStatus
+from system_status.queries.dimensions import dimension_cache
+from system_status.queries.user_proj_queue_ingest import (
+    ActiveSpanIndex,
+    coalesce_user_proj_queue_rows,
+    coalesce_user_proj_queue_spans,
+    fill_staged_span_ids,
+    span_index,
+)
+
+
+pytestmark = pytest.mark.unit
+
+T0 = datetime(2026, 5, 4, 12, 0)
+TICK = timedelta(minutes=5)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'status.db'}")
+
+    # Real SAVEPOINTs on pysqlite (the bulk path's lookup inserts use them).
+    @event.listens_for(engine, 'connect')
+    def _no_pysqlite_begin(dbapi_connection, record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def _begin(conn):
+        conn.exec_driver_sql('BEGIN')
+
+    UserProjQueueStatus.__table__.metadata.create_all(engine)
+    dimension_cache.configure(client=None)
+    span_index.configure(client=None)
+    yield engine
+    dimension_cache.configure(client=None)
+    span_index.configure(client=None)
+    engine.dispose()
+
+
+@pytest.fixture
+def statements(engine):
+    seen = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, stmt, *a: seen.append(stmt))
+    return seen
+
+
+class _FakeParent:
+    def __init__(self, user_project_queues):
+        self.user_project_queues = user_project_queues
+
+
+def _child(ts, username, running):
+    return UserProjQueueStatus(timestamp=ts, system_name='derecho', queue_name='main',
+                               username=username, project_code='SCSG0001',
+                               running_jobs=running, cores_allocated=8 * running)
+
+
+def _tick(engine, ts, counts, commit=True):
+    """Ingest one tick through the ORM coalescer: ``{username: running_jobs}``."""
+    with Session(engine) as session:
+        parent = _FakeParent([_child(ts, u, n) for u, n in counts.items()])
+        result = coalesce_user_proj_queue_spans(session, parent, ts)
+        session.add_all(parent.user_project_queues)
+        session.flush()
+        if commit:
+            session.commit()
+        else:
+            session.rollback()
+    return result
+
+
+def _spans(engine):
+    with Session(engine) as session:
+        return sorted(
+            (r.username, r.timestamp, r.last_seen, r.running_jobs)
+            for r in session.query(UserProjQueueStatus)
+        )
+
+
+def _scans(statements):
+    return [s for s in statements if 'max(user_proj_queue_status.last_seen)' in s]
+
+
+TICKS = [
+    {'alice': 1, 'bob': 2},
+    {'alice': 1, 'bob': 3},
+    {'alice': 1, 'bob': 3, 'carol': 1},
+    {'alice': 2, 'carol': 1},
+    {'alice': 2, 'carol': 1},
+]
+
+
+class TestHeldIndex:
+
+    def test_steady_state_skips_rebuild(self, engine, statements):
+        _tick(engine, T0, TICKS[0])
+        assert len(_scans(statements)) == 1             # cold start
+
+        del statements[:]
+        for i, counts in enumerate(TICKS[1:], start=1):
+            _tick(engine, T0 + i * TICK, counts)
+        assert _scans(statements) == []
+
+    def test_matches_rebuild(self, engine, tmp_path):
+        for i, counts in enumerate(TICKS):
+            _tick(engine, T0 + i * TICK, counts)
+        held = _spans(engine)
+
+        cold = create_engine(f"sqlite:///{tmp_path / 'cold.db'}")
+        UserProjQueueStatus.__table__.metadata.create_all(cold)
+        for i, counts in enumerate(TICKS):
+            span_index.clear()
+            dimension_cache.clear()
+            _tick(cold, T0 + i * TICK, counts)
+        assert _spans(cold) == held
+        cold.dispose()
+
+    def test_stale_index_is_rebuilt(self, engine, statements):
+        _tick(engine, T0, TICKS[0])
+        system_id = next(iter(span_index._local))
+        stale = span_index.get(system_id)
+        _tick(engine, T0 + TICK, TICKS[1])
+
+        span_index.put(system_id, *stale)               # a worker that missed T0+TICK
+        del statements[:]
+        assert _tick(engine, T0 + 2 * TICK, TICKS[2]) == {'inserted': 1, 'extended': 2}
+        assert len(_scans(statements)) == 1
+
+    def test_pruned_span_starts_new_span(self, engine):
+        _tick(engine, T0, {'alice': 1, 'bob': 1})
+        with Session(engine) as session:
+            session.query(UserProjQueueStatus).filter(
+                UserProjQueueStatus.running_jobs == 1,
+                UserProjQueueStatus.user.has(username='bob'),
+            ).delete(synchronize_session=False)
+            session.commit()
+
+        assert _tick(engine, T0 + TICK, {'alice': 1, 'bob': 1}) == \
+            {'inserted': 1, 'extended': 1}
+        assert _spans(engine) == [
+            ('alice', T0, T0 + TICK, 1),
+            ('bob', T0 + TICK, T0 + TICK, 1),
+        ]
+
+    def test_rollback_keeps_previous_index(self, engine, statements):
+        _tick(engine, T0, TICKS[0])
+        _tick(engine, T0 + TICK, TICKS[1], commit=False)
+
+        del statements[:]
+        assert _tick(engine, T0 + TICK, TICKS[1]) == {'inserted': 1, 'extended': 1}
+        assert _scans(statements) == []
+
+    def test_gap_starts_fresh(self, engine):
+        _tick(engine, T0, TICKS[0])
+        assert _tick(engine, T0 + timedelta(hours=1), TICKS[0]) == \
+            {'inserted': 2, 'extended': 0}
+
+
+class TestBulkRows:
+
+    def _rows(self, session, ts, counts):
+        system_id = dimension_cache.resolve(session, 'system', ('derecho',))
+        queue_id = dimension_cache.resolve(session, 'queue', (system_id, 'main'))
+        project_id = dimension_cache.resolve(session, 'project_code', ('SCSG0001',))
+        rows = []
+        for username, n in counts.items():
+            rows.append(dict(
+                {f: 0 for f in ('pending_jobs', 'held_jobs', 'gpus_allocated',
+                                'nodes_allocated', 'cores_pending', 'gpus_pending',
+                                'cores_held', 'gpus_held')},
+                timestamp=ts, system_id=system_id, queue_id=queue_id,
+                project_code_id=project_id,
+                user_id=dimension_cache.resolve(session, 'user', (username,)),
+                running_jobs=n, cores_allocated=8 * n,
+            ))
+        return system_id, rows
+
+    def _ingest(self, engine, ts, counts):
+        with Session(engine) as session:
+            system_id, rows = self._rows(session, ts, counts)
+            to_insert, result = coalesce_user_proj_queue_rows(session, system_id, rows, ts)
+            if to_insert:
+                session.execute(UserProjQueueStatus.__table__.insert(), to_insert)
+                fill_staged_span_ids(session, system_id, ts)
+            session.commit()
+        return system_id, result
+
+    def test_inserted_ids_held(self, engine, statements):
+        system_id, _ = self._ingest(engine, T0, TICKS[0])
+        tick, spans = span_index.get(system_id)
+        with Session(engine) as session:
+            ids = set(session.scalars(select(UserProjQueueStatus.user_proj_queue_status_id)))
+        assert tick == T0
+        assert {row_id for row_id, _ in spans.values()} == ids
+
+        del statements[:]
+        assert self._ingest(engine, T0 + TICK, TICKS[1])[1] == {'inserted': 1, 'extended': 1}
+        assert _scans(statements) == []
+
+    def test_shared_through_redis(self, engine, statements):
+        span_index.configure(client=fakeredis.FakeRedis())
+        system_id, _ = self._ingest(engine, T0, TICKS[0])
+
+        # A second worker: own process memory, same Redis.
+        other = ActiveSpanIndex(client=span_index._client)
+        assert other.get(system_id) == span_index.get(system_id)
+
+        span_index.clear()
+        assert other.get(system_id) is None
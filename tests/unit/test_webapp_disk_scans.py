@@ -2094,3 +2094,173 @@ def test_single_owner_band_without_window_keeps_table(app):
     assert 'benkirk' in body                            # user still listed
     assert 'Top users by' in body                       # per-user table kept
     assert 'owner_uid=7' not in body                    # but no directory drill
+
+
+# ---------------------------------------------------------------------------
+# warm.warm_scan_caches — post-scan warmer
+# ---------------------------------------------------------------------------
+
+def _wire_warmer(monkeypatch, *, scans, projects, scopes):
+    """A fake plugin + SAM seams for the warmer.
+
+    *scans* maps collection → latest scan ISO date (mutable, so a test can
+    "re-scan"); *projects* is the projcode list owning directories there;
+    *scopes* maps projcode → the path prefixes its card resolves to. Every
+    facade call is counted in the returned dict, keyed by method name.
+    """
+    from flask import Flask
+    from webapp.disk_scans import scope as scope_mod
+    from webapp.disk_scans import warm
+
+    calls = {}
+
+    class _FakeQueries:
+        def __init__(self, filesystems, database=None):
+            self.filesystems = list(filesystems)
+
+        def scan_dates(self, filesystems=None):
+            return [datetime.fromisoformat(scans[c]) for c in filesystems or self.filesystems]
+
+        def __getattr__(self, name):
+            def _query(**kw):
+                calls[name] = calls.get(name, 0) + 1
+                return {'bucket_labels': [], 'buckets': {}} if 'hist' in name else []
+            return _query
+
+    mod = types.SimpleNamespace(
+        FsScanQueries=_FakeQueries,
+        collection_for_path=_fake_collection_for_path,
+        normalize_path=_fake_normalize,
+    )
+    for target in (scope_mod, warm):
+        monkeypatch.setattr(target, 'get_module', lambda: mod)
+        monkeypatch.setattr(target, 'collections_for_resource',
+                            lambda r, app=None: sorted(scans))
+        monkeypatch.setattr(target, 'database_for_resource', lambda r, app=None: 'campaign')
+    monkeypatch.setattr(warm, 'is_enabled', lambda app=None: True)
+    monkeypatch.setattr(
+        scope_mod, 'resolve_scan_scope',
+        lambda session, project, resource_name: (
+            list(scopes[project.projcode]),
+            sorted({_fake_collection_for_path(p) for p in scopes[project.projcode]})))
+    monkeypatch.setattr(
+        warm, '_projects_on',
+        lambda session, mod, collections: [
+            types.SimpleNamespace(projcode=p) for p in projects
+            if any(_fake_collection_for_path(s) in collections for s in scopes[p])])
+
+    monkeypatch.delenv('CACHE_REDIS_URL', raising=False)
+    from webapp.disk_scans import cache as c
+    c._adapters.clear()
+    app = Flask(__name__)
+    app.config['FS_SCAN_RESOURCES'] = ['Campaign_Store']
+    return app, calls
+
+
+def test_warm_scan_caches_warms_new_scans_once(monkeypatch):
+    from webapp.disk_scans import service, warm
+    from webapp.disk_scans.scope import ProjectScanScope
+
+    scans = {'cisl': '2026-06-14T00:00:00', 'cesm': '2026-06-14T00:00:00'}
+    scopes = {'CISL0001': ['/glade/campaign/cisl/csg'],
+              'CISL0002': ['/glade/campaign/cisl/csg'],      # same paths → warmed once
+              'CESM0001': ['/glade/campaign/cesm/dev']}
+    app, calls = _wire_warmer(monkeypatch, scans=scans, projects=list(scopes),
+                              scopes=scopes)
+    seen = []
+    with app.app_context():
+        report = warm.warm_scan_caches(None, progress=lambda d, t, p: seen.append((d, t)))
+        assert report.collections == {('Campaign_Store', 'cesm'): 'warmed',
+                                      ('Campaign_Store', 'cisl'): 'warmed'}
+        assert sorted(p.projcode for p in report.prefixes) == ['CESM0001', 'CISL0001']
+        assert all(p.error is None and p.seconds >= 0 for p in report.prefixes)
+        assert seen == [(1, 2), (2, 2)]
+        assert calls == {'list_directories': 2, 'owner_summary': 2, 'group_summary': 2,
+                         'access_history': 2, 'file_size_histogram': 2}
+
+        # The card's own calls are now hits.
+        card = ProjectScanScope(None, types.SimpleNamespace(projcode='CISL0002'),
+                                'Campaign_Store')
+        service.scan_directories(card)
+        service.scan_entity_summary(card, 'owner', limit=50)
+        service.scan_distribution(card, 'access_history')
+        assert calls['list_directories'] == 2
+        assert calls['owner_summary'] == 2 and calls['access_history'] == 2
+
+        # Nothing re-scanned: nothing to do.
+        again = warm.warm_scan_caches(None)
+        assert set(again.collections.values()) == {'current'} and again.prefixes == []
+
+        # A new cisl scan re-warms only the scopes on cisl.
+        scans['cisl'] = '2026-06-21T00:00:00'
+        rescan = warm.warm_scan_caches(None)
+        assert rescan.collections[('Campaign_Store', 'cesm')] == 'current'
+        assert [p.projcode for p in rescan.prefixes] == ['CISL0001']
+
+        assert len(warm.warm_scan_caches(None, force=True).prefixes) == 2
+
+
+def test_warm_scan_caches_failed_prefix_is_retried(monkeypatch):
+    from webapp.disk_scans import warm
+
+    scans = {'cisl': '2026-06-14T00:00:00'}
+    scopes = {'CISL0001': ['/glade/campaign/cisl/csg']}
+    app, calls = _wire_warmer(monkeypatch, scans=scans, projects=list(scopes),
+                              scopes=scopes)
+    broken = [True]
+
+    def _group(scope, kind, **kw):
+        if broken[0] and kind == 'group':
+            raise RuntimeError('statement timeout')
+        return []
+    monkeypatch.setattr(warm.service, 'scan_entity_summary', _group)
+    with app.app_context():
+        report = warm.warm_scan_caches(None)
+        assert report.collections == {('Campaign_Store', 'cisl'): 'failed'}
+        assert 'statement timeout' in report.errors[0].error
+        broken[0] = False
+        assert warm.warm_scan_caches(None).collections == \
+            {('Campaign_Store', 'cisl'): 'warmed'}
+
+
+def test_warm_scan_caches_noop_when_cache_disabled(monkeypatch):
+    from webapp.disk_scans import cache as c, warm
+
+    app, calls = _wire_warmer(monkeypatch, scans={'cisl': '2026-06-14T00:00:00'},
+                              projects=[], scopes={})
+    c._CACHE.reset_for_tests()
+    with app.app_context():
+        report = warm.warm_scan_caches(None)
+    assert report.collections == {} and not report.busy
+    assert calls == {}
+
+
+def test_warm_scan_caches_stops_when_the_lease_is_lost(monkeypatch):
+    from webapp.disk_scans import warm
+
+    scans = {'cisl': '2026-06-14T00:00:00', 'cesm': '2026-06-14T00:00:00'}
+    scopes = {'CISL0001': ['/glade/campaign/cisl/csg'],
+              'CESM0001': ['/glade/campaign/cesm/dev']}
+    app, calls = _wire_warmer(monkeypatch, scans=scans, projects=list(scopes),
+                              scopes=scopes)
+    renewals, released = [], []
+    with app.app_context():
+        adapter = warm.get_cache_adapter('default')
+        monkeypatch.setattr(adapter, 'acquire_lease', lambda key, ttl: 'tok',
+                            raising=False)
+        monkeypatch.setattr(adapter, 'renew_lease',
+                            lambda key, token, ttl: renewals.append(ttl) or False,
+                            raising=False)
+        monkeypatch.setattr(adapter, 'release_lease',
+                            lambda key, token: released.append(key), raising=False)
+        report = warm.warm_scan_caches(None, workers=1)
+        assert report.busy
+        assert renewals == [warm._RUN_LEASE_TTL]        # stopped after one scope
+        assert warm._RUN_LEASE_KEY in released
+        assert report.collections == {}                 # nothing recorded
+
+        # Nothing was stamped, so the next leader warms both collections.
+        monkeypatch.setattr(adapter, 'renew_lease', lambda key, token, ttl: True)
+        again = warm.warm_scan_caches(None)
+        assert not again.busy
+        assert set(again.collections.values()) == {'warmed'}
@@ -163,7 +163,7 @@ def test_jobs_cache_info_shape_enabled():
     c._adapters.clear()
 
     infos = c.jobs_cache_info()
-    assert [i['name'] for i in infos] == ['jobs', 'jobs_recent']
+    assert [i['name'] for i in infos] == ['jobs', 'jobs_recent', 'jobs_partials']
 
 
 def test_jobs_cache_defaults_cap_staleness_at_thirty_minutes():
@@ -190,11 +190,11 @@ def test_jobs_cache_sizes_fit_the_explorer_fan_out():
 
 
 def test_jobs_cache_info_shape_disabled():
-    """With buckets disabled, info still reports both (disabled_info shape)."""
+    """With buckets disabled, info still reports all (disabled_info shape)."""
     from webapp.jobs import cache as c
 
     infos = c.jobs_cache_info()
-    assert [i['name'] for i in infos] == ['jobs', 'jobs_recent']
+    assert [i['name'] for i in infos] == ['jobs', 'jobs_recent', 'jobs_partials']
 
 
 def test_caching_facade_reports_and_clears_jobs_category(app):
@@ -208,7 +208,7 @@ def test_caching_facade_reports_and_clears_jobs_category(app):
 
     with app.app_context():
         stats = caching.stats()
-    assert [i['name'] for i in stats['jobs']] == ['jobs', 'jobs_recent']
+    assert [i['name'] for i in stats['jobs']] == ['jobs', 'jobs_recent', 'jobs_partials']
 
     cleared = caching.clear('jobs')
     assert cleared == {'jobs': 1}
@@ -522,3 +522,347 @@ def test_service_jobs_usage_by_project_caches_under_own_query_type(
     dim, kwargs = captured['usage_by'][0]
     assert dim == 'account'
     assert kwargs['user'] == 'benkirk'
+
+
+# ---------------------------------------------------------------------------
+# Bundles — a card's aggregations computed together
+# ---------------------------------------------------------------------------
+
+_BUNDLE = dict(histograms=('wait', 'nodes', 'duration'), owners_limit=10,
+               owners_sort_by='cpu_hours', usage_by=('user', 'account'),
+               usage_limit=25, usage_sort_by='gpu_hours',
+               facets=('queue', 'qos', 'exit_status'))
+
+
+def _count_sessions(app, monkeypatch):
+    sessions = []
+    mod = app.extensions['hpc_usage_queries']['module']
+    monkeypatch.setattr(mod, 'get_session', lambda machine, engine=None:
+                        sessions.append(machine) or MagicMock(name='jh_session'))
+    return sessions
+
+
+def _siblings_as_the_tabs_ask(service, scope, win):
+    """Each tab's own call, with the arguments its fragment would pass."""
+    for dim in _BUNDLE['histograms']:
+        service.jobs_histogram('derecho', dim, scope, owners_limit=10,
+                               owners_sort_by='cpu_hours', **win)
+    service.jobs_usage_by_user('derecho', scope, limit=25, sort_by='gpu_hours', **win)
+    service.jobs_usage_by_project('derecho', scope, limit=25, sort_by='gpu_hours', **win)
+    service.jobs_facets('derecho', scope, facets=_BUNDLE['facets'], **win)
+
+
+def test_bundle_computes_every_member_in_one_session(app, monkeypatch):
+    """One plugin session for the lot; each tab's own call is a hit after."""
+    from webapp.jobs import cache as c, service
+    c._adapters.clear()
+
+    captured = _install_agg_plugin(app, monkeypatch)
+    sessions = _count_sessions(app, monkeypatch)
+    scope = ProjectJobScope(account_projcodes=['SCSG0001'])
+    win = {'start': date(2026, 6, 1), 'end': date(2026, 6, 30)}
+
+    with app.app_context():
+        got = service.jobs_aggregation_bundle(
+            'derecho', scope, service.JobsBundle(**_BUNDLE),
+            need=('histogram', 'wait'), **win)
+        assert len(sessions) == 1
+        assert set(got['histograms']) == {'wait', 'nodes', 'duration'}
+        assert set(got['usage_by']) == {'user', 'account'}
+        assert set(got['facets']) == {'queue', 'qos', 'exit_status'}
+
+        _siblings_as_the_tabs_ask(service, scope, win)
+
+    assert len(sessions) == 1
+    assert [d for d, _ in captured['histogram']] == ['wait', 'nodes', 'duration']
+    assert [d for d, _ in captured['usage_by']] == ['user', 'account']
+    assert len(captured['facets']) == 1
+
+
+def test_bundle_hit_on_need_computes_nothing(app, monkeypatch):
+    """A cached *need* is served as is — its siblings wait for the next miss."""
+    from webapp.jobs import cache as c, service
+    c._adapters.clear()
+
+    captured = _install_agg_plugin(app, monkeypatch)
+    sessions = _count_sessions(app, monkeypatch)
+    scope = MachineJobScope()
+    win = {'start': date(2026, 6, 1), 'end': date(2026, 6, 30)}
+
+    with app.app_context():
+        service.jobs_histogram('derecho', 'wait', scope, owners_limit=10,
+                               owners_sort_by='cpu_hours', **win)
+        got = service.jobs_aggregation_bundle(
+            'derecho', scope, service.JobsBundle(**_BUNDLE),
+            need=('histogram', 'wait'), **win)
+
+    assert len(sessions) == 1
+    assert list(got['histograms']) == ['wait']
+    assert got['usage_by'] == {} and got['facets'] is None
+    assert captured['usage_by'] == [] and captured['facets'] == []
+
+
+def test_bundle_with_cache_disabled_computes_only_need(app, monkeypatch):
+    """No cache, nowhere to keep siblings — they would only be thrown away."""
+    from webapp.jobs import service
+
+    captured = _install_agg_plugin(app, monkeypatch)
+
+    with app.app_context():
+        got = service.jobs_aggregation_bundle(
+            'derecho', MachineJobScope(), service.JobsBundle(**_BUNDLE),
+            need=('facets',))
+
+    assert captured['histogram'] == [] and captured['usage_by'] == []
+    assert len(captured['facets']) == 1
+    assert got['histograms'] == {} and set(got['facets']) == set(_BUNDLE['facets'])
+
+
+def test_bundle_rejects_user_filter_beside_pin(app, monkeypatch):
+    """Filters are vetted the same way the per-dimension functions vet them."""
+    from webapp.jobs import service
+
+    _install_agg_plugin(app, monkeypatch)
+    with app.app_context(), pytest.raises(ValueError):
+        service.jobs_aggregation_bundle(
+            'derecho', UserJobScope('benkirk'),
+            service.JobsBundle(**_BUNDLE), user='mallory')
+
+
+# ---------------------------------------------------------------------------
+# Window composition from cached chunks (webapp/jobs/partials.py)
+# ---------------------------------------------------------------------------
+
+_PART_DAYS = [date(2025, 3, 1) + timedelta(days=i) for i in range(120)]
+_PART_USERS = [f'u{i:02d}' for i in range(12)]
+_METRIC_KEYS = ('job_count', 'cpu_hours', 'gpu_hours', 'cpu_charges', 'gpu_charges')
+
+
+def _part_data():
+    import random
+    rng = random.Random(7)
+    data = {}
+    for day in _PART_DAYS:
+        for user in _PART_USERS:
+            if rng.random() < 0.6:
+                data[(day, user)] = {
+                    'job_count': rng.randint(1, 40),
+                    'cpu_hours': round(rng.uniform(0, 900), 3),
+                    'gpu_hours': round(rng.uniform(0, 90), 3) if rng.random() < 0.4 else 0.0,
+                    'cpu_charges': round(rng.uniform(0, 900), 3),
+                    'gpu_charges': round(rng.uniform(0, 300), 3),
+                }
+    return data
+
+
+def _sum_metrics(items):
+    out = dict.fromkeys(_METRIC_KEYS, 0)
+    for m in items:
+        for k in _METRIC_KEYS:
+            out[k] += m[k]
+    return out
+
+
+_SORT_KEYS = {
+    None: lambda m: m['cpu_hours'] + m['gpu_hours'],
+    'job_count': lambda m: m['job_count'],
+    'gpu_hours': lambda m: m['gpu_hours'],
+    'charges': lambda m: m['cpu_charges'] + m['gpu_charges'],
+}
+
+
+def _install_window_plugin(app, monkeypatch):
+    """Mock plugin that really aggregates a synthetic per-(day, user) table,
+    so whole-window answers can be compared with composed ones."""
+    data = _part_data()
+    calls = []
+
+    def _window(start, end):
+        return {k: v for k, v in data.items() if start <= k[0] <= end}
+
+    def _per_user(rows):
+        users = {}
+        for (_, user), m in rows.items():
+            users.setdefault(user, []).append(m)
+        return {u: _sum_metrics(ms) for u, ms in users.items()}
+
+    class FakeJobQueries:
+        def __init__(self, session, machine='derecho'):
+            pass
+
+        def jobs_usage_by(self, dimension, *, limit=None, start=None, end=None,
+                          sort_by=None, **kwargs):
+            calls.append(('usage_by', start, end))
+            per_user = _per_user(_window(start, end))
+            ranked = sorted(per_user.items(), key=lambda kv: -_SORT_KEYS[sort_by](kv[1]))
+            rows = [{'value': u, **m} for u, m in ranked]
+            return {'dimension': dimension,
+                    'rows': rows if limit is None else rows[:limit],
+                    'totals': _sum_metrics(per_user.values())}
+
+        def jobs_timeseries(self, period, *, start=None, end=None, owners_limit=None,
+                            owners_sort_by=None, **kwargs):
+            calls.append(('timeseries', start, end))
+            rows = _window(start, end)
+            top = []
+            if owners_limit is not None:
+                ranked = sorted(_per_user(rows).items(),
+                                key=lambda kv: -_SORT_KEYS[owners_sort_by](kv[1]))
+                top = [u for u, _ in ranked[:owners_limit]]
+            bands = []
+            day = start
+            while day <= end:
+                label = day.isoformat()
+                band = {'label': label, 'start': label, 'end': label,
+                        **_sum_metrics(m for (d, _), m in rows.items() if d == day)}
+                if owners_limit is not None:
+                    band['owners'] = {u: rows.get((day, u), dict.fromkeys(_METRIC_KEYS, 0))
+                                      for u in top}
+                bands.append(band)
+                day += timedelta(days=1)
+            totals = _sum_metrics(rows.values())
+            return {'period': period, 'owners_by': 'user',
+                    'start': start.isoformat(), 'end': end.isoformat(),
+                    'bands': bands, 'totals': totals,
+                    'null_count': 0, 'total_count': totals['job_count']}
+
+    fake_mod = types.SimpleNamespace(
+        get_engine=lambda machine, pool_kwargs=None: MagicMock(),
+        get_session=lambda machine, engine=None: MagicMock(name='jh_session'),
+        JobQueries=FakeJobQueries)
+    monkeypatch.setitem(app.extensions, 'hpc_usage_queries', {
+        'module': fake_mod,
+        'engines': {'derecho': MagicMock()},
+        'enabled': True,
+    })
+    return calls
+
+
+@pytest.fixture
+def partials_on(app, monkeypatch):
+    from webapp.jobs import cache as c
+    monkeypatch.setitem(app.config, 'JOBS_PARTIAL_CACHE_TTL', 86400)
+    c._adapters.clear()
+    with app.app_context():
+        yield
+
+
+def _assert_envelopes_match(got, expected):
+    assert got.keys() == expected.keys()
+    for key, value in expected.items():
+        if key in ('rows', 'bands'):
+            assert len(got[key]) == len(value)
+            for g, e in zip(got[key], value):
+                assert g.keys() == e.keys()
+                for k, v in e.items():
+                    if k == 'owners':
+                        assert list(g[k]) == list(v)     # same keys, same order
+                        for name, m in v.items():
+                            assert g[k][name] == pytest.approx(m)
+                    else:
+                        assert g[k] == pytest.approx(v)
+        else:
+            assert got[key] == pytest.approx(value)
+
+
+@pytest.mark.parametrize('start, end', [
+    (date(2025, 3, 1), date(2025, 3, 31)),     # Saturday → Monday edges
+    (date(2025, 3, 3), date(2025, 3, 16)),     # exactly two ISO weeks
+    (date(2025, 4, 9), date(2025, 4, 9)),      # one day
+])
+def test_split_window_covers_window_with_iso_weeks(start, end):
+    from webapp.jobs.partials import split_window
+
+    chunks = split_window(start, end)
+    days = [c[0] + timedelta(days=i) for c in chunks for i in range((c[1] - c[0]).days + 1)]
+    assert days == [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    for first, last in chunks:
+        assert first == last or (first.weekday() == 0 and (last - first).days == 6)
+
+
+def test_composition_is_off_by_default(app, monkeypatch):
+    """TTL 0 leaves every aggregation on the whole-window path."""
+    from webapp.jobs import cache as c, service
+    c._adapters.clear()
+    calls = _install_window_plugin(app, monkeypatch)
+
+    with app.app_context():
+        assert not c.partials_enabled()
+        service.jobs_usage_by_user('derecho', MachineJobScope(),
+                                   start=date(2025, 3, 1), end=date(2025, 5, 29))
+    assert calls == [('usage_by', date(2025, 3, 1), date(2025, 5, 29))]
+
+
+@pytest.mark.parametrize('sort_by', [None, 'gpu_hours', 'charges'])
+def test_composed_usage_matches_whole_window(app, monkeypatch, partials_on, sort_by):
+    from webapp.jobs import cache as c, service
+    calls = _install_window_plugin(app, monkeypatch)
+    win = {'start': date(2025, 3, 4), 'end': date(2025, 6, 1)}
+
+    composed = service.jobs_usage_by_project('derecho', MachineJobScope(),
+                                             limit=5, sort_by=sort_by, **win)
+    c.purge_jobs_cache()
+    monkeypatch.setitem(app.config, 'JOBS_PARTIAL_CACHE_TTL', 0)
+    c._adapters.clear()
+    whole = service.jobs_usage_by_project('derecho', MachineJobScope(),
+                                          limit=5, sort_by=sort_by, **win)
+
+    assert len(whole['rows']) == 5
+    _assert_envelopes_match(composed, whole)
+    assert calls[-1] == ('usage_by', win['start'], win['end'])
+    assert all((e - s).days in (0, 6) for _, s, e in calls[:-1])
+
+
+def test_overlapping_windows_and_sort_orders_share_chunks(app, monkeypatch, partials_on):
+    """30d then 90d ending on the same day: the longer window only computes
+    the chunks the shorter one never saw; a new sort order computes none."""
+    from webapp.jobs import service
+    calls = _install_window_plugin(app, monkeypatch)
+    end = date(2025, 6, 20)
+
+    service.jobs_usage_by_user('derecho', MachineJobScope(),
+                               start=end - timedelta(days=29), end=end)
+    first = len(calls)
+    service.jobs_usage_by_user('derecho', MachineJobScope(),
+                               start=end - timedelta(days=89), end=end)
+    second = len(calls) - first
+    assert second < first * 2
+    recomputed = {(s, e) for _, s, e in calls[first:]}
+    assert not recomputed & {(s, e) for _, s, e in calls[:first]}
+
+    before = len(calls)
+    service.jobs_usage_by_user('derecho', MachineJobScope(), sort_by='job_count',
+                               start=end - timedelta(days=89), end=end)
+    assert len(calls) == before
+    # 60d reuses every whole week; only its ragged leading days are new.
+    service.jobs_usage_by_user('derecho', MachineJobScope(), limit=3,
+                               start=end - timedelta(days=59), end=end)
+    assert 0 < len(calls) - before <= 6
+    assert all(s == e for _, s, e in calls[before:])
+
+
+@pytest.mark.parametrize('owners_limit, owners_sort_by', [
+    (None, None), (4, None), (4, 'job_count'),
+])
+def test_composed_daily_series_matches_whole_window(app, monkeypatch, partials_on,
+                                                    owners_limit, owners_sort_by):
+    from webapp.jobs import cache as c, service
+    _install_window_plugin(app, monkeypatch)
+    win = {'start': date(2025, 3, 5), 'end': date(2025, 4, 27)}
+    opts = dict(owners_limit=owners_limit, owners_sort_by=owners_sort_by, **win)
+
+    composed = service.jobs_timeseries('derecho', 'day', MachineJobScope(), **opts)
+    monkeypatch.setitem(app.config, 'JOBS_PARTIAL_CACHE_TTL', 0)
+    c._adapters.clear()
+    whole = service.jobs_timeseries('derecho', 'day', MachineJobScope(), **opts)
+
+    assert len(composed['bands']) == 54
+    _assert_envelopes_match(composed, whole)
+
+
+def test_partial_bucket_only_holds_settled_chunks():
+    from webapp.jobs.cache import PARTIAL_SETTLE_DAYS, bucket_for_partial
+    today = date.today()
+    assert bucket_for_partial(today) == 'recent'
+    assert bucket_for_partial(today - timedelta(days=1)) == 'historical'
+    assert bucket_for_partial(today - timedelta(days=PARTIAL_SETTLE_DAYS + 1)) == 'partials'